@@ -1,7 +1,6 @@
-from qgis.core import QgsProject, QgsRasterLayer, QgsMapSettings, QgsMapRendererCustomPainterJob, Qgis, QgsMessageLog, QgsLayerTreeLayer, QgsRasterBandStats, QgsRasterShader, QgsColorRampShader, QgsSingleBandPseudoColorRenderer, QgsSingleBandGrayRenderer, QgsVectorLayer, QgsFields, QgsField, QgsPointXY, QgsRaster, QgsGeometry, QgsRectangle, QgsFeature, QgsFillSymbol, QgsRendererRange, QgsGraduatedSymbolRenderer
-from qgis.PyQt.QtWidgets import QDialog, QCheckBox, QComboBox, QPushButton, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QListView, QLabel, QVBoxLayout, QListWidgetItem, QLabel, QProgressBar, QApplication, QStyledItemDelegate, QStyleOptionViewItem, QStyle, QAbstractItemView, QFileDialog, QProgressBar
+from qgis.core import QgsProject, QgsRasterLayer, QgsMapSettings, QgsMapRendererCustomPainterJob, Qgis, QgsMessageLog, QgsLayerTreeLayer, QgsRasterBandStats, QgsRasterShader, QgsColorRampShader, QgsSingleBandPseudoColorRenderer, QgsSingleBandGrayRenderer, QgsVectorLayer, QgsFields, QgsField, QgsPointXY, QgsRaster, QgsGeometry, QgsRectangle, QgsFeature, QgsFillSymbol, QgsRendererRange, QgsGraduatedSymbolRenderer, QgsCoordinateTransform, QgsWkbTypes
+from qgis.PyQt.QtWidgets import QDialog, QCheckBox, QComboBox, QPushButton, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QListView, QLabel, QVBoxLayout, QListWidgetItem, QLabel, QProgressBar, QApplication, QStyledItemDelegate, QStyleOptionViewItem, QStyle, QAbstractItemView, QFileDialog, QProgressBar, QListWidget, QDialogButtonBox, QTableWidget, QTableWidgetItem, QDoubleSpinBox, QMessageBox
 from qgis.PyQt.QtGui import QImage, QPainter, QPixmap, QColor, QStandardItemModel, QStandardItem, QFont, QPen, QBrush
-from qgis.analysis import QgsRasterCalculatorEntry, QgsRasterCalculator
 from qgis.PyQt.QtCore import Qt, QSize, QFileInfo, QVariant, QRect, QPoint, QEvent, QSettings, QItemSelectionModel, QCoreApplication
 from qgis.utils import iface
 from qgis.PyQt import uic
@@ -14,6 +13,11 @@ import time
 import math
 import os
 
+from .raster_blocos import contar_blocos, somar_corte_aterro, escrever_poligonos_pixels, poligonizar_valores_iguais, rasterizar_zonas, somar_corte_aterro_por_zona, grupos_sem_sobreposicao
+from .diferenca_raster import grade_comum, calcular_diferenca, comparar_superficies
+from .volumes_materiais import (ResumoVolumes, resumo_por_poligonos, resumo_por_raster_categorico, classes_raster_categorico, raster_categorico_valido,
+                                CLASSE_PADRAO, FATOR_EMPOLAMENTO_PADRAO, FATOR_COMPACTACAO_PADRAO)
+
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'calcularVolumeMDT.ui'))
 
@@ -28,6 +32,16 @@ class VolumeManager(QDialog, FORM_CLASS):
 
         self.iface = iface
 
+        # Volumes já somados por classe de material, por (ID do raster, fonte de materiais);
+        # trocar os fatores reaproveita estes resumos sem reler os rasters
+        self.resumos_volumes = {}
+
+        # Fonte dos materiais: None (material único), ('poligono', ID da camada, campo) ou ('raster', ID da camada)
+        self.fonte_materiais = None
+
+        # Fatores {material: (empolamento, compactacao)}; CLASSE_PADRAO vale para os materiais sem fatores próprios
+        self.fatores_materiais = {CLASSE_PADRAO: (FATOR_EMPOLAMENTO_PADRAO, FATOR_COMPACTACAO_PADRAO)}
+
         # Cria uma cena gráfica para os QGraphicsViews
         self.scene = QGraphicsScene()
         self.scene2 = QGraphicsScene()  # Segunda cena gráfica
@@ -77,6 +91,16 @@ class VolumeManager(QDialog, FORM_CLASS):
         # Conectar o botão pushButtonVolume à função de cálculo de volume
         self.pushButtonVolume.clicked.connect(self.calculate_volume)
 
+        # Conecta o botão de comparação em lote do primitivo com várias superfícies
+        self.pushButtonLote.clicked.connect(self.calculate_volume_lote)
+
+        # Conecta o botão dos fatores de empolamento e compactação por material
+        self.pushButtonFatores.clicked.connect(self.abrir_fatores_materiais)
+
+        # Conecta o botão de volumes por zona e a verificação da camada de zonas
+        self.pushButtonVolumeZonas.clicked.connect(self.calculate_volume_zonas)
+        self.comboBoxZonas.currentIndexChanged.connect(self.verificar_selecao_volume)
+
         # Conecta o botão de exportação ao método export_to_excel
         self.pushButtonExcel.clicked.connect(self.exportar_tabela_para_excel)
 
@@ -107,6 +131,7 @@ class VolumeManager(QDialog, FORM_CLASS):
 
         # Atualiza os ComboBoxes
         self.init_combo_box_raster()
+        self.init_combo_box_zonas()
 
         # Tenta restaurar a seleção anterior para ambos os ComboBoxes
         if current_layer_id:
@@ -244,12 +269,15 @@ class VolumeManager(QDialog, FORM_CLASS):
 
         # Reseta o estado dos checkboxes ao iniciar o diálogo
         self.checkBoxPoligono.setChecked(False)
+        self.checkBoxDissolver.setChecked(False)
         self.checkBoxCorteAterro.setChecked(False)
         self.checkBoxSalvar.setChecked(False)
         
         # Verifica as condições para habilitar/desabilitar o botão Calcular
         self.verificar_condicoes_calculo()
 
+        self.init_combo_box_zonas()  # Atualiza as camadas de polígonos disponíveis para o volume por zonas
+
         self.verificar_selecao_volume()  # reseta o estado do pushButtonVolume ao iniciar o diálogo
 
         # Reseta o estado do pushButtonExcel ao iniciar o diálogo
@@ -285,6 +313,15 @@ class VolumeManager(QDialog, FORM_CLASS):
         self._log_message(f"Camada '{layer.name()}' adicionada ao grupo '{group_name}'.", Qgis.Info)
 
     def update_list_view_on_layer_removed(self, layer_ids):
+        # Descarta os volumes guardados das camadas removidas (rasters de diferenças ou fontes de materiais)
+        removidos = set(layer_ids)
+        for chave in list(self.resumos_volumes):
+            layer_id, fonte = chave
+            if layer_id in removidos or (fonte is not None and fonte[1] in removidos):
+                del self.resumos_volumes[chave]
+        if self.fonte_materiais is not None and self.fonte_materiais[1] in removidos:
+            self.fonte_materiais = None
+
         group = QgsProject.instance().layerTreeRoot().findGroup("Calculados")
         if group:
             self.update_list_view(group)
@@ -402,6 +439,24 @@ class VolumeManager(QDialog, FORM_CLASS):
             self.display_raster()  # Exibe no primeiro gráfico
             self.display_raster2()  # Exibe no segundo gráfico
 
+    def init_combo_box_zonas(self):
+        """
+        Preenche o comboBoxZonas com as camadas de polígonos do projeto, mantendo a seleção atual quando possível.
+        """
+        current_layer_id = self.comboBoxZonas.currentData()
+
+        self.comboBoxZonas.blockSignals(True)
+        self.comboBoxZonas.clear()
+        for layer in QgsProject.instance().mapLayers().values():
+            if isinstance(layer, QgsVectorLayer) and layer.geometryType() == QgsWkbTypes.PolygonGeometry:
+                self.comboBoxZonas.addItem(layer.name(), layer.id())
+
+        index = self.comboBoxZonas.findData(current_layer_id)
+        self.comboBoxZonas.setCurrentIndex(index if index != -1 else 0)
+        self.comboBoxZonas.blockSignals(False)
+
+        self.verificar_selecao_volume()
+
     def sync_combo_boxes(self):
         # Obtém o ID das camadas selecionadas em cada comboBox
         selected_id_1 = self.comboBoxRaster.currentData()
@@ -618,6 +673,13 @@ class VolumeManager(QDialog, FORM_CLASS):
         return unique_name
 
     def calculate_raster_difference(self):
+        """
+        Calcula o raster de diferenças (modificado - primitivo) e o adiciona ao grupo "Calculados".
+
+        Os dois rasters são alinhados na grade do primitivo e subtraídos em janelas numpy; os volumes
+        de corte e aterro são somados na mesma passagem e guardados para calculate_volume(), que assim
+        não precisa reler o raster gravado.
+        """
         # Obtém os IDs das camadas raster selecionadas
         raster_id_primitivo = self.comboBoxRaster.currentData()
         raster_id_modificado = self.comboBoxRaster2.currentData()
@@ -636,131 +698,71 @@ class VolumeManager(QDialog, FORM_CLASS):
             self._log_message("Erro: As camadas raster devem ter o mesmo sistema de referência de coordenadas (CRS).", Qgis.Critical)
             return
 
-        # Definir a extensão de interseção entre os dois rasters
-        intersection_extent = raster_primitivo.extent().intersect(raster_modificado.extent())
-
-        if intersection_extent.isEmpty():
+        # Grade comum: interseção das extensões, com a resolução e o alinhamento do raster primitivo
+        grade = grade_comum(raster_primitivo, raster_modificado)
+        if grade is None:
             self._log_message("Erro: As camadas raster não possuem sobreposição.", Qgis.Critical)
             return
 
-        # Calcular a resolução com base no raster primitivo
-        resolution_x = raster_primitivo.rasterUnitsPerPixelX()
-        resolution_y = raster_primitivo.rasterUnitsPerPixelY()
-
-        # Calcular o número de colunas e linhas para a extensão de interseção
-        width = int(intersection_extent.width() / resolution_x)
-        height = int(intersection_extent.height() / resolution_y)
-
         # Definir o caminho de saída para o raster resultante
         temp_fd, temp_path = tempfile.mkstemp(suffix='.tif')
         os.close(temp_fd)  # Fechar o arquivo temporário
 
-        # Criar as entradas para o QgsRasterCalculator
-        entries = []
-
-        entry_primitivo = QgsRasterCalculatorEntry()
-        entry_primitivo.raster = raster_primitivo
-        entry_primitivo.bandNumber = 1  # Usar a banda 1
-        entry_primitivo.ref = 'primitivo@1'
-        entries.append(entry_primitivo)
-
-        entry_modificado = QgsRasterCalculatorEntry()
-        entry_modificado.raster = raster_modificado
-        entry_modificado.bandNumber = 1  # Usar a banda 1
-        entry_modificado.ref = 'modificado@1'
-        entries.append(entry_modificado)
-
-        # Expressão de cálculo: -(primitivo - modificado)
-        expression = '-1 * (primitivo@1 - modificado@1)'
-
-        # Número total de etapas para o progresso
-        total_steps = width * height
-
-        # Inicializa a barra de progresso
+        # Inicializa a barra de progresso com o número de janelas a processar
+        total_steps = grade.contar_blocos()
         progress_bar, progress_message = self.iniciar_progress_bar(total_steps)
 
-        # Criar o objeto QgsRasterCalculator para realizar a operação
-        calculator = QgsRasterCalculator(
-            expression,
-            temp_path,
-            'GTiff',
-            intersection_extent,
-            width,
-            height,
-            entries
-        )
+        def atualizar_progresso(blocos_processados):
+            progress_bar.setValue(blocos_processados)
+            QCoreApplication.processEvents()  # Permite a atualização da interface
 
         # Captura o tempo inicial
         start_time = time.time()
 
-        # Inicia o cálculo e atualiza a barra de progresso a cada linha processada
-        result = 0
-        for i in range(height):
-            progress_bar.setValue(i * width)  # Atualiza a barra de progresso
-            QCoreApplication.processEvents()  # Permite a atualização da interface
-            # Simula o cálculo parcial para cada linha do raster (exemplo fictício)
-            # Este é apenas um exemplo e deve ser substituído pelo cálculo real
-            if result != 0:
-                self.mostrar_mensagem(f"Erro ao calcular a diferença dos rasters: {result}", "Erro", 5)
-                break
-
-        # Finaliza o cálculo do raster
-        result = calculator.processCalculation()
+        try:
+            _, total_corte, total_aterro = calcular_diferenca(raster_primitivo, raster_modificado, temp_path, progresso=atualizar_progresso)
+        except RuntimeError as e:
+            self.iface.messageBar().popWidget(progress_message)
+            self.mostrar_mensagem(f"Erro ao calcular a diferença dos rasters: {e}", "Erro", 5)
+            return
 
         # Calcula o tempo total gasto
         total_time = time.time() - start_time
 
-        # Verifica se houve sucesso no cálculo
-        if result != 0:
-            self.mostrar_mensagem(f"Erro ao calcular a diferença dos rasters: {result}", "Erro", 5)
-            return
-
-        # Completa a barra de progresso
-        progress_bar.setValue(total_steps)
         self.iface.messageBar().popWidget(progress_message)  # Remove a mensagem de progresso
 
         # Adicionar o raster resultante ao projeto e obter a camada resultante
         result_layer = self.add_result_raster_to_project(temp_path, raster_primitivo.name(), raster_modificado.name())
 
+        # Guarda os volumes já somados para o cálculo de volume desta camada
+        if result_layer:
+            self.resumos_volumes[(result_layer.id(), None)] = ResumoVolumes.material_unico(total_corte, total_aterro)
+
         # Se o checkBoxPoligono estiver selecionado e a camada resultante for válida, gera a camada de polígonos
         if self.checkBoxPoligono.isChecked() and result_layer:
-            self.gerar_camadas_poligono_custom(result_layer)
+            self.gerar_camadas_poligono_custom(result_layer, dissolver=self.checkBoxDissolver.isChecked())
 
         # Exibe mensagem de sucesso com o tempo total gasto
         self.mostrar_mensagem(f"Sucesso: raster calculado em {total_time:.2f} segundos.", "Sucesso", 5)
 
-    def gerar_camadas_poligono_custom(self, raster_layer):
+    def gerar_camadas_poligono_custom(self, raster_layer, dissolver=False):
         """
         Gera uma camada de polígonos a partir de um raster, onde cada pixel se torna um polígono.
         Adiciona um campo de volume calculado como o valor do pixel multiplicado pela área do pixel.
 
+        As geometrias são montadas por bloco do raster e enviadas ao provedor com um único addFeatures
+        por bloco. Com dissolver=True, pixels vizinhos de mesmo valor são agrupados com GDAL Polygonize
+        e o volume passa a ser o valor multiplicado pela área do polígono.
+
         Parâmetros:
         - raster_layer: Camada raster de entrada.
+        - dissolver: Agrupa pixels vizinhos de mesmo valor em um único polígono.
         """
 
         # Captura o tempo inicial
         start_time = time.time()
 
-        # Define o caminho temporário para a camada de polígonos
-        temp_fd, temp_polygon_path = tempfile.mkstemp(suffix='.shp')
-        os.close(temp_fd)  # Fecha o arquivo temporário
-
-        # Definir o provedor e a extensão do raster
         provider = raster_layer.dataProvider()
-        extent = provider.extent()
-        pixelSizeX = raster_layer.rasterUnitsPerPixelX()
-        pixelSizeY = raster_layer.rasterUnitsPerPixelY()
-        width = provider.xSize()
-        height = provider.ySize()
-
-        # Calcula a área de cada pixel (polígono)
-        area_pixel = pixelSizeX * pixelSizeY
-
-        # Número total de pixels a serem processados
-        total_pixels = width * height
-
-        # Inicializa a barra de progresso
-        progress_bar, progress_message = self.iniciar_progress_bar(total_pixels)
 
         # Cria uma nova camada de polígonos temporária
         campos = QgsFields()
@@ -774,46 +776,27 @@ class VolumeManager(QDialog, FORM_CLASS):
         pr.addAttributes(campos)
         camada_poligono.updateFields()
 
-        # Inicializa um ID para as features
-        ID = 0
-        valores_pixel = []  # Lista para armazenar valores de pixels
-
-        # Itera sobre cada pixel no raster para criar polígonos
-        for row in range(height):
-            for col in range(width):
-                ID += 1
-
-                # Calcula a coordenada do centro do pixel
-                x = extent.xMinimum() + col * pixelSizeX + pixelSizeX / 2
-                y = extent.yMaximum() - row * pixelSizeY - pixelSizeY / 2
-                ponto = QgsPointXY(x, y)
-                valor_pixel = provider.identify(ponto, QgsRaster.IdentifyFormatValue).results().get(1)
-
-                if valor_pixel is not None:  # Ignorar pixels NoData
-                    # Definir coordenadas do retângulo do pixel
-                    xMin = extent.xMinimum() + col * pixelSizeX
-                    xMax = extent.xMinimum() + (col + 1) * pixelSizeX
-                    yMax = extent.yMaximum() - row * pixelSizeY
-                    yMin = extent.yMaximum() - (row + 1) * pixelSizeY
-
-                    # Criar um polígono a partir do retângulo do pixel
-                    poligono = QgsGeometry.fromRect(QgsRectangle(xMin, yMin, xMax, yMax))
+        def montar_atributos(ids, valores, areas):
+            # Volume = valor do pixel * área do polígono
+            return zip(ids.tolist(), valores.tolist(), (valores * areas).tolist())
 
-                    # Calcular o volume (valor do pixel * área do pixel)
-                    volume = valor_pixel * area_pixel
-
-                    # Criar uma nova feature com os atributos e a geometria
-                    feature = QgsFeature()
-                    feature.setGeometry(poligono)
-                    feature.setAttributes([ID, valor_pixel, volume])
-                    pr.addFeature(feature)
+        # Inicializa a barra de progresso (percentual no modo dissolvido, blocos no modo por pixel)
+        total_steps = 100 if dissolver else contar_blocos(provider)
+        progress_bar, progress_message = self.iniciar_progress_bar(total_steps)
 
-                    # Adicionar o valor do pixel à lista para estatísticas (opcional)
-                    valores_pixel.append(valor_pixel)
+        def atualizar_progresso(valor):
+            progress_bar.setValue(valor)
+            QCoreApplication.processEvents()  # Permite a atualização da interface
 
-                # Atualiza a barra de progresso a cada pixel processado
-                progress_bar.setValue(ID)
-                QCoreApplication.processEvents()  # Permite a atualização da interface
+        try:
+            if dissolver:
+                poligonizar_valores_iguais(raster_layer, pr, montar_atributos, progresso=atualizar_progresso)
+            else:
+                escrever_poligonos_pixels(provider, pr, montar_atributos, progresso=atualizar_progresso)
+        except ValueError as e:
+            self.iface.messageBar().popWidget(progress_message)
+            self.mostrar_mensagem(str(e), "Erro", 5)
+            return
 
         # Atualizar a camada de polígonos com as novas features
         camada_poligono.updateExtents()
@@ -823,7 +806,7 @@ class VolumeManager(QDialog, FORM_CLASS):
         self.aplicar_estilo_atribuido(camada_poligono)
 
         # Finaliza a barra de progresso
-        progress_bar.setValue(total_pixels)
+        progress_bar.setValue(total_steps)
         self.iface.messageBar().popWidget(progress_message)  # Remove a mensagem de progresso
 
         # Calcula o tempo total gasto
@@ -887,52 +870,267 @@ class VolumeManager(QDialog, FORM_CLASS):
         # Nome da camada raster
         layer_name = raster_layer.name()
 
-        # Definir fator de empolamento (exemplo: 1.3 para 30% de empolamento)
-        fator_empolamento = 1.3
+        chave_resumo = (layer_id, self.fonte_materiais)
+        resumo = self.resumos_volumes.get(chave_resumo)
 
-        # Obter o provedor de dados e a extensão do raster
-        provider = raster_layer.dataProvider()
-        extent = raster_layer.extent()
-        pixel_size_x = raster_layer.rasterUnitsPerPixelX()
-        pixel_size_y = raster_layer.rasterUnitsPerPixelY()
-
-        # Inicializar variáveis para cálculo de volumes
-        total_corte = 0.0
-        total_aterro = 0.0
-
-        # Calcular volume para cada pixel
-        for row in range(provider.ySize()):
-            for col in range(provider.xSize()):
-                # Coordenada do centro do pixel
-                x = extent.xMinimum() + col * pixel_size_x + pixel_size_x / 2
-                y = extent.yMaximum() - row * pixel_size_y - pixel_size_y / 2
-                point = QgsPointXY(x, y)
-                pixel_value = provider.identify(point, QgsRaster.IdentifyFormatValue).results().get(1)
-
-                if pixel_value is not None:
-                    # Calcular área do pixel (considerando retângulo)
-                    area = pixel_size_x * pixel_size_y
-
-                    # Calcular volume do pixel
-                    volume = pixel_value * area
-
-                    # Acumular volumes de corte e aterro
-                    if volume < 0:
-                        total_corte += volume
-                    elif volume > 0:
-                        total_aterro += volume
-
-        # Calcular volumes empolados
-        total_corte_empolado = total_corte * fator_empolamento
-        total_aterro_empolado = total_aterro * fator_empolamento
+        if resumo is None:
+            resumo = self.calcular_resumo_volumes(raster_layer)
+            if resumo is None:
+                return
+            self.resumos_volumes[chave_resumo] = resumo
+
+        # Aplica os fatores de cada material aos volumes já somados
+        total_corte, total_aterro = resumo.total_corte, resumo.total_aterro
+        total_corte_empolado, total_aterro_empolado = resumo.aplicar_fatores(self.fatores_materiais)
 
         # Preencher o modelo da tableViewVolumes com as informações atualizadas
-        self.fill_table_view_volumes(layer_name, total_corte, total_aterro, total_corte_empolado, total_aterro_empolado)
+        self.fill_table_view_volumes(layer_name, total_corte, total_aterro, total_corte_empolado, total_aterro_empolado, chave_resumo)
 
-    def fill_table_view_volumes(self, layer_name, total_corte, total_aterro, total_corte_empolado, total_aterro_empolado):
+    def calcular_resumo_volumes(self, raster_layer):
+        """
+        Soma os volumes de corte e aterro do raster por material, conforme a fonte de materiais atual,
+        em uma única leitura do raster em blocos.
+
+        Retorna:
+        - ResumoVolumes, ou None se a fonte de materiais não puder ser usada.
+        """
+        provider = raster_layer.dataProvider()
+
+        # Inicializa a barra de progresso com o número de blocos a serem lidos
+        total_blocos = contar_blocos(provider)
+        progress_bar, progress_message = self.iniciar_progress_bar(total_blocos)
+
+        def atualizar_progresso(blocos_processados):
+            progress_bar.setValue(blocos_processados)
+            QCoreApplication.processEvents()  # Permite a atualização da interface
+
+        try:
+            if self.fonte_materiais is None:
+                # Soma os volumes de corte e aterro lendo o raster em blocos
+                total_corte, total_aterro = somar_corte_aterro(provider, progresso=atualizar_progresso)
+                resumo = ResumoVolumes.material_unico(total_corte, total_aterro)
+            elif self.fonte_materiais[0] == 'poligono':
+                _, camada_id, campo = self.fonte_materiais
+                camada = QgsProject.instance().mapLayer(camada_id)
+                resumo = resumo_por_poligonos(raster_layer, camada, campo, progresso=atualizar_progresso)
+            else:
+                camada = QgsProject.instance().mapLayer(self.fonte_materiais[1])
+                resumo = resumo_por_raster_categorico(raster_layer, camada, progresso=atualizar_progresso)
+        except ValueError as e:
+            self.iface.messageBar().popWidget(progress_message)
+            self.mostrar_mensagem(str(e), "Erro", 5)
+            return None
+
+        self.iface.messageBar().popWidget(progress_message)  # Remove a mensagem de progresso
+        return resumo
+
+    def abrir_fatores_materiais(self):
+        """
+        Abre o diálogo de fatores de empolamento e compactação por material e, se confirmado,
+        atualiza os volumes empolados da tabela a partir dos resumos já calculados (sem reler rasters).
+        """
+        dialogo = DialogoFatoresMateriais(self.fonte_materiais, self.fatores_materiais, self)
+        if dialogo.exec_() != QDialog.Accepted:
+            return
+
+        self.fonte_materiais = dialogo.fonte_materiais
+        self.fatores_materiais = dialogo.fatores_materiais
+        self.atualizar_volumes_empolados()
+
+    def atualizar_volumes_empolados(self):
+        """
+        Recalcula a coluna de volume empolado das camadas da tabela com os fatores atuais,
+        usando os volumes por material guardados em self.resumos_volumes.
+        """
+        model = self.tableViewVolumes.model()
+        if model is None:
+            return
+
+        for row in range(0, model.rowCount() - 1, 2):
+            name_item = model.item(row, 0)
+            resumo = self.resumos_volumes.get(name_item.data(Qt.UserRole)) if name_item is not None else None
+            if resumo is None:
+                continue
+            total_corte_empolado, total_aterro_empolado = resumo.aplicar_fatores(self.fatores_materiais)
+            model.item(row, 3).setText(f"{abs(total_corte_empolado):.3f}")
+            model.item(row + 1, 3).setText(f"{total_aterro_empolado:.3f}")
+
+    def calculate_volume_zonas(self):
+        """
+        Calcula corte, aterro, volume líquido e volumes empolados de cada polígono da camada de zonas
+        sobre o raster de diferenças selecionado e gera uma camada com os resultados.
+
+        Os polígonos são rasterizados uma única vez na grade do raster e os volumes de todas as zonas
+        são acumulados em uma só leitura do raster, bloco a bloco. Polígonos que se sobrepõem são
+        rasterizados em grupos separados (uma leitura por grupo), para que cada um receba toda a sua área.
+        """
+        selected_items = self.listWidgetRasters.selectedItems()
+        if not selected_items:
+            self._log_message("Nenhuma camada selecionada.", Qgis.Warning)
+            return
+
+        raster_layer = QgsProject.instance().mapLayer(selected_items[0].data(Qt.UserRole))
+        camada_zonas = QgsProject.instance().mapLayer(self.comboBoxZonas.currentData())
+
+        if not isinstance(raster_layer, QgsRasterLayer):
+            self._log_message("Camada selecionada não é um raster válido.", Qgis.Critical)
+            return
+
+        if not isinstance(camada_zonas, QgsVectorLayer):
+            self.mostrar_mensagem("Selecione uma camada de polígonos para as zonas.", "Erro")
+            return
+
+        # Fatores da classe padrão (os mesmos para todo o raster): a fonte de materiais não é usada por zona
+        fator_empolamento, fator_compactacao = self.fatores_materiais.get(CLASSE_PADRAO, (FATOR_EMPOLAMENTO_PADRAO, FATOR_COMPACTACAO_PADRAO))
+
+        start_time = time.time()
+
+        # Geometrias das zonas no SRC do raster
+        transformacao = QgsCoordinateTransform(camada_zonas.crs(), raster_layer.crs(), QgsProject.instance())
+        feicoes = []
+        geometrias_wkb = []
+        for feicao in camada_zonas.getFeatures():
+            geometria = QgsGeometry(feicao.geometry())
+            if geometria.isEmpty():
+                continue
+            geometria.transform(transformacao)
+            feicoes.append(feicao)
+            geometrias_wkb.append(bytes(geometria.asWkb()))
+
+        if not feicoes:
+            self.mostrar_mensagem("A camada de zonas não possui polígonos.", "Erro")
+            return
+
+        provider = raster_layer.dataProvider()
+
+        # Zonas sobrepostas iriam para o mesmo pixel: cada grupo sem sobreposição é somado em uma passagem
+        grupos = grupos_sem_sobreposicao(geometrias_wkb)
+        total_blocos = contar_blocos(provider)
+        progress_bar, progress_message = self.iniciar_progress_bar(total_blocos * len(grupos))
+
+        corte = np.zeros(len(geometrias_wkb))
+        aterro = np.zeros(len(geometrias_wkb))
+        area = np.zeros(len(geometrias_wkb))
+        try:
+            for passagem, grupo in enumerate(grupos):
+                def atualizar_progresso(blocos_processados, base=passagem * total_blocos):
+                    progress_bar.setValue(base + blocos_processados)
+                    QCoreApplication.processEvents()  # Permite a atualização da interface
+
+                zonas = rasterizar_zonas(provider, [geometrias_wkb[i] for i in grupo], numeros=[i + 1 for i in grupo])
+                c, a, ar = somar_corte_aterro_por_zona(provider, zonas, len(geometrias_wkb), progresso=atualizar_progresso)
+                zonas = None  # Libera o raster de zonas
+                corte += c
+                aterro += a
+                area += ar
+        except Exception as e:
+            self.mostrar_mensagem(f"Erro ao calcular os volumes por zona: {e}", "Erro", 5)
+            return
+        finally:
+            self.iface.messageBar().popWidget(progress_message)  # Remove a mensagem de progresso
+
+        if len(grupos) > 1:
+            self._log_message(f"Zonas sobrepostas calculadas em {len(grupos)} passagens separadas.", Qgis.Info)
+
+        # Camada de resultados: atributos originais das zonas seguidos dos volumes
+        campos = QgsFields(camada_zonas.fields())
+        for nome in ("Corte", "Aterro", "Liquido", "Corte_Emp", "Aterro_Emp", "Area_Valida"):
+            campo = QgsField(nome, QVariant.Double)
+            if nome.endswith("_Emp"):
+                campo.setAlias(f"{nome} (fatores da classe {CLASSE_PADRAO})")
+            campos.append(campo)
+
+        crs = camada_zonas.crs().authid() or camada_zonas.crs().toWkt()
+        camada_resultado = QgsVectorLayer(f"{QgsWkbTypes.displayString(camada_zonas.wkbType())}?crs={crs}", f"Volumes por Zona - {raster_layer.name()}", "memory")
+        pr = camada_resultado.dataProvider()
+        pr.addAttributes(campos.toList())
+        camada_resultado.updateFields()
+
+        novas_feicoes = []
+        for feicao, v_corte, v_aterro, v_area in zip(feicoes, corte.tolist(), aterro.tolist(), area.tolist()):
+            nova = QgsFeature(camada_resultado.fields())
+            nova.setGeometry(feicao.geometry())
+            nova.setAttributes(feicao.attributes() + [v_corte, v_aterro, v_corte + v_aterro, v_corte * fator_empolamento, v_aterro * fator_compactacao, v_area])
+            novas_feicoes.append(nova)
+        pr.addFeatures(novas_feicoes)
+        camada_resultado.updateExtents()
+
+        QgsProject.instance().addMapLayer(camada_resultado)
+
+        total_time = time.time() - start_time
+        self.mostrar_mensagem(f"Volumes de {len(novas_feicoes)} zonas calculados em {total_time:.2f} segundos.", "Sucesso", 5)
+        if self.fonte_materiais is not None:
+            self._log_message(f"Volumes por zona: Corte_Emp e Aterro_Emp usam os fatores da classe '{CLASSE_PADRAO}', sem a fonte de materiais.", Qgis.Info)
+
+    def calculate_volume_lote(self):
+        """
+        Compara o raster primitivo (comboBoxRaster) com várias superfícies escolhidas pelo usuário e
+        adiciona à tableViewVolumes o corte e o aterro de cada uma.
+
+        O primitivo é lido uma única vez: cada bloco dele é comparado com o bloco correspondente de
+        todas as superfícies, sem gravar rasters de diferenças.
+        """
+        raster_primitivo = QgsProject.instance().mapLayer(self.comboBoxRaster.currentData())
+        if not isinstance(raster_primitivo, QgsRasterLayer):
+            self._log_message("Erro: selecione um raster primitivo válido.", Qgis.Critical)
+            return
+
+        # Superfícies candidatas: os demais rasters do projeto com o mesmo SRC do primitivo
+        candidatos = [self.comboBoxRaster.itemData(i) for i in range(self.comboBoxRaster.count())]
+        candidatos = [QgsProject.instance().mapLayer(layer_id) for layer_id in candidatos if layer_id != raster_primitivo.id()]
+        candidatos = [layer for layer in candidatos if isinstance(layer, QgsRasterLayer) and layer.crs() == raster_primitivo.crs()]
+
+        if not candidatos:
+            self.mostrar_mensagem("Não há outras superfícies com o mesmo SRC do raster primitivo.", "Erro")
+            return
+
+        dialogo = DialogoSelecionarSuperficies(candidatos, self)
+        if dialogo.exec_() != QDialog.Accepted or not dialogo.superficies_selecionadas:
+            return
+        superficies = dialogo.superficies_selecionadas
+
+        total_steps = contar_blocos(raster_primitivo.dataProvider())
+        progress_bar, progress_message = self.iniciar_progress_bar(total_steps)
+
+        def atualizar_progresso(blocos_processados):
+            progress_bar.setValue(blocos_processados)
+            QCoreApplication.processEvents()  # Permite a atualização da interface
+
+        start_time = time.time()
+
+        try:
+            volumes = comparar_superficies(raster_primitivo, superficies, progresso=atualizar_progresso)
+        except RuntimeError as e:
+            self.iface.messageBar().popWidget(progress_message)
+            self.mostrar_mensagem(f"Erro ao comparar as superfícies: {e}", "Erro", 5)
+            return
+
+        self.iface.messageBar().popWidget(progress_message)  # Remove a mensagem de progresso
+
+        for superficie, (total_corte, total_aterro) in zip(superficies, volumes):
+            nome = f"{raster_primitivo.name()}_{superficie.name()}"
+            if self.fonte_materiais is not None:
+                # Sem raster de diferenças não há volumes por material: vale a classe padrão
+                nome += f" (fatores: {CLASSE_PADRAO})"
+
+            # Guarda o resumo (material único) para que os volumes empolados acompanhem a troca de fatores;
+            # a chave segue o formato (camada, fonte) e é descartada se a superfície ou o primitivo forem removidos
+            chave_resumo = (superficie.id(), ('lote', raster_primitivo.id()))
+            resumo = ResumoVolumes.material_unico(total_corte, total_aterro)
+            self.resumos_volumes[chave_resumo] = resumo
+            total_corte_empolado, total_aterro_empolado = resumo.aplicar_fatores(self.fatores_materiais)
+            self.fill_table_view_volumes(nome, total_corte, total_aterro, total_corte_empolado, total_aterro_empolado, chave_resumo)
+
+        total_time = time.time() - start_time
+        self.mostrar_mensagem(f"{len(superficies)} superfícies comparadas em {total_time:.2f} segundos.", "Sucesso", 5)
+
+    def fill_table_view_volumes(self, layer_name, total_corte, total_aterro, total_corte_empolado, total_aterro_empolado, chave_resumo=None):
         """
         Preenche a tableViewVolumes com os volumes de corte e aterro, incluindo o volume empolado.
         Adiciona os dados da nova camada abaixo das camadas existentes.
+
+        chave_resumo (opcional) identifica, em self.resumos_volumes, os volumes por material da camada,
+        usados para atualizar o volume empolado quando os fatores mudam.
         """
         # Obter o modelo existente da tableView
         model = self.tableViewVolumes.model()
@@ -959,6 +1157,7 @@ class VolumeManager(QDialog, FORM_CLASS):
 
         # Nome da camada
         name_item = QStandardItem(layer_name)
+        name_item.setData(chave_resumo, Qt.UserRole)
 
         # Adicionar linha com o nome da camada apenas na primeira linha
         model.appendRow([name_item, corte_item, volume_corte, volume_corte_empolado])
@@ -1133,6 +1332,9 @@ class VolumeManager(QDialog, FORM_CLASS):
         else:
             self.pushButtonVolume.setEnabled(False)
 
+        # O volume por zonas também precisa de uma camada de polígonos
+        self.pushButtonVolumeZonas.setEnabled(bool(selected_items) and self.comboBoxZonas.currentData() is not None)
+
     def verificar_dados_excel(self):
         """
         Verifica se há dados no tableViewVolumes e ativa/desativa o pushButtonExcel.
@@ -1194,6 +1396,175 @@ class VolumeManager(QDialog, FORM_CLASS):
         # Se todas as condições forem atendidas, ativa o botão
         self.pushButtonCalcular.setEnabled(True)
 
+class DialogoSelecionarSuperficies(QDialog):
+    """
+    Diálogo com a lista das superfícies (rasters) disponíveis para a comparação em lote com o raster primitivo.
+    """
+    def __init__(self, rasters, parent=None):
+        super(DialogoSelecionarSuperficies, self).__init__(parent)
+        self.setWindowTitle("Selecione as Superfícies")
+        self.rasters = rasters
+        self.superficies_selecionadas = []
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Superfícies comparadas com o raster primitivo:"))
+
+        # Lista com uma caixa de seleção por raster, todas marcadas inicialmente
+        self.lista = QListWidget(self)
+        for raster in rasters:
+            item = QListWidgetItem(raster.name(), self.lista)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            item.setData(Qt.UserRole, raster.id())
+        layout.addWidget(self.lista)
+
+        # Botões OK e Cancelar
+        self.botoes = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
+        self.botoes.accepted.connect(self.accept)
+        self.botoes.rejected.connect(self.reject)
+        layout.addWidget(self.botoes)
+
+    def accept(self):
+        """
+        Armazena as superfícies marcadas, na ordem da lista, e fecha o diálogo.
+        """
+        for i, raster in enumerate(self.rasters):
+            if self.lista.item(i).checkState() == Qt.Checked:
+                self.superficies_selecionadas.append(raster)
+        super(DialogoSelecionarSuperficies, self).accept()
+
+class DialogoFatoresMateriais(QDialog):
+    """
+    Diálogo para escolher a fonte dos materiais (nenhuma, camada de polígonos com um campo de material
+    ou raster categórico) e os fatores de empolamento (aplicado ao corte) e de compactação (aplicado
+    ao aterro) de cada material.
+    """
+    def __init__(self, fonte_materiais, fatores_materiais, parent=None):
+        super(DialogoFatoresMateriais, self).__init__(parent)
+        self.setWindowTitle("Fatores de Empolamento e Compactação")
+        self.fonte_materiais = fonte_materiais
+        self.fatores_materiais = dict(fatores_materiais)
+
+        layout = QVBoxLayout(self)
+
+        # Fonte dos materiais: material único, camadas de polígonos e rasters do projeto
+        layout.addWidget(QLabel("Materiais:"))
+        self.comboFonte = QComboBox(self)
+        self.comboFonte.addItem("Material único", None)
+        for layer in QgsProject.instance().mapLayers().values():
+            if isinstance(layer, QgsVectorLayer) and layer.geometryType() == QgsWkbTypes.PolygonGeometry:
+                self.comboFonte.addItem(f"Polígonos: {layer.name()}", ('poligono', layer.id()))
+            elif isinstance(layer, QgsRasterLayer) and raster_categorico_valido(layer):
+                # Apenas rasters de banda única inteira (MDTs e outros rasters contínuos ficam de fora)
+                self.comboFonte.addItem(f"Raster categórico: {layer.name()}", ('raster', layer.id()))
+        layout.addWidget(self.comboFonte)
+
+        # Campo com o material (apenas para camadas de polígonos)
+        self.comboCampo = QComboBox(self)
+        layout.addWidget(self.comboCampo)
+
+        # Tabela de fatores por material
+        self.tabela = QTableWidget(0, 3, self)
+        self.tabela.setHorizontalHeaderLabels(["Material", "Empolamento", "Compactação"])
+        self.tabela.verticalHeader().setVisible(False)
+        layout.addWidget(self.tabela)
+
+        # Botões OK e Cancelar
+        self.botoes = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
+        self.botoes.accepted.connect(self.accept)
+        self.botoes.rejected.connect(self.reject)
+        layout.addWidget(self.botoes)
+
+        # Restaura a fonte atual
+        if fonte_materiais is not None:
+            for i in range(self.comboFonte.count()):
+                if self.comboFonte.itemData(i) == tuple(fonte_materiais[:2]):
+                    self.comboFonte.setCurrentIndex(i)
+                    break
+
+        self.comboFonte.currentIndexChanged.connect(self.atualizar_campos)
+        self.comboCampo.currentIndexChanged.connect(self.atualizar_tabela)
+        self.atualizar_campos()
+
+        if fonte_materiais is not None and fonte_materiais[0] == 'poligono':
+            self.comboCampo.setCurrentIndex(max(self.comboCampo.findText(fonte_materiais[2]), 0))
+
+    def atualizar_campos(self):
+        """
+        Preenche o comboCampo com os campos da camada de polígonos escolhida e atualiza a tabela de materiais.
+        """
+        fonte = self.comboFonte.currentData()
+
+        self.comboCampo.blockSignals(True)
+        self.comboCampo.clear()
+        if fonte is not None and fonte[0] == 'poligono':
+            camada = QgsProject.instance().mapLayer(fonte[1])
+            self.comboCampo.addItems([campo.name() for campo in camada.fields()])
+        self.comboCampo.setEnabled(self.comboCampo.count() > 0)
+        self.comboCampo.blockSignals(False)
+
+        self.atualizar_tabela()
+
+    def classes_da_fonte(self):
+        """
+        Retorna os materiais da fonte escolhida: valores distintos do campo ou códigos do raster categórico.
+        """
+        fonte = self.comboFonte.currentData()
+        if fonte is None:
+            return []
+
+        camada = QgsProject.instance().mapLayer(fonte[1])
+        if fonte[0] == 'poligono':
+            indice = camada.fields().indexOf(self.comboCampo.currentText())
+            if indice < 0:
+                return []
+            return sorted(str(valor) for valor in camada.uniqueValues(indice))
+        try:
+            return classes_raster_categorico(camada)
+        except ValueError as e:
+            QMessageBox.warning(self, "Raster categórico", str(e))
+            return []
+
+    def atualizar_tabela(self):
+        """
+        Monta uma linha por material (a classe padrão primeiro), com os fatores já definidos ou os da classe padrão.
+        """
+        padrao = self.fatores_materiais.get(CLASSE_PADRAO, (FATOR_EMPOLAMENTO_PADRAO, FATOR_COMPACTACAO_PADRAO))
+        classes = [CLASSE_PADRAO] + [classe for classe in self.classes_da_fonte() if classe != CLASSE_PADRAO]
+
+        self.tabela.setRowCount(len(classes))
+        for linha, classe in enumerate(classes):
+            item = QTableWidgetItem(classe)
+            item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+            self.tabela.setItem(linha, 0, item)
+
+            for coluna, valor in enumerate(self.fatores_materiais.get(classe, padrao), start=1):
+                spin = QDoubleSpinBox(self.tabela)
+                spin.setDecimals(3)
+                spin.setRange(0.1, 5.0)
+                spin.setSingleStep(0.05)
+                spin.setValue(valor)
+                self.tabela.setCellWidget(linha, coluna, spin)
+
+        self.tabela.resizeColumnsToContents()
+
+    def accept(self):
+        """
+        Armazena a fonte dos materiais e os fatores de cada material e fecha o diálogo.
+        """
+        fonte = self.comboFonte.currentData()
+        if fonte is not None and fonte[0] == 'poligono':
+            if not self.comboCampo.currentText():
+                return
+            fonte = ('poligono', fonte[1], self.comboCampo.currentText())
+        self.fonte_materiais = tuple(fonte) if fonte is not None else None
+
+        self.fatores_materiais = {}
+        for linha in range(self.tabela.rowCount()):
+            classe = self.tabela.item(linha, 0).text()
+            self.fatores_materiais[classe] = (self.tabela.cellWidget(linha, 1).value(), self.tabela.cellWidget(linha, 2).value())
+        super(DialogoFatoresMateriais, self).accept()
+
 class DeleteButtonDelegate(QStyledItemDelegate):
     def __init__(self, parent=None):
         super(DeleteButtonDelegate, self).__init__(parent)
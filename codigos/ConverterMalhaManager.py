@@ -8,6 +8,8 @@ import processing
 import math
 import os
 
+from .malha_topologia import ler_stl
+
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'ConverterMalhas.ui'))
 
@@ -656,63 +658,10 @@ class MalhaConverteManager(QDialog, FORM_CLASS):
 
         self.mostrar_mensagem(f"{len(feats)} arestas adicionadas à camada de linhas (CRS: {mesh_crs.authid()}).", "Aviso")
 
-    def parse_stl_ascii(stl_path):
-        """
-        Lê um arquivo STL ASCII e retorna:
-          - Uma lista de vértices (x, y, z) em 'global_vertices'
-          - Uma lista de faces (i1, i2, i3) em 'global_faces'
-        Cada face corresponde a 3 vértices. Duplicados são unificados.
-
-        Retorna (global_vertices, global_faces).
-
-        * Não lida com STL binário.
-        """
-        import re
-
-        # Regex para extrair linhas do tipo "vertex x y z"
-        vertex_pattern = re.compile(r'^\s*vertex\s+([+-]?\d+(\.\d+)?([eE][+-]?\d+)?)\s+([+-]?\d+(\.\d+)?([eE][+-]?\d+)?)\s+([+-]?\d+(\.\d+)?([eE][+-]?\d+)?)')
-
-        vertices_map = {}  # dict para evitar vértices duplicados => {(x, y, z): index}
-        global_vertices = []
-        global_faces = []
-        
-        with open(stl_path, 'r', encoding='utf-8', errors='replace') as f:
-            lines = f.readlines()
-
-        current_facet_vertices = []  # vai acumular índices de 3 vértices
-
-        for line in lines:
-            line = line.strip()
-            # Tenta casar com "vertex x y z"
-            m = vertex_pattern.match(line)
-            if m:
-                # Extraímos x, y, z
-                x_str, y_str, z_str = m.group(1), m.group(4), m.group(7)
-                x, y, z = float(x_str), float(y_str), float(z_str)
-
-                # Se ainda não existe no map, cria
-                if (x, y, z) not in vertices_map:
-                    idx = len(global_vertices)
-                    vertices_map[(x, y, z)] = idx
-                    global_vertices.append((x, y, z))
-                
-                # Index do vértice
-                v_idx = vertices_map[(x, y, z)]
-                current_facet_vertices.append(v_idx)
-
-                # Se já pegamos 3 vértices => 1 triângulo
-                if len(current_facet_vertices) == 3:
-                    # (i1, i2, i3)
-                    i1, i2, i3 = current_facet_vertices
-                    global_faces.append((i1, i2, i3))
-                    current_facet_vertices = []  # zera para o próximo triângulo
-
-        return (global_vertices, global_faces)
-
     def converter_stl_para_2dm_auto(self, stl_path, output_2dm):
         """
-        Converte um arquivo STL ASCII para .2dm (Mesh 2D).
-        - Lê o STL usando parse_stl_ascii (não binário).
+        Converte um arquivo STL (binário ou ASCII) para .2dm (Mesh 2D).
+        - Lê o STL usando parse_stl.
         - Gera e adiciona a malha .2dm ao QGIS.
         - Se checkBoxPontos estiver marcado, cria camada de pontos.
         - Se checkBoxGRADE estiver marcado, cria camada de linhas.
@@ -723,10 +672,10 @@ class MalhaConverteManager(QDialog, FORM_CLASS):
             if not os.path.exists(stl_path):
                 raise FileNotFoundError(f"Arquivo STL não encontrado: {stl_path}")
 
-            # 1) Lê STL ASCII, obtém vértices e faces
-            global_vertices, global_faces = self.parse_stl_ascii(stl_path)
+            # 1) Lê o STL, obtém vértices e faces
+            global_vertices, global_faces = self.parse_stl(stl_path)
             if not global_vertices or not global_faces:
-                raise ValueError("Não foi possível extrair triângulos do STL (pode não ser ASCII ou estar vazio).")
+                raise ValueError("Não foi possível extrair triângulos do STL (arquivo vazio ou inválido).")
 
             # 2) Gera arquivo .2dm
             with open(output_2dm, 'w', encoding='utf-8') as f:
@@ -764,51 +713,20 @@ class MalhaConverteManager(QDialog, FORM_CLASS):
         except Exception as e:
             self.mostrar_mensagem(f"Erro na conversão STL→2DM: {str(e)}", "Erro")
 
-    def parse_stl_ascii(self, stl_path):
+    def parse_stl(self, stl_path):
         """
-        Lê um arquivo STL ASCII e retorna (global_vertices, global_faces).
-        Cada triângulo = 3 linhas "vertex x y z".
+        Lê um arquivo STL (binário ou ASCII) e retorna (global_vertices, global_faces).
+        Vértices repetidos entre triângulos são unificados.
         """
-        import re
-
-        vertex_pattern = re.compile(r'^\s*vertex\s+([+-]?\d+(\.\d+)?([eE][+-]?\d+)?)\s+([+-]?\d+(\.\d+)?([eE][+-]?\d+)?)\s+([+-]?\d+(\.\d+)?([eE][+-]?\d+)?)')
-
-        vertices_map = {}
-        global_vertices = []
-        global_faces = []
-        current_facet_vertices = []
-
-        with open(stl_path, 'r', encoding='utf-8', errors='replace') as f:
-            lines = f.readlines()
-
-        for line in lines:
-            match = vertex_pattern.match(line)
-            if match:
-                x_str, y_str, z_str = match.group(1), match.group(4), match.group(7)
-                x, y, z = float(x_str), float(y_str), float(z_str)
-
-                if (x, y, z) not in vertices_map:
-                    idx = len(global_vertices)
-                    vertices_map[(x, y, z)] = idx
-                    global_vertices.append((x, y, z))
-
-                v_idx = vertices_map[(x, y, z)]
-                current_facet_vertices.append(v_idx)
-                
-                if len(current_facet_vertices) == 3:
-                    # fechou 1 triângulo
-                    i1, i2, i3 = current_facet_vertices
-                    global_faces.append((i1, i2, i3))
-                    current_facet_vertices = []
-
-        return (global_vertices, global_faces)
+        vertices, faces = ler_stl(stl_path)
+        return vertices.tolist(), faces.tolist()
 
     def on_converte_stl_clicked(self):
         # Abre diálogo para selecionar STL
         file_dialog = QFileDialog()
         stl_path, _ = file_dialog.getOpenFileName(
             self,
-            "Selecione o arquivo STL (ASCII)",
+            "Selecione o arquivo STL",
             "",
             "Arquivos STL (*.stl)"
         )
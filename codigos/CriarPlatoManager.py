@@ -20,6 +20,8 @@ import tempfile
 import math
 import os
 
+from .amostragem_raster import obter_amostrador
+
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'platoMDT.ui'))
 
@@ -356,27 +358,12 @@ class PlatoManager(QDialog, FORM_CLASS):
             )
             return None
 
-        identify_result = raster_layer.dataProvider().identify(
-            QgsPointXY(x, y), 
-            QgsRaster.IdentifyFormatValue
-        )
+        # Amostra pelo serviço compartilhado, que mantém em cache os blocos já lidos
+        z_value = obter_amostrador().amostrar_ponto(raster_layer, x, y)
+        if z_value is not None:
+            return round(z_value, 3)
 
-        if identify_result.isValid():
-            results = identify_result.results()
-            if results:
-                band_key = list(results.keys())[0]
-                z_value = results.get(band_key)  # <-- Pode ser None
-                if z_value is None:
-                    self.mostrar_mensagem(
-                        f"Não há valor de elevação (Z) para o pixel em ({x}, {y}). "
-                        "Verifique se o polígono está dentro do raster.",
-                        "Erro"
-                    )
-                    return None
-                # Se `z_value` for válido, convertemos para float
-                return round(float(z_value), 3)
-
-        # Caso identify_result não seja válido ou esteja vazio
+        # Caso não haja valor no ponto (fora do raster ou NoData)
         self.mostrar_mensagem(
             f"Não foi possível identificar o valor Z em ({x}, {y}). "
             "Verifique se o polígono está dentro do raster.",
@@ -1473,15 +1460,9 @@ class PlatoManager(QDialog, FORM_CLASS):
             self.mostrar_mensagem("Camada raster inválida ou não selecionada.", "Erro")
             return None
         
-        identify_result = raster_layer.dataProvider().identify(QgsPointXY(x, y), QgsRaster.IdentifyFormatValue)
-        
-        if identify_result.isValid():
-            results = identify_result.results()
-            if results:
-                band_key = list(results.keys())[0]
-                z_value = results.get(band_key)
-                if z_value is not None:
-                    return round(float(z_value), 3)
+        z_value = obter_amostrador().amostrar_ponto(raster_layer, x, y)
+        if z_value is not None:
+            return round(z_value, 3)
 
         # Se não conseguir identificar o valor Z, retorna None
         self.mostrar_mensagem(f"Não foi possível identificar o valor Z nas coordenadas ({x}, {y}).", "Erro")
@@ -2479,15 +2460,9 @@ class GraficoManager:
 
     def sample_raster_value(self, point, raster_layer):
         """Amostra o valor Z do raster baseado nas coordenadas do ponto."""
-        identify_result = raster_layer.dataProvider().identify(QgsPointXY(point.x(), point.y()), QgsRaster.IdentifyFormatValue)
-        
-        if identify_result.isValid():
-            results = identify_result.results()
-            if results:
-                band_key = list(results.keys())[0]
-                z_value = results.get(band_key)  # Use get para evitar KeyError
-                if z_value is not None:  # Verifica se o valor é válido
-                    return round(float(z_value), 3)
+        z_value = obter_amostrador().amostrar_ponto(raster_layer, point.x(), point.y())
+        if z_value is not None:  # Verifica se o valor é válido
+            return round(z_value, 3)
         return None  # Retorna None se não houver valor válido
 
     def create_support_points_layer(self, estacas_layer, raster_layer):
@@ -3,13 +3,10 @@ from PyQt5.QtGui import QStandardItemModel, QStandardItem, QPixmap, QIcon, QPain
 from PyQt5.QtCore import QDir, Qt, QSize, QEvent, QRect, QPoint, QItemSelectionModel, QSettings, QRectF
 from qgis.core import Qgis, QgsMessageLog
 from PyQt5 import QtCore, QtWidgets
-from PIL.ExifTags import TAGS
 from qgis.utils import iface
 from qgis.PyQt import uic
 from PyQt5 import QtGui
 import pandas as pd
-import PIL.ExifTags
-import PIL.Image
 import simplekml
 import requests
 import zipfile
@@ -17,6 +14,8 @@ import time
 import os
 import re
 
+from .carregador_fotos import carregar_fotos, info_vazia, TAMANHO_MINIATURA
+
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'fotos_kmz.ui'))
 
@@ -43,11 +42,19 @@ class FotosManager(QDialog, FORM_CLASS):
     ultima_pasta = QDir.homePath()  # Variável de classe para armazenar o caminho da última pasta usada
 
     def closeEvent(self, event):
+        if self.carregando_fotos:  # Não fecha no meio do carregamento das fotos
+            event.ignore()
+            return
         parent = self.parent()
         if parent:
             parent.fotos_kmz_dlg = None
         super(FotosManager, self).closeEvent(event)
 
+    def reject(self):
+        if self.carregando_fotos:  # A tecla Esc também não fecha no meio do carregamento
+            return
+        super(FotosManager, self).reject()
+
     def __init__(self, parent=None):
         """
         Construtor da classe FotosManager. Inicializa a interface do usuário e configura os elementos gráficos e as conexões de sinal.
@@ -70,6 +77,8 @@ class FotosManager(QDialog, FORM_CLASS):
 
         self.setWindowTitle("Exporta Fotos para KMZ")  # Define o título da janela
 
+        self.carregando_fotos = False  # Indica um carregamento de fotos em andamento (bloqueia novo carregamento e fechamento)
+
         self.icon_scene = QGraphicsScene(self)  # Inicializa a cena para o graphicsViewIcones
         self.graphicsViewIcones.setScene(self.icon_scene)  # Define a cena no QGraphicsView
 
@@ -346,12 +355,17 @@ class FotosManager(QDialog, FORM_CLASS):
         - Registra o tempo de início do processo de carregamento de imagens.
         - Gera uma lista de caminhos completos das imagens na pasta selecionada, com extensões suportadas.
         - Inicializa uma barra de progresso para o processo de carregamento de imagens.
+        - Desativa os botões Abrir, Fechar e KMZ e a tabela durante o carregamento, que processa eventos da interface
+          e não pode ser reiniciado nem interrompido pelo fechamento do diálogo.
         - Carrega as imagens no TableView com barra de progresso.
         - Remove a barra de progresso ao finalizar.
         - Calcula o tempo de execução do processo de carregamento de imagens.
         - Mostra uma mensagem de sucesso ou erro, dependendo do resultado.
         """
         
+        if self.carregando_fotos:  # Já há um carregamento em andamento
+            return
+
         # Abre um diálogo para selecionar a pasta, usando a última pasta acessada
         pasta = QFileDialog.getExistingDirectory(self, "Selecione a pasta com as imagens", FotosManager.ultima_pasta)
 
@@ -371,11 +385,22 @@ class FotosManager(QDialog, FORM_CLASS):
             # Inicializa a barra de progresso
             progressBar, progressMessageBar = self.iniciar_progress_bar(len(caminhos_imagens))
 
-            # Carrega as imagens no TableView com barra de progresso
-            self.carregar_imagens_no_tableview(caminhos_imagens, progressBar)
+            # Bloqueia os controles que alteram as imagens carregadas enquanto o carregamento processa eventos
+            self.carregando_fotos = True
+            for widget in (self.pushButtonAbrir, self.pushButtonFecha, self.pushButtonKMZ, self.tableViewFotos):
+                widget.setEnabled(False)
 
-            # Remove a barra de progresso ao finalizar
-            iface.messageBar().popWidget(progressMessageBar)
+            try:
+                # Carrega as imagens no TableView com barra de progresso
+                self.carregar_imagens_no_tableview(caminhos_imagens, progressBar)
+            finally:
+                self.carregando_fotos = False
+                for widget in (self.pushButtonAbrir, self.pushButtonFecha, self.tableViewFotos):
+                    widget.setEnabled(True)
+                self.atualizar_estado_itens()  # Reativa o botão KMZ se houver imagens
+
+                # Remove a barra de progresso ao finalizar
+                iface.messageBar().popWidget(progressMessageBar)
 
             # Calcula o tempo de execução
             tempo_execucao = time.time() - tempo_inicio
@@ -469,15 +494,10 @@ class FotosManager(QDialog, FORM_CLASS):
         - Obtém a seleção atual do TableView.
         - Se não houver seleção, retorna sem fazer nada.
         - Obtém o caminho da imagem selecionada e atualiza o lineEdit_Nome.
-        - Lê os dados EXIF da imagem, se disponíveis.
-        - Obtém e converte os valores de latitude, longitude e altitude dos dados EXIF.
+        - Usa as informações EXIF lidas no carregamento das imagens (sem reabrir o arquivo).
         - Converte as coordenadas para o formato DMS (graus, minutos, segundos).
         - Atualiza os QLineEdits correspondentes com as coordenadas, altitude, resolução, data e horário.
         - Em caso de erro, define os QLineEdits como "Erro".
-
-        Exceções:
-        - Lança uma ValueError se não houver dados EXIF.
-        - Lança uma Exception genérica para outros erros.
         """
 
         # Obtém a seleção atual do TableView
@@ -490,46 +510,24 @@ class FotosManager(QDialog, FORM_CLASS):
         caminho_imagem = index.data(Qt.UserRole)
         self.lineEdit_Nome.setText(FotosManager.nomes_imagens.get(caminho_imagem, "N/A"))  # Atualiza o lineEdit_Nome
 
-        # Lê os dados EXIF da imagem
         try:
-            with PIL.Image.open(caminho_imagem) as imagem:  # Abre a imagem usando PIL
-                exif_data = imagem._getexif()  # Obtém os dados EXIF
-                if not exif_data:
-                    raise ValueError("Sem dados EXIF")  # Lança um erro se não houver dados EXIF
-
-                exif = {
-                    TAGS.get(k, k): v
-                    for k, v in exif_data.items()
-                    if k in TAGS
-                }  # Converte os dados EXIF para um dicionário legível
-
-                # Obtém os valores de latitude, longitude e altitude dos dados EXIF
-                gps_info = exif.get("GPSInfo")
-                if gps_info:
-                    lat = self._get_gps_coordinate(gps_info, 2, gps_info.get(1))  # Obtém a latitude
-                    lon = self._get_gps_coordinate(gps_info, 4, gps_info.get(3))  # Obtém a longitude
-                    alt = self._get_gps_altitude(gps_info)  # Obtém a altitude
-
-                    # Converter coordenadas para DMS
-                    lat_ref = gps_info.get(1, 'N')  # Obtém a referência de latitude
-                    lon_ref = gps_info.get(3, 'E')  # Obtém a referência de longitude
-                    lat_dms = self.decimal_to_dms(lat, lat_ref)  # Converte a latitude para DMS
-                    lon_dms = self.decimal_to_dms(lon, lon_ref)  # Converte a longitude para DMS
-
-                    # Define os valores nos QLineEdits correspondentes
-                    self.lineEditLatitude.setText(lat_dms)
-                    self.lineEditLongitude.setText(lon_dms)
-                    self.lineEditAltitude.setText(f"{alt:.2f} m" if isinstance(alt, float) else str(alt))
-                else:
-                    self.lineEditLatitude.setText("N/A")
-                    self.lineEditLongitude.setText("N/A")
-                    self.lineEditAltitude.setText("N/A")
-
-                # Mostrar resolução, data e horário
-                self.mostrar_resolucao_data_horario(caminho_imagem, exif)
+            info = FotosManager.info_imagens.get(caminho_imagem) or info_vazia()  # Informações lidas no carregamento
+            lat, lon, alt = info["latitude"], info["longitude"], info["altitude"]
+
+            if lat != "N/A" and lon != "N/A":
+                # Define os valores nos QLineEdits correspondentes, com as coordenadas em DMS
+                self.lineEditLatitude.setText(self.decimal_to_dms(lat, 'lat'))
+                self.lineEditLongitude.setText(self.decimal_to_dms(lon, 'lon'))
+                self.lineEditAltitude.setText(f"{alt:.2f} m" if isinstance(alt, float) else str(alt))
+            else:
+                self.lineEditLatitude.setText("N/A")
+                self.lineEditLongitude.setText("N/A")
+                self.lineEditAltitude.setText("N/A")
+
+            # Mostrar resolução, data e horário
+            self.mostrar_resolucao_data_horario(info)
 
         except Exception as e:
-            # self.mostrar_mensagem(f"Erro ao ler dados EXIF: {str(e)}")
             self.lineEditLatitude.setText("Erro")
             self.lineEditLongitude.setText("Erro")
             self.lineEditAltitude.setText("Erro")
@@ -537,110 +535,30 @@ class FotosManager(QDialog, FORM_CLASS):
             self.lineEditData.setText("Erro")
             self.lineEditHorario.setText("Erro")
 
-    def _get_gps_coordinate(self, gps_info, ref_index, ref):
-        """
-        Converte os valores GPS em coordenadas decimais.
-
-        Parâmetros:
-        gps_info: dict - O dicionário contendo as informações GPS extraídas dos dados EXIF.
-        ref_index: int - O índice da coordenada específica (latitude ou longitude) nos dados GPS.
-        ref: str - A referência da coordenada (N, S, E, W).
-
-        Retorna:
-        float - A coordenada convertida em decimal ou "N/A" em caso de erro.
-
-        Funções:
-        - Obtém a coordenada GPS do dicionário gps_info usando o índice fornecido.
-        - Verifica se a coordenada e a referência estão presentes.
-        - Converte a coordenada de graus, minutos e segundos para decimal.
-        - Ajusta o sinal da coordenada com base na referência (N, S, E, W).
-        - Retorna a coordenada decimal ou "N/A" em caso de erro.
-        """
-        
-        try:
-            # Converte os valores GPS em coordenadas decimais
-            coord = gps_info.get(ref_index)  # Obtém a coordenada GPS do dicionário gps_info
-            if not coord or not ref:  # Verifica se a coordenada e a referência estão presentes
-                return "N/A"
-
-            coord = [float(x) for x in coord]  # Converte os valores da coordenada para float
-            coord = coord[0] + coord[1] / 60 + coord[2] / 3600  # Converte a coordenada de graus, minutos e segundos para decimal
-
-            if ref in ['S', 'W']:  # Ajusta o sinal da coordenada com base na referência
-                coord = -coord
-
-            return coord  # Retorna a coordenada decimal
-        except Exception as e:
-            self.mostrar_mensagem(f"Erro ao converter coordenadas: {str(e)}")
-            return "N/A"  # Retorna "N/A" em caso de erro
-
-    def _get_gps_altitude(self, gps_info):
-        """
-        Obtém a altitude dos dados GPS dos dados EXIF.
-
-        Parâmetros:
-        gps_info: dict - O dicionário contendo as informações GPS extraídas dos dados EXIF.
-
-        Retorna:
-        float - A altitude em metros ou "N/A" em caso de erro.
-
-        Funções:
-        - Obtém a altitude dos dados GPS usando a chave 6.
-        - Verifica se a altitude está presente.
-        - Converte a altitude para float.
-        - Verifica a referência da altitude (acima ou abaixo do nível do mar) usando a chave 5.
-        - Ajusta o valor da altitude se a referência for abaixo do nível do mar.
-        - Retorna a altitude ou "N/A" em caso de erro.
-        """
-        
-        try:
-            # A chave para altitude nos dados EXIF é geralmente 6
-            alt = gps_info.get(6)  # Obtém a altitude dos dados GPS
-            if not alt:  # Verifica se a altitude está presente
-                return "N/A"
-            altitude = float(alt)  # Converte a altitude para float
-
-            # Verificar a referência da altitude (acima ou abaixo do nível do mar)
-            alt_ref = gps_info.get(5, 0)  # Obtém a referência da altitude usando a chave 5
-            if alt_ref == 1:  # Ajusta o valor da altitude se a referência for abaixo do nível do mar
-                altitude = -altitude
-
-            return altitude  # Retorna a altitude
-        except Exception as e:
-            return "N/A"  # Retorna "N/A" em caso de erro
-
-    def mostrar_resolucao_data_horario(self, caminho_imagem, exif):
+    def mostrar_resolucao_data_horario(self, info):
         """
         Exibe a resolução, data e horário da imagem nos QLineEdits correspondentes.
 
         Parâmetros:
-        caminho_imagem: str - O caminho da imagem a ser aberta.
-        exif: dict - O dicionário contendo as informações EXIF extraídas dos dados da imagem.
+        info: dict - As informações da imagem (resolução, data e hora no formato do EXIF).
 
         Funções:
-        - Abre a imagem usando PIL e obtém a resolução.
         - Define a resolução nos QLineEdits correspondentes.
-        - Obtém a data e a hora em que a foto foi tirada a partir dos dados EXIF.
-        - Formata a data e a hora e define nos QLineEdits correspondentes.
+        - Formata a data e a hora em que a foto foi tirada e define nos QLineEdits correspondentes.
         - Em caso de erro, define os QLineEdits como "Erro".
         """
         
         try:
-            with PIL.Image.open(caminho_imagem) as imagem:  # Abre a imagem usando PIL
-                # Obtém a resolução da imagem
-                width, height = imagem.size  # Obtém a largura e altura da imagem
-                self.lineEditResolucao.setText(f"{width}x{height}")  # Define a resolução no QLineEdit correspondente
-
-                # Obtém a data e a hora em que a foto foi tirada
-                data_hora = exif.get("DateTimeOriginal")  # Obtém a data e hora dos dados EXIF
-                if data_hora:
-                    data, hora = data_hora.split(" ")  # Separa a data e a hora
-                    ano, mes, dia = data.split(":")  # Separa ano, mês e dia
-                    self.lineEditData.setText(f"{dia}/{mes}/{ano}")  # Define a data no QLineEdit correspondente
-                    self.lineEditHorario.setText(hora)  # Define a hora no QLineEdit correspondente
-                else:
-                    self.lineEditData.setText("N/A")  # Define "N/A" no QLineEdit se não houver data
-                    self.lineEditHorario.setText("N/A")  # Define "N/A" no QLineEdit se não houver hora
+            self.lineEditResolucao.setText(info["resolucao"])  # Define a resolução no QLineEdit correspondente
+
+            # Obtém a data e a hora em que a foto foi tirada
+            if info["data"] != "N/A":
+                ano, mes, dia = info["data"].split(":")  # Separa ano, mês e dia
+                self.lineEditData.setText(f"{dia}/{mes}/{ano}")  # Define a data no QLineEdit correspondente
+                self.lineEditHorario.setText(info["hora"])  # Define a hora no QLineEdit correspondente
+            else:
+                self.lineEditData.setText("N/A")  # Define "N/A" no QLineEdit se não houver data
+                self.lineEditHorario.setText("N/A")  # Define "N/A" no QLineEdit se não houver hora
         except Exception as e:
             self.lineEditResolucao.setText("Erro")  # Define "Erro" no QLineEdit em caso de exceção
             self.lineEditData.setText("Erro")  # Define "Erro" no QLineEdit em caso de exceção
@@ -1147,9 +1065,11 @@ class FotosManager(QDialog, FORM_CLASS):
 
         Funções:
         - Cria um modelo padrão e define os cabeçalhos das colunas.
-        - Itera sobre os caminhos das imagens, carregando cada imagem e adicionando ao modelo.
-        - Redimensiona as imagens se forem maiores que 160x160 pixels.
-        - Extrai e armazena informações EXIF das imagens.
+        - Adiciona uma linha por imagem, na ordem da pasta.
+        - Lê as miniaturas (até 160x160 pixels) e as informações EXIF em paralelo, fora da thread da interface,
+          reaproveitando o cache em disco das imagens já carregadas antes.
+        - Define o ícone de cada linha do modelo à medida que as miniaturas ficam prontas; o modelo só é
+          ligado ao TableView ao final, com todas as miniaturas.
         - Define o ícone padrão para cada imagem carregada.
         - Configura o TableView para exibir as miniaturas das imagens.
         - Conecta sinais para exibir coordenadas e atualizar ícones.
@@ -1160,62 +1080,30 @@ class FotosManager(QDialog, FORM_CLASS):
 
         icon_url = self.comboBoxLinks.currentData()  # Obtém a URL do ícone selecionado no comboBoxLinks
 
-        for i, caminho_completo in enumerate(caminhos_imagens):  # Itera sobre os caminhos das imagens
-            pixmap = QPixmap(caminho_completo)  # Carrega a imagem em um QPixmap
-            if pixmap.width() > 160 or pixmap.height() > 160:  # Redimensiona a imagem se for maior que 160x160 pixels
-                pixmap = pixmap.scaled(160, 160, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        for caminho_completo in caminhos_imagens:  # Cria as linhas na ordem das imagens
             item = QStandardItem()  # Cria um item padrão
-            item.setIcon(QIcon(pixmap))  # Define o ícone do item como a imagem carregada
             item.setData(caminho_completo, Qt.UserRole)  # Define o caminho da imagem como dado do item
             modelo.appendRow(item)  # Adiciona o item ao modelo
-            progressBar.setValue(i + 1)  # Atualiza a barra de progresso
 
             nome_imagem = os.path.splitext(os.path.basename(caminho_completo))[0]  # Obtém o nome da imagem
             FotosManager.nomes_imagens[caminho_completo] = nome_imagem  # Armazena o nome da imagem
             FotosManager.icones_imagens[caminho_completo] = icon_url  # Define o ícone padrão para a imagem
 
-            try:
-                with PIL.Image.open(caminho_completo) as imagem:  # Abre a imagem usando PIL
-                    exif_data = imagem._getexif()  # Obtém os dados EXIF da imagem
-                    if exif_data:
-                        exif = {
-                            TAGS.get(k, k): v
-                            for k, v in exif_data.items()
-                            if k in TAGS
-                        }
-
-                        gps_info = exif.get("GPSInfo")
-                        if gps_info:  # Obtém informações de GPS se disponíveis
-                            lat = self._get_gps_coordinate(gps_info, 2, gps_info.get(1))
-                            lon = self._get_gps_coordinate(gps_info, 4, gps_info.get(3))
-                            alt = self._get_gps_altitude(gps_info)
-                        else:
-                            lat, lon, alt = "N/A", "N/A", "N/A"
-
-                        data_hora = exif.get("DateTimeOriginal", "N/A N/A").split()
-                        data = data_hora[0] if len(data_hora) > 0 else "N/A"
-                        hora = data_hora[1] if len(data_hora) > 1 else "N/A"
-
-                        width, height = imagem.size  # Obtém a resolução da imagem
-                        resolucao = f"{width}x{height}"
-
-                        FotosManager.info_imagens[caminho_completo] = {
-                            "latitude": lat,
-                            "longitude": lon,
-                            "altitude": alt,
-                            "data": data,
-                            "hora": hora,
-                            "resolucao": resolucao
-                        }
-            except Exception as e:  # Em caso de erro ao obter informações EXIF
-                FotosManager.info_imagens[caminho_completo] = {
-                    "latitude": "N/A",
-                    "longitude": "N/A",
-                    "altitude": "N/A",
-                    "data": "N/A",
-                    "hora": "N/A",
-                    "resolucao": "N/A"
-                }
+        alturas_linhas = [TAMANHO_MINIATURA] * len(caminhos_imagens)  # Altura de cada linha, ajustada à miniatura
+
+        # Recebe as miniaturas e as informações EXIF conforme as threads terminam
+        for contador, (indice, info, miniatura) in enumerate(carregar_fotos(caminhos_imagens), start=1):
+            caminho_completo = caminhos_imagens[indice]
+            FotosManager.info_imagens[caminho_completo] = info  # Armazena as informações da imagem
+
+            if miniatura:
+                pixmap = QPixmap()
+                pixmap.loadFromData(miniatura)  # Cria o QPixmap na thread da interface, a partir do JPEG já reduzido
+                modelo.item(indice).setIcon(QIcon(pixmap))  # Define o ícone do item como a miniatura
+                alturas_linhas[indice] = pixmap.height()
+
+            progressBar.setValue(contador)  # Atualiza a barra de progresso
+            QtCore.QCoreApplication.processEvents()  # Mantém a interface responsiva durante o carregamento
 
         self.tableViewFotos.setModel(modelo)  # Define o modelo do TableView
         self.tableViewFotos.setItemDelegate(DeleteButtonDelegate(self))  # Define o delegate para o botão de deletar
@@ -1223,8 +1111,8 @@ class FotosManager(QDialog, FORM_CLASS):
         self.tableViewFotos.setEditTriggers(QAbstractItemView.NoEditTriggers)  # Define o comportamento de edição
         self.tableViewFotos.setIconSize(QSize(160, 160))  # Define o tamanho dos ícones
 
-        for row in range(modelo.rowCount()):  # Define a altura das linhas para se ajustar aos ícones
-            self.tableViewFotos.setRowHeight(row, modelo.item(row).icon().availableSizes()[0].height())
+        for row, altura in enumerate(alturas_linhas):  # Define a altura das linhas para se ajustar aos ícones
+            self.tableViewFotos.setRowHeight(row, altura)
 
         header = self.tableViewFotos.horizontalHeader()  # Obtém o cabeçalho horizontal
         header.setDefaultAlignment(Qt.AlignHCenter | Qt.AlignVCenter)  # Define o alinhamento do cabeçalho
@@ -8,6 +8,8 @@ from qgis.PyQt import uic
 import time
 import os
 
+from .raster_blocos import contar_blocos, escrever_poligonos_pixels, poligonizar_valores_iguais, escrever_pontos_pixels, passo_para_limite
+
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'ExtrairCotasMDT.ui'))
 
@@ -545,10 +547,12 @@ class CotasManager(QDialog, FORM_CLASS):
             self.checkboxPoligonos.setChecked(False)  # Desmarca o checkbox de polígonos
             self.checkboxEstilizada.setChecked(False)  # Desmarca o checkbox de estilo
             self.checkboxAtribuida.setChecked(False)  # Desmarca o checkbox de atribuição
+            self.checkboxDissolver.setChecked(False)  # Desmarca o checkbox de dissolução
             self.checkboxPontos.setEnabled(False)  # Desativa o checkbox de pontos
             self.checkboxPoligonos.setEnabled(False)  # Desativa o checkbox de polígonos
             self.checkboxEstilizada.setEnabled(False)  # Desativa o checkbox de estilo
             self.checkboxAtribuida.setEnabled(False)  # Desativa o checkbox de atribuição
+            self.checkboxDissolver.setEnabled(False)  # Desativa o checkbox de dissolução
 
             # Desativa o botão "OK"
             self.okButton.setEnabled(False)  # Desativa o botão "OK"
@@ -559,6 +563,7 @@ class CotasManager(QDialog, FORM_CLASS):
             self.checkboxPoligonos.setEnabled(True)  # Habilita o checkbox de polígonos
             self.checkboxEstilizada.setEnabled(True)  # Habilita o checkbox de estilo
             self.checkboxAtribuida.setEnabled(True)  # Habilita o checkbox de atribuição
+            self.checkboxDissolver.setEnabled(True)  # Habilita o checkbox de dissolução
 
             # Ativa o botão "OK" apenas se pelo menos um checkbox estiver marcado
             if (self.checkboxPontos.isChecked() or 
@@ -683,12 +688,14 @@ class CotasManager(QDialog, FORM_CLASS):
         self.checkboxPoligonos.setChecked(False)  # Desmarca o checkbox de polígonos
         self.checkboxEstilizada.setChecked(False)  # Desmarca o checkbox de estilo
         self.checkboxAtribuida.setChecked(False)  # Desmarca o checkbox de atribuição
+        self.checkboxDissolver.setChecked(False)  # Desmarca o checkbox de dissolução
 
         # Desativa todos os checkboxes
         self.checkboxPontos.setEnabled(False)  # Desativa o checkbox de pontos
         self.checkboxPoligonos.setEnabled(False)  # Desativa o checkbox de polígonos
         self.checkboxEstilizada.setEnabled(False)  # Desativa o checkbox de estilo
         self.checkboxAtribuida.setEnabled(False)  # Desativa o checkbox de atribuição
+        self.checkboxDissolver.setEnabled(False)  # Desativa o checkbox de dissolução
 
         # Desativa o botão "OK"
         self.okButton.setEnabled(False)  # Desativa o botão "OK"
@@ -827,32 +834,29 @@ class CotasManager(QDialog, FORM_CLASS):
         camada_poligono = QgsVectorLayer(f"Polygon?crs={raster_layer.crs().authid()}", layer_name, "memory")
         return camada_poligono
 
-    def processar_cotas_poligonos(self, raster_layer, estilizar=False, atribuir=False):
+    def processar_cotas_poligonos(self, raster_layer, estilizar=False, atribuir=False, dissolver=False):
         """
         Processa uma camada raster para extrair cotas em polígonos e cria uma camada de polígonos no QGIS.
 
         Passos detalhados:
         1. Captura o tempo de início do processo.
         2. Obtém o provedor de dados da camada raster.
-        3. Calcula a extensão e dimensões da camada raster.
-        4. Cria uma camada de polígonos com os campos necessários.
-        5. Itera sobre cada pixel no raster.
-        6. Calcula a resolução do pixel em X e Y.
-        7. Inicia a barra de progresso.
-        8. Para cada pixel, calcula a coordenada do centro do pixel.
-        9. Obtém o valor do pixel.
-        10. Cria um novo polígono e adiciona à camada se o valor do pixel não for nulo.
-        11. Atualiza a barra de progresso periodicamente.
-        12. Atualiza a camada de polígonos e a adiciona ao projeto QGIS.
-        13. Aplica o estilo atribuído se necessário.
-        14. Captura o tempo de fim e calcula o tempo de execução.
-        15. Remove a barra de progresso.
-        16. Exibe uma mensagem de sucesso com o tempo de execução.
+        3. Cria uma camada de polígonos com os campos necessários.
+        4. Inicia a barra de progresso.
+        5. Lê o raster em blocos e monta, para cada bloco, os polígonos dos pixels válidos de uma só vez.
+        6. Envia os polígonos de cada bloco ao provedor com um único addFeatures.
+        7. Se dissolver for True, agrupa pixels vizinhos de mesmo valor com GDAL Polygonize.
+        8. Adiciona a camada de polígonos ao projeto QGIS.
+        9. Aplica o estilo atribuído se necessário.
+        10. Captura o tempo de fim e calcula o tempo de execução.
+        11. Remove a barra de progresso.
+        12. Exibe uma mensagem de sucesso com o tempo de execução.
 
         Parâmetros:
         - raster_layer: Camada raster a ser processada.
         - estilizar: Indica se a camada deve ser estilizada.
         - atribuir: Indica se a camada deve ter estilos atribuídos.
+        - dissolver: Indica se pixels vizinhos de mesmo valor devem formar um único polígono.
 
         Retorna:
         - None
@@ -860,9 +864,6 @@ class CotasManager(QDialog, FORM_CLASS):
         start_time = time.time()  # Capturar o tempo de início
 
         provider = raster_layer.dataProvider()  # Obter o provedor de dados da camada raster
-        extent = provider.extent()  # Obter a extensão da camada raster
-        width = provider.xSize()  # Obter a largura da camada raster
-        height = provider.ySize()  # Obter a altura da camada raster
 
         # Criar a camada de polígonos com um nome exclusivo
         camada_poligono = self.criar_camadas_poligonos_unicas(raster_layer)
@@ -871,45 +872,24 @@ class CotasManager(QDialog, FORM_CLASS):
         pr.addAttributes([QgsField("ID", QVariant.Int), QgsField("Value", QVariant.Double)])  # Adicionar campos
         camada_poligono.updateFields()  # Atualizar os campos da camada de polígonos
 
-        pixelSizeX = provider.extent().width() / width  # Calcular a resolução do pixel em X
-        pixelSizeY = provider.extent().height() / height  # Calcular a resolução do pixel em Y
+        def montar_atributos(ids, valores, areas):
+            return zip(ids.tolist(), valores.tolist())
 
-        total_steps = width * height  # Número total de pixels
+        # Percentual no modo dissolvido, número de blocos no modo por pixel
+        total_steps = 100 if dissolver else contar_blocos(provider)
         progress_bar, progress_message_bar = self.iniciar_progress_bar(total_steps)  # Inicia a barra de progresso
 
-        ID = 0
-        update_interval = 1000  # Atualizar a barra de progresso a cada 1000 pixels
-
-        valores_pixel = []  # Lista para armazenar os valores dos pixels
-
-        for row in range(height):
-            for col in range(width):
-                ID += 1
-
-                # Atualizar a barra de progresso a cada 1000 pixels
-                if ID % update_interval == 0:
-                    progress_bar.setValue(ID)
-
-                # Encontrar a coordenada do centro do pixel
-                x = extent.xMinimum() + col * pixelSizeX + pixelSizeX / 2
-                y = extent.yMaximum() - row * pixelSizeY - pixelSizeY / 2
-                ponto = QgsPointXY(x, y)
-                valor_pixel = provider.identify(ponto, QgsRaster.IdentifyFormatValue).results().get(1)
-
-                if valor_pixel is not None:  # Ignorar pixels NoData
-                    xMin = extent.xMinimum() + col * pixelSizeX
-                    xMax = extent.xMinimum() + (col + 1) * pixelSizeX
-                    yMax = extent.yMaximum() - row * pixelSizeY
-                    yMin = extent.yMaximum() - (row + 1) * pixelSizeY
-
-                    poligono = QgsGeometry.fromRect(QgsRectangle(xMin, yMin, xMax, yMax))  # Criar um polígono a partir do retângulo
-
-                    feature = QgsFeature()  # Criar uma nova feature
-                    feature.setGeometry(poligono)  # Definir a geometria da feature
-                    feature.setAttributes([ID, valor_pixel])  # Definir os atributos da feature
-                    pr.addFeature(feature)  # Adicionar a feature à camada de polígonos
+        try:
+            if dissolver:
+                _, min_value, max_value = poligonizar_valores_iguais(raster_layer, pr, montar_atributos, progresso=progress_bar.setValue)
+            else:
+                _, min_value, max_value = escrever_poligonos_pixels(provider, pr, montar_atributos, progresso=progress_bar.setValue)
+        except ValueError as e:
+            self.iface.messageBar().clearWidgets()
+            self.mostrar_mensagem(str(e), "Erro")
+            return
 
-                    valores_pixel.append(valor_pixel)  # Adicionar o valor do pixel à lista
+        camada_poligono.updateExtents()  # Atualizar a extensão da camada de polígonos
 
         # Adicionar a camada de polígono ao projeto
         QgsProject.instance().addMapLayer(camada_poligono)
@@ -923,9 +903,7 @@ class CotasManager(QDialog, FORM_CLASS):
             colormap = color_ramp_shader.colorRampItemList() if isinstance(color_ramp_shader, QgsColorRampShader) else []
 
         # Gerar colormap cinza se não for encontrado
-        if estilizar and not colormap:
-            min_value = min(valores_pixel)
-            max_value = max(valores_pixel)
+        if estilizar and not colormap and min_value is not None:
             colormap = self.gerar_colormap_cinza(min_value, max_value, 10)
 
         # Aplicar o estilo graduado baseado na colormap se estilizar for True
@@ -947,34 +925,30 @@ class CotasManager(QDialog, FORM_CLASS):
         # Exibir mensagem de sucesso com o tempo de execução
         self.mostrar_mensagem(f"Camada de Polígonos Criadas com sucesso em {execution_time:.2f} segundos.", "Sucesso")
 
-    def processar_cotas_pontos(self, raster_layer):
+    def processar_cotas_pontos(self, raster_layer, passo=1, max_pontos=None):
         """
         Processa uma camada raster para extrair cotas em pontos e cria uma camada de pontos no QGIS.
 
         Passos detalhados:
         1. Captura o tempo de início do processo.
-        2. Obtém o SRC (Sistema de Referência de Coordenadas) do raster.
-        3. Cria uma camada de pontos com os campos necessários.
-        4. Itera sobre cada pixel no raster.
-        5. Calcula a resolução do pixel em X e Y.
-        6. Inicia a barra de progresso.
-        7. Para cada pixel, calcula a coordenada do centro do pixel.
-        8. Obtém o valor do pixel.
-        9. Cria um novo ponto e adiciona à camada se o valor do pixel não for nulo.
-        10. Atualiza a barra de progresso periodicamente.
-        11. Atualiza a camada de pontos e a adiciona ao projeto QGIS.
-        12. Captura o tempo de fim e calcula o tempo de execução.
-        13. Remove a barra de progresso.
-        14. Exibe uma mensagem de sucesso com o tempo de execução.
+        2. Cria uma camada PointZ com os campos necessários, no SRC do raster.
+        3. Ajusta o passo para respeitar o número máximo de pontos, se informado.
+        4. Lê o raster em blocos e, para cada bloco, calcula de uma só vez os centros dos pixels
+           válidos da grade do passo (pixels NoData são descartados pela máscara).
+        5. Envia os pontos de cada bloco ao provedor com um único addFeatures.
+        6. Atualiza a camada de pontos e a adiciona ao projeto QGIS.
+        7. Remove a barra de progresso e exibe uma mensagem de sucesso com o tempo de execução.
+
+        Parâmetros:
+        - raster_layer: Camada raster a ser processada.
+        - passo: Extrai um ponto a cada passo pixels, nas linhas e nas colunas.
+        - max_pontos: (opcional) Número máximo de pontos; o passo é aumentado até respeitá-lo.
 
         Retorna:
         - None
         """
         start_time = time.time()  # Capturar o tempo de início
 
-        # Obtenha o SRC do raster
-        raster_crs = raster_layer.crs().authid()
-
         # Crie a camada de pontos com os campos necessários
         camada_pontos = QgsVectorLayer(f"PointZ?crs={raster_layer.crs().authid()}", raster_layer.name() + "_Pontos", "memory")
         pr = camada_pontos.dataProvider()
@@ -984,53 +958,17 @@ class CotasManager(QDialog, FORM_CLASS):
                           QgsField("Z", QVariant.Double)])
         camada_pontos.updateFields()
 
-        # Iterar sobre cada pixel no raster
         provider = raster_layer.dataProvider()
-        extent = raster_layer.extent()
-        width = provider.xSize()
-        height = provider.ySize()
+        passo = passo_para_limite(provider.xSize(), provider.ySize(), passo, max_pontos)
 
-        xres = extent.width() / width  # Calcula a resolução do pixel em X
-        yres = extent.height() / height  # Calcula a resolução do pixel em Y
+        def montar_atributos(ids, x, y, z):
+            return zip(ids.tolist(), x.tolist(), y.tolist(), z.tolist())
 
-        total_steps = width * height  # Número total de pixels
+        total_steps = contar_blocos(provider)  # Número de blocos lidos do raster
         progress_bar, progress_message_bar = self.iniciar_progress_bar(total_steps)  # Inicia a barra de progresso
 
-        id = 0
-        update_interval = 1000  # Atualizar a barra de progresso a cada 1000 pixels
-
-        for row in range(height):
-            for col in range(width):
-                id += 1
-
-                # Atualizar a barra de progresso a cada 1000 pixels
-                if id % update_interval == 0:
-                    progress_bar.setValue(id)
-
-                # Encontrar a coordenada do centro do pixel
-                x = extent.xMinimum() + xres * (col + 0.5)
-                y = extent.yMinimum() + yres * (row + 0.5)
-
-                # Pegar o valor do pixel
-                result = provider.identify(QgsPointXY(x, y), QgsRaster.IdentifyFormatValue)
-                z = result.results()[1]
-
-                if z is not None:  # Verifica se o valor do pixel não é nulo
-                    # Criar um novo ponto e adicionar à camada
-                    x = round(x, 3)  # Arredonda a coordenada X para 3 casas decimais
-                    y = round(y, 3)  # Arredonda a coordenada Y para 3 casas decimais
-                    z = round(z, 5)  # Arredonda o valor Z para 5 casas decimais
-
-                    # Criar um novo ponto e adicionar à camada
-                    pt = QgsPoint(x, y, z)
-
-                    # Criar a feature e preencher os campos
-                    feature = QgsFeature()
-                    feature.setGeometry(QgsGeometry.fromWkt(pt.asWkt()))  # Usamos fromWkt e asWkt aqui
-                    feature.setAttributes([id, pt.x(), pt.y(), z])
-
-                    # Adicionar a feature à camada
-                    pr.addFeature(feature)
+        # X e Y arredondados a 3 casas decimais e Z a 5, como nos atributos
+        quantidade = escrever_pontos_pixels(provider, pr, montar_atributos, passo=passo, arredondar=(3, 3, 5), progresso=progress_bar.setValue)
 
         # Atualizar a barra de progresso para 100% no final
         progress_bar.setValue(total_steps)
@@ -1045,7 +983,7 @@ class CotasManager(QDialog, FORM_CLASS):
         self.iface.messageBar().clearWidgets()
 
         # Exibir mensagem de sucesso com o tempo de execução
-        self.mostrar_mensagem(f"Camada de Pontos Criadas com sucesso em {execution_time:.2f} segundos.", "Sucesso")
+        self.mostrar_mensagem(f"Camada com {quantidade} pontos (passo {passo}) criada com sucesso em {execution_time:.2f} segundos.", "Sucesso")
 
     def extrair_cotas(self):
         """
@@ -1079,11 +1017,13 @@ class CotasManager(QDialog, FORM_CLASS):
 
         # Processa a extração de cotas de pontos se o checkbox de pontos estiver marcado
         if self.checkboxPontos.isChecked():
-            self.processar_cotas_pontos(layer)  # Chama o método para processar cotas de pontos
+            max_pontos = self.spinBoxMaxPontos.value() or None  # 0 significa sem limite de pontos
+            self.processar_cotas_pontos(layer, passo=self.spinBoxPasso.value(), max_pontos=max_pontos)  # Chama o método para processar cotas de pontos
 
         # Processa a extração de cotas de polígonos (simples, estilizada ou atribuída) conforme o estado dos checkboxes
         if self.checkboxPoligonos.isChecked() or self.checkboxEstilizada.isChecked() or self.checkboxAtribuida.isChecked():
             estilizar = self.checkboxEstilizada.isChecked()  # Verifica se o checkbox de estilo está marcado
             atribuir = self.checkboxAtribuida.isChecked()  # Verifica se o checkbox de atribuição está marcado
-            self.processar_cotas_poligonos(layer, estilizar=estilizar, atribuir=atribuir)  # Chama o método para processar cotas de polígonos
+            dissolver = self.checkboxDissolver.isChecked()  # Verifica se os pixels de mesmo valor devem ser agrupados
+            self.processar_cotas_poligonos(layer, estilizar=estilizar, atribuir=atribuir, dissolver=dissolver)  # Chama o método para processar cotas de polígonos
 
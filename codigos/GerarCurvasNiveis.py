@@ -1,17 +1,21 @@
-from qgis.core import QgsProject, QgsRasterLayer, QgsMapSettings, QgsMapRendererCustomPainterJob, Qgis, QgsMessageLog, QgsVectorLayer, QgsField, QgsSymbol, QgsRendererCategory, QgsCategorizedSymbolRenderer, QgsPalLayerSettings, QgsVectorLayerSimpleLabeling, QgsTextFormat, QgsProperty, QgsFeature, QgsWkbTypes, QgsProcessingFeedback, QgsPoint, QgsGeometry, QgsCoordinateReferenceSystem, QgsFields, QgsPropertyCollection
-from qgis.PyQt.QtWidgets import QDialog, QCheckBox, QComboBox, QPushButton, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QSpinBox, QFileDialog, QMenu, QAction, QProgressBar, QLabel, QVBoxLayout
+from qgis.core import QgsApplication, QgsTask, QgsProject, QgsRasterLayer, QgsMapSettings, QgsMapRendererCustomPainterJob, Qgis, QgsMessageLog, QgsVectorLayer, QgsField, QgsSymbol, QgsRendererCategory, QgsCategorizedSymbolRenderer, QgsPalLayerSettings, QgsVectorLayerSimpleLabeling, QgsTextFormat, QgsProperty, QgsFeature, QgsWkbTypes, QgsProcessingFeedback, QgsPoint, QgsGeometry, QgsCoordinateReferenceSystem, QgsFields, QgsPropertyCollection
+from qgis.PyQt.QtWidgets import QTableWidget, QTableWidgetItem, QHBoxLayout, QLineEdit, QHeaderView, QAbstractItemView, QDialog, QCheckBox, QComboBox, QPushButton, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QSpinBox, QFileDialog, QMenu, QAction, QProgressBar, QLabel, QVBoxLayout
 from qgis.PyQt.QtCore import Qt, QRectF, QPointF, QSize, QVariant, QSettings
 from qgis.PyQt.QtGui import QImage, QPainter, QPixmap, QColor
 from PyQt5 import QtCore, QtGui, QtWidgets
 from qgis.gui import QgsMapCanvas
 from qgis.utils import iface
 from qgis.PyQt import uic
-import processing
+from collections import deque
 import tempfile
 import ezdxf
 import time
 import math
 import os
+import re
+
+from .curvas_blocos import gerar_curvas_em_blocos, gravar_curvas_gpkg, gerar_curvas_gpkg, copiar_curvas_simplificadas
+from .dxf_curvas import escrever_dxf_curvas, fator_escala_dxf
 
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'GerarCurvas.ui'))
@@ -100,6 +104,7 @@ class CurvasManager(QDialog, FORM_CLASS):
         - Conecta o SpinBox de escala para atualizar a escala no QGIS quando alterado.
         - Conecta o botão de gerar curvas de nível ao método de geração de curvas.
         - Conecta o botão de exportação para DXF ao método de exportação.
+        - Conecta o botão de curvas em lote ao diálogo da fila de rasters.
         - Conecta o botão de cancelar para fechar o diálogo.
         - Conecta o botão de configurações para abrir o diálogo de configuração.
         - Conecta o sinal de alteração de nome das camadas para atualizar o ComboBox de camadas quando uma camada for renomeada.
@@ -127,6 +132,9 @@ class CurvasManager(QDialog, FORM_CLASS):
         # Conecta o botão de exportar para DXF ao método de exportação para DXF
         self.pushButtonDXF.clicked.connect(self.export_to_dxf)
 
+        # Conecta o botão de curvas em lote ao diálogo da fila de rasters
+        self.pushButtonLote.clicked.connect(self.open_batch_dialog)
+
         # Conecta o botão de cancelamento ao fechamento do diálogo
         self.pushButtonCancelar.clicked.connect(self.close)
 
@@ -527,25 +535,16 @@ class CurvasManager(QDialog, FORM_CLASS):
         contour_interval = self.desnivel_s  # Usa o valor armazenado do spinBoxDmestras
         output_layer_name = f"Curvas de Nível - {selected_layer.name()}"
 
-        # Cria o parâmetro para o processamento
-        params = {
-            'INPUT': selected_layer.source(),
-            'BAND': 1,
-            'INTERVAL': contour_interval,
-            'FIELD_NAME': 'ELEV',
-            'OUTPUT': 'TEMPORARY_OUTPUT'  # Configura a saída para um arquivo temporário
-        }
-
         # Medir o tempo de início
         start_time = time.time()
 
-        # Inicia a barra de progresso personalizada (sem o uso de featureCount)
+        # Inicia a barra de progresso personalizada
         progressMessageBar = self.iface.messageBar().createMessage("Gerando curvas de nível...")
         progressBar = QProgressBar()
         progressBar.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        progressBar.setFormat("%p%")
+        progressBar.setFormat("%p% - %v de %m janelas processadas")
         progressBar.setMinimumWidth(300)
-        progressBar.setMaximum(0)  # Configura a barra de progresso como indeterminada
+        progressBar.setMaximum(0)  # Indeterminada até a primeira janela ser concluída
 
         # Estiliza a barra de progresso
         progressBar.setStyleSheet("""
@@ -567,21 +566,27 @@ class CurvasManager(QDialog, FORM_CLASS):
         progressMessageBar.layout().addWidget(progressBar)
         self.iface.messageBar().pushWidget(progressMessageBar, Qgis.Info)
 
+        # A barra de progresso avança a cada janela concluída
+        def atualizar_progresso(concluidas, total):
+            progressBar.setMaximum(total)
+            progressBar.setValue(concluidas)
+            QtWidgets.QApplication.processEvents()
+
+        # As curvas vão direto para um GeoPackage temporário, sem passar por uma camada em memória
+        temp_file_path = os.path.join(tempfile.mkdtemp(prefix="curvas_"), "curvas.gpkg")
+
         try:
-            # Executa a ferramenta de curvas de nível com feedback
-            feedback = QgsProcessingFeedback()
-            result = processing.run("gdal:contour", params, feedback=feedback)
+            # Gera as curvas em janelas paralelas e emenda as linhas nas costuras
+            lotes = gerar_curvas_em_blocos(selected_layer.source(), contour_interval, progresso=atualizar_progresso)
+            gravar_curvas_gpkg(temp_file_path, selected_layer.crs().toWkt(), lotes)
         except Exception as e:
             self.mostrar_mensagem(f"Erro ao gerar curvas de nível: {e}", tipo="Erro")
             return
         finally:
             self.iface.messageBar().popWidget(progressMessageBar)
 
-        # Extrai o caminho do arquivo temporário do resultado
-        temp_file_path = result['OUTPUT']
-
-        # Cria a camada de curvas de nível como uma camada em memória
-        original_layer = QgsVectorLayer(temp_file_path, output_layer_name, "ogr")
+        # Carrega as curvas geradas a partir do GeoPackage
+        original_layer = QgsVectorLayer(f"{temp_file_path}|layername=curvas", output_layer_name, "ogr")
 
         if not original_layer.isValid():
             self.mostrar_mensagem("Falha ao criar a camada de curvas de nível.", "Erro")
@@ -709,46 +714,14 @@ class CurvasManager(QDialog, FORM_CLASS):
           as coordenadas Z serão copiadas.
 
         Funcionalidades:
-        - Itera pelas feições da camada de origem.
+        - Lê da camada de origem apenas o atributo 'ELEV'.
         - Simplifica a geometria de cada feição com um fator de simplificação de 0.01.
-        - Verifica se a camada de destino tem coordenadas Z (3D) e, se sim, adiciona as coordenadas Z às geometrias copiadas.
-        - Copia os atributos 'ELEV' das feições da camada de origem para a camada de destino.
-        - Adiciona as feições simplificadas à camada de destino.
-        - Realiza a edição e commit das alterações na camada de destino.
+        - Se a camada de destino for 3D, aplica o valor de 'ELEV' como coordenada Z constante da linha.
+        - Envia as feições em lotes diretamente ao provedor de dados, sem modo de edição.
         """
 
-        # Inicia o modo de edição na camada de destino
-        target_layer.startEditing()
-
-        # Itera sobre as feições da camada de origem
-        for feature in source_layer.getFeatures():
-            # Cria uma nova feição
-            new_feature = QgsFeature()
-            
-            # Obtém e simplifica a geometria da feição de origem
-            geom = feature.geometry()
-            simple_geom = geom.simplify(0.01)  # Simplifica a geometria com o fator de 0.01
-
-            # Verifica se a camada de destino é 3D (tem coordenadas Z)
-            if QgsWkbTypes.hasZ(target_layer.wkbType()):
-                # Obtém o valor da elevação (Z) da feição de origem
-                z_value = feature['ELEV']
-
-                # Adiciona coordenadas Z à geometria simplificada
-                points_3d = [QgsPoint(point.x(), point.y(), z_value) for point in simple_geom.vertices()]
-                simple_geom = QgsGeometry.fromPolyline(points_3d)
-
-            # Define a geometria simplificada para a nova feição
-            new_feature.setGeometry(simple_geom)
-
-            # Copia o atributo 'ELEV' da feição de origem para a nova feição
-            new_feature.setAttributes([feature['ELEV']])
-
-            # Adiciona a nova feição à camada de destino
-            target_layer.addFeature(new_feature)
-
-        # Realiza o commit das alterações na camada de destino
-        target_layer.commitChanges()
+        # Copia em lotes direto para o provedor, sem o buffer de edição
+        copiar_curvas_simplificadas(source_layer, target_layer, tolerancia=0.01)
 
     def set_layer_symbology(self, layer):
         """
@@ -1039,168 +1012,20 @@ class CurvasManager(QDialog, FORM_CLASS):
         # Retorna o progressBar e o progressMessageBar para que possam ser atualizados durante o processo de exportação
         return progressBar, progressMessageBar
 
-    def create_line_labels(self, msp, points, text_value, label_rgb, dist_repeat, position_mode, text_size, scale_factor):
-        """
-        Cria rótulos (MTEXT) ao longo de uma lista de pontos (x, y, z), repetidos a cada 'dist_repeat' unidades.
-        
-        Parâmetros:
-        - msp: O modelspace do documento DXF onde os rótulos serão adicionados.
-        - points (list): Lista de tuplas (x, y, z) representando os pontos da polyline.
-        - text_value (str): Texto que será exibido em cada rótulo (geralmente o valor de 'ELEV').
-        - label_rgb (tuple): Tupla (R, G, B) definindo a cor do rótulo.
-        - dist_repeat (float): Distância em que os rótulos serão repetidos ao longo da linha.
-        - position_mode (str): Determina a posição do rótulo em relação à linha ('Acima', 'Abaixo' ou 'Centro').
-        - text_size (float): Tamanho base do texto (char_height) antes do ajuste pela escala.
-        - scale_factor (float): Fator de escala calculado a partir da escala atual do QGIS e uma escala base.
-        """
-
-        # Funções auxiliares para cálculos geométricos
-
-        def segment_length_2d(p1, p2):
-            """
-            Calcula a distância Euclidiana 2D entre dois pontos (x, y).
-            """
-            dx = p2[0] - p1[0]
-            dy = p2[1] - p1[1]
-            return math.hypot(dx, dy)
-
-        def angle_of_segment_2d(p1, p2):
-            """
-            Calcula o ângulo (em graus) do segmento formado por p1 e p2 em relação ao eixo X.
-            """
-            dx = p2[0] - p1[0]
-            dy = p2[1] - p1[1]
-            return math.degrees(math.atan2(dy, dx))
-
-        def offset_point(px, py, angle_deg, offset_dist):
-            """
-            Desloca o ponto (px, py) perpendicularmente à direção do ângulo 'angle_deg'.
-            
-            Parâmetros:
-            - px, py: Coordenadas originais do ponto.
-            - angle_deg: Ângulo do segmento (em graus).
-            - offset_dist: Distância de deslocamento (valor positivo desloca para um lado, negativo para o outro).
-            
-            Retorna:
-            - Nova posição (x, y) após o deslocamento.
-            """
-            alpha = math.radians(angle_deg + 90)  # Calcula o ângulo perpendicular ao segmento
-            ox = offset_dist * math.cos(alpha)
-            oy = offset_dist * math.sin(alpha)
-            return px + ox, py + oy
-
-        def get_label_positions(points, dist_repeat):
-            """
-            Calcula as posições ao longo da polyline onde os rótulos devem ser inseridos.
-            
-            Percorre os pontos e, a cada 'dist_repeat' unidades, calcula:
-            - As coordenadas (x, y) de inserção do rótulo.
-            - O ângulo do segmento onde o rótulo será posicionado.
-            
-            Retorna:
-            - Uma lista de tuplas (x, y, angle_deg) com as posições e ângulos dos rótulos.
-            """
-            if len(points) < 2:
-                return []  # Não é possível calcular posição se houver menos de 2 pontos
-
-            results = []  # Lista para armazenar as posições dos rótulos
-            dist_to_next_label = dist_repeat  # Distância remanescente para o próximo rótulo
-            current_start = points[0]  # Ponto de partida para o cálculo
-
-            # Percorre cada segmento formado pelos pontos consecutivos
-            for i in range(1, len(points)):
-                p1 = current_start
-                p2 = points[i]
-                seg_len = segment_length_2d((p1[0], p1[1]), (p2[0], p2[1]))  # Comprimento do segmento atual
-
-                # Enquanto o segmento atual for maior ou igual à distância para o próximo rótulo
-                while seg_len >= dist_to_next_label:
-                    frac = dist_to_next_label / seg_len  # Fator de interpolação
-                    # Calcula as coordenadas do rótulo interpolado no segmento
-                    x_label = p1[0] + frac * (p2[0] - p1[0])
-                    y_label = p1[1] + frac * (p2[1] - p1[1])
-                    # Calcula o ângulo do segmento para alinhar o rótulo
-                    angle_deg = angle_of_segment_2d((p1[0], p1[1]), (p2[0], p2[1]))
-                    results.append((x_label, y_label, angle_deg))
-                    
-                    # Atualiza p1 para o ponto recém-calculado e diminui a distância do segmento
-                    p1 = (x_label, y_label, p1[2])
-                    seg_len -= dist_to_next_label
-                    dist_to_next_label = dist_repeat  # Reseta a distância para o próximo rótulo
-
-                # Ajusta a distância remanescente para o próximo rótulo e atualiza o ponto de partida
-                dist_to_next_label -= seg_len
-                current_start = p2
-
-            # Se nenhum rótulo foi gerado (ex.: linha muito curta), insere um rótulo no meio da polyline
-            if not results:
-                mid_idx = len(points) // 2
-                if len(points) > 1:
-                    p1 = points[mid_idx - 1]
-                    p2 = points[mid_idx]
-                    x_label = (p1[0] + p2[0]) / 2
-                    y_label = (p1[1] + p2[1]) / 2
-                    angle_deg = angle_of_segment_2d((p1[0], p1[1]), (p2[0], p2[1]))
-                else:
-                    x_label = points[0][0]
-                    y_label = points[0][1]
-                    angle_deg = 0
-                results.append((x_label, y_label, angle_deg))
-            return results
-
-        # Início do processamento para criação dos rótulos
-
-        # Calcula as posições (coordenadas e ângulos) para inserir os rótulos ao longo da polyline
-        label_positions = get_label_positions(points, dist_repeat)
-        if not label_positions:
-            return  # Se nenhuma posição foi calculada, não há rótulos para criar
-
-        # Importa o módulo ezdxf e converte a cor do rótulo para um valor inteiro DXF
-        try:
-            import ezdxf
-            color_int = ezdxf.rgb2int(label_rgb)
-        except Exception:
-            color_int = 0  # Se ocorrer erro, utiliza a cor preta como fallback
- 
-        # Ajuste do tamanho do texto e do deslocamento com base no fator de escala
-        adjusted_text_size = text_size * scale_factor  # Tamanho do texto ajustado conforme a escala
-        offset_factor = 0.0  # Valor inicial do deslocamento
-        if position_mode == 'Acima':
-            offset_factor = 1.5 * text_size * scale_factor  # Desloca para cima
-        elif position_mode == 'Abaixo':
-            offset_factor = -1.5 * text_size * scale_factor  # Desloca para baixo
-        # Se for 'Centro', offset_factor permanece 0 (sem deslocamento)
-
-        # Criação dos rótulos MTEXT no DXF
-        for (x_label, y_label, angle_deg) in label_positions:
-            # Calcula a posição final do rótulo aplicando o deslocamento perpendicular
-            x_final, y_final = offset_point(x_label, y_label, angle_deg, offset_factor)
-            # Cria uma entidade MTEXT com os atributos definidos
-            mtext = msp.add_mtext(
-                text=text_value,  # Texto a ser exibido (ex: valor de ELEV)
-                dxfattribs={
-                    'char_height': adjusted_text_size,  # Tamanho do texto ajustado
-                    'rotation': angle_deg,              # Rotação do texto para alinhamento com a linha
-                    'true_color': color_int,            # Cor do texto convertida para formato DXF
-                }
-            )
-            # Define a localização do MTEXT com attachment_point=5 (centralizado)
-            mtext.set_location(insert=(x_final, y_final), attachment_point=5)
-
     def export_to_dxf(self):
         """
         Exporta a camada "Curva de Niveis 3D" para um arquivo DXF,
         ajustando os tamanhos e posicionamentos dos elementos de acordo com a escala definida no QGIS.
         
-        Além disso, todas as entidades serão adicionadas em uma camada DXF chamada "Curvas de Níveis 3D".
+        As curvas mestras e simples (e os seus rótulos) vão para camadas DXF próprias, com as cores definidas nas camadas.
         
         Passos:
           1. Procura a camada "Curva de Niveis 3D" no projeto.
           2. Solicita ao usuário o caminho para salvar o arquivo DXF.
           3. Calcula um fator de escala com base na escala atual (spinBoxEscala)
              e no valor definido para o tamanho (self.tamanho).
-          4. Cria um novo documento DXF, cria a camada "Curvas de Níveis 3D" no DXF e insere as polilinhas 3D e os rótulos (MTEXT).
-          5. Ao finalizar, salva o arquivo e exibe uma mensagem com botões para abrir a pasta ou executar o arquivo.
+          4. Grava as polilinhas (com a cota como elevação) e os rótulos (MTEXT) com escrever_dxf_curvas().
+          5. Ao finalizar, exibe uma mensagem com botões para abrir a pasta ou executar o arquivo.
         """
         # 1. Busca a camada "Curva de Niveis 3D"
         layer_name = "Curva de Niveis 3D"
@@ -1218,87 +1043,13 @@ class CurvasManager(QDialog, FORM_CLASS):
         if not file_path:
             return
 
-        # Tenta importar o módulo ezdxf; se não conseguir, exibe mensagem de erro e encerra a exportação
-        try:
-            import ezdxf
-        except ImportError:
-            self.mostrar_mensagem("Módulo ezdxf não encontrado. Instale-o para exportar para DXF.", "Erro")
-            return
-
-        # 3. Calcula o fator de escala
-        # current_scale: valor da escala atual definido no diálogo (ex.: 500, 1000, etc.)
-        current_scale = self.spinBoxEscala.value()  
-        # base_scale: valor definido para self.tamanho (já é um número, ex.: 8)
-        base_scale = self.tamanho  
-        # Fórmula para ajustar os tamanhos: o fator de escala é calculado multiplicando current_scale pelo base_scale
-        # e dividindo por um divisor (aqui, 30000) que pode ser ajustado conforme necessário
-        scale_factor = current_scale * base_scale / 30000
-
-        # 4. Cria um novo documento DXF usando a versão R2010 e obtém o modelspace para inserir as entidades
-        doc = ezdxf.new(dxfversion='R2010')
-        msp = doc.modelspace()
-
-        # Cria a camada DXF "Curvas de Níveis 3D" se ela ainda não existir
-        dxf_layer_name = "Curvas de Níveis 3D"
-        if not doc.layers.has_entry(dxf_layer_name):
-            doc.layers.new(dxf_layer_name, dxfattribs={'color': 7})  # '7' é a cor padrão (branco)
-
-        # Define um mapeamento de cores para converter as strings definidas em ConfigDialog para valores RGB
-        color_mapping = {
-            'Red': (255, 0, 0),
-            'Yellow': (255, 255, 0),
-            'Green': (0, 255, 0),
-            'Cyan': (0, 255, 255),
-            'Blue': (0, 0, 255),
-            'Magenta': (255, 0, 255),
-            'Gray': (180, 180, 180),
-        }
-
-        # 5. Itera sobre cada feição da camada para criar as polilinhas 3D e os rótulos
-        for feature in target_layer.getFeatures():
-            geom = feature.geometry()
-            # Usa o valor da coluna "ELEV" para definir a coordenada Z de todos os pontos
-            z_value = feature['ELEV']
+        # 3. Calcula o fator de escala a partir da escala atual e do tamanho dos rótulos
+        scale_factor = fator_escala_dxf(self.spinBoxEscala.value(), self.tamanho)
 
-            # Define as cores para a linha e o rótulo com base no valor de ELEV
-            if z_value % self.desnivel_m == 0:
-                line_color_name = self.selected_colors.get('cor1', 'Red')
-                label_color_name = self.selected_colors.get('cor3', 'Red')
-            else:
-                line_color_name = self.selected_colors.get('cor2', 'Yellow')
-                label_color_name = self.selected_colors.get('cor4', 'Yellow')
-
-            line_rgb = color_mapping.get(line_color_name, (255, 0, 0))
-            label_rgb = color_mapping.get(label_color_name, (255, 0, 0))
-
-            # Verifica se a geometria é multipart ou simples e processa cada caso
-            if geom.isMultipart():
-                multiline = geom.asMultiPolyline()
-                for poly in multiline:
-                    # Converte os pontos da polyline para (x, y, z), utilizando z_value para Z
-                    points = [(pt.x(), pt.y(), z_value) for pt in poly]
-                    # Adiciona a polilinha 3D ao modelspace, define sua cor e sua camada DXF
-                    polyline = msp.add_polyline3d(points)
-                    polyline.dxf.true_color = ezdxf.rgb2int(line_rgb)
-                    polyline.dxf.layer = dxf_layer_name
-                    # Chama o método que cria os rótulos ao longo da polyline, aplicando o scale_factor
-                    self.create_line_labels(msp, points, str(z_value), label_rgb,
-                                            self.repeticao, self.selected_position,
-                                            self.tamanho, scale_factor)
-            else:
-                poly = geom.asPolyline()
-                if poly:
-                    points = [(pt.x(), pt.y(), z_value) for pt in poly]
-                    polyline = msp.add_polyline3d(points)
-                    polyline.dxf.true_color = ezdxf.rgb2int(line_rgb)
-                    polyline.dxf.layer = dxf_layer_name
-                    self.create_line_labels(msp, points, str(z_value), label_rgb,
-                                            self.repeticao, self.selected_position,
-                                            self.tamanho, scale_factor)
-
-        # 6. Tenta salvar o arquivo DXF e exibe uma mensagem de sucesso com botões para abrir a pasta ou executar o arquivo
+        # 4 e 5. Grava o DXF e exibe uma mensagem de sucesso com botões para abrir a pasta ou executar o arquivo
         try:
-            doc.saveas(file_path)
+            escrever_dxf_curvas(target_layer, file_path, self.desnivel_m, self.selected_colors,
+                                self.selected_position, self.tamanho, self.repeticao, scale_factor)
             # Obtém a pasta onde o arquivo foi salvo para possibilitar a abertura via botão
             pasta = os.path.dirname(file_path)
             self.mostrar_mensagem("Arquivo DXF exportado com sucesso!", "Sucesso", duracao=3,
@@ -1306,6 +1057,39 @@ class CurvasManager(QDialog, FORM_CLASS):
         except Exception as e:
             self.mostrar_mensagem(f"Erro ao exportar DXF: {e}", "Erro")
 
+    def open_batch_dialog(self):
+        """
+        Abre o diálogo de curvas em lote, com uma cópia das configurações atuais (desníveis, cores, rótulos e escala).
+        """
+        config = {
+            'desnivel_s': self.desnivel_s,
+            'desnivel_m': self.desnivel_m,
+            'cores': dict(self.selected_colors),
+            'posicao': self.selected_position,
+            'tamanho': self.tamanho,
+            'repeticao': self.repeticao,
+            'fator_escala': fator_escala_dxf(self.spinBoxEscala.value(), self.tamanho),
+        }
+        dialogo = DialogoLoteCurvas(config, self.add_contour_layer_from_file, self)
+        dialogo.show()
+
+    def add_contour_layer_from_file(self, caminho_gpkg, layer_name):
+        """
+        Adiciona ao projeto as curvas 3D gravadas em um GeoPackage, com a simbologia (mestras e simples) e os rótulos do plugin.
+
+        Parâmetros:
+        - caminho_gpkg (str): GeoPackage com a tabela 'curvas' (campos ID e ELEV).
+        - layer_name (str): Nome da camada no projeto.
+        """
+        layer = QgsVectorLayer(f"{caminho_gpkg}|layername=curvas", layer_name, "ogr")
+        if not layer.isValid():
+            self.mostrar_mensagem(f"Falha ao carregar as curvas de '{caminho_gpkg}'.", "Erro")
+            return
+
+        self.set_layer_symbology(layer)
+        self.set_labeling(layer)
+        QgsProject.instance().addMapLayer(layer)
+
 class ConfigDialog(QDialog):
     """
     Classe que define o diálogo de configurações de exportação.
@@ -1759,3 +1543,289 @@ class ConfigDialog(QDialog):
         # Atualiza os textos dos botões
         self.pushButtonOK.setText(_translate("Dialog", "OK"))
         self.pushButtonFechar.setText(_translate("Dialog", "Fechar"))
+
+class TarefaCurvasRaster(QgsTask):
+    """
+    Tarefa em segundo plano que gera as curvas 3D de um raster direto em um GeoPackage e, opcionalmente, exporta o DXF.
+
+    A tarefa trabalha só com arquivos (o raster, o GeoPackage e o DXF); nenhuma camada do projeto é acessada fora da thread principal.
+    """
+    def __init__(self, caminho_raster, caminho_gpkg, config, caminho_dxf=None, max_workers=None):
+        super(TarefaCurvasRaster, self).__init__(f"Curvas de nível: {os.path.basename(caminho_raster)}", QgsTask.CanCancel)
+        self.caminho_raster = caminho_raster
+        self.caminho_gpkg = caminho_gpkg
+        self.caminho_dxf = caminho_dxf
+        self.config = config
+        self.max_workers = max_workers
+        self.erro = None
+
+    def run(self):
+        """
+        Gera as curvas (metade do progresso, se houver DXF) e grava o DXF com as cores de mestras e simples.
+        """
+        peso_curvas = 50 if self.caminho_dxf else 100
+        try:
+            gerar_curvas_gpkg(
+                self.caminho_raster, self.caminho_gpkg, self.config['desnivel_s'], tolerancia=0.01, com_z=True,
+                max_workers=self.max_workers,
+                progresso=lambda concluidas, total: self.setProgress(peso_curvas * concluidas / total),
+                cancelado=self.isCanceled)
+            if self.isCanceled():
+                return False
+
+            if self.caminho_dxf:
+                camada = QgsVectorLayer(f"{self.caminho_gpkg}|layername=curvas", "curvas", "ogr")
+                total = max(camada.featureCount(), 1)
+                return escrever_dxf_curvas(
+                    camada, self.caminho_dxf, self.config['desnivel_m'], self.config['cores'], self.config['posicao'],
+                    self.config['tamanho'], self.config['repeticao'], self.config['fator_escala'],
+                    progresso=lambda gravadas: self.setProgress(50 + 50 * gravadas / total),
+                    cancelado=self.isCanceled)
+            return True
+        except Exception as e:
+            self.erro = str(e)
+            return False
+
+class DialogoLoteCurvas(QDialog):
+    """
+    Diálogo com a fila de rasters para gerar curvas (e DXF) em lote, com as configurações do CurvasManager.
+
+    As tarefas rodam no gerenciador de tarefas do QGIS, no máximo 'Tarefas simultâneas' por vez; cada linha da
+    tabela mostra o progresso e a situação do seu raster, e pode ser cancelada individualmente.
+    """
+    # Extensões consideradas ao adicionar uma pasta
+    EXTENSOES_RASTER = ('.tif', '.tiff', '.img', '.asc', '.vrt')
+
+    def __init__(self, config, adicionar_camada, parent=None):
+        super(DialogoLoteCurvas, self).__init__(parent)
+        self.setWindowTitle("Curvas de Nível em Lote")
+        self.resize(520, 400)
+        self.config = config
+        self.adicionar_camada = adicionar_camada
+        self.trabalhos = []  # Um dicionário por raster: caminho, nome, tarefa e situação
+        self.fila = deque()
+        self.ativas = 0
+
+        layout = QVBoxLayout(self)
+
+        # Rasters da fila
+        botoes_fila = QHBoxLayout()
+        self.botaoCamadas = QPushButton("Adicionar Camadas do Projeto", self)
+        self.botaoPasta = QPushButton("Adicionar Pasta", self)
+        self.botaoRemover = QPushButton("Remover", self)
+        for botao in (self.botaoCamadas, self.botaoPasta, self.botaoRemover):
+            botoes_fila.addWidget(botao)
+        layout.addLayout(botoes_fila)
+
+        self.tabela = QTableWidget(0, 3, self)
+        self.tabela.setHorizontalHeaderLabels(["Raster", "Progresso", "Situação"])
+        self.tabela.verticalHeader().setVisible(False)
+        self.tabela.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabela.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabela.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.tabela)
+
+        # Pasta de saída dos GeoPackages e DXF
+        linha_saida = QHBoxLayout()
+        linha_saida.addWidget(QLabel("Pasta de saída:", self))
+        self.lineEditSaida = QLineEdit(QSettings().value("lastDir", ""), self)
+        self.botaoSaida = QPushButton("...", self)
+        linha_saida.addWidget(self.lineEditSaida)
+        linha_saida.addWidget(self.botaoSaida)
+        layout.addLayout(linha_saida)
+
+        # Opções
+        linha_opcoes = QHBoxLayout()
+        self.checkBoxDXF = QCheckBox("Exportar DXF", self)
+        self.checkBoxProjeto = QCheckBox("Adicionar ao projeto", self)
+        self.checkBoxProjeto.setChecked(True)
+        self.spinBoxSimultaneas = QSpinBox(self)
+        self.spinBoxSimultaneas.setRange(1, max(1, os.cpu_count() or 1))
+        self.spinBoxSimultaneas.setValue(min(2, self.spinBoxSimultaneas.maximum()))
+        linha_opcoes.addWidget(self.checkBoxDXF)
+        linha_opcoes.addWidget(self.checkBoxProjeto)
+        linha_opcoes.addWidget(QLabel("Tarefas simultâneas:", self))
+        linha_opcoes.addWidget(self.spinBoxSimultaneas)
+        layout.addLayout(linha_opcoes)
+
+        # Iniciar, cancelar e fechar
+        botoes = QHBoxLayout()
+        self.botaoIniciar = QPushButton("Iniciar", self)
+        self.botaoCancelar = QPushButton("Cancelar Tarefas", self)
+        self.botaoFechar = QPushButton("Fechar", self)
+        for botao in (self.botaoIniciar, self.botaoCancelar, self.botaoFechar):
+            botoes.addWidget(botao)
+        layout.addLayout(botoes)
+
+        self.botaoCamadas.clicked.connect(self.adicionar_camadas_projeto)
+        self.botaoPasta.clicked.connect(self.adicionar_pasta)
+        self.botaoRemover.clicked.connect(self.remover_selecionados)
+        self.botaoSaida.clicked.connect(self.escolher_pasta_saida)
+        self.botaoIniciar.clicked.connect(self.iniciar)
+        self.botaoCancelar.clicked.connect(self.cancelar)
+        self.botaoFechar.clicked.connect(self.close)
+
+    def adicionar_raster(self, caminho, nome):
+        """
+        Acrescenta um raster à tabela, se ele ainda não estiver na fila.
+        """
+        if any(trabalho['caminho'] == caminho for trabalho in self.trabalhos):
+            return
+
+        linha = self.tabela.rowCount()
+        self.tabela.insertRow(linha)
+        self.tabela.setItem(linha, 0, QTableWidgetItem(nome))
+        barra = QProgressBar(self.tabela)
+        barra.setRange(0, 100)
+        self.tabela.setCellWidget(linha, 1, barra)
+        self.tabela.setItem(linha, 2, QTableWidgetItem("Aguardando"))
+        self.trabalhos.append({'caminho': caminho, 'nome': nome, 'tarefa': None, 'situacao': "Aguardando"})
+
+    def adicionar_camadas_projeto(self):
+        """
+        Acrescenta todas as camadas raster do projeto à fila.
+        """
+        for layer in QgsProject.instance().mapLayers().values():
+            if isinstance(layer, QgsRasterLayer):
+                self.adicionar_raster(layer.source(), layer.name())
+
+    def adicionar_pasta(self):
+        """
+        Acrescenta à fila os rasters de uma pasta (extensões em EXTENSOES_RASTER).
+        """
+        pasta = QFileDialog.getExistingDirectory(self, "Selecione a pasta dos rasters", self.lineEditSaida.text())
+        if not pasta:
+            return
+        for nome_arquivo in sorted(os.listdir(pasta)):
+            if nome_arquivo.lower().endswith(self.EXTENSOES_RASTER):
+                self.adicionar_raster(os.path.join(pasta, nome_arquivo), os.path.splitext(nome_arquivo)[0])
+
+    def remover_selecionados(self):
+        """
+        Remove da tabela as linhas selecionadas; só é permitido enquanto nenhuma tarefa estiver na fila ou em execução.
+        """
+        if self.fila or self.ativas:
+            return
+
+        linhas = sorted({indice.row() for indice in self.tabela.selectedIndexes()}, reverse=True)
+        for linha in linhas:
+            self.tabela.removeRow(linha)
+            del self.trabalhos[linha]
+
+    def escolher_pasta_saida(self):
+        """
+        Escolhe a pasta onde os GeoPackages e os DXF serão gravados.
+        """
+        pasta = QFileDialog.getExistingDirectory(self, "Selecione a pasta de saída", self.lineEditSaida.text())
+        if pasta:
+            self.lineEditSaida.setText(pasta)
+
+    def definir_situacao(self, linha, situacao):
+        self.trabalhos[linha]['situacao'] = situacao
+        self.tabela.item(linha, 2).setText(situacao)
+
+    def iniciar(self):
+        """
+        Coloca na fila os rasters aguardando e inicia as primeiras tarefas.
+        """
+        pasta = self.lineEditSaida.text()
+        if not pasta or not os.path.isdir(pasta):
+            self.parent().mostrar_mensagem("Selecione uma pasta de saída válida.", "Erro")
+            return
+
+        for linha, trabalho in enumerate(self.trabalhos):
+            if trabalho['situacao'] == "Aguardando":
+                self.fila.append(linha)
+                self.definir_situacao(linha, "Na fila")
+        self.iniciar_proximas()
+
+    def nomes_saida(self):
+        """
+        Nome base dos arquivos de saída de cada linha da tabela, válido como nome de arquivo e único na fila.
+
+        Caracteres inválidos (/, :, etc.) viram '_'; nomes repetidos recebem o número da linha,
+        para que duas tarefas nunca gravem (ou apaguem) o mesmo GeoPackage/DXF.
+        """
+        bases = [re.sub(r'[\\/:*?"<>|\s]+', '_', trabalho['nome']).strip('._') or "raster" for trabalho in self.trabalhos]
+        nomes = []
+        usados = set()
+        for linha, base in enumerate(bases):
+            nome = f"{base}_{linha + 1}_curvas" if bases.count(base) > 1 else f"{base}_curvas"
+            contador = 2
+            while nome.lower() in usados:
+                nome = f"{base}_{linha + 1}_{contador}_curvas"
+                contador += 1
+            usados.add(nome.lower())
+            nomes.append(nome)
+        return nomes
+
+    def iniciar_proximas(self):
+        """
+        Inicia tarefas da fila até o limite de tarefas simultâneas.
+
+        As janelas de cada raster também são processadas em paralelo; os núcleos são divididos entre as tarefas.
+        """
+        limite = self.spinBoxSimultaneas.value()
+        pasta = self.lineEditSaida.text()
+        nomes = self.nomes_saida()
+        while self.fila and self.ativas < limite:
+            linha = self.fila.popleft()
+            trabalho = self.trabalhos[linha]
+
+            base = os.path.join(pasta, nomes[linha])
+            caminho_dxf = base + ".dxf" if self.checkBoxDXF.isChecked() else None
+            tarefa = TarefaCurvasRaster(trabalho['caminho'], base + ".gpkg", self.config, caminho_dxf,
+                                        max_workers=max(1, (os.cpu_count() or 1) // limite))
+
+            barra = self.tabela.cellWidget(linha, 1)
+            tarefa.progressChanged.connect(lambda valor, barra=barra: barra.setValue(int(valor)))
+            tarefa.taskCompleted.connect(lambda linha=linha: self.tarefa_finalizada(linha, True))
+            tarefa.taskTerminated.connect(lambda linha=linha: self.tarefa_finalizada(linha, False))
+
+            # Mantém a referência Python da tarefa enquanto ela estiver no gerenciador
+            trabalho['tarefa'] = tarefa
+            self.ativas += 1
+            self.definir_situacao(linha, "Processando")
+            QgsApplication.taskManager().addTask(tarefa)
+
+    def tarefa_finalizada(self, linha, sucesso):
+        """
+        Atualiza a situação do raster, adiciona as curvas ao projeto (se marcado) e inicia a próxima tarefa da fila.
+        """
+        self.ativas -= 1
+        trabalho = self.trabalhos[linha]
+        tarefa = trabalho['tarefa']
+
+        if sucesso:
+            self.definir_situacao(linha, "Concluída")
+            if self.checkBoxProjeto.isChecked():
+                self.adicionar_camada(tarefa.caminho_gpkg, f"Curvas de Nível 3D - {trabalho['nome']}")
+        elif tarefa.erro:
+            self.definir_situacao(linha, f"Erro: {tarefa.erro}")
+        else:
+            self.definir_situacao(linha, "Cancelada")
+
+        self.iniciar_proximas()
+
+    def cancelar(self, todas=False):
+        """
+        Cancela as linhas selecionadas (ou todas, se nenhuma estiver selecionada): as da fila saem dela e as em execução são interrompidas.
+        """
+        linhas = {indice.row() for indice in self.tabela.selectedIndexes()}
+        if todas or not linhas:
+            linhas = set(range(len(self.trabalhos)))
+
+        for linha in sorted(linhas):
+            trabalho = self.trabalhos[linha]
+            if linha in self.fila:
+                self.fila.remove(linha)
+                self.definir_situacao(linha, "Cancelada")
+            elif trabalho['situacao'] == "Processando":
+                trabalho['tarefa'].cancel()
+
+    def closeEvent(self, event):
+        """
+        Cancela a fila e as tarefas em execução ao fechar o diálogo.
+        """
+        self.cancelar(todas=True)
+        super(DialogoLoteCurvas, self).closeEvent(event)
@@ -4,10 +4,14 @@ from qgis.PyQt.QtCore import Qt, QRectF, QPointF, QSize, QVariant, QSettings
 from qgis.PyQt.QtGui import QImage, QPainter, QPixmap, QColor, QFont
 from qgis.utils import iface
 from qgis.PyQt import uic
+import numpy as np
 import math
 import time
 import os
 
+from .raster_blocos import criar_feicoes
+from .setas_declividade import segmentos_das_feicoes, pontos_dos_segmentos, amostrar_cotas, calcular_inclinacoes, setas_wkb
+
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'GerarSetasRaster.ui'))
 
@@ -530,142 +534,40 @@ class SetasManager(QDialog, FORM_CLASS):
                 # Se encontrar o ID da camada anterior, restaura a seleção
                 self.comboBoxLinhas.setCurrentIndex(line_index)
 
-    def gerar_camadas_pontos(self, exploded_layer, original_layer):
+    def calcular_inclinacoes_segmentos(self, segmentos):
         """
-        Gera uma nova camada de pontos a partir de uma camada de linhas explodida, coletando os valores de elevação
-        (cotas) do raster para os vértices inicial e final de cada segmento de linha. Adiciona os valores de elevação
-        à camada de pontos e calcula a inclinação para a camada de linhas explodida.
+        Lê do raster as cotas (elevação) dos pontos inicial e final de todos os segmentos de uma vez e calcula a
+        inclinação de cada segmento.
 
         Parâmetros:
         - self: Referência para a instância atual da classe (implícito), utilizada para acessar os atributos e métodos da classe.
-        - exploded_layer (QgsVectorLayer): A camada de linhas explodida, onde cada segmento de linha será processado para obter
-          os valores de elevação (cotas) de seus pontos.
-        - original_layer (QgsVectorLayer): A camada de linhas original, usada para referência.
+        - segmentos (list): Lista de arrays numpy com os vértices de cada segmento, como retornado por 'explodir_linhas'.
 
         A função realiza as seguintes ações:
         - Obtém a camada raster atualmente selecionada no ComboBox de Raster.
-        - Verifica se a camada raster é válida e é do tipo QgsRasterLayer.
-        - Cria uma nova camada de pontos com o mesmo sistema de referência da camada de linhas explodida.
-        - Adiciona os pontos correspondentes aos vértices inicial e final de cada segmento de linha à nova camada de pontos,
-          coletando os valores de elevação do raster no ponto inicial e final.
-        - Armazena as cotas (elevação) dos pontos no dicionário 'cota_inicial_final' para posterior cálculo da inclinação.
-        - Calcula a inclinação da camada de linhas explodida chamando a função '_calcular_inclinacao'.
+        - Extrai os pontos inicial, médio e final e o comprimento de todos os segmentos em arrays.
+        - Amostra o raster nos pontos inicial e final em lote (valor do pixel, como o identify).
+        - Calcula a inclinação: (cota_final - cota_inicial) / comprimento * 100, arredondada a 3 casas; sem cota
+          ou com comprimento nulo, a inclinação fica vazia (NaN).
 
         Retorno:
-        - Nenhum retorno explícito. A função adiciona diretamente a camada de pontos ao projeto e atualiza a camada de linhas
-          explodida com a inclinação calculada.
+        - Tupla (pontos, inclinacoes), com pontos = (inicio, meio, fim, comprimento), ou None se o raster for inválido.
         """
 
-        # Obtém o ID da camada raster selecionada no comboBoxRaster
-        selected_raster_id = self.comboBoxRaster.currentData()
-        # Busca a camada raster no projeto pelo seu ID
-        selected_raster = QgsProject.instance().mapLayer(selected_raster_id)
+        # Obtém a camada raster selecionada no comboBoxRaster
+        selected_raster = QgsProject.instance().mapLayer(self.comboBoxRaster.currentData())
 
         # Verifica se a camada raster selecionada é válida e se é do tipo QgsRasterLayer
         if not selected_raster or not isinstance(selected_raster, QgsRasterLayer):
             self.mostrar_mensagem("Nenhuma camada raster válida foi selecionada", "Erro")
-            return
-
-        # Cria a nova camada de pontos com o mesmo SRC da camada de linhas explodida
-        point_layer = QgsVectorLayer(f"Point?crs={exploded_layer.crs().authid()}", f"{exploded_layer.name()}_points", "memory")
-        point_layer_data = point_layer.dataProvider()
-
-        # Adiciona o campo "ValorRaster" à camada de pontos
-        point_layer_data.addAttributes([
-            QgsField("ID", QVariant.Int),
-            QgsField("ValorRaster", QVariant.Double)
-        ])
-        point_layer.updateFields()
-
-        # Dicionário para armazenar as cotas dos pontos iniciais e finais por segmento de linha
-        cota_inicial_final = {}
-
-        point_id = 1
-        for feature in exploded_layer.getFeatures():
-            geom = feature.geometry()
-            if geom:
-                vertices = list(geom.vertices())
-                if len(vertices) >= 2:
-                    # Converte o primeiro e último vértice de QgsPoint para QgsPointXY
-                    start_vertex_xy = QgsPointXY(vertices[0])
-                    end_vertex_xy = QgsPointXY(vertices[-1])
-
-                    # Coleta a cota do MDT no ponto inicial
-                    ident_start = selected_raster.dataProvider().identify(start_vertex_xy, QgsRaster.IdentifyFormatValue)
-                    cota_start = ident_start.results().get(1, None)
-
-                    # Coleta a cota do MDT no ponto final
-                    ident_end = selected_raster.dataProvider().identify(end_vertex_xy, QgsRaster.IdentifyFormatValue)
-                    cota_end = ident_end.results().get(1, None)
-
-                    # Armazena as cotas no dicionário
-                    cota_inicial_final[feature.id()] = (cota_start, cota_end)
-
-                    # Cria as feições de pontos e as adiciona à camada de pontos
-                    for vertex_xy, cota in [(start_vertex_xy, cota_start), (end_vertex_xy, cota_end)]:
-                        point_feat = QgsFeature(point_layer.fields())
-                        point_geom = QgsGeometry.fromPointXY(vertex_xy)
-                        point_feat.setGeometry(point_geom)
-                        point_feat.setAttributes([point_id, cota])
-                        point_layer_data.addFeature(point_feat)
-                        point_id += 1
-
-        # Adiciona a nova camada de pontos ao projeto
-        # QgsProject.instance().addMapLayer(point_layer)
-
-        # Calcula a inclinação e atualiza a camada de linhas explodida
-        self._calcular_inclinacao(exploded_layer, cota_inicial_final)
-
-    def _calcular_inclinacao(self, exploded_layer, cota_inicial_final):
-        """
-        Calcula a inclinação para cada segmento de linha na camada explodida com base nas cotas (elevação)
-        dos pontos inicial e final. A inclinação é armazenada como um novo atributo na camada.
-
-        Parâmetros:
-        - self: Referência para a instância atual da classe (implícito), utilizada para acessar os atributos e métodos da classe.
-        - exploded_layer (QgsVectorLayer): A camada de linhas explodida, onde cada segmento de linha será atualizado com o valor de inclinação.
-        - cota_inicial_final (dict): Dicionário que contém as cotas (elevação) inicial e final de cada segmento de linha.
-          A chave é o ID da feição, e o valor é uma tupla (cota_start, cota_end).
-
-        A função realiza as seguintes ações:
-        - Inicia a edição da camada de linhas explodida.
-        - Para cada segmento de linha, obtém as cotas inicial e final.
-        - Calcula a inclinação usando a fórmula: (cota_end - cota_start) / comprimento * 100.
-        - Armazena o valor da inclinação como um novo atributo na camada.
-        - Se a cota inicial ou final for nula, define a inclinação como None.
-        - Finaliza as alterações na camada ao chamar 'commitChanges'.
-
-        Retorno:
-        - Nenhum retorno explícito. A função atualiza diretamente os valores de inclinação na camada de linhas explodida.
-        """
-
-        # Inicia o modo de edição da camada de linhas explodida
-        exploded_layer.startEditing()
-
-        # Itera sobre cada feição da camada explodida
-        for feature in exploded_layer.getFeatures():
-            # Obtém as cotas inicial e final para a feição atual a partir do dicionário 'cota_inicial_final'
-            cota_start, cota_end = cota_inicial_final.get(feature.id(), (None, None))
-
-            # Verifica se as cotas inicial e final estão definidas
-            if cota_start is not None and cota_end is not None:
-                # Calcula o comprimento do segmento de linha
-                length = feature.geometry().length()
-                if length > 0:
-                    # Calcula a inclinação como a variação de cota dividida pelo comprimento, multiplicada por 100 para obter a porcentagem
-                    inclinacao = round(((cota_end - cota_start) / length) * 100, 3)
-                else:
-                    # Define a inclinação como None se o comprimento for 0 (linha inválida)
-                    inclinacao = None
-            else:
-                # Define a inclinação como None se qualquer uma das cotas for nula
-                inclinacao = None
+            return None
 
-            # Atualiza o valor do campo "Inclinacao" na feição atual
-            exploded_layer.changeAttributeValue(feature.id(), exploded_layer.fields().indexFromName("Inclinacao"), inclinacao)
+        pontos = pontos_dos_segmentos(segmentos)
+        inicio, _, fim, comprimento = pontos
 
-        # Confirma as alterações feitas na camada
-        exploded_layer.commitChanges()
+        # Cotas dos pontos inicial e final de todos os segmentos em uma única amostragem
+        cota_inicio, cota_fim = amostrar_cotas(selected_raster, inicio, fim)
+        return pontos, calcular_inclinacoes(comprimento, cota_inicio, cota_fim)
 
     def atualizar_spinBoxAbertura(self):
         """
@@ -690,8 +592,8 @@ class SetasManager(QDialog, FORM_CLASS):
 
     def explodir_linhas(self, selected_layer):
         """
-        Explode as feições de uma camada de linhas em segmentos individuais e cria uma nova camada de linhas com esses segmentos.
-        Cada segmento de linha na nova camada é tratado como uma feição independente, e a inclinação e o comprimento são calculados.
+        Explode as feições de uma camada de linhas em segmentos individuais e cria a nova camada (vazia) que receberá as setas.
+        Cada segmento será uma feição independente da nova camada, com o seu comprimento e a sua inclinação.
 
         Parâmetros:
         - self: Referência para a instância atual da classe (implícito), utilizada para acessar os atributos e métodos da classe.
@@ -701,19 +603,19 @@ class SetasManager(QDialog, FORM_CLASS):
         - Verifica se a camada de linhas selecionada é válida.
         - Determina se o usuário deseja explodir apenas as feições selecionadas ou todas as feições.
         - Gera um nome único para a nova camada de linhas explodidas.
-        - Cria uma nova camada de linhas em memória, adicionando campos para armazenar o comprimento e a inclinação de cada segmento.
+        - Cria uma nova camada de multilinhas em memória, com campos para o comprimento e a inclinação de cada segmento.
         - Se a camada tiver um SRC geográfico, transforma as coordenadas para um CRS projetado (WGS 84 / Pseudo-Mercator).
-        - Para cada feição da camada original, divide as linhas em segmentos individuais e adiciona-os à nova camada.
-        - Retorna a nova camada de linhas explodida.
+        - Divide as linhas simples em segmentos de dois vértices e mantém inteiras as partes das linhas multipartes.
 
         Retorno:
-        - exploded_layer (QgsVectorLayer): A nova camada de linhas contendo os segmentos explodidos, ou None se a camada original for inválida.
+        - Tupla (exploded_layer, segmentos): a nova camada e a lista de arrays numpy com os vértices de cada segmento,
+          ou (None, []) se a camada original for inválida.
         """
 
         # Verifica se a camada de linhas selecionada é válida
         if not selected_layer:
             self.mostrar_mensagem("Nenhuma camada de linhas válida foi encontrada.", "Erro")
-            return None
+            return None, []
 
         # Verifica se o checkBoxSeleciona está marcado
         if self.checkBoxSeleciona.isChecked():
@@ -731,8 +633,8 @@ class SetasManager(QDialog, FORM_CLASS):
             layer_name = f"{base_name}_{suffix}"
             suffix += 1
 
-        # Cria uma nova camada para armazenar as linhas explodidas, usando o mesmo SRC da camada original
-        exploded_layer = QgsVectorLayer(f"LineString?crs={selected_layer.crs().authid()}", layer_name, "memory")
+        # Cria a camada das setas (multilinhas: haste, cabeça e fechamentos), usando o mesmo SRC da camada original
+        exploded_layer = QgsVectorLayer(f"MultiLineString?crs={selected_layer.crs().authid()}", layer_name, "memory")
         exploded_layer_data = exploded_layer.dataProvider()
 
         # Adiciona os campos "ID", "Comprimento" e "Inclinação" à nova camada
@@ -744,46 +646,13 @@ class SetasManager(QDialog, FORM_CLASS):
         exploded_layer.updateFields()
 
         # Verifica se o SRC da camada é geográfico
-        is_geographic = selected_layer.crs().isGeographic()
         transform = None
-        if is_geographic:
+        if selected_layer.crs().isGeographic():
             dest_crs = QgsCoordinateReferenceSystem('EPSG:3857')  # Usa o CRS projetado WGS 84 / Pseudo-Mercator
             transform = QgsCoordinateTransform(selected_layer.crs(), dest_crs, QgsProject.instance())
 
-        # Itera sobre as feições e realiza a explosão das linhas
-        segment_id = 1
-        for feature in features:
-            geom = feature.geometry()
-            # Verifica se a geometria é multipart (várias partes em uma única feição)
-            if geom and geom.isMultipart():
-                for single_line in geom.asMultiPolyline():
-                    new_feat = QgsFeature(exploded_layer.fields())
-                    new_geom = QgsGeometry.fromPolylineXY(single_line)
-                    if is_geographic:
-                        # Transforma as coordenadas para o CRS projetado se necessário
-                        new_geom.transform(transform)
-                    length = round(new_geom.length(), 3)
-                    # Define a geometria e os atributos (ID, comprimento, inclinação)
-                    new_feat.setGeometry(new_geom)
-                    new_feat.setAttributes([segment_id, length, None])
-                    exploded_layer_data.addFeature(new_feat)
-                    segment_id += 1
-            elif geom:
-                # Trata linhas simples (não multipart)
-                single_polyline = geom.asPolyline()
-                for i in range(len(single_polyline) - 1):
-                    new_feat = QgsFeature(exploded_layer.fields())
-                    new_geom = QgsGeometry.fromPolylineXY([single_polyline[i], single_polyline[i + 1]])
-                    if is_geographic:
-                        new_geom.transform(transform)
-                    length = round(new_geom.length(), 3)
-                    new_feat.setGeometry(new_geom)
-                    new_feat.setAttributes([segment_id, length, None])
-                    exploded_layer_data.addFeature(new_feat)
-                    segment_id += 1
-
-        # Retorna a nova camada de linhas explodida
-        return exploded_layer
+        # Explode as linhas em segmentos (arrays de vértices)
+        return exploded_layer, segmentos_das_feicoes(features, transform)
 
     def iniciar_progress_bar(self, layer):
         """
@@ -940,7 +809,19 @@ class SetasManager(QDialog, FORM_CLASS):
         progressBar, progressMessageBar = self.iniciar_progress_bar(selected_layer)
 
         # Explode as linhas
-        exploded_layer = self.explodir_linhas(selected_layer)
+        exploded_layer, segmentos = self.explodir_linhas(selected_layer)
+        if exploded_layer is None or not segmentos:
+            self.iface.messageBar().popWidget(progressMessageBar)
+            if exploded_layer is not None:
+                self.mostrar_mensagem("Nenhum segmento de linha foi encontrado.", "Erro")
+            return
+
+        # Calcula as cotas e a inclinação de todos os segmentos
+        resultado = self.calcular_inclinacoes_segmentos(segmentos)
+        if resultado is None:
+            self.iface.messageBar().popWidget(progressMessageBar)
+            return
+        pontos, inclinacoes = resultado
 
         # Armazena a camada gerada para uso posterior (por exemplo, na exportação para DXF)
         self.exploded_layer = exploded_layer
@@ -954,11 +835,8 @@ class SetasManager(QDialog, FORM_CLASS):
         # Adiciona a camada explodida ao projeto
         QgsProject.instance().addMapLayer(exploded_layer)
 
-        # Gera a camada de pontos e calcula a inclinação
-        self.gerar_camadas_pontos(exploded_layer, selected_layer)
-
-        # Processa as setas na camada de linhas com o estilo selecionado
-        self.gerar_setas_com_estilo(exploded_layer)
+        # Gera as setas na camada de linhas com o estilo selecionado
+        self.gerar_setas_com_estilo(exploded_layer, pontos, inclinacoes)
 
         # Finaliza a barra de progresso
         progressBar.setValue(progressBar.maximum())
@@ -974,7 +852,7 @@ class SetasManager(QDialog, FORM_CLASS):
         # Habilita ou desabilita o pushButtonExportarDXF
         self.atualizar_estado_pushButtonExportarDXF()
 
-    def gerar_setas_com_estilo(self, exploded_layer):
+    def gerar_setas_com_estilo(self, exploded_layer, pontos, inclinacoes):
         """
         Gera setas na camada de linhas explodida com base no estilo selecionado pelo usuário. 
         O estilo de setas pode ser simples ou proporcional, dependendo da seleção dos radio buttons.
@@ -982,7 +860,9 @@ class SetasManager(QDialog, FORM_CLASS):
 
         Parâmetros:
         - self: Referência para a instância atual da classe (implícito), utilizada para acessar os atributos e métodos da classe.
-        - exploded_layer (QgsVectorLayer): A camada de linhas explodida que será estilizada com setas.
+        - exploded_layer (QgsVectorLayer): A camada de linhas explodida que receberá as setas.
+        - pontos (tuple): Arrays (inicio, meio, fim, comprimento) dos segmentos, de 'calcular_inclinacoes_segmentos'.
+        - inclinacoes (numpy.ndarray): Inclinação de cada segmento (NaN quando não calculada).
 
         A função realiza as seguintes ações:
         - Verifica qual estilo de seta foi selecionado pelo usuário (Simples ou Proporcional).
@@ -996,10 +876,10 @@ class SetasManager(QDialog, FORM_CLASS):
         # Verifica qual estilo de seta foi selecionado nos radio buttons
         if self.radioButtonSimples.isChecked():
             # Se o estilo Simples foi selecionado, processa as setas simples
-            self.processar_setas_simples(exploded_layer)
+            self.processar_setas_simples(exploded_layer, pontos, inclinacoes)
         elif self.radioButtonProporcional.isChecked():
             # Se o estilo Proporcional foi selecionado, processa as setas proporcionais
-            self.processar_setas_proporcionais(exploded_layer)
+            self.processar_setas_proporcionais(exploded_layer, pontos, inclinacoes)
         else:
             # Caso nenhum estilo de seta esteja selecionado, exibe uma mensagem de erro
             self.mostrar_mensagem("Nenhum estilo de seta selecionado.", "Erro")
@@ -1007,84 +887,28 @@ class SetasManager(QDialog, FORM_CLASS):
         # Exibe o rótulo de "Inclinação" na camada e aplica a cor correspondente
         self.exibir_rotulo_inclinacao(exploded_layer)
 
-    def processar_setas_simples(self, exploded_layer):
+    def processar_setas_simples(self, exploded_layer, pontos, inclinacoes):
         """
-        Processa a camada de linhas explodida para adicionar setas simples. O estilo da seta é baseado nos valores
-        definidos pelos spin boxes de espessura e tamanho da cabeça. As setas são adicionadas a cada linha da camada explodida.
+        Adiciona à camada de linhas explodida uma seta simples por segmento. O estilo da seta é baseado nos valores
+        definidos pelos spin boxes de espessura e tamanho da cabeça.
 
         Parâmetros:
         - self: Referência para a instância atual da classe (implícito), utilizada para acessar os atributos e métodos da classe.
-        - exploded_layer (QgsVectorLayer): A camada de linhas explodida, onde cada segmento de linha será atualizado para exibir setas.
+        - exploded_layer (QgsVectorLayer): A camada de linhas explodida que receberá as setas.
+        - pontos (tuple): Arrays (inicio, meio, fim, comprimento) dos segmentos.
+        - inclinacoes (numpy.ndarray): Inclinação de cada segmento.
 
         A função realiza as seguintes ações:
         - Obtém os valores de espessura e tamanho da cabeça da seta a partir dos spin boxes.
-        - Itera sobre cada feição da camada de linhas explodida.
-        - Calcula as coordenadas para desenhar a seta, incluindo a linha principal e a cabeça.
-        - Combina as geometrias da seta e atualiza a geometria da feição.
+        - Monta as setas (haste do início ao fim e cabeça no ponto final) de todos os segmentos de uma vez.
         - Aplica a cor das setas e exibe os rótulos de inclinação na camada.
 
         Retorno:
-        - Nenhum retorno explícito. A função altera diretamente a geometria da camada de linhas e aplica a cor e rótulo das setas.
+        - Nenhum retorno explícito. A função preenche diretamente a camada de linhas e aplica a cor e rótulo das setas.
         """
 
-        # Obtém os valores dos spin boxes para a espessura e o tamanho da cabeça da seta
-        thickness = self.spinBoxAbertura.value()  # Define a espessura da linha conforme o valor do spinBoxAbertura
-        head_length = self.spinBoxCabeca.value()  # Define o tamanho da cabeça da seta conforme o valor do spinBoxCabeca
-
-        # Inicia o modo de edição na camada de linhas explodida
-        exploded_layer.startEditing()
-
-        # Itera sobre cada feição na camada de linhas explodida
-        for feature in exploded_layer.getFeatures():
-            geom = feature.geometry()
-            if not geom or geom.isEmpty():
-                continue
-
-            # Obtém a linha como uma lista de pontos (QgsPointXY)
-            line = geom.asPolyline()
-            if len(line) < 2:
-                continue
-
-            # Cálculo do comprimento da linha, tamanho da cabeça da seta e espessura
-            length = geom.length()
-
-            # Definição dos pontos inicial, médio e final da linha
-            start_point = QgsPointXY(line[0])
-            mid_point = QgsPointXY(line[int(len(line) / 2)])
-            end_point = QgsPointXY(line[-1])
-
-            # Cálculo do ângulo da linha
-            dx = end_point.x() - start_point.x()
-            dy = end_point.y() - start_point.y()
-            angle = math.atan2(dy, dx)
-
-            # Cálculo dos pontos da cabeça da seta
-            arrow_head_point1 = QgsPointXY(end_point.x() - head_length * math.cos(angle + math.pi / 6),
-                                           end_point.y() - head_length * math.sin(angle + math.pi / 6))
-            arrow_head_point2 = QgsPointXY(end_point.x() - head_length * math.cos(angle - math.pi / 6),
-                                           end_point.y() - head_length * math.sin(angle - math.pi / 6))
-
-            # Cálculo dos pontos de fechamento da cabeça da seta
-            arrow_closure_point1 = QgsPointXY(arrow_head_point1.x() + thickness * math.cos(angle + math.pi / 2),
-                                              arrow_head_point1.y() + thickness * math.sin(angle + math.pi / 2))
-            arrow_closure_point2 = QgsPointXY(arrow_head_point2.x() - thickness * math.cos(angle + math.pi / 2),
-                                              arrow_head_point2.y() - thickness * math.sin(angle + math.pi / 2))
-
-            # Construção das geometrias da seta (linha principal e cabeça)
-            arrow_geom = QgsGeometry.fromPolylineXY([start_point, end_point])
-            arrow_head_geom1 = QgsGeometry.fromPolylineXY([end_point, arrow_head_point1])
-            arrow_head_geom2 = QgsGeometry.fromPolylineXY([end_point, arrow_head_point2])
-            arrow_closure_geom1 = QgsGeometry.fromPolylineXY([arrow_head_point1, arrow_closure_point1])
-            arrow_closure_geom2 = QgsGeometry.fromPolylineXY([arrow_head_point2, arrow_closure_point2])
-
-            # Combinação das geometrias da seta e cabeça em uma única geometria
-            combined_geom = arrow_geom.combine(arrow_head_geom1).combine(arrow_head_geom2).combine(arrow_closure_geom1).combine(arrow_closure_geom2)
-
-            # Atualizando a geometria da feição
-            exploded_layer.changeGeometry(feature.id(), combined_geom)
-
-        # Finaliza a edição da camada
-        exploded_layer.commitChanges()
+        # Adiciona as setas com cabeça de tamanho fixo no ponto final
+        self.adicionar_setas(exploded_layer, pontos, inclinacoes, proporcional=False)
 
         # Aplica a cor às setas da camada de linhas
         self.aplicar_cor_setas(exploded_layer)
@@ -1095,6 +919,32 @@ class SetasManager(QDialog, FORM_CLASS):
         # Exibe o rótulo de inclinação para cada feição da camada
         self.exibir_rotulo_inclinacao(exploded_layer)
 
+    def adicionar_setas(self, exploded_layer, pontos, inclinacoes, proporcional):
+        """
+        Monta as setas de todos os segmentos com numpy e as envia ao provedor da camada em um único addFeatures.
+
+        Parâmetros:
+        - self: Referência para a instância atual da classe (implícito), utilizada para acessar os atributos e métodos da classe.
+        - exploded_layer (QgsVectorLayer): A camada que receberá as setas.
+        - pontos (tuple): Arrays (inicio, meio, fim, comprimento) dos segmentos.
+        - inclinacoes (numpy.ndarray): Inclinação de cada segmento (NaN vira atributo nulo).
+        - proporcional (bool): Se True, a cabeça e a espessura são porcentagens do comprimento de cada segmento.
+
+        Retorno:
+        - Nenhum retorno explícito. As feições (ID, Comprimento, Inclinacao) são adicionadas diretamente ao provedor.
+        """
+        inicio, meio, fim, comprimento = pontos
+        geometrias = setas_wkb(inicio, meio, fim, comprimento, self.spinBoxCabeca.value(), self.spinBoxAbertura.value(), proporcional)
+
+        atributos = [
+            [segment_id, comprimento_segmento, None if math.isnan(inclinacao) else inclinacao]
+            for segment_id, comprimento_segmento, inclinacao in zip(
+                range(1, len(geometrias) + 1), np.round(comprimento, 3).tolist(), inclinacoes.tolist())
+        ]
+
+        exploded_layer.dataProvider().addFeatures(criar_feicoes(geometrias, atributos))
+        exploded_layer.updateExtents()
+
     def exibir_rotulo_inclinacao(self, layer):
         """
         Configura os rótulos para o campo 'Inclinacao' na camada de linhas, exibindo a inclinação como porcentagem 
@@ -1307,86 +1157,27 @@ class SetasManager(QDialog, FORM_CLASS):
             # Reseta o estilo do botão de seleção de cor para o estado padrão (sem cor de fundo)
             self.pushButtonCor.setStyleSheet("")
 
-    def processar_setas_proporcionais(self, exploded_layer):
+    def processar_setas_proporcionais(self, exploded_layer, pontos, inclinacoes):
         """
-        Processa a camada de linhas explodida para adicionar setas proporcionais ao comprimento da linha.
-        O tamanho da cabeça e a espessura das setas são ajustados proporcionalmente ao comprimento de cada segmento de linha.
+        Adiciona à camada de linhas explodida uma seta proporcional ao comprimento de cada segmento.
+        O tamanho da cabeça e a espessura das setas são porcentagens (spin boxes) do comprimento de cada segmento.
 
         Parâmetros:
         - self: Referência para a instância atual da classe (implícito), utilizada para acessar os atributos e métodos da classe.
-        - exploded_layer (QgsVectorLayer): A camada de linhas explodida, onde cada segmento de linha será atualizado para exibir setas proporcionais.
+        - exploded_layer (QgsVectorLayer): A camada de linhas explodida que receberá as setas proporcionais.
+        - pontos (tuple): Arrays (inicio, meio, fim, comprimento) dos segmentos.
+        - inclinacoes (numpy.ndarray): Inclinação de cada segmento.
 
         A função realiza as seguintes ações:
-        - Obtém os valores de espessura e tamanho da cabeça das setas a partir dos spin boxes.
-        - Itera sobre cada feição da camada de linhas explodida.
-        - Calcula as coordenadas para desenhar a seta proporcional ao comprimento da linha.
-        - Combina as geometrias da seta e atualiza a geometria da feição.
-        - Aplica a cor das setas e finaliza as alterações.
+        - Monta as setas (haste início-meio-fim e cabeça no vértice central) de todos os segmentos de uma vez.
+        - Aplica a cor das setas.
 
         Retorno:
-        - Nenhum retorno explícito. A função altera diretamente a geometria da camada de linhas e aplica as cores e setas.
+        - Nenhum retorno explícito. A função preenche diretamente a camada de linhas e aplica as cores das setas.
         """
 
-        # Obtém os valores dos spin boxes para a espessura e o tamanho da cabeça da seta
-        spin_thickness = self.spinBoxAbertura.value()  # Define a espessura da linha conforme o valor do spinBoxAbertura
-        spin_head_length = self.spinBoxCabeca.value()  # Define o tamanho da cabeça da seta conforme o valor do spinBoxCabeca
-
-        # Inicia o modo de edição na camada de linhas explodida
-        exploded_layer.startEditing()
-
-        # Itera sobre cada feição na camada de linhas explodida
-        for feature in exploded_layer.getFeatures():
-            geom = feature.geometry()
-            if not geom or geom.isEmpty():
-                continue
-
-            # Obtém a linha como uma lista de pontos (QgsPointXY)
-            line = geom.asPolyline()
-            if len(line) < 2:
-                continue
-
-            # Cálculo do comprimento da linha, tamanho da cabeça da seta e espessura
-            length = geom.length()
-            head_length = spin_head_length * length / 100 # Ajusta o tamanho da cabeça da seta proporcional ao comprimento da linha
-            thickness = spin_thickness * length / 100 # Ajusta a espessura proporcional ao comprimento da linha
-
-            # Definição dos pontos inicial, médio e final da linha
-            start_point = QgsPointXY(line[0])
-            mid_point = QgsPointXY(line[int(len(line) / 2)])
-            end_point = QgsPointXY(line[-1])
-
-            # Cálculo do ângulo da linha
-            dx = end_point.x() - start_point.x()
-            dy = end_point.y() - start_point.y()
-            angle = math.atan2(dy, dx)
-
-            # Cálculo dos pontos da cabeça da seta
-            arrow_head_point1 = QgsPointXY(mid_point.x() - head_length * math.cos(angle + math.pi / 6),
-                                           mid_point.y() - head_length * math.sin(angle + math.pi / 6))
-            arrow_head_point2 = QgsPointXY(mid_point.x() - head_length * math.cos(angle - math.pi / 6),
-                                           mid_point.y() - head_length * math.sin(angle - math.pi / 6))
-
-            # Cálculo dos pontos de fechamento da cabeça da seta
-            arrow_closure_point1 = QgsPointXY(arrow_head_point1.x() + thickness * math.cos(angle + math.pi / 2),
-                                              arrow_head_point1.y() + thickness * math.sin(angle + math.pi / 2))
-            arrow_closure_point2 = QgsPointXY(arrow_head_point2.x() - thickness * math.cos(angle + math.pi / 2),
-                                              arrow_head_point2.y() - thickness * math.sin(angle + math.pi / 2))
-
-            # Construção das geometrias da seta e fechamento da cabeça da seta
-            arrow_geom = QgsGeometry.fromPolylineXY([start_point, mid_point, end_point])
-            arrow_head_geom1 = QgsGeometry.fromPolylineXY([mid_point, arrow_head_point1])
-            arrow_head_geom2 = QgsGeometry.fromPolylineXY([mid_point, arrow_head_point2])
-            arrow_closure_geom1 = QgsGeometry.fromPolylineXY([arrow_head_point1, arrow_closure_point1])
-            arrow_closure_geom2 = QgsGeometry.fromPolylineXY([arrow_head_point2, arrow_closure_point2])
-
-            # Combinando as geometrias
-            combined_geom = arrow_geom.combine(arrow_head_geom1).combine(arrow_head_geom2).combine(arrow_closure_geom1).combine(arrow_closure_geom2)
-
-            # Atualiza a geometria da feição na camada de linhas explodida
-            exploded_layer.changeGeometry(feature.id(), combined_geom)
-
-        # Finaliza a edição da camada
-        exploded_layer.commitChanges()
+        # Adiciona as setas com cabeça proporcional ao comprimento no vértice central
+        self.adicionar_setas(exploded_layer, pontos, inclinacoes, proporcional=True)
 
         # Aplica a cor às setas da camada de linhas
         self.aplicar_cor_setas(exploded_layer)
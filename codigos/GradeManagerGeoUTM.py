@@ -1,4 +1,4 @@
-from qgis.core import (QgsProject, QgsVectorLayer, QgsPointXY, QgsField, QgsFeature, QgsGeometry, QgsPalLayerSettings, QgsVectorLayerSimpleLabeling, QgsCoordinateReferenceSystem, Qgis, QgsMapLayer, QgsRectangle, QgsWkbTypes)
+from qgis.core import (QgsProject, QgsVectorLayer, QgsPointXY, QgsField, QgsFeature, QgsGeometry, QgsPalLayerSettings, QgsVectorLayerSimpleLabeling, QgsCoordinateReferenceSystem, Qgis, QgsMapLayer, QgsRectangle, QgsWkbTypes, QgsFeatureRequest, QgsSpatialIndex, QgsCoordinateTransform, QgsCsException)
 from qgis.PyQt.QtWidgets import QDialog, QProgressBar, QApplication, QFileDialog, QPushButton
 from qgis.PyQt.QtCore import QVariant, Qt, QSettings
 from qgis.utils import iface
@@ -955,6 +955,94 @@ class GradeManager(QDialog, FORM_CLASS):
         # Reforça a atualização da camada para garantir que os rótulos sejam exibidos imediatamente
         camada_de_vetor.triggerRepaint()
 
+    def coletar_obstaculos(self, retangulo, crs_projeto, buffer_para_linhas_pontos):
+        """
+        Reúne, em uma única união, as geometrias que a grade ajustada deve contornar.
+
+        Parâmetros:
+        - retangulo (QgsRectangle): Área da grade, no SRC do projeto. Só são lidas as feições que a tocam.
+        - crs_projeto (QgsCoordinateReferenceSystem): SRC do projeto, para o qual as feições são reprojetadas.
+        - buffer_para_linhas_pontos (float): Buffer aplicado às feições de linhas e pontos.
+
+        Funcionalidades:
+        - Polígonos entram como estão; linhas e pontos entram com buffer.
+        - Rasters e malhas entram como o retângulo de sua extensão, reprojetado para o SRC do projeto.
+        - A união é feita em uma só chamada de QgsGeometry.unaryUnion.
+
+        Retorno:
+        - Lista com as partes (polígonos disjuntos) da união, ou lista vazia se não houver obstáculos.
+        """
+        contexto = QgsProject.instance().transformContext()
+        geometrias = []
+
+        for layer in QgsProject.instance().mapLayers().values():
+            if layer.type() == QgsMapLayer.VectorLayer and layer.isValid():
+                tipo = layer.geometryType()
+                if tipo not in (QgsWkbTypes.PolygonGeometry, QgsWkbTypes.LineGeometry, QgsWkbTypes.PointGeometry):
+                    continue
+
+                # Só as feições dentro da área da grade, já no SRC do projeto e sem atributos
+                request = QgsFeatureRequest()
+                request.setDestinationCrs(crs_projeto, contexto)
+                request.setFilterRect(retangulo)
+                request.setNoAttributes()
+
+                for feat in layer.getFeatures(request):
+                    geom = feat.geometry()
+                    if not geom or geom.isEmpty():
+                        continue
+                    if tipo != QgsWkbTypes.PolygonGeometry:
+                        # Linha ou ponto => buffer
+                        geom = geom.buffer(buffer_para_linhas_pontos, 5)
+                        if geom.isEmpty():
+                            continue
+                    geometrias.append(geom)
+
+            elif layer.type() in (QgsMapLayer.RasterLayer, QgsMapLayer.MeshLayer) and layer.isValid():
+                # Raster ou malha => retângulo da extensão, no SRC do projeto e só se tocar a área da grade
+                extensao = layer.extent()
+                if layer.crs() != crs_projeto:
+                    try:
+                        extensao = QgsCoordinateTransform(layer.crs(), crs_projeto, contexto).transformBoundingBox(extensao)
+                    except QgsCsException:
+                        continue
+                if extensao.intersects(retangulo):
+                    geometrias.append(QgsGeometry.fromRect(extensao))
+
+        if not geometrias:
+            return []
+
+        uniao = QgsGeometry.unaryUnion(geometrias)
+        if not uniao or uniao.isEmpty():
+            return []
+        return uniao.asGeometryCollection()
+
+    def criar_indice_obstaculos(self, obstaculos):
+        """
+        Cria um índice espacial com as partes da união dos obstáculos, identificadas pela posição na lista.
+        """
+        indice = QgsSpatialIndex()
+        for i, geom in enumerate(obstaculos):
+            feat = QgsFeature(i)
+            feat.setGeometry(geom)
+            indice.addFeature(feat)
+        return indice
+
+    def recortar_fora_obstaculos(self, geom, obstaculos, indice):
+        """
+        Remove de uma geometria as partes que caem sobre os obstáculos.
+
+        Apenas os obstáculos cujo retângulo envolvente toca a geometria (consultados no índice espacial) entram no recorte.
+
+        Retorno:
+        - A geometria restante (vazia se estiver totalmente coberta).
+        """
+        candidatos = [obstaculos[i] for i in indice.intersects(geom.boundingBox())]
+        # Sem obstáculos tocando a geometria (ou nenhum na área da grade), ela fica inteira (sem recortes)
+        if not candidatos:
+            return geom
+        return geom.difference(QgsGeometry.collectGeometry(candidatos))
+
     def executar_criar_grade_utm_aj(self):
         """
         Cria uma grade UTM que:
@@ -963,7 +1051,7 @@ class GradeManager(QDialog, FORM_CLASS):
           - E também cria uma camada de pontos "Coordenadas Limites (Fora)" nas bordas,
             armazenando X e Y (apenas se estiverem fora das feições)
           - Para camadas lineares e pontuais, usa um buffer de 10% do valor do spinBox_espacamento
-          - Se não houver feições (ou não estiver em UTM), exibe mensagem de erro.
+          - Se não houver feições na área da grade, desenha a grade inteira; fora de UTM, exibe mensagem de erro.
           - Configura os rótulos nos pontos, exibindo X ou Y conforme a posição extrema.
         """
 
@@ -987,53 +1075,7 @@ class GradeManager(QDialog, FORM_CLASS):
         # 3) Remover camadas anteriores
         self.remove_layers_if_exist(['Grade UTM', 'Coordenadas Limites'])
 
-        # 4) Construir a união de todas as geometrias (polygon, buffer de lines/points, raster, mesh)
-        union_geom = None
-
-        def unir_geometrias(base_geom, nova_geom):
-            if base_geom is None:
-                return nova_geom
-            else:
-                return base_geom.combine(nova_geom)
-
-        for layer in QgsProject.instance().mapLayers().values():
-            if layer.type() == QgsMapLayer.VectorLayer and layer.isValid():
-                # Polígono
-                if layer.geometryType() == QgsWkbTypes.PolygonGeometry:
-                    for feat in layer.getFeatures():
-                        geom = feat.geometry()
-                        if geom:
-                            union_geom = unir_geometrias(union_geom, geom)
-                # Linha ou ponto => buffer
-                elif layer.geometryType() in (QgsWkbTypes.LineGeometry, QgsWkbTypes.PointGeometry):
-                    for feat in layer.getFeatures():
-                        geom = feat.geometry()
-                        if geom:
-                            bufferado = geom.buffer(buffer_para_linhas_pontos, 5)
-                            if not bufferado.isEmpty():
-                                union_geom = unir_geometrias(union_geom, bufferado)
-
-            elif layer.type() == QgsMapLayer.RasterLayer:
-                # Raster => retângulo bounding box
-                ext_raster = layer.extent()
-                geom_ret = QgsGeometry.fromRect(ext_raster)
-                union_geom = unir_geometrias(union_geom, geom_ret)
-
-            elif layer.type() == QgsMapLayer.MeshLayer:
-                # Mesh => retângulo bounding box
-                ext_mesh = layer.extent()
-                geom_ret = QgsGeometry.fromRect(ext_mesh)
-                union_geom = unir_geometrias(union_geom, geom_ret)
-
-        # Se não achamos geometrias para union
-        if not union_geom or union_geom.isEmpty():
-            self.mostrar_mensagem(
-                "Não há feições/camadas para restringir a grade.",
-                "Erro"
-            )
-            return
-
-        # 5) Extensão do Map Canvas, arredondada para múltiplos do espaçamento
+        # 4) Extensão do Map Canvas, arredondada para múltiplos do espaçamento
         canvas = self.iface.mapCanvas()
         extent = canvas.extent()
         minx = extent.xMinimum()
@@ -1046,16 +1088,21 @@ class GradeManager(QDialog, FORM_CLASS):
         maxx = math.ceil(maxx / intervalo) * intervalo
         maxy = math.ceil(maxy / intervalo) * intervalo
 
-        retangulo_geom = QgsGeometry.fromRect(QgsRectangle(minx, miny, maxx, maxy))
+        retangulo = QgsRectangle(minx, miny, maxx, maxy)
 
-        # 6) Polígono externo = retângulo - union_geom
-        poligono_externo = retangulo_geom.difference(union_geom)
-        if poligono_externo.isEmpty():
+        # 5) Obstáculos dentro da área da grade (polygon, buffer de lines/points, raster, mesh), unidos de uma vez
+        obstaculos = self.coletar_obstaculos(retangulo, crs_projeto, buffer_para_linhas_pontos)
+
+        # 6) Nada sobra para a grade se algum obstáculo cobrir todo o retângulo
+        retangulo_geom = QgsGeometry.fromRect(retangulo)
+        if any(geom.contains(retangulo_geom) for geom in obstaculos):
             self.mostrar_mensagem(
                 "As feições/camadas ocupam toda a área de trabalho. Nada sobra para a grade externa.",
                 "Erro")
             return
 
+        indice = self.criar_indice_obstaculos(obstaculos)
+
         # 7) Criar camada de linhas: "Grade UTM Ajustada (Fora)"
         grade_layer = QgsVectorLayer(
             f'LineString?crs={crs_projeto.authid()}',
@@ -1066,8 +1113,6 @@ class GradeManager(QDialog, FORM_CLASS):
         provider_lines.addAttributes([QgsField('ID', QVariant.Int)])
         grade_layer.updateFields()
 
-        fid_lines = 1
-
         # 8) Calcular total para barra de progresso (linhas + pontos)
         qtd_horiz = int((maxy - miny) // intervalo) + 1
         qtd_vert = int((maxx - minx) // intervalo) + 1
@@ -1081,67 +1126,37 @@ class GradeManager(QDialog, FORM_CLASS):
         progressBar, progressMessageBar = self.iniciar_progress_bar(total_steps)
         steps_done = 0
 
-        # 9) Criar linhas horizontais
+        # 9) Linhas horizontais e verticais, recortadas apenas pelos obstáculos que tocam cada linha
+        linhas = []
         y_atual = miny
         while y_atual <= maxy:
-            line_geom = QgsGeometry.fromPolylineXY([
-                QgsPointXY(minx, y_atual),
-                QgsPointXY(maxx, y_atual)
-            ])
-            # Intersecta com poligono_externo => somente fora
-            linha_fora = line_geom.intersection(poligono_externo)
-            if not linha_fora.isEmpty():
-                if linha_fora.isMultipart():
-                    partes = linha_fora.asMultiPolyline()
-                    for parte in partes:
-                        feat_line = QgsFeature()
-                        feat_line.setGeometry(QgsGeometry.fromPolylineXY(parte))
-                        feat_line.setAttributes([fid_lines])
-                        provider_lines.addFeature(feat_line)
-                        fid_lines += 1
-                else:
-                    feat_line = QgsFeature()
-                    feat_line.setGeometry(linha_fora)
-                    feat_line.setAttributes([fid_lines])
-                    provider_lines.addFeature(feat_line)
-                    fid_lines += 1
-
-            steps_done += 1
-            progressBar.setValue(steps_done)
+            linhas.append([QgsPointXY(minx, y_atual), QgsPointXY(maxx, y_atual)])
             y_atual += intervalo
-
-        # 10) Criar linhas verticais
         x_atual = minx
         while x_atual <= maxx:
-            line_geom = QgsGeometry.fromPolylineXY([
-                QgsPointXY(x_atual, miny),
-                QgsPointXY(x_atual, maxy)
-            ])
-            linha_fora = line_geom.intersection(poligono_externo)
+            linhas.append([QgsPointXY(x_atual, miny), QgsPointXY(x_atual, maxy)])
+            x_atual += intervalo
+
+        feats_linhas = []
+        for pontos_linha in linhas:
+            linha_fora = self.recortar_fora_obstaculos(QgsGeometry.fromPolylineXY(pontos_linha), obstaculos, indice)
             if not linha_fora.isEmpty():
-                if linha_fora.isMultipart():
-                    partes = linha_fora.asMultiPolyline()
-                    for parte in partes:
-                        feat_line = QgsFeature()
-                        feat_line.setGeometry(QgsGeometry.fromPolylineXY(parte))
-                        feat_line.setAttributes([fid_lines])
-                        provider_lines.addFeature(feat_line)
-                        fid_lines += 1
-                else:
+                partes = linha_fora.asMultiPolyline() if linha_fora.isMultipart() else [linha_fora.asPolyline()]
+                for parte in partes:
                     feat_line = QgsFeature()
-                    feat_line.setGeometry(linha_fora)
-                    feat_line.setAttributes([fid_lines])
-                    provider_lines.addFeature(feat_line)
-                    fid_lines += 1
+                    feat_line.setGeometry(QgsGeometry.fromPolylineXY(parte))
+                    feat_line.setAttributes([len(feats_linhas) + 1])
+                    feats_linhas.append(feat_line)
 
             steps_done += 1
             progressBar.setValue(steps_done)
-            x_atual += intervalo
+
+        provider_lines.addFeatures(feats_linhas)
 
         # Adicionar a camada de linhas ao projeto
         QgsProject.instance().addMapLayer(grade_layer)
 
-        # 11) Criar a camada de pontos: "Coordenadas Limites (Fora)"
+        # 10) Criar a camada de pontos: "Coordenadas Limites (Fora)"
         points_layer = QgsVectorLayer(
             f'Point?crs={crs_projeto.authid()}',
             'Coordenadas Limites',
@@ -1155,20 +1170,23 @@ class GradeManager(QDialog, FORM_CLASS):
         ])
         points_layer.updateFields()
 
-        fid_points = 1
+        feats_pontos = []
+
+        def adicionar_ponto_se_fora(x, y):
+            # O ponto fica na camada se nenhum obstáculo candidato o contiver
+            pt_geom = QgsGeometry.fromPointXY(QgsPointXY(x, y))
+            candidatos = indice.intersects(QgsRectangle(x, y, x, y))
+            if not any(obstaculos[i].contains(pt_geom) for i in candidatos):
+                feat_pt = QgsFeature()
+                feat_pt.setGeometry(pt_geom)
+                feat_pt.setAttributes([len(feats_pontos) + 1, x, y])
+                feats_pontos.append(feat_pt)
 
         # a) Pontos nas bordas verticais (x variando, y = miny ou maxy)
         x_val = minx
         while x_val <= maxx:
             for y_borda in [miny, maxy]:
-                pt_geom = QgsGeometry.fromPointXY(QgsPointXY(x_val, y_borda))
-                pt_fora = pt_geom.intersection(poligono_externo)
-                if not pt_fora.isEmpty():
-                    feat_pt = QgsFeature()
-                    feat_pt.setGeometry(pt_geom)
-                    feat_pt.setAttributes([fid_points, x_val, y_borda])
-                    provider_points.addFeature(feat_pt)
-                    fid_points += 1
+                adicionar_ponto_se_fora(x_val, y_borda)
             steps_done += 2
             progressBar.setValue(steps_done)
             x_val += intervalo
@@ -1177,25 +1195,20 @@ class GradeManager(QDialog, FORM_CLASS):
         y_val = miny + intervalo
         while y_val < maxy:
             for x_borda in [minx, maxx]:
-                pt_geom = QgsGeometry.fromPointXY(QgsPointXY(x_borda, y_val))
-                pt_fora = pt_geom.intersection(poligono_externo)
-                if not pt_fora.isEmpty():
-                    feat_pt = QgsFeature()
-                    feat_pt.setGeometry(pt_geom)
-                    feat_pt.setAttributes([fid_points, x_borda, y_val])
-                    provider_points.addFeature(feat_pt)
-                    fid_points += 1
+                adicionar_ponto_se_fora(x_borda, y_val)
             steps_done += 2
             progressBar.setValue(steps_done)
             y_val += intervalo
 
+        provider_points.addFeatures(feats_pontos)
+
         # Adicionar a camada de pontos ao projeto
         QgsProject.instance().addMapLayer(points_layer)
 
         # Configurar rótulos usando a função solicitada
         self.configurar_rotulos_na_camada_utm(points_layer)
 
-        # 12) Limpar barra e exibir mensagem
+        # 11) Limpar barra e exibir mensagem
         self.iface.messageBar().clearWidgets()
         self.mostrar_mensagem(
             "Grade UTM Ajustada (Fora) e Coordenadas Limites (Fora) criadas com sucesso!",
@@ -19,6 +19,8 @@ import math
 import os
 import re
 
+from .amostragem_raster import obter_amostrador
+
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'GraficoEstruturaSolar.ui'))
 
@@ -851,7 +853,6 @@ class EstruturasManager(QDockWidget, FORM_CLASS):
         """
         Obtém o valor de Z de um Raster para as coordenadas X, Y fornecidas.
         """
-        raster_provider = raster_layer.dataProvider()
         raster_extent = raster_layer.extent()
 
         # Converte as coordenadas do ponto para o sistema de referência do raster
@@ -867,12 +868,10 @@ class EstruturasManager(QDockWidget, FORM_CLASS):
         if not raster_extent.contains(point):
             return 0  # Se o ponto está fora do Raster, retorna 0
 
-        # Obtém o valor de Z no ponto
-        ident = raster_provider.identify(point, QgsRaster.IdentifyFormatValue)
-        if ident.isValid():
-            band_values = ident.results()
-            if band_values:
-                return list(band_values.values())[0]  # Retorna o primeiro valor da banda
+        # Obtém o valor de Z no ponto pelo serviço compartilhado de amostragem
+        z_value = obter_amostrador().amostrar_ponto(raster_layer, point.x(), point.y())
+        if z_value is not None:
+            return z_value
 
         return 0  # Caso não consiga obter o valor
 
@@ -1389,15 +1388,9 @@ class EstruturasManager(QDockWidget, FORM_CLASS):
 
     def sample_raster_value(self, point, raster_layer):
         """Amostra o valor Z do raster baseado nas coordenadas do ponto."""
-        identify_result = raster_layer.dataProvider().identify(QgsPointXY(point.x(), point.y()), QgsRaster.IdentifyFormatValue)
-        
-        if identify_result.isValid():
-            results = identify_result.results()
-            if results:
-                band_key = list(results.keys())[0]
-                z_value = results.get(band_key)  # Use get para evitar KeyError
-                if z_value is not None:  # Verifica se o valor é válido
-                    return round(float(z_value), 3)
+        z_value = obter_amostrador().amostrar_ponto(raster_layer, point.x(), point.y())
+        if z_value is not None:  # Verifica se o valor é válido
+            return round(z_value, 3)
         return None  # Retorna None se não houver valor válido
 
     def iniciar_progress_bar(self, total_steps):
@@ -1,9 +1,9 @@
-from qgis.core import QgsProject, QgsRasterLayer, QgsPointXY, QgsWkbTypes, QgsFeature, QgsRaster, Qgis, QgsGeometry, QgsLayerTreeLayer, QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsDistanceArea, QgsCoordinateTransformContext, QgsMapLayerType, QgsVectorLayer, QgsTextAnnotation, QgsTextFormat, QgsProperty, QgsMapRendererParallelJob, QgsMapRendererCustomPainterJob, QgsMapSettings, QgsMessageLog, QgsField
+from qgis.core import QgsProject, QgsRasterLayer, QgsPointXY, QgsWkbTypes, QgsFeature, QgsRaster, Qgis, QgsGeometry, QgsLayerTreeLayer, QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsDistanceArea, QgsCoordinateTransformContext, QgsMapLayerType, QgsVectorLayer, QgsTextAnnotation, QgsTextFormat, QgsProperty, QgsMapRendererParallelJob, QgsMapRendererCustomPainterJob, QgsMapSettings, QgsMessageLog, QgsField, QgsApplication, QgsTask
 from qgis.PyQt.QtWidgets import QDockWidget, QWidget, QListWidgetItem, QColorDialog, QStyledItemDelegate, QStyleOptionViewItem, QApplication, QStyle, QLabel, QVBoxLayout, QTableWidgetItem, QToolTip, QLabel, QListView, QFileDialog, QPushButton
 from qgis.gui import QgsMapToolEmitPoint, QgsRubberBand, QgsVertexMarker, QgsMapToolIdentifyFeature, QgsMapCanvasAnnotationItem
 from qgis.PyQt.QtCore import Qt, QRect, QPoint, QSize, QEvent, QVariant, QSettings
 from PyQt5.QtGui import QTextDocument, QImage, QPixmap, QPainter, QFont
-from PyQt5.QtCore import QThread, pyqtSignal, QByteArray, QBuffer
+from PyQt5.QtCore import pyqtSignal, QByteArray, QBuffer
 from matplotlib.backends.backend_pdf import PdfPages
 from qgis.PyQt.QtGui import QIcon, QPixmap, QColor
 from pyqtgraph.Qt import QtGui, QtCore
@@ -21,6 +21,12 @@ import ezdxf
 import math
 import os
 
+from .amostragem_raster import obter_amostrador
+from .perfil_amostragem import MAX_AMOSTRAS_PADRAO, amostrar_corredor, amostrar_polilinha, passo_pelo_pixel, trechos_validos
+from .perfil_indice import IndiceCurvas, IndiceLinha
+from .perfil_lod import PiramideCurva
+from .transformacoes_crs import aplicar_transformacao, obter_transformacao, transformar_coordenadas
+
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'Grafico_perfil.ui'))
 
@@ -73,6 +79,29 @@ class PerfilManager(QDockWidget, FORM_CLASS):
         self.current_x_values = []  # Lista vazia para os valores x
         self.current_y_values = []  # Lista vazia para os valores y
 
+        # Vértices da linha desenhada (ou selecionada), para reamostrar quando a seleção de rasters muda
+        self.line_vertices = []
+
+        # Índices da linha (distância -> ponto) e das curvas plotadas, refeitos a cada novo perfil
+        self.indice_linha = None
+        self.indice_curvas = None
+
+        # Amostragem da linha: 'pixel' (passo igual ao menor pixel dos rasters selecionados, com limite
+        # de amostras e refino nos vértices) ou 'fixo' (100 amostras por segmento, como antes)
+        self.modo_amostragem = 'pixel'
+        self.max_amostras_perfil = MAX_AMOSTRAS_PADRAO
+        self.refinar_curvatura = True
+        self.comboBoxAmostragem.setCurrentIndex(0 if self.modo_amostragem == 'pixel' else 1)
+        self.spinBoxMaxAmostras.setValue(self.max_amostras_perfil or 0)
+        self.checkBoxRefinar.setChecked(self.refinar_curvatura)
+
+        # Tarefa de extração de perfis em andamento (QgsTask), cancelada quando outra é iniciada
+        self.tarefa_perfis = None
+
+        # Curvas plotadas e suas pirâmides de resolução (decimação mínimo/máximo conforme o zoom)
+        self.curvas_lod = []
+        self.view_box_lod = None
+
         # Inicializa o checkBoxLinha como selecionado
         self.checkBoxLinha.setChecked(True)
 
@@ -149,6 +178,11 @@ class PerfilManager(QDockWidget, FORM_CLASS):
         # Conectar o botão pushButtonExportar_2 ao método de exportação
         self.pushButtonExportar_2.clicked.connect(self.export_second_graph)
 
+        # Conecta os controles de amostragem da linha (modo, limite de amostras e refino nos vértices)
+        self.comboBoxAmostragem.currentIndexChanged.connect(self.on_amostragem_alterada)
+        self.spinBoxMaxAmostras.valueChanged.connect(self.on_amostragem_alterada)
+        self.checkBoxRefinar.stateChanged.connect(self.on_amostragem_alterada)
+
     def connect_name_changed_signals(self):
         """Conecta o sinal de mudança de nome de todas as camadas raster existentes no projeto QGIS."""
         for layer in QgsProject.instance().mapLayers().values():
@@ -237,6 +271,10 @@ class PerfilManager(QDockWidget, FORM_CLASS):
         self.selected_raster_layers = []  # Reseta as camadas selecionadas
         self.line_points = []  # Adicione esta linha
         self.line_distances = []  # Adicione esta linha
+        self.line_vertices = []
+        self.indice_linha = None
+        self.indice_curvas = None
+        self.curvas_lod = []
 
         # Ativa a ferramenta de linha se o checkBoxLinha estiver selecionado
         if self.checkBoxLinha.isChecked():
@@ -275,6 +313,9 @@ class PerfilManager(QDockWidget, FORM_CLASS):
         """Ativado quando o diálogo é fechado."""
         super(PerfilManager, self).closeEvent(event)
 
+        # Interrompe a extração de perfis em andamento
+        self.cancel_profile_extraction()
+
         # Remove o marcador do mapa
         self.remove_map_marker()
 
@@ -310,6 +351,10 @@ class PerfilManager(QDockWidget, FORM_CLASS):
         # Reseta as variáveis de perfil
         self.line_points = []
         self.line_distances = []
+        self.line_vertices = []
+        self.indice_linha = None
+        self.indice_curvas = None
+        self.curvas_lod = []
         self.current_x_values = []
         self.current_y_values = []
         self.all_profiles = []
@@ -442,10 +487,12 @@ class PerfilManager(QDockWidget, FORM_CLASS):
 
         self.all_profiles = []  # Lista para armazenar todos os perfis
 
-        # Calcula os pontos e distâncias apenas uma vez
+        # Calcula os pontos e distâncias apenas uma vez (o passo depende dos rasters selecionados)
+        self.line_vertices = list(points)
         distances, line_points = self.calculate_distances_and_points(points)
         self.line_points = line_points
         self.line_distances = distances
+        self.indice_linha = IndiceLinha(line_points, distances)
 
         # Ajusta o valor máximo do doubleSpinBox_espaco
         if distances:
@@ -455,60 +502,8 @@ class PerfilManager(QDockWidget, FORM_CLASS):
             if self.doubleSpinBox_espaco.value() > total_length:
                 self.doubleSpinBox_espaco.setValue(total_length)
 
-        # Para cada camada selecionada, extrai os valores de elevação
-        for layer in self.selected_raster_layers:
-            profiles = []  # Lista para armazenar segmentos de dados válidos
-            current_distances = []
-            current_values = []
-
-            # Obtém o CRS da camada raster e configura a transformação de coordenadas
-            raster_crs = layer.crs()
-            map_crs = iface.mapCanvas().mapSettings().destinationCrs()
-            if raster_crs != map_crs:
-                transform = QgsCoordinateTransform(map_crs, raster_crs, QgsProject.instance())
-                transformed_points = [transform.transform(point) for point in line_points]
-            else:
-                transformed_points = line_points
-
-            for i, point in enumerate(transformed_points):
-                ident = layer.dataProvider().identify(point, QgsRaster.IdentifyFormatValue)
-                if ident.isValid():
-                    results = ident.results()
-                    value = list(results.values())[0]
-                    if value is not None and not np.isnan(value):
-                        current_distances.append(distances[i])
-                        current_values.append(value)
-                    else:
-                        if current_distances and current_values:
-                            profiles.append({
-                                'distances': current_distances,
-                                'values': current_values
-                            })
-                            current_distances = []
-                            current_values = []
-                else:
-                    if current_distances and current_values:
-                        profiles.append({
-                            'distances': current_distances,
-                            'values': current_values
-                        })
-                        current_distances = []
-                        current_values = []
-
-            if current_distances and current_values:
-                profiles.append({
-                    'distances': current_distances,
-                    'values': current_values
-                })
-
-            # Armazena os perfis segmentados junto com a camada
-            self.all_profiles.append({
-                'layer': layer,
-                'profiles': profiles
-            })
-
-        # Plota todos os perfis
-        self.plot_profiles()
+        # Extrai os valores de elevação em segundo plano; o gráfico é plotado ao final da tarefa
+        self.start_profile_extraction()
 
     def sample_raster_along_line(self, start_point, end_point, num_samples=100):
         """Amostra o raster ao longo de um segmento de linha, desconsiderando pontos fora da extensão do raster."""
@@ -550,6 +545,15 @@ class PerfilManager(QDockWidget, FORM_CLASS):
 
     def calculate_distances_and_points(self, points):
         """Calcula as distâncias cumulativas e pontos ao longo da linha."""
+        if self.modo_amostragem == 'pixel' and len(points) >= 2:
+            map_crs = iface.mapCanvas().mapSettings().destinationCrs()
+            passo = passo_pelo_pixel(self.selected_raster_layers, map_crs)
+            if passo:
+                vertices = np.array([(point.x(), point.y()) for point in points], dtype=np.float64)
+                distances, xs, ys = amostrar_polilinha(vertices, passo, self.max_amostras_perfil, self.refinar_curvatura)
+                return distances.tolist(), [QgsPointXY(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+
+        # Modo fixo (ou sem raster válido para derivar o passo): 100 amostras por segmento
         distances = []
         total_distance = 0
         all_points = []
@@ -602,6 +606,8 @@ class PerfilManager(QDockWidget, FORM_CLASS):
     def plot_profiles(self):
         """Plota todos os perfis no gráfico."""
         self.plot_widget.clear()
+        self.indice_curvas = None
+        self.curvas_lod = []
 
         if not self.all_profiles:
             return
@@ -631,13 +637,16 @@ class PerfilManager(QDockWidget, FORM_CLASS):
                 pen = pg.mkPen(color='b', width=1.3)
 
             for segment in profiles:
-                distances = segment['distances']
-                values = segment['values']
-                # Coleta todos os valores de x e y
-                all_x_values.extend(distances)
-                all_y_values.extend(values)
-                # Plota o segmento
-                self.plot_widget.plot(distances, values, pen=pen, name=layer_name)
+                distances = np.asarray(segment['distances'], dtype=np.float64)
+                values = np.asarray(segment['values'], dtype=np.float64)
+                if not len(distances):
+                    continue
+                # Coleta os limites de x e y de cada segmento
+                all_x_values.extend((distances[0], distances[-1]))
+                all_y_values.extend((values.min(), values.max()))
+                # Plota o segmento (o item guarda a curva completa; a pirâmide alimenta o desenho)
+                plot_item = self.plot_widget.plot(distances, values, pen=pen, name=layer_name)
+                self.curvas_lod.append((plot_item, PiramideCurva(distances, values)))
 
         # Armazena os valores de x (distâncias) e y (valores) do primeiro segmento do primeiro perfil para interação
         first_profile = self.all_profiles[0]['profiles'][0] if self.all_profiles[0]['profiles'] else None
@@ -651,6 +660,9 @@ class PerfilManager(QDockWidget, FORM_CLASS):
         if not all_x_values or not all_y_values:
             return  # Não há dados para plotar
 
+        # Índice das curvas para a interação com o cursor (mouse_moved)
+        self.indice_curvas = IndiceCurvas(self.all_profiles)
+
         # Adiciona rótulos nos eixos
         self.plot_widget.setLabel('left', 'Elevação (m)')
         self.plot_widget.setLabel('bottom', 'Distância (m)')
@@ -664,6 +676,10 @@ class PerfilManager(QDockWidget, FORM_CLASS):
         self.plot_widget.setXRange(min(all_x_values), max(all_x_values), padding=0)
         self.plot_widget.setYRange(min(all_y_values), max(all_y_values), padding=0)
 
+        # Desenha cada curva no nível de detalhe adequado à faixa visível
+        self.connect_lod_signals()
+        self.update_lod_curves()
+
         # Ativa o antialiasing
         # self.plot_widget.getPlotItem().setMouseEnabled(True, True)
 
@@ -695,6 +711,30 @@ class PerfilManager(QDockWidget, FORM_CLASS):
 
         self.update_export_button_state() # Conecta update_export_button_state
 
+    def connect_lod_signals(self):
+        """Conecta as mudanças de zoom e de tamanho do gráfico à atualização do nível de detalhe (uma vez por ViewBox)."""
+        view_box = self.plot_widget.getViewBox()
+        if self.view_box_lod is view_box:
+            return
+        view_box.sigXRangeChanged.connect(self.update_lod_curves)
+        view_box.sigResized.connect(self.update_lod_curves)
+        self.view_box_lod = view_box
+
+    def update_lod_curves(self, *args):
+        """
+        Redesenha as curvas com decimação mínimo/máximo dependente da vista, como o setDownsampling(auto=True,
+        mode='peak') com setClipToView do pyqtgraph, mas lendo níveis já prontos da pirâmide de cada curva.
+        Os dados completos continuam no PlotDataItem (usados nas exportações); ao aproximar, o detalhe volta.
+        """
+        if not self.curvas_lod or not self.plot_widget:
+            return
+        view_box = self.plot_widget.getViewBox()
+        (x_inicio, x_fim), _ = view_box.viewRange()
+        largura_pixels = int(view_box.width())
+        for plot_item, piramide in self.curvas_lod:
+            x, y = piramide.dados_visiveis(x_inicio, x_fim, largura_pixels)
+            plot_item.curve.setData(x, y)
+
     def get_list_item_by_layer_name(self, layer_name):
         """Retorna o QListWidgetItem correspondente ao nome da camada."""
         for index in range(self.listWidgetRaster.count()):
@@ -738,10 +778,9 @@ class PerfilManager(QDockWidget, FORM_CLASS):
             iface.messageBar().pushMessage("Aviso", "Desenhe ou selecione uma linha para gerar o perfil.", level=Qgis.Info)
             return
 
-        # Processa o perfil em uma thread
-        self.thread = ProfileExtractionThread(self, line_points, self.selected_raster_layers)
-        self.thread.profile_ready.connect(self.on_profile_ready)
-        self.thread.start()
+        # Processa o perfil em uma tarefa em segundo plano
+        self.line_points = line_points
+        self.start_profile_extraction()
 
     def on_profile_ready(self, all_profiles):
         """Callback chamado quando o perfil está pronto."""
@@ -859,70 +898,6 @@ class PerfilManager(QDockWidget, FORM_CLASS):
         interpolated_points.append(points[-1])  # Adiciona o último ponto
         return interpolated_points
 
-    def extract_profiles_from_rasters(self, raster_layers):
-        """Extrai os perfis das camadas raster selecionadas."""
-        # Verifica se self.line_points e self.line_distances estão disponíveis
-        if not hasattr(self, 'line_points') or not hasattr(self, 'line_distances'):
-            iface.messageBar().pushMessage("Erro", "Nenhuma linha disponível para extrair o perfil.", level=Qgis.Warning)
-            return []
-
-        # Utiliza os pontos interpolados existentes
-        line_points = self.line_points
-        distances = self.line_distances
-
-        all_profiles = []
-        for layer in raster_layers:
-            profiles = []  # Lista para armazenar segmentos contínuos
-            current_distances = []
-            current_values = []
-
-            # Verifica se a camada está em coordenadas geográficas e realiza a transformação se necessário
-            raster_crs = layer.crs()
-            map_crs = iface.mapCanvas().mapSettings().destinationCrs()
-            if raster_crs != map_crs:
-                transform = QgsCoordinateTransform(map_crs, raster_crs, QgsProject.instance())
-                transformed_points = [transform.transform(point) for point in line_points]
-            else:
-                transformed_points = line_points
-
-            for i, point in enumerate(transformed_points):
-                ident = layer.dataProvider().identify(point, QgsRaster.IdentifyFormatValue)
-                if ident.isValid():
-                    results = ident.results()
-                    value = list(results.values())[0]
-                    if value is not None and not np.isnan(value):
-                        current_distances.append(distances[i])
-                        current_values.append(value)
-                    else:
-                        if current_distances and current_values:
-                            profiles.append({
-                                'distances': current_distances,
-                                'values': current_values
-                            })
-                            current_distances = []
-                            current_values = []
-                else:
-                    if current_distances and current_values:
-                        profiles.append({
-                            'distances': current_distances,
-                            'values': current_values
-                        })
-                        current_distances = []
-                        current_values = []
-
-            if current_distances and current_values:
-                profiles.append({
-                    'distances': current_distances,
-                    'values': current_values
-                })
-
-            all_profiles.append({
-                'layer': layer,
-                'profiles': profiles
-            })
-
-        return all_profiles
-
     def update_checkboxes_state(self):
         """Atualiza o estado dos checkboxes com base nas condições."""
         # Verifica se o sistema de coordenadas do projeto é geográfico
@@ -959,21 +934,8 @@ class PerfilManager(QDockWidget, FORM_CLASS):
             self.remove_map_marker()
             return
 
-        # Verifica se a distância está dentro do intervalo permitido
-        if distance < self.line_distances[0] or distance > self.line_distances[-1]:
-            self.remove_map_marker()
-            return
-
-        # Encontra os índices dos pontos entre os quais a distância atual se encontra
-        point = None
-        for i in range(len(self.line_distances) - 1):
-            if self.line_distances[i] <= distance <= self.line_distances[i + 1]:
-                # Interpola entre os pontos line_points[i] e line_points[i + 1]
-                ratio = (distance - self.line_distances[i]) / (self.line_distances[i + 1] - self.line_distances[i])
-                x = self.line_points[i].x() + ratio * (self.line_points[i + 1].x() - self.line_points[i].x())
-                y = self.line_points[i].y() + ratio * (self.line_points[i + 1].y() - self.line_points[i].y())
-                point = QgsPointXY(x, y)
-                break
+        # Localiza o ponto pelo índice da linha (busca binária nas distâncias acumuladas)
+        point = self.get_point_at_distance(distance)
 
         if not point:
             self.remove_map_marker()
@@ -1015,7 +977,7 @@ class PerfilManager(QDockWidget, FORM_CLASS):
 
     def mouse_moved(self, evt):
         """Evento chamado quando o mouse é movido sobre o gráfico."""
-        if not self.all_profiles or not self.current_x_values:
+        if not self.all_profiles or not len(self.current_x_values) or self.indice_curvas is None:
             return
 
         pos = evt[0]  # Obter a posição do mouse do evento
@@ -1024,26 +986,11 @@ class PerfilManager(QDockWidget, FORM_CLASS):
             x = mousePoint.x()
             y = mousePoint.y()
 
-            # Verificar se x está dentro do intervalo de todos os x_values
-            all_x_values = [x for profile_data in self.all_profiles for segment in profile_data['profiles'] for x in segment['distances']]
-            if min(all_x_values) <= x <= max(all_x_values):
-                # Encontrar o perfil mais próximo do cursor em y
-                min_diff = float('inf')
-                closest_y_interp = None
-                closest_profile_data = None
-
-                # Percorrer todos os perfis e segmentos para encontrar o valor de y mais próximo
-                for profile_data in self.all_profiles:
-                    for segment in profile_data['profiles']:
-                        distances = segment['distances']
-                        values = segment['values']
-                        if distances[0] <= x <= distances[-1]:
-                            y_interp = np.interp(x, distances, values)
-                            diff = abs(y - y_interp)
-                            if diff < min_diff:
-                                min_diff = diff
-                                closest_y_interp = y_interp
-                                closest_profile_data = profile_data  # Armazena o perfil correspondente
+            # Verificar se x está dentro do intervalo de todas as curvas
+            if self.indice_curvas.contem(x):
+                # Encontrar o perfil mais próximo do cursor em y (uma busca binária por trecho)
+                closest_y_interp, indice_perfil = self.indice_curvas.valor_mais_proximo(x, y)
+                closest_profile_data = self.all_profiles[indice_perfil] if indice_perfil is not None else None
 
                 if closest_y_interp is not None:
                     # Atualizar as linhas de referência
@@ -1227,10 +1174,48 @@ class PerfilManager(QDockWidget, FORM_CLASS):
             iface.messageBar().pushMessage("Aviso", "Desenhe ou selecione uma linha para gerar o perfil.", level=Qgis.Info)
             return
 
-        # Processa o perfil em uma thread
-        self.thread = ProfileExtractionThread(self, self.selected_raster_layers)
-        self.thread.profile_ready.connect(self.on_profile_ready)
-        self.thread.start()
+        # Cancela a extração anterior, se ainda estiver em andamento
+        self.cancel_profile_extraction()
+
+        if not self.line_distances or len(self.line_distances) != len(self.line_points):
+            self.line_distances = self.calculate_cumulative_distances(self.line_points)
+
+        # Processa o perfil em uma tarefa do QGIS (leitura só dos blocos ao longo da linha)
+        map_crs = iface.mapCanvas().mapSettings().destinationCrs()
+        tarefa = TarefaPerfis(self.selected_raster_layers, self.line_points, self.line_distances, map_crs)
+        tarefa.perfis_prontos.connect(self.on_perfis_extraidos)
+        tarefa.taskCompleted.connect(lambda: self.on_tarefa_perfis_encerrada(tarefa))
+        tarefa.taskTerminated.connect(lambda: self.on_tarefa_perfis_encerrada(tarefa))
+        self.tarefa_perfis = tarefa
+        QgsApplication.taskManager().addTask(tarefa)
+
+    def cancel_profile_extraction(self):
+        """Cancela a tarefa de extração de perfis em andamento, se houver."""
+        if self.tarefa_perfis is not None:
+            try:
+                self.tarefa_perfis.perfis_prontos.disconnect(self.on_perfis_extraidos)
+                self.tarefa_perfis.cancel()
+            except (RuntimeError, TypeError):
+                pass  # A tarefa já foi encerrada e removida pelo gerenciador
+            self.tarefa_perfis = None
+
+    def on_tarefa_perfis_encerrada(self, tarefa):
+        """Esquece a referência da tarefa quando ela termina ou é cancelada."""
+        if self.tarefa_perfis is tarefa:
+            self.tarefa_perfis = None
+
+    def on_perfis_extraidos(self, distancias, resultados):
+        """Recebe os arrays da TarefaPerfis e monta os perfis (trechos contínuos) de cada camada."""
+        all_profiles = []
+        for layer_id, valores in resultados:
+            layer = QgsProject.instance().mapLayer(layer_id)
+            if layer is None:
+                continue  # Camada removida durante a extração
+            all_profiles.append({
+                'layer': layer,
+                'profiles': trechos_validos(distancias, valores)
+            })
+        self.on_profile_ready(all_profiles)
 
     def on_raster_layer_selected(self, item):
         """Callback quando um item do listWidgetRaster é alterado."""
@@ -1245,8 +1230,25 @@ class PerfilManager(QDockWidget, FORM_CLASS):
                 if layer in self.selected_raster_layers:
                     self.selected_raster_layers.remove(layer)
 
-        # Inicia a extração do perfil
-        self.start_profile_extraction()
+        # Reamostra a linha desenhada: o passo pelo pixel muda com os rasters selecionados
+        if self.selected_raster_layers and self.line_vertices:
+            self.extract_profile(self.line_vertices)
+        else:
+            self.start_profile_extraction()
+
+    def on_amostragem_alterada(self, *args):
+        """Atualiza a amostragem da linha com os controles do painel e reamostra a linha desenhada."""
+        self.modo_amostragem = 'pixel' if self.comboBoxAmostragem.currentIndex() == 0 else 'fixo'
+        # 0 no spinBoxMaxAmostras significa sem limite de amostras
+        self.max_amostras_perfil = self.spinBoxMaxAmostras.value() or None
+        self.refinar_curvatura = self.checkBoxRefinar.isChecked()
+
+        # O limite e o refino só valem para a amostragem pelo pixel
+        self.spinBoxMaxAmostras.setEnabled(self.modo_amostragem == 'pixel')
+        self.checkBoxRefinar.setEnabled(self.modo_amostragem == 'pixel')
+
+        if self.selected_raster_layers and self.line_vertices:
+            self.extract_profile(self.line_vertices)
 
     def calculate_cumulative_distances(self, points):
         """
@@ -1272,49 +1274,29 @@ class PerfilManager(QDockWidget, FORM_CLASS):
         if not self.line_points or not self.line_distances:
             return None
 
-        if distance < self.line_distances[0] or distance > self.line_distances[-1]:
-            return None
+        # Índice criado em extract_profile; refeito aqui se a linha foi trocada por outro caminho
+        if self.indice_linha is None or len(self.indice_linha) != len(self.line_points):
+            self.indice_linha = IndiceLinha(self.line_points, self.line_distances)
 
-        for i in range(len(self.line_distances) - 1):
-            d0 = self.line_distances[i]
-            d1 = self.line_distances[i + 1]
-            if d0 <= distance <= d1:
-                # Evita divisão por zero
-                if d1 - d0 == 0:
-                    ratio = 0
-                else:
-                    ratio = (distance - d0) / (d1 - d0)
-                x = self.line_points[i].x() + ratio * (self.line_points[i + 1].x() - self.line_points[i].x())
-                y = self.line_points[i].y() + ratio * (self.line_points[i + 1].y() - self.line_points[i].y())
-                return QgsPointXY(x, y)
-        # Se a distância for exatamente a última, retorna o último ponto
-        if np.isclose(distance, self.line_distances[-1]):
-            return self.line_points[-1]
-        return None
+        ponto = self.indice_linha.ponto_na_distancia(distance)
+        if ponto is None:
+            # Se a distância for exatamente a última (a menos de arredondamento), retorna o último ponto
+            if np.isclose(distance, self.line_distances[-1]):
+                return self.line_points[-1]
+            return None
+        return QgsPointXY(*ponto)
 
     def get_z_values_at_point(self, point):
         """Retorna um dicionário de valores Z das camadas raster selecionadas no ponto dado."""
         z_values = {}
+        map_crs = iface.mapCanvas().mapSettings().destinationCrs()
         for layer in self.selected_raster_layers:
-            # Transforma o ponto para o CRS da camada raster, se necessário
-            raster_crs = layer.crs()
-            map_crs = iface.mapCanvas().mapSettings().destinationCrs()
-            if raster_crs != map_crs:
-                transform = QgsCoordinateTransform(map_crs, raster_crs, QgsProject.instance())
-                point_in_raster_crs = transform.transform(point)
-            else:
-                point_in_raster_crs = point
+            # Transforma o ponto para o CRS da camada raster (transformação reaproveitada do cache)
+            xs, ys = transformar_coordenadas([point.x()], [point.y()], map_crs, layer.crs())
 
-            ident = layer.dataProvider().identify(point_in_raster_crs, QgsRaster.IdentifyFormatValue)
-            if ident.isValid():
-                results = ident.results()
-                value = list(results.values())[0]
-                if value is not None and not np.isnan(value):
-                    z_values[layer.name()] = value
-                else:
-                    z_values[layer.name()] = float('nan')
-            else:
-                z_values[layer.name()] = float('nan')
+            # Amostra pelo serviço compartilhado (NaN quando não há valor)
+            valor = obter_amostrador().amostrar(layer, xs, ys, metodo='nearest')[0]
+            z_values[layer.name()] = float(valor)
         return z_values
 
     def on_profile_ready(self, all_profiles):
@@ -1447,16 +1429,20 @@ class PerfilManager(QDockWidget, FORM_CLASS):
         # Agora podemos chamar np.arange sem risco
         distances_to_sample = list(np.arange(0, total_distance, spacing)) + [total_distance]
 
-        table_data = []
-        self.graph_line_points = []  # Adicione esta linha para armazenar os pontos
-        for distance in distances_to_sample:
-            point = self.get_point_at_distance(distance)
-            if point:
-                x, y = point.x(), point.y()
-                z_values = self.get_z_values_at_point(point)
-                z_value = z_values.get(selected_layer_name, float('nan'))
-                table_data.append((distance, x, y, z_value))
-                self.graph_line_points.append(point)  # Armazena o ponto correspondente
+        # Localiza todos os pontos de uma vez e amostra só a camada da tabela, com uma transformação em lote
+        if self.indice_linha is None or len(self.indice_linha) != len(self.line_points):
+            self.indice_linha = IndiceLinha(self.line_points, self.line_distances)
+        distances_to_sample = np.asarray(distances_to_sample, dtype=np.float64)
+        xs, ys = self.indice_linha.pontos_nas_distancias(np.minimum(distances_to_sample, self.indice_linha.comprimento))
+        validos = ~np.isnan(xs)
+        distances_to_sample, xs, ys = distances_to_sample[validos], xs[validos], ys[validos]
+
+        map_crs = iface.mapCanvas().mapSettings().destinationCrs()
+        xs_raster, ys_raster = transformar_coordenadas(xs, ys, map_crs, selected_layer.crs())
+        z_values = obter_amostrador().amostrar(selected_layer, xs_raster, ys_raster, metodo='nearest')
+
+        table_data = list(zip(distances_to_sample.tolist(), xs.tolist(), ys.tolist(), z_values.tolist()))
+        self.graph_line_points = [QgsPointXY(x, y) for x, y in zip(xs.tolist(), ys.tolist())]  # Pontos correspondentes
 
         self.populate_table(table_data)
 
@@ -2900,18 +2886,56 @@ class PerfilManager(QDockWidget, FORM_CLASS):
                 except ValueError:
                     continue
 
-class ProfileExtractionThread(QThread):
-    profile_ready = pyqtSignal(list)  # Sinal para enviar o resultado do perfil
+class TarefaPerfis(QgsTask):
+    """
+    Tarefa em segundo plano que extrai os perfis das camadas raster ao longo da linha.
 
-    def __init__(self, parent, raster_layers):
-        super().__init__()
-        self.parent = parent
-        self.raster_layers = raster_layers
+    Os provedores são clonados e as transformações obtidas na thread principal; a tarefa só lê os blocos
+    de cada raster tocados pelas amostras e devolve arrays numpy pelo sinal perfis_prontos.
+    """
+    perfis_prontos = pyqtSignal(object, object)  # Distâncias e lista de (id da camada, valores)
+
+    def __init__(self, raster_layers, line_points, distances, map_crs):
+        super(TarefaPerfis, self).__init__("Extração de perfis", QgsTask.CanCancel)
+        self.distancias = np.asarray(distances, dtype=np.float64)
+        self.xs = np.array([point.x() for point in line_points], dtype=np.float64)
+        self.ys = np.array([point.y() for point in line_points], dtype=np.float64)
+        self.erro = None
+        self.resultados = []
+
+        self.fontes = []  # (id da camada, clone do provedor, transformação mapa -> raster ou None)
+        for layer in raster_layers:
+            # A transformação é obtida aqui, na thread principal, e usada pela tarefa sem nova consulta ao cache
+            self.fontes.append((layer.id(), layer.dataProvider().clone(), obter_transformacao(map_crs, layer.crs())))
 
     def run(self):
-        # Processa o perfil em background usando os pontos interpolados
-        all_profiles = self.parent.extract_profiles_from_rasters(self.raster_layers)
-        self.profile_ready.emit(all_profiles)
+        """Amostra cada raster (uma fração igual do progresso por camada)."""
+        try:
+            total = max(len(self.fontes), 1)
+            for indice, (layer_id, provider, transformacao) in enumerate(self.fontes):
+                if self.isCanceled():
+                    return False
+
+                xs, ys = aplicar_transformacao(self.xs, self.ys, transformacao)
+
+                valores = amostrar_corredor(
+                    provider, xs, ys,
+                    progresso=lambda lidos, blocos, indice=indice: self.setProgress(100 * (indice + lidos / blocos) / total),
+                    cancelado=self.isCanceled)
+                if valores is None:
+                    return False
+                self.resultados.append((layer_id, valores))
+            return True
+        except Exception as e:
+            self.erro = str(e)
+            return False
+
+    def finished(self, result):
+        """Na thread principal: entrega os perfis ou registra o erro."""
+        if result and not self.isCanceled():
+            self.perfis_prontos.emit(self.distancias, self.resultados)
+        elif self.erro:
+            QgsMessageLog.logMessage(f"Falha na extração dos perfis: {self.erro}", 'GRÁFICO', level=Qgis.Critical)
 
 class SelectLineTool(QgsMapToolIdentifyFeature):
     def __init__(self, canvas, parent):
@@ -2949,9 +2973,6 @@ class SelectLineTool(QgsMapToolIdentifyFeature):
 
                     # Desenha a linha selecionada no mapa
                     self.parent.draw_rubber_band(line_points, color=Qt.magenta)  # Sempre magenta
-
-                    # Inicia a extração do perfil
-                    self.parent.start_profile_extraction()
                 else:
                     iface.messageBar().pushMessage("Erro", "A feição selecionada não é uma linha.", level=Qgis.Warning)
             else:
@@ -3034,8 +3055,7 @@ class LineTool(QgsMapToolEmitPoint):
         elif event.button() == Qt.RightButton and self.is_drawing:
             # Conclui o desenho ao clicar com o botão direito
             self.is_drawing = False
-            self.parent.extract_profile(self.points)  # Extrai o perfil
-            self.parent.log_xyz_every_100m()  # Registra os pontos a cada 100 metros
+            self.parent.extract_profile(self.points)  # Extrai o perfil (a tabela é preenchida ao final da tarefa)
 
     def on_profile_ready(self, all_profiles):
         """Callback chamado quando o perfil está pronto."""
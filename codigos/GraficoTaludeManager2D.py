@@ -15,6 +15,8 @@ import time
 import math
 import os
 
+from .amostragem_raster import obter_amostrador
+
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'GraficoPyQtGraphTalude.ui'))
 
@@ -1462,15 +1464,9 @@ class GraficoManager(QDialog, FORM_CLASS):
 
     def sample_raster_value(self, point, raster_layer):
         """Amostra o valor Z do raster baseado nas coordenadas do ponto."""
-        identify_result = raster_layer.dataProvider().identify(QgsPointXY(point.x(), point.y()), QgsRaster.IdentifyFormatValue)
-        
-        if identify_result.isValid():
-            results = identify_result.results()
-            if results:
-                band_key = list(results.keys())[0]
-                z_value = results.get(band_key)  # Use get para evitar KeyError
-                if z_value is not None:  # Verifica se o valor é válido
-                    return round(float(z_value), 3)
+        z_value = obter_amostrador().amostrar_ponto(raster_layer, point.x(), point.y())
+        if z_value is not None:  # Verifica se o valor é válido
+            return round(z_value, 3)
         return None  # Retorna None se não houver valor válido
 
     def iniciar_progress_bar(self, total_steps):
@@ -1676,9 +1672,13 @@ class GraficoManager(QDialog, FORM_CLASS):
         support_layer.startEditing()
         z_value_previous = None
 
-        for feature in support_layer.getFeatures():
-            point = feature.geometry().asPoint()
-            z_value = self.sample_raster_value(point, raster_layer)
+        # Amostra todos os pontos de apoio de uma só vez
+        support_features = list(support_layer.getFeatures())
+        support_points = [feature.geometry().asPoint() for feature in support_features]
+        z_values = obter_amostrador().amostrar(raster_layer, [p.x() for p in support_points], [p.y() for p in support_points], metodo='nearest')
+
+        for feature, z_sample in zip(support_features, z_values):
+            z_value = None if np.isnan(z_sample) else round(float(z_sample), 3)
             if z_value is None and z_value_previous is not None:
                 z_value = z_value_previous
             if z_value is not None:
@@ -1907,7 +1907,7 @@ class UiManager:
         - Recupera a camada selecionada e verifica sua existência no projeto QGIS.
         - Inicializa um diálogo com opções detalhadas de exportação para KML, incluindo seleção de campos, configurações de visualização 3D, e outros.
         - Se o diálogo for aceito pelo usuário, inicia o processo de exportação, incluindo a escolha do local para salvar o arquivo.
-        - Cria um documento KML em memória com as configurações definidas, escreve no local especificado e aplica modificações adicionais se necessário.
+        - Escreve o documento KML no local especificado, feição por feição, com as configurações definidas.
         - Calcula e exibe o tempo decorrido para a operação de exportação, informando o usuário sobre a conclusão bem-sucedida.
 
         Atribuição no código:
@@ -1945,15 +1945,8 @@ class UiManager:
                 self.mostrar_mensagem("Exportação cancelada.", "Info") # Cancela a exportação se o usuário não escolher um local para salvar
                 return
 
-            # Cria o KML em memória com as opções definidas
-            kml_element = self.criar_kml_em_memoria(layer, campo_rotulo, espessura_linha, altitude, url_imagem, url_imagem_2, incluir_tabela, use_3d, num_repeticoes)
-
-            # Escreve o KML no arquivo
-            tree = ET.ElementTree(kml_element)
-            tree.write(caminho_arquivos, xml_declaration=True, encoding='utf-8', method="xml")
-
-            # Modificar KML para tessellation (se necessário)
-            self.modificar_kml_para_tessellation(caminho_arquivos)
+            # Escreve o KML no arquivo, feição por feição, com as opções definidas
+            self.escrever_kml_em_fluxo(layer, caminho_arquivos, campo_rotulo, espessura_linha, altitude, url_imagem, url_imagem_2, incluir_tabela, use_3d, num_repeticoes)
 
             elapsed_time = time.time() - start_time  # Calcula o tempo decorrido
             # self.mostrar_mensagem(f"Arquivo KML salvo com sucesso. Tempo de execução: {elapsed_time:.2f} segundos.", "Sucesso")
@@ -2020,8 +2013,8 @@ class UiManager:
                 value = ET.SubElement(data, 'value')
                 value.text = str(feature[field.name()])
 
-            # Inserindo visibilidade do rótulo
-            label_visibility = ET.SubElement(line_style, '{http://www.google.com/kml/ext/2.2}labelVisibility')
+            # Inserindo visibilidade do rótulo (prefixo 'gx' declarado no elemento kml por escrever_kml_em_fluxo)
+            label_visibility = ET.SubElement(line_style, 'gx:labelVisibility')
             label_visibility.text = '1'
 
             # Início da construção da tabela de atributos
@@ -2117,12 +2110,13 @@ class UiManager:
         # Junta todas as coordenadas em uma string e a define como texto do elemento de coordenadas
         coordinates.text = ' '.join(coords) 
 
-    def criar_kml_em_memoria(self, layer, campo_rotulo, espessura_linha, altitude, url_imagem, url_imagem_2, incluir_tabela, use_3d, num_repeticoes):
+    def escrever_kml_em_fluxo(self, layer, caminho_kml, campo_rotulo, espessura_linha, altitude, url_imagem, url_imagem_2, incluir_tabela, use_3d, num_repeticoes):
         """
-        Cria uma representação KML em memória de uma camada do QGIS, incluindo opções para visualização 3D, repetição de elementos, tabelas de atributos e a possibilidade de adicionar uma imagem como ScreenOverlay.
+        Escreve o KML de uma camada de linhas diretamente no arquivo, em uma única passagem pelas feições, sem manter a árvore XML inteira em memória.
 
         Parâmetros:
         - layer (QgsVectorLayer): A camada de onde os dados serão extraídos.
+        - caminho_kml (str): O caminho do arquivo KML que será gravado.
         - campo_rotulo (str): O campo utilizado para o rótulo dos placemarks.
         - espessura_linha (float): A espessura das linhas no KML.
         - altitude (int): A altitude base para os placemarks.
@@ -2133,81 +2127,63 @@ class UiManager:
         - num_repeticoes (int): Número de vezes que cada placemark será repetido com incremento de altitude.
 
         Funcionalidades:
-        - Cria o elemento KML e um subelemento Documento.
-        - Utiliza um índice espacial para otimizar a criação de placemarks.
-        - Para cada feição na camada, um placemark é criado com opções de visualização configuráveis.
-        - Utiliza uma barra de progresso para indicar o progresso da criação do KML.
-        - Adiciona um ScreenOverlay ao KML se uma segunda URL de imagem for fornecida e a imagem for processada corretamente.
-        - Caso a imagem do ScreenOverlay não possa ser processada, o KML é gerado normalmente sem o ScreenOverlay.
-        - Retorna o elemento KML criado para uso posterior, como salvar em um arquivo ou enviar por rede.
-
-        Atribuição no código:
-        Facilita a exportação de dados geográficos complexos para o formato KML, amplamente utilizado em aplicações como Google Earth. Esta função é essencial para projetos que requerem visualização avançada de dados geoespaciais e oferece uma maneira de personalizar intensamente a apresentação desses dados.
-        Além disso, a função é robusta o suficiente para lidar com falhas no processamento de imagens, garantindo que a exportação do KML continue sem interrupções, mesmo que um ScreenOverlay não possa ser adicionado.
+        - Escreve o cabeçalho do KML e abre o elemento Document no arquivo.
+        - Calcula uma única vez a cor da linha e a transformação de coordenadas para WGS84.
+        - Para cada feição, monta os placemarks em um elemento temporário, grava-os no arquivo e os descarta em seguida.
+        - A tesselação é aplicada já na criação de cada LineString, dispensando a reescrita posterior do arquivo.
+        - Adiciona um ScreenOverlay ao final do documento se uma segunda URL de imagem for fornecida e a imagem for processada corretamente.
+        - Utiliza uma barra de progresso para indicar o andamento da gravação.
         """
         progressBar, messageBar = self.iniciar_progress_bar(layer)  # Inicia a barra de progresso
 
-        # Cria o elemento raiz do KML e um subelemento Documento
-        kml = ET.Element('kml', xmlns="http://www.opengis.net/kml/2.2")
-        document = ET.SubElement(kml, 'Document')
-
-        # Criar um índice espacial para a camada
-        index = QgsSpatialIndex()
-        for feat in layer.getFeatures():
-            index.insertFeature(feat)
+        # Cor da linha (AABBGGRR) e transformação para WGS84 calculadas uma única vez
+        cor_linha_kml = self.cor_rgb_para_kml(self.obter_cor_linha(layer))
+        transformar = layer.crs().authid() != 'EPSG:4326'
+        transform = QgsCoordinateTransform(layer.crs(), QgsCoordinateReferenceSystem(4326), QgsProject.instance()) if transformar else None
+
+        with open(caminho_kml, 'w', encoding='utf-8') as arquivo:
+            arquivo.write("<?xml version='1.0' encoding='utf-8'?>\n")
+            # O prefixo 'gx' (visibilidade dos rótulos) é declarado aqui, sem alterar a tabela global de prefixos do ElementTree
+            arquivo.write('<kml xmlns="http://www.opengis.net/kml/2.2" xmlns:gx="http://www.google.com/kml/ext/2.2"><Document>')
+
+            # Cria e grava os placemarks de cada feição, um de cada vez
+            for count, feature in enumerate(layer.getFeatures()):
+                trecho = ET.Element('Document')  # Elemento temporário que recebe os placemarks da feição
+                self.criar_placemark_kml(trecho, feature, campo_rotulo, cor_linha_kml, espessura_linha, altitude, transformar, transform, url_imagem, url_imagem_2, incluir_tabela, use_3d, num_repeticoes)
+                for placemark in trecho:
+                    arquivo.write(ET.tostring(placemark, encoding='unicode'))
+                progressBar.setValue(count + 1)  # Atualiza a barra de progresso
+
+            # Adiciona ScreenOverlay apenas se url_imagem_2 for fornecida e não for vazia
+            if url_imagem_2:
+                # Redimensiona a imagem obtida a partir do URL
+                imagem_redimensionada, nova_largura, nova_altura = self.redimensionar_imagem_proporcional_url(url_imagem_2, 300, 150)
 
-        # Cria placemarks para cada recurso na camada
-        total_features = layer.featureCount()
-        for count, feature in enumerate(layer.getFeatures()):
-            self.criar_placemark_kml(document, feature, campo_rotulo, self.cor_rgb_para_kml(self.obter_cor_linha(layer)), espessura_linha, altitude, layer.crs().authid() != 'EPSG:4326', None if layer.crs().authid() == 'EPSG:4326' else QgsCoordinateTransform(layer.crs(), QgsCoordinateReferenceSystem(4326), QgsProject.instance()), url_imagem, url_imagem_2, incluir_tabela, use_3d, num_repeticoes)
-            progressBar.setValue(count + 1)  # Atualiza a barra de progresso
-
-        # Obtém e converte a cor da linha da camada para o formato KML
-        cor_linha = self.obter_cor_linha(layer)
-        # Converte a cor da linha para o formato de cor KML (AABBGGRR)
-        cor_linha_kml = self.cor_rgb_para_kml(cor_linha)
-
-        # Prepara a transformação de coordenadas se a camada não estiver em EPSG:4326
-        if layer.crs().authid() != 'EPSG:4326':
-            crsDestino = QgsCoordinateReferenceSystem(4326)
-            transform = QgsCoordinateTransform(layer.crs(), crsDestino, QgsProject.instance())
-            transformar = True # Habilita a flag de transformação
-        else:
-            transformar = False # Desabilita a flag de transformação, não é necessária
-
-        # Cria placemarks para cada recurso na camada
-        for feature in layer.getFeatures():
-            self.criar_placemark_kml(document, feature, campo_rotulo, cor_linha_kml, espessura_linha, altitude, transformar, transform if transformar else None, url_imagem, url_imagem_2, incluir_tabela, use_3d, num_repeticoes)
-
-        # Adiciona ScreenOverlay apenas se url_imagem_2 for fornecida e não for vazia
-        if url_imagem_2:
-            # Redimensiona a imagem obtida a partir do URL
-            imagem_redimensionada, nova_largura, nova_altura = self.redimensionar_imagem_proporcional_url(url_imagem_2, 300, 150)
-
-            if imagem_redimensionada is not None:
-                # Adiciona o ScreenOverlay ao KML usando a imagem redimensionada
-                screen_overlay = ET.SubElement(document, 'ScreenOverlay') # Cria o elemento ScreenOverlay no documento KML
-                name = ET.SubElement(screen_overlay, 'name')  # Define o nome do ScreenOverlay
-                name.text = 'logo'
-
-                # Define o ícone do ScreenOverlay, utilizando a URL da imagem fornecida
-                icon = ET.SubElement(screen_overlay, 'Icon')
-                href = ET.SubElement(icon, 'href')
-                href.text = url_imagem_2
-
-                # Configura a posição e o tamanho do overlay na tela
-                overlay_xy = ET.SubElement(screen_overlay, 'overlayXY', x="1", y="1", xunits="fraction", yunits="fraction")
-                screen_xy = ET.SubElement(screen_overlay, 'screenXY', x=f"{nova_largura}", y=f"{nova_altura}", xunits="pixels", yunits="pixels")
-                rotation_xy = ET.SubElement(screen_overlay, 'rotationXY', x="0", y="0", xunits="fraction", yunits="fraction")
-                # Define o tamanho do ScreenOverlay
-                size = ET.SubElement(screen_overlay, 'size', x=f"{nova_largura}", y=f"{nova_altura}", xunits="pixels", yunits="pixels")
-
-        # Continua o processo normalmente, mesmo se o ScreenOverlay não foi adicionado
-        progressBar.setValue(total_features)  # Garante que a barra de progresso esteja completa no fim do processo
+                if imagem_redimensionada is not None:
+                    # Monta o ScreenOverlay usando a imagem redimensionada
+                    screen_overlay = ET.Element('ScreenOverlay')
+                    name = ET.SubElement(screen_overlay, 'name')  # Define o nome do ScreenOverlay
+                    name.text = 'logo'
+
+                    # Define o ícone do ScreenOverlay, utilizando a URL da imagem fornecida
+                    icon = ET.SubElement(screen_overlay, 'Icon')
+                    href = ET.SubElement(icon, 'href')
+                    href.text = url_imagem_2
+
+                    # Configura a posição e o tamanho do overlay na tela
+                    ET.SubElement(screen_overlay, 'overlayXY', x="1", y="1", xunits="fraction", yunits="fraction")
+                    ET.SubElement(screen_overlay, 'screenXY', x=f"{nova_largura}", y=f"{nova_altura}", xunits="pixels", yunits="pixels")
+                    ET.SubElement(screen_overlay, 'rotationXY', x="0", y="0", xunits="fraction", yunits="fraction")
+                    # Define o tamanho do ScreenOverlay
+                    ET.SubElement(screen_overlay, 'size', x=f"{nova_largura}", y=f"{nova_altura}", xunits="pixels", yunits="pixels")
+                    arquivo.write(ET.tostring(screen_overlay, encoding='unicode'))
+
+            # Continua o processo normalmente, mesmo se o ScreenOverlay não foi adicionado
+            arquivo.write('</Document></kml>\n')
+
+        progressBar.setValue(layer.featureCount())  # Garante que a barra de progresso esteja completa no fim do processo
         self.iface.messageBar().clearWidgets()  # Limpa a barra de mensagens
 
-        return kml
-
     def redimensionar_imagem_proporcional_url(self, url_imagem, largura_max, altura_max):
         """
         Baixa a imagem de um URL e redimensiona proporcionalmente para caber dentro de uma caixa de largura e altura máximas.
@@ -1,7 +1,7 @@
-from qgis.core import QgsProject, QgsMapLayer, QgsWkbTypes, Qgis, QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsLayerTreeLayer,  QgsGeometry, QgsLayerTree, QgsVectorLayer, QgsField, QgsPoint, QgsFeature, QgsMeshLayer, edit, QgsMeshRendererScalarSettings,  QgsProcessingException
+from qgis.core import QgsProject, QgsMapLayer, Qgis, QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsLayerTreeLayer, QgsLayerTree, QgsVectorLayer, QgsPointXY, QgsMeshLayer, QgsMeshRendererScalarSettings
 from PyQt5.QtWidgets import QTreeView, QStyledItemDelegate, QColorDialog, QMenu, QDialog, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QFileDialog, QComboBox, QFrame, QCheckBox, QProgressBar, QListWidget, QScrollBar, QStyle, QGraphicsDropShadowEffect, QDoubleSpinBox, QSpinBox, QRadioButton, QSlider, QGridLayout, QSpacerItem, QSizePolicy, QWidget
 from PyQt5.QtGui import QStandardItemModel, QStandardItem, QIcon, QPixmap, QPainter, QColor, QPen, QFont, QPalette
-from PyQt5.QtCore import Qt, QPoint, QRect, QEvent, QCoreApplication, QSettings, QItemSelectionModel, QSize, QVariant
+from PyQt5.QtCore import Qt, QPoint, QRect, QEvent, QCoreApplication, QSettings, QItemSelectionModel, QSize
 from pyqtgraph.opengl import GLViewWidget, GLLinePlotItem
 import xml.etree.ElementTree as ET
 import pyqtgraph.opengl as gl
@@ -9,12 +9,13 @@ from qgis.utils import iface
 from lxml import etree
 import pyqtgraph as pg
 import numpy as np
-import processing
 import simplekml
 import ezdxf
 import time
 import os
 
+from .malha_topologia import extrair_topologia_malha, escrever_stl_binario, calcular_normais
+
 class UiManagerM:
     """
     Gerencia a interface do usuário, interagindo com um QTreeView para listar e gerenciar camadas de malhas no QGIS.
@@ -696,7 +697,7 @@ class UiManagerM:
         Funções e Ações Desenvolvidas:
         - Verifica a seleção da camada no TreeView.
         - Obtém a camada selecionada do projeto QGIS.
-        - Converte a camada de malha para polígonos e pontos.
+        - Lê os vértices e as faces da malha diretamente do provedor.
         - Permite ao usuário escolher o local para salvar o arquivo.
         - Exporta a camada de malha para o formato especificado.
         - Exibe uma mensagem de sucesso ao final da exportação.
@@ -732,11 +733,11 @@ class UiManagerM:
             self.mostrar_mensagem("A camada selecionada não é uma malha", "Erro")
             return
 
-        # Converte a camada de malha para polígonos e extrai os valores de Z dos pontos
-        polygon_layer, point_z_values = self.convert_mesh_to_polygons_and_points(layer)
-        if not polygon_layer or not point_z_values:
-            # Exibe uma mensagem de erro se a conversão falhar
-            self.mostrar_mensagem("Falha na conversão da malha para polígonos e pontos", "Erro")
+        # Lê a topologia da malha (vértices e triângulos) diretamente do provedor
+        vertices, triangulos = extrair_topologia_malha(layer)
+        if not len(vertices) or not len(triangulos):
+            # Exibe uma mensagem de erro se a malha não tiver faces
+            self.mostrar_mensagem("Falha na leitura dos vértices e faces da malha", "Erro")
             return
 
         # Inicializa o caminho do arquivo de salvamento como None
@@ -746,19 +747,19 @@ class UiManagerM:
         if formato == "DXF":
             save_path = self.escolher_local_para_salvar(layer.name() + ".dxf", "DXF Files (*.dxf)")
             if save_path:
-                self.export_to_dxf(polygon_layer, point_z_values, save_path)
+                self.export_to_dxf(vertices, triangulos, save_path)
         elif formato == "DAE":
             save_path = self.escolher_local_para_salvar(layer.name() + ".dae", "DAE Files (*.dae)")
             if save_path:
-                self.export_to_dae(polygon_layer, point_z_values, save_path)
+                self.export_to_dae(vertices, triangulos, save_path)
         elif formato == "OBJ":
             save_path = self.escolher_local_para_salvar(layer.name() + ".obj", "OBJ Files (*.obj)")
             if save_path:
-                self.export_to_obj(polygon_layer, point_z_values, save_path)
+                self.export_to_obj(vertices, triangulos, save_path)
         elif formato == "STL":
             save_path = self.escolher_local_para_salvar(layer.name() + ".stl", "STL Files (*.stl)")
             if save_path:
-                self.export_to_stl(polygon_layer, point_z_values, save_path)
+                self.export_to_stl(vertices, triangulos, save_path, binario=self.dlg_exporta_malha.checkBox_stl_binario.isChecked())
 
         # Se o caminho de salvamento for definido, exibe uma mensagem de sucesso
         if save_path:
@@ -768,206 +769,36 @@ class UiManagerM:
                                   caminho_pasta=os.path.dirname(save_path), caminho_arquivo=save_path)
             self.dlg_exporta_malha.close()  # Fecha o diálogo após a exportação
 
-    def convert_mesh_to_polygons_and_points(self, mesh_layer):
-        """
-        Converte uma camada de malha para polígonos e extrai os pontos com coordenadas Z.
-
-        A função usa algoritmos de processamento nativos do QGIS para exportar faces da malha como polígonos e vértices da malha como pontos.
-        Em seguida, adiciona campos ID e Altitude às feições resultantes.
-
-        Funções e Ações Desenvolvidas:
-        - Exporta as faces da malha como polígonos.
-        - Adiciona um campo ID à camada de polígonos.
-        - Converte a camada de polígonos para MultiSurface (MultiPolygonZ).
-        - Exporta os vértices da malha como pontos.
-        - Adiciona campos ID e Altitude à camada de pontos.
-        - Cria um dicionário para mapear as coordenadas dos pontos às suas altitudes.
-
-        :param mesh_layer: Camada de malha a ser convertida (QgsMeshLayer).
-        :return: Uma tupla contendo a camada de polígonos MultiSurface (MultiPolygonZ) e um dicionário de valores de altitude dos pontos.
-        """
-        # Obter o CRS da camada de malha
-        crs = mesh_layer.crs()
-        
-        # Configurar parâmetros para o algoritmo de processamento de polígonos
-        params_polygons = {
-            'INPUT': mesh_layer,
-            'DATASET_GROUPS': [],  # Ajuste conforme necessário
-            'DATASET_TIME': {'type': 'static'},  # Configurar o tipo de tempo como estático
-            'CRS_OUTPUT': crs.toWkt(),  # Definir o CRS de saída como o mesmo da camada de malha
-            'VECTOR_OPTION': 0,  # 0 para Polygons
-            'OUTPUT': 'memory:Polygons from TIN Mesh'
-        }
-        
-        # Executar o algoritmo de processamento para polígonos
-        result_polygons = processing.run("native:exportmeshfaces", params_polygons)
-        
-        # Obter a camada de polígonos resultante
-        poly_layer = result_polygons['OUTPUT']
-        
-        # Adicionar campo ID à camada de polígonos
-        provider_poly = poly_layer.dataProvider()
-        provider_poly.addAttributes([QgsField("ID", QVariant.Int)])
-        poly_layer.updateFields()
-        
-        # Atribuir valores de ID para cada feição
-        with edit(poly_layer):
-            for i, feature in enumerate(poly_layer.getFeatures()):
-                feature.setAttribute("ID", i + 1)  # ID começa em 1
-                poly_layer.updateFeature(feature)
-        
-        # Converter a camada de polígonos para MultiSurface (MultiPolygonZ)
-        multi_poly_layer = self.convert_to_multisurface(poly_layer)
-        
-        # Configurar parâmetros para o algoritmo de processamento de pontos
-        params_points = {
-            'INPUT': mesh_layer,
-            'DATASET_GROUPS': [],  # Ajuste conforme necessário
-            'DATASET_TIME': {'type': 'static'},  # Configurar o tipo de tempo como estático
-            'CRS_OUTPUT': crs.toWkt(),  # Definir o CRS de saída como o mesmo da camada de malha
-            'VECTOR_OPTION': 1,  # 1 para pontos
-            'OUTPUT': 'memory:Mesh Vertices'
-        }
-        
-        # Executar o algoritmo de processamento para pontos
-        result_points = processing.run("native:exportmeshvertices", params_points)
-        
-        # Obter a camada de pontos resultante
-        point_layer = result_points['OUTPUT']
-        
-        # Adicionar campo ID e Altimetria à camada de pontos
-        provider_point = point_layer.dataProvider()
-        provider_point.addAttributes([QgsField("ID", QVariant.Int), QgsField("Altitude", QVariant.Double)])
-        point_layer.updateFields()
-        
-        # Atribuir valores de ID e Altimetria para cada feição
-        point_z_values = {}
-        with edit(point_layer):
-            for i, feature in enumerate(point_layer.getFeatures()):
-                geom = feature.geometry()
-                if QgsWkbTypes.hasZ(geom.wkbType()):  # Verificar se a geometria tem coordenada Z
-                    point = geom.constGet()  # Obter a geometria como QgsPoint
-                    feature.setAttribute("ID", i + 1)  # ID começa em 1
-                    feature.setAttribute("Altitude", point.z())  # Define a altimetria (z-coordinate)
-                    point_z_values[(point.x(), point.y())] = point.z() # Adicionar ao dicionário de valores de Z
-                    point_layer.updateFeature(feature) # Atualizar feição
-        # Retornar a camada de polígonos e o dicionário de valores de Z
-        return multi_poly_layer, point_z_values 
-
-    def convert_to_multisurface(self, poly_layer):
-        """
-        Converte uma camada de polígonos simples em uma camada de MultiSurface (MultiPolygonZ).
-
-        A função cria uma nova camada de memória que armazena polígonos como MultiPolygonZ, preservando os atributos e IDs das feições originais.
-
-        Funções e Ações Desenvolvidas:
-        - Cria uma nova camada de MultiSurface (MultiPolygonZ) com o mesmo CRS da camada de entrada.
-        - Adiciona um campo ID à nova camada.
-        - Converte cada feição da camada de polígonos simples para MultiPolygon e adiciona à nova camada.
-        
-        :param poly_layer: Camada de polígonos simples a ser convertida (QgsVectorLayer).
-        :return: A nova camada de MultiSurface (MultiPolygonZ) (QgsVectorLayer).
-        """
-        # Criar uma nova camada de MultiSurface (MultiPolygonZ)
-        multi_poly_layer = QgsVectorLayer(f"MultiPolygonZ?crs={poly_layer.crs().authid()}", "MultiSurface Polygons", "memory")
-        provider_multi_poly = multi_poly_layer.dataProvider()
-        
-        # Adicionar campo ID à nova camada
-        provider_multi_poly.addAttributes([QgsField("ID", QVariant.Int)])
-        multi_poly_layer.updateFields()
-        
-        # Converter cada feição para MultiPolygon e adicionar à nova camada
-        with edit(multi_poly_layer):
-            for feature in poly_layer.getFeatures():
-                geom = feature.geometry() # Obter a geometria da feição
-                if geom.isMultipart():
-                    multi_geom = geom # Se a geometria já for multipart, mantê-la como está
-                else:
-                    multi_geom = QgsGeometry.fromMultiPolygonXY([geom.asPolygon()])  # Converter para MultiPolygon
-                new_feature = QgsFeature()  # Criar uma nova feição
-                new_feature.setGeometry(multi_geom)  # Definir a geometria da nova feição
-                new_feature.setAttributes(feature.attributes())  # Copiar atributos da feição original
-                multi_poly_layer.addFeature(new_feature)  # Adicionar a nova feição à camada
-        
-        return multi_poly_layer  # Retornar a nova camada de MultiSurface (MultiPolygonZ)
-
-    def are_vertices_collinear(self, p1, p2, p3):
-        """
-        Verifica se três vértices são colineares.
-
-        A função calcula se os pontos p1, p2 e p3 estão alinhados na mesma linha reta. 
-        Isso é feito verificando a relação entre as coordenadas dos pontos. 
-        Se a relação se mantiver igual, os pontos são considerados colineares.
-
-        :param p1: Primeiro ponto (QgsPoint).
-        :param p2: Segundo ponto (QgsPoint).
-        :param p3: Terceiro ponto (QgsPoint).
-        :return: True se os pontos forem colineares, False caso contrário.
+    def export_to_dxf(self, vertices, triangulos, output_path):
         """
-        # Calcular a diferença das coordenadas X e Y dos pontos
-        # Verificar se a relação entre as diferenças é igual
-        return (p2.x() - p1.x()) * (p3.y() - p1.y()) == (p3.x() - p1.x()) * (p2.y() - p1.y())
-
-    def export_to_dxf(self, multi_poly_layer, point_z_values, output_path):
-        """
-        Exporta uma camada de MultiPolygonZ para um arquivo DXF, representando polígonos como 3DFACE.
+        Exporta a malha para um arquivo DXF, representando cada triângulo como 3DFACE.
 
         Funções e Ações Desenvolvidas:
         - Cria um novo documento DXF.
-        - Adiciona polígonos da camada MultiPolygonZ ao documento DXF como entidades 3DFACE.
-        - Atribui coordenadas Z a partir de um dicionário de valores de pontos.
-        - Garante que faces duplicadas não sejam adicionadas.
+        - Adiciona os triângulos da malha ao documento DXF como entidades 3DFACE.
         - Salva o documento DXF no caminho especificado.
         
-        :param multi_poly_layer: Camada de MultiPolygonZ a ser exportada (QgsVectorLayer).
-        :param point_z_values: Dicionário com coordenadas X, Y como chaves e coordenadas Z como valores.
+        :param vertices: Array (N, 3) com as coordenadas X, Y, Z dos vértices da malha.
+        :param triangulos: Array (M, 3) com os índices dos vértices de cada triângulo.
         :param output_path: Caminho onde o arquivo DXF será salvo.
         """
         # Criar um novo documento DXF
         doc = ezdxf.new(dxfversion='R2013')  # Versão do DXF
         msp = doc.modelspace()  # Espaço do modelo do DXF
 
-        # Conjunto para rastrear faces já vistas
-        faces_seen = set()
-
         # Inicializar a barra de progresso
-        total_faces = sum(len(ring) - 2 for feature in multi_poly_layer.getFeatures() 
-                          for geom in (feature.geometry().asMultiPolygon() if feature.geometry().isMultipart() else [feature.geometry().asPolygon()]) 
-                          for ring in geom)
-        progressBar, progressMessageBar = self.iniciar_progress_bar(total_faces)
-        step = 0
-
-        # Adicionar polígonos como 3DFACE
-        for feature in multi_poly_layer.getFeatures():
-            geom = feature.geometry()  # Obter a geometria da feição
-            if geom.isMultipart():
-                polygons = geom.asMultiPolygon()  # Obter multipolígonos se multipart
-            else:
-                polygons = [geom.asPolygon()]  # Caso contrário, obter como polígono
-            
-            for polygon in polygons:
-                for ring in polygon:
-                    for i in range(1, len(ring) - 1):
-                        p1 = ring[0]  # Primeiro ponto do anel
-                        p2 = ring[i]  # Ponto atual do anel
-                        p3 = ring[i + 1]  # Próximo ponto do anel
-                        if not self.are_vertices_collinear(p1, p2, p3):  # Verificar se os vértices não são colineares
-                            face = frozenset([(p1.x(), p1.y()), (p2.x(), p2.y()), (p3.x(), p3.y())])  # Criar um conjunto imutável para a face
-                            if face not in faces_seen:  # Verificar se a face já não foi adicionada
-                                faces_seen.add(face)  # Adicionar a face ao conjunto
-                                # Atribuir Z a partir do dicionário de valores de pontos
-                                p1_z = point_z_values.get((p1.x(), p1.y()), 0)  # Obter Z de p1
-                                p2_z = point_z_values.get((p2.x(), p2.y()), 0)  # Obter Z de p2
-                                p3_z = point_z_values.get((p3.x(), p3.y()), 0)  # Obter Z de p3
-                                # Adicionar 3DFACE ao espaço do modelo
-                                msp.add_3dface([(p1.x(), p1.y(), p1_z), 
-                                                (p2.x(), p2.y(), p2_z), 
-                                                (p3.x(), p3.y(), p3_z), 
-                                                (p3.x(), p3.y(), p3_z)])  # Adicionar o quarto ponto como p3 para 3DFACE
-
-                                # Atualizar a barra de progresso
-                                step += 1
-                                progressBar.setValue(step)
+        progressBar, progressMessageBar = self.iniciar_progress_bar(len(triangulos))
+
+        # Coordenadas dos três vértices de cada triângulo, já como listas Python
+        faces = vertices[triangulos].tolist()
+
+        # Adicionar triângulos como 3DFACE (o quarto ponto repete o terceiro)
+        for step, (p1, p2, p3) in enumerate(faces, start=1):
+            msp.add_3dface([p1, p2, p3, p3])
+
+            # Atualizar a barra de progresso a cada 1000 faces
+            if step % 1000 == 0:
+                progressBar.setValue(step)
 
         # Salvar o documento DXF
         doc.saveas(output_path)  # Salvar o DXF no caminho especificado
@@ -975,151 +806,73 @@ class UiManagerM:
         # Remover a barra de progresso
         self.iface.messageBar().clearWidgets()
 
-    def export_to_obj(self, multi_poly_layer, point_z_values, output_path):
+    def export_to_obj(self, vertices, triangulos, output_path):
         """
-        Exporta uma camada de MultiPolygonZ para um arquivo OBJ.
+        Exporta a malha para um arquivo OBJ.
 
         Funções e Ações Desenvolvidas:
-        - Inicializa a barra de progresso com o número total de faces a serem processadas.
-        - Itera sobre as feições da camada de polígonos.
-        - Constrói a lista de vértices e faces para o arquivo OBJ.
-        - Atualiza a barra de progresso conforme as faces são processadas.
-        - Escreve os vértices e faces no arquivo OBJ.
-        - Remove a barra de progresso ao final da exportação.
-
-        :param multi_poly_layer: Camada de polígonos a ser exportada (QgsVectorLayer).
-        :param point_z_values: Dicionário com coordenadas X, Y como chaves e coordenadas Z como valores.
+        - Escreve cada vértice da malha uma única vez (linhas "v").
+        - Escreve os triângulos referenciando os vértices pelo índice (linhas "f", base 1).
+
+        :param vertices: Array (N, 3) com as coordenadas X, Y, Z dos vértices da malha.
+        :param triangulos: Array (M, 3) com os índices dos vértices de cada triângulo.
         :param output_path: Caminho onde o arquivo OBJ será salvo.
         """
-        vertices = []  # Lista para armazenar os vértices
-        faces = []  # Lista para armazenar as faces
-
-        # Inicializar a barra de progresso
-        total_faces = sum(len(ring) - 2 for feature in multi_poly_layer.getFeatures() 
-                          for geom in (feature.geometry().asMultiPolygon() if feature.geometry().isMultipart() else [feature.geometry().asPolygon()]) 
-                          for ring in geom)
-        progressBar, progressMessageBar = self.iniciar_progress_bar(total_faces)
-        step = 0  # Inicializa o contador de passos
-
-        # Itera sobre as feições da camada de polígonos
-        for feature in multi_poly_layer.getFeatures():
-            geom = feature.geometry()  # Obtém a geometria da feição
-            if geom.isMultipart():
-                polygons = geom.asMultiPolygon()  # Obtém multipolígonos se multipart
-            else:
-                polygons = [geom.asPolygon()]  # Caso contrário, obtém como polígono
-
-            # Itera sobre os polígonos
-            for polygon in polygons:
-                face = []  # Inicializa a lista para a face
-                # Itera sobre os anéis do polígono
-                for ring in polygon:
-                    # Itera sobre os pontos do anel
-                    for point in ring:
-                        if (point.x(), point.y()) in point_z_values:
-                            z = point_z_values[(point.x(), point.y())]  # Obtém o valor Z do ponto
-                            vertices.append(f"v {point.x()} {point.y()} {z}")  # Adiciona o vértice à lista
-                            face.append(len(vertices))  # Adiciona o índice do vértice à face
-                    if face:
-                        faces.append(f"f {' '.join(map(str, face))}")  # Adiciona a face à lista
-                        # Atualizar a barra de progresso
-                        step += 1
-                        progressBar.setValue(step)  # Atualiza a barra de progresso
-
-        # Abre o arquivo de saída para escrita
         with open(output_path, 'w') as file:
-            file.write("\n".join(vertices))  # Escreve os vértices no arquivo
-            file.write("\n")  # Adiciona uma linha em branco
-            file.write("\n".join(faces))  # Escreve as faces no arquivo
-
-        # Remover a barra de progresso
-        self.iface.messageBar().clearWidgets()  # Remove a barra de progresso da interface
+            np.savetxt(file, vertices, fmt="v %.15g %.15g %.15g")  # Escreve os vértices
+            np.savetxt(file, triangulos + 1, fmt="f %d %d %d")  # Escreve as faces (índices começam em 1)
 
-    def export_to_stl(self, multi_poly_layer, point_z_values, output_path):
+    def export_to_stl(self, vertices, triangulos, output_path, binario=False):
         """
-        Exporta uma camada de MultiPolygonZ para um arquivo STL.
+        Exporta a malha para um arquivo STL, ASCII (padrão) ou binário, com as normais das facetas calculadas.
 
         Funções e Ações Desenvolvidas:
-        - Inicializa a barra de progresso com o número total de faces a serem processadas.
-        - Itera sobre as feições da camada de polígonos.
-        - Constrói as faces para o arquivo STL.
-        - Atualiza a barra de progresso conforme as faces são processadas.
-        - Escreve as faces no arquivo STL.
-        - Remove a barra de progresso ao final da exportação.
-
-        :param multi_poly_layer: Camada de polígonos a ser exportada (QgsVectorLayer).
-        :param point_z_values: Dicionário com coordenadas X, Y como chaves e coordenadas Z como valores.
+        - No modo ASCII, monta as coordenadas e normais de cada triângulo e as escreve em bloco, com precisão total.
+        - No modo binário, grava todas as facetas de uma vez a partir de um array estruturado.
+
+        Observação: o STL binário armazena as coordenadas em float32; elas são gravadas relativas a uma
+        origem local (registrada no cabeçalho) para não perder a precisão submétrica em coordenadas UTM.
+
+        :param vertices: Array (N, 3) com as coordenadas X, Y, Z dos vértices da malha.
+        :param triangulos: Array (M, 3) com os índices dos vértices de cada triângulo.
         :param output_path: Caminho onde o arquivo STL será salvo.
+        :param binario: Grava o STL binário quando True, ou ASCII quando False.
         """
-        with open(output_path, 'w') as file:
-            file.write("solid mesh\n")  # Escreve a linha inicial do arquivo STL
+        if binario:
+            escrever_stl_binario(output_path, vertices, triangulos)
+            return
 
-            # Inicializar a barra de progresso
-            total_faces = sum(len(ring) - 2 for feature in multi_poly_layer.getFeatures() 
-                              for geom in (feature.geometry().asMultiPolygon() if feature.geometry().isMultipart() else [feature.geometry().asPolygon()]) 
-                              for ring in geom)
-            progressBar, progressMessageBar = self.iniciar_progress_bar(total_faces)  # Inicializa a barra de progresso
-            step = 0  # Inicializa o contador de passos
-
-            # Itera sobre as feições da camada de polígonos
-            for feature in multi_poly_layer.getFeatures():
-                geom = feature.geometry()  # Obtém a geometria da feição
-                if geom.isMultipart():
-                    polygons = geom.asMultiPolygon()  # Obtém multipolígonos se multipart
-                else:
-                    polygons = [geom.asPolygon()]  # Caso contrário, obtém como polígono
-
-                # Itera sobre os polígonos
-                for polygon in polygons:
-                    # Itera sobre os anéis do polígono
-                    for ring in polygon:
-                        # Itera sobre os pontos do anel
-                        for i in range(1, len(ring) - 1):
-                            p1 = ring[0]
-                            p2 = ring[i]
-                            p3 = ring[i + 1]
-
-                            # Verifica se as coordenadas dos pontos estão no dicionário de valores Z
-                            if (p1.x(), p1.y()) in point_z_values and (p2.x(), p2.y()) in point_z_values and (p3.x(), p3.y()) in point_z_values:
-                                z1 = point_z_values[(p1.x(), p1.y())]  # Obtém o valor Z de p1
-                                z2 = point_z_values[(p2.x(), p2.y())]  # Obtém o valor Z de p2
-                                z3 = point_z_values[(p3.x(), p3.y())]  # Obtém o valor Z de p3
-
-                                # Escreve a face no arquivo STL
-                                file.write("facet normal 0 0 0\n")
-                                file.write("  outer loop\n")
-                                file.write(f"    vertex {p1.x()} {p1.y()} {z1}\n")
-                                file.write(f"    vertex {p2.x()} {p2.y()} {z2}\n")
-                                file.write(f"    vertex {p3.x()} {p3.y()} {z3}\n")
-                                file.write("  endloop\n")
-                                file.write("endfacet\n")
-
-                                # Atualizar a barra de progresso
-                                step += 1
-                                progressBar.setValue(step)  # Atualiza a barra de progresso
+        # Modelo de uma faceta, preenchido com a normal e as nove coordenadas do triângulo
+        modelo_faceta = ("facet normal %.7g %.7g %.7g\n"
+                         "  outer loop\n"
+                         "    vertex %.15g %.15g %.15g\n"
+                         "    vertex %.15g %.15g %.15g\n"
+                         "    vertex %.15g %.15g %.15g\n"
+                         "  endloop\n"
+                         "endfacet")
+        facetas = np.hstack((calcular_normais(vertices, triangulos), vertices[triangulos].reshape(-1, 9)))
 
+        with open(output_path, 'w') as file:
+            file.write("solid mesh\n")  # Escreve a linha inicial do arquivo STL
+            np.savetxt(file, facetas, fmt=modelo_faceta)  # Escreve as facetas
             file.write("endsolid mesh\n")  # Escreve a linha final do arquivo STL
 
-        # Remover a barra de progresso
-        self.iface.messageBar().clearWidgets()  # Remove a barra de progresso da interface
-
-    def export_to_dae(self, multi_poly_layer, point_z_values, output_path):
+    def export_to_dae(self, vertices, triangulos, output_path):
         """
-        Exporta uma camada de MultiPolygonZ para um arquivo DAE (COLLADA).
+        Exporta a malha para um arquivo DAE (COLLADA).
 
         Funções e Ações Desenvolvidas:
         - Cria um documento COLLADA.
         - Adiciona metadados ao documento COLLADA.
         - Cria uma biblioteca de geometrias no documento COLLADA.
-        - Obtém valores únicos de Z e cria uma simbologia gradiente.
-        - Constrói listas de posições e cores dos vértices.
+        - Cria uma simbologia gradiente a partir dos valores de Z dos vértices.
         - Adiciona fontes de posições e cores à malha COLLADA.
         - Define vértices e triângulos da malha COLLADA.
         - Adiciona a malha a uma cena visual.
         - Salva o documento COLLADA no caminho especificado.
 
-        :param multi_poly_layer: Camada de MultiPolygonZ a ser exportada (QgsVectorLayer).
-        :param point_z_values: Dicionário com coordenadas X, Y como chaves e coordenadas Z como valores.
+        :param vertices: Array (N, 3) com as coordenadas X, Y, Z dos vértices da malha.
+        :param triangulos: Array (M, 3) com os índices dos vértices de cada triângulo.
         :param output_path: Caminho onde o arquivo DAE será salvo.
         """
 
@@ -1139,89 +892,39 @@ class UiManagerM:
         geometry = ET.SubElement(library_geometries, "geometry", id="mesh", name="mesh")
         mesh = ET.SubElement(geometry, "mesh")
 
-        # Obtendo valores únicos e criando simbologia gradiente
-        valores_unicos = list(set(point_z_values.values()))
-        cores = self.criar_simbologia_gradiente(valores_unicos)
-
-        positions = []  # Lista para armazenar as posições dos vértices
-        colors = []  # Lista para armazenar as cores dos vértices
-        indices = {}  # Dicionário para armazenar os índices dos vértices
-
-        # Constrói as listas de posições e cores dos vértices
-        for (x, y), z in point_z_values.items():
-            idx = len(positions) // 3
-            positions.extend([x, y, z])
-            color = cores[z]
-            colors.extend(color)
-            indices[(x, y)] = idx
+        # Cores dos vértices (RGBA) segundo a simbologia gradiente dos valores de Z
+        cores = self.criar_simbologia_gradiente(vertices[:, 2])
 
         # Cria e preenche os elementos source para posições e cores dos vértices
         source_positions = ET.SubElement(mesh, "source", id="mesh-positions")
-        float_array_positions = ET.SubElement(source_positions, "float_array", id="mesh-positions-array", count=str(len(positions)))
-        float_array_positions.text = " ".join(map(str, positions))
+        float_array_positions = ET.SubElement(source_positions, "float_array", id="mesh-positions-array", count=str(vertices.size))
+        float_array_positions.text = " ".join(map(str, vertices.ravel().tolist()))
         technique_common_positions = ET.SubElement(source_positions, "technique_common")
-        accessor_positions = ET.SubElement(technique_common_positions, "accessor", source="#mesh-positions-array", count=str(len(positions)//3), stride="3")
+        accessor_positions = ET.SubElement(technique_common_positions, "accessor", source="#mesh-positions-array", count=str(len(vertices)), stride="3")
         ET.SubElement(accessor_positions, "param", name="X", type="float")
         ET.SubElement(accessor_positions, "param", name="Y", type="float")
         ET.SubElement(accessor_positions, "param", name="Z", type="float")
 
         source_colors = ET.SubElement(mesh, "source", id="mesh-colors")
-        float_array_colors = ET.SubElement(source_colors, "float_array", id="mesh-colors-array", count=str(len(colors)))
-        float_array_colors.text = " ".join(map(str, colors))
+        float_array_colors = ET.SubElement(source_colors, "float_array", id="mesh-colors-array", count=str(cores.size))
+        float_array_colors.text = " ".join(map(str, cores.ravel().tolist()))
         technique_common_colors = ET.SubElement(source_colors, "technique_common")
-        accessor_colors = ET.SubElement(technique_common_colors, "accessor", source="#mesh-colors-array", count=str(len(colors)//4), stride="4")
+        accessor_colors = ET.SubElement(technique_common_colors, "accessor", source="#mesh-colors-array", count=str(len(cores)), stride="4")
         ET.SubElement(accessor_colors, "param", name="R", type="float")
         ET.SubElement(accessor_colors, "param", name="G", type="float")
         ET.SubElement(accessor_colors, "param", name="B", type="float")
         ET.SubElement(accessor_colors, "param", name="A", type="float")
 
         # Cria o elemento vertices e associa as posições e cores
-        vertices = ET.SubElement(mesh, "vertices", id="mesh-vertices")
-        ET.SubElement(vertices, "input", semantic="POSITION", source="#mesh-positions")
-        ET.SubElement(vertices, "input", semantic="COLOR", source="#mesh-colors")
+        vertices_elem = ET.SubElement(mesh, "vertices", id="mesh-vertices")
+        ET.SubElement(vertices_elem, "input", semantic="POSITION", source="#mesh-positions")
+        ET.SubElement(vertices_elem, "input", semantic="COLOR", source="#mesh-colors")
 
-        # Cria o elemento triangles para armazenar as faces
-        triangles = ET.SubElement(mesh, "triangles", count=str(len(point_z_values) // 3))
+        # Cria o elemento triangles com os índices dos vértices de cada face
+        triangles = ET.SubElement(mesh, "triangles", count=str(len(triangulos)))
         ET.SubElement(triangles, "input", semantic="VERTEX", source="#mesh-vertices", offset="0")
         p = ET.SubElement(triangles, "p")
-
-        p_text = []  # Lista para armazenar os índices das faces
-
-        # Inicializar a barra de progresso
-        total_faces = sum(len(ring) - 2 for feature in multi_poly_layer.getFeatures() 
-                          for geom in (feature.geometry().asMultiPolygon() if feature.geometry().isMultipart() else [feature.geometry().asPolygon()]) 
-                          for ring in geom)
-        progressBar, progressMessageBar = self.iniciar_progress_bar(total_faces)  # Inicializa a barra de progresso
-        step = 0  # Inicializa o contador de passos
-
-        # Itera sobre as feições da camada de polígonos
-        for feature in multi_poly_layer.getFeatures():
-            geom = feature.geometry()  # Obtém a geometria da feição
-            if geom.isMultipart():
-                polygons = geom.asMultiPolygon()  # Obtém multipolígonos se multipart
-            else:
-                polygons = [geom.asPolygon()]  # Caso contrário, obtém como polígono
-
-            # Itera sobre os polígonos
-            for polygon in polygons:
-                # Itera sobre os anéis do polígono
-                for ring in polygon:
-                    # Itera sobre os pontos do anel
-                    for i in range(1, len(ring) - 1):
-                        p1 = ring[0]
-                        p2 = ring[i]
-                        p3 = ring[i + 1]
-                        # Verifica se os vértices não são colineares
-                        if not self.are_vertices_collinear(p1, p2, p3):
-                            # Adiciona os índices dos vértices à lista de faces
-                            p_text.append(str(indices[(p1.x(), p1.y())]))
-                            p_text.append(str(indices[(p2.x(), p2.y())]))
-                            p_text.append(str(indices[(p3.x(), p3.y())]))
-                            # Atualizar a barra de progresso
-                            step += 1
-                            progressBar.setValue(step)  # Atualiza a barra de progresso
-
-        p.text = " ".join(p_text)  # Define o texto do elemento p com os índices das faces
+        p.text = " ".join(map(str, triangulos.ravel().tolist()))
         
         # Cria e preenche os elementos library_visual_scenes e visual_scene
         library_visual_scenes = ET.SubElement(collada, "library_visual_scenes")
@@ -1239,49 +942,46 @@ class UiManagerM:
         tree = ET.ElementTree(collada)
         tree.write(output_path, encoding="UTF-8", xml_declaration=True)
 
-        # Remover a barra de progresso
-        self.iface.messageBar().clearWidgets()  # Remove a barra de progresso da interface
-
     def criar_simbologia_gradiente(self, valores):
         """
         Cria uma simbologia gradiente de vermelho, laranja, amarelo e verde baseada nos valores fornecidos.
 
         Funções e Ações Desenvolvidas:
-        - Calcula os valores mínimo e máximo da lista fornecida.
+        - Calcula os valores mínimo e máximo do array fornecido.
         - Interpola cores entre vermelho, laranja, amarelo e verde com base nos valores fornecidos.
-        - Cria um dicionário onde as chaves são os valores fornecidos e os valores são listas RGBA.
-
-        :param valores: Lista de valores para os quais a simbologia será aplicada.
-        :return: Um dicionário com valores como chave e a cor RGBA correspondente como valor.
-        """
-        cores = {}  # Dicionário para armazenar as cores
-        min_valor = min(valores)  # Calcula o valor mínimo da lista
-        max_valor = max(valores)  # Calcula o valor máximo da lista
-
-        # Itera sobre cada valor na lista de valores
-        for valor in valores:
-            ratio = (valor - min_valor) / (max_valor - min_valor)  # Calcula a razão normalizada do valor
-
-            # Interpola a cor com base na razão
-            if ratio < 0.33:
-                # Interpolação de vermelho para laranja
-                r = 1.0  # Vermelho constante
-                g = ratio * 3.0  # Verde cresce de 0 a 1
-                b = 0.0  # Azul constante
-            elif ratio < 0.66:
-                # Interpolação de laranja para amarelo
-                r = 1.0 - (ratio - 0.33) * 3.0  # Vermelho decresce de 1 a 0
-                g = 1.0  # Verde constante
-                b = 0.0  # Azul constante
-            else:
-                # Interpolação de amarelo para verde
-                r = 0.0  # Vermelho constante
-                g = 1.0  # Verde constante
-                b = (ratio - 0.66) * 3.0  # Azul cresce de 0 a 1
-            a = 1.0  # Alfa constante
-            cores[valor] = [r, g, b, a]  # Adiciona a cor interpolada ao dicionário
 
-        return cores  # Retorna o dicionário de cores
+        :param valores: Array de valores para os quais a simbologia será aplicada.
+        :return: Array (N, 4) com a cor RGBA correspondente a cada valor.
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        min_valor = valores.min()  # Calcula o valor mínimo
+        intervalo = valores.max() - min_valor  # Calcula a amplitude dos valores
+
+        # Calcula a razão normalizada de cada valor (0 quando todos os valores são iguais)
+        ratio = (valores - min_valor) / intervalo if intervalo > 0 else np.zeros_like(valores)
+
+        cores = np.empty((len(valores), 4))
+        cores[:, 3] = 1.0  # Alfa constante
+
+        # Interpolação de vermelho para laranja: verde cresce de 0 a 1
+        faixa = ratio < 0.33
+        cores[faixa, 0] = 1.0
+        cores[faixa, 1] = ratio[faixa] * 3.0
+        cores[faixa, 2] = 0.0
+
+        # Interpolação de laranja para amarelo: vermelho decresce de 1 a 0
+        faixa = (ratio >= 0.33) & (ratio < 0.66)
+        cores[faixa, 0] = 1.0 - (ratio[faixa] - 0.33) * 3.0
+        cores[faixa, 1] = 1.0
+        cores[faixa, 2] = 0.0
+
+        # Interpolação de amarelo para verde: azul cresce de 0 a 1
+        faixa = ratio >= 0.66
+        cores[faixa, 0] = 0.0
+        cores[faixa, 1] = 1.0
+        cores[faixa, 2] = (ratio[faixa] - 0.66) * 3.0
+
+        return cores  # Retorna as cores RGBA
 
     def exportar_malha_kml(self):
         """
@@ -1295,8 +995,8 @@ class UiManagerM:
         5. Obtém a camada de malha selecionada no TreeView.
         6. Verifica se há uma camada selecionada. Se não, exibe uma mensagem de erro e retorna.
         7. Verifica se a camada selecionada é do tipo QgsMeshLayer. Se não, exibe uma mensagem de erro e retorna.
-        8. Converte a camada de malha em polígonos e pontos com valores Z.
-        9. Verifica se a conversão foi bem-sucedida. Se não, exibe uma mensagem de erro e retorna.
+        8. Lê os vértices e as faces da malha diretamente do provedor.
+        9. Verifica se a leitura foi bem-sucedida. Se não, exibe uma mensagem de erro e retorna.
         10. Abre um diálogo para o usuário escolher o local para salvar o arquivo KML.
         11. Exporta os dados para um arquivo KML com as opções de estilo personalizadas.
         12. Calcula a duração da exportação e exibe uma mensagem de sucesso com o tempo gasto.
@@ -1308,7 +1008,7 @@ class UiManagerM:
         - Nenhuma camada selecionada.
         - Camada não encontrada.
         - Camada selecionada não é uma malha.
-        - Falha na conversão da malha para polígonos e pontos.
+        - Malha sem vértices ou faces.
         """
 
         # Abre o diálogo de personalização
@@ -1343,18 +1043,18 @@ class UiManagerM:
             self.mostrar_mensagem("A camada selecionada não é uma malha", "Erro")
             return
 
-        # Converte a camada de malha em polígonos e pontos com valores Z
-        polygon_layer, point_z_values = self.convert_mesh_to_polygons_and_points(layer)
-        if not polygon_layer or not point_z_values:
-            # Verifica se a conversão foi bem-sucedida
-            self.mostrar_mensagem("Falha na conversão da malha para polígonos e pontos", "Erro")
+        # Lê a topologia da malha (vértices e triângulos) diretamente do provedor
+        vertices, triangulos = extrair_topologia_malha(layer)
+        if not len(vertices) or not len(triangulos):
+            # Verifica se a leitura foi bem-sucedida
+            self.mostrar_mensagem("Falha na leitura dos vértices e faces da malha", "Erro")
             return
 
         # Abre um diálogo para o usuário escolher o local para salvar o arquivo KML
         save_path = self.escolher_local_para_salvar(layer.name() + ".kml", "KML Files (*.kml)")
         if save_path:
             # Exporta os dados para um arquivo KML com as opções de estilo personalizadas
-            self.export_to_kml(polygon_layer, point_z_values, save_path, style_options)
+            self.export_to_kml(vertices, triangulos, layer.crs(), save_path, style_options)
 
             # Calcula a duração da exportação
             end_time = time.time()
@@ -1364,39 +1064,41 @@ class UiManagerM:
             self.mostrar_mensagem(f"Camada exportada para KML em {duration:.2f} segundos", "Sucesso",
                                   caminho_pasta=os.path.dirname(save_path), caminho_arquivo=save_path)
 
-    def export_to_kml(self, multi_poly_layer, point_z_values, output_path, style_options):
+    def export_to_kml(self, vertices, triangulos, crs_src, output_path, style_options):
         """
-        Esta função exporta uma camada de polígonos múltiplos (multi_poly_layer) e seus valores de pontos Z associados (point_z_values)
-        para um arquivo KML, aplicando estilos personalizados definidos pelo usuário.
+        Esta função exporta os triângulos de uma malha para um arquivo KML,
+        aplicando estilos personalizados definidos pelo usuário.
 
         Detalhamento:
-        1. Converte o sistema de referência de coordenadas (CRS) da camada para WGS84.
+        1. Converte uma única vez as coordenadas de todos os vértices para WGS84.
         2. Cria a estrutura XML básica do KML.
         3. Adiciona estilos personalizados ao KML, incluindo cor e largura de linha, e cor e opacidade de polígonos.
-        4. Calcula o número total de faces para configuração da barra de progresso.
-        5. Itera sobre os recursos da camada, convertendo geometrias em polígonos e adicionando-os ao KML.
-        6. Atualiza a barra de progresso durante a iteração.
-        7. Salva o KML em um arquivo no caminho especificado.
-        8. Limpa a barra de mensagens da interface do usuário ao concluir.
+        4. Adiciona cada triângulo ao KML como um polígono, reaproveitando as coordenadas já convertidas.
+        5. Atualiza a barra de progresso durante a iteração.
+        6. Salva o KML em um arquivo no caminho especificado.
+        7. Limpa a barra de mensagens da interface do usuário ao concluir.
 
         Parâmetros:
-        - multi_poly_layer: Camada de polígonos múltiplos a ser exportada.
-        - point_z_values: Dicionário contendo valores de Z para os pontos na camada.
+        - vertices: Array (N, 3) com as coordenadas X, Y, Z dos vértices da malha.
+        - triangulos: Array (M, 3) com os índices dos vértices de cada triângulo.
+        - crs_src: Sistema de referência de coordenadas da malha.
         - output_path: Caminho onde o arquivo KML será salvo.
         - style_options: Dicionário contendo as opções de estilo definidas pelo usuário.
 
         Retorno:
         - Nenhum retorno direto. A função realiza a exportação e exibe uma barra de progresso durante o processo.
-
-        Exceções tratadas:
-        - Nenhuma exceção específica tratada nesta função.
         """
 
         # Converter CRS para WGS84
-        crs_src = multi_poly_layer.crs()  # Obtém o CRS da camada original
         crs_dest = QgsCoordinateReferenceSystem(4326)  # Define o CRS de destino como WGS84 (EPSG:4326)
         xform = QgsCoordinateTransform(crs_src, crs_dest, QgsProject.instance())  # Cria a transformação CRS
 
+        # Texto das coordenadas de cada vértice, convertido uma única vez
+        coordenadas_vertices = []
+        for x, y, z in vertices.tolist():
+            ponto = xform.transform(QgsPointXY(x, y))
+            coordenadas_vertices.append(f"{ponto.x()},{ponto.y()},{z}")
+
         # Cria a estrutura XML básica do KML
         kml = ET.Element("kml", xmlns="http://www.opengis.net/kml/2.2")
         document = ET.SubElement(kml, "Document")
@@ -1414,35 +1116,20 @@ class UiManagerM:
         ET.SubElement(polystyle, "fill").text = "1"  # Ativa o preenchimento
         ET.SubElement(polystyle, "outline").text = "1"  # Ativa o contorno
 
-        # Calcula o número total de faces para a barra de progresso
-        total_faces = sum(len(ring) - 2 for feature in multi_poly_layer.getFeatures()
-                          for geom in (feature.geometry().asMultiPolygon() if feature.geometry().isMultipart() else [feature.geometry().asPolygon()])
-                          for ring in geom)
-        progressBar, progressMessageBar = self.iniciar_progress_bar(total_faces)  # Inicia a barra de progresso
-        step = 0  # Inicializa o contador de progresso
-
-        # Itera sobre os recursos da camada
-        for feature in multi_poly_layer.getFeatures():
-            geom = feature.geometry()
-            if geom.isMultipart():
-                polygons = geom.asMultiPolygon()  # Converte a geometria para múltiplos polígonos se multipartida
-            else:
-                polygons = [geom.asPolygon()]  # Converte a geometria para um único polígono
-
-            # Adiciona polígonos ao KML
-            for polygon in polygons:
-                for ring in polygon:
-                    placemark = ET.SubElement(document, "Placemark")
-                    ET.SubElement(placemark, "styleUrl").text = "#customStyle"  # Aplica o estilo personalizado
-                    polygon_elem = ET.SubElement(placemark, "Polygon")
-                    ET.SubElement(polygon_elem, "altitudeMode").text = "absolute"  # Define o modo de altitude como absoluto
-                    outer_boundary_is = ET.SubElement(polygon_elem, "outerBoundaryIs")
-                    linear_ring = ET.SubElement(outer_boundary_is, "LinearRing")
-                    coordinates = ET.SubElement(linear_ring, "coordinates")
-                    coord_text = " ".join([f"{xform.transform(point).x()},{xform.transform(point).y()},{point_z_values.get((point.x(), point.y()), 0)}" for point in ring])
-                    coordinates.text = coord_text  # Adiciona as coordenadas dos pontos
-                    step += 1  # Incrementa o contador de progresso
-                    progressBar.setValue(step)  # Atualiza a barra de progresso
+        progressBar, progressMessageBar = self.iniciar_progress_bar(len(triangulos))  # Inicia a barra de progresso
+
+        # Adiciona cada triângulo ao KML como um polígono fechado
+        for step, (i1, i2, i3) in enumerate(triangulos.tolist(), start=1):
+            placemark = ET.SubElement(document, "Placemark")
+            ET.SubElement(placemark, "styleUrl").text = "#customStyle"  # Aplica o estilo personalizado
+            polygon_elem = ET.SubElement(placemark, "Polygon")
+            ET.SubElement(polygon_elem, "altitudeMode").text = "absolute"  # Define o modo de altitude como absoluto
+            outer_boundary_is = ET.SubElement(polygon_elem, "outerBoundaryIs")
+            linear_ring = ET.SubElement(outer_boundary_is, "LinearRing")
+            coordinates = ET.SubElement(linear_ring, "coordinates")
+            coordinates.text = " ".join((coordenadas_vertices[i1], coordenadas_vertices[i2], coordenadas_vertices[i3], coordenadas_vertices[i1]))
+            if step % 1000 == 0:
+                progressBar.setValue(step)  # Atualiza a barra de progresso
 
         # Salva o KML em um arquivo no caminho especificado
         tree = ET.ElementTree(kml)
@@ -1457,7 +1144,7 @@ class UiManagerM:
 
         Este método verifica se a camada está no modo de edição e, em caso afirmativo, interrompe a operação,
         pedindo ao usuário que salve ou cancele as edições. Se a camada não estiver no modo de edição,
-        o método converte a malha em polígonos e pontos, exporta para um arquivo DAE temporário e retorna
+        o método lê os vértices e as faces da malha, exporta para um arquivo DAE temporário e retorna
         o caminho do arquivo DAE exportado.
 
         Parâmetros:
@@ -1467,9 +1154,7 @@ class UiManagerM:
         - dae_file_path (str): O caminho do arquivo DAE exportado, ou None em caso de erro.
 
         Exceções:
-        - QgsProcessingException: Se ocorrer um erro de processamento relacionado ao modo de edição ou
-                                  restrições da camada.
-        - Exception: Para qualquer outro erro inesperado.
+        - Exception: Para qualquer erro inesperado.
         """
         try:
             # Verifica se a camada é uma camada vetorial (QgsVectorLayer) e está no modo de edição
@@ -1483,21 +1168,16 @@ class UiManagerM:
                 os.makedirs(temp_dir)
             dae_file_path = os.path.join(temp_dir, layer.name() + ".dae")
 
-            # Chamar a função de exportação para DAE
-            polygon_layer, point_z_values = self.convert_mesh_to_polygons_and_points(layer)
-            if not polygon_layer or not point_z_values:
-                self.mostrar_mensagem("Falha na conversão da malha para polígonos e pontos", "Erro")
+            # Ler a topologia da malha diretamente do provedor
+            vertices, triangulos = extrair_topologia_malha(layer)
+            if not len(vertices) or not len(triangulos):
+                self.mostrar_mensagem("Falha na leitura dos vértices e faces da malha", "Erro")
                 return None
 
             # Exportar a malha para o arquivo DAE
-            self.export_to_dae(polygon_layer, point_z_values, dae_file_path)
+            self.export_to_dae(vertices, triangulos, dae_file_path)
             return dae_file_path
 
-        except QgsProcessingException as pe:
-            # Caso o erro seja relacionado ao processamento, mostrar uma mensagem específica
-            self.mostrar_mensagem(f"Erro ao exportar a malha para DAE: {str(pe)}. Verifique o modo de edição ou as restrições da camada.", "Erro")
-            return None
-
         except Exception as e:
             # Para outros tipos de erro, mostrar a mensagem genérica
             self.mostrar_mensagem(f"Erro inesperado: {str(e)}", "Erro")
@@ -2558,9 +2238,14 @@ class ExportaMalha3D(QDialog):
         bottom_layout.addWidget(self.button_stl)
         bottom_layout.addWidget(self.button_obj)
         
+        # Formato do STL: ASCII (padrão, precisão total) ou binário (menor, float32 relativo a uma origem local)
+        self.checkBox_stl_binario = QCheckBox("STL binário")
+        self.checkBox_stl_binario.setToolTip("Grava o STL em formato binário (arquivo menor); as coordenadas ficam relativas a uma origem local registrada no cabeçalho.")
+
         # Adiciona os layouts superior e inferior ao layout do frame
         frame_layout.addLayout(top_layout)
         frame_layout.addLayout(bottom_layout)
+        frame_layout.addWidget(self.checkBox_stl_binario)
         frame.setLayout(frame_layout)  # Define o layout do frame
         
         # Botão de cancelar
@@ -0,0 +1,156 @@
+from qgis.core import QgsProject, QgsRectangle
+from collections import OrderedDict
+import threading
+import numpy as np
+
+from .raster_blocos import bloco_para_array, geotransform_provider
+
+class AmostradorRaster:
+    """Serviço de amostragem de rasters em lote, com cache LRU de blocos (tiles).
+
+    Os valores são lidos do provedor em tiles de tamanho_tile x tamanho_tile pixels e guardados
+    em um cache limitado por memória, indexado por (id da camada, banda, linha do tile, coluna do tile).
+    Consultas repetidas sobre o mesmo terreno reaproveitam os tiles já lidos.
+    """
+
+    def __init__(self, tamanho_tile=256, limite_bytes=64 * 1024 * 1024):
+        self.tamanho_tile = tamanho_tile
+        self.limite_bytes = limite_bytes
+        self._cache = OrderedDict()
+        self._bytes_em_cache = 0
+        self._trava = threading.Lock()  # A extração de perfis também amostra a partir de QThreads
+
+    def amostrar(self, raster_layer, xs, ys, metodo='bilinear', banda=1):
+        """Amostra o raster em vários pontos de uma só vez.
+
+        Parâmetros:
+          - raster_layer: QgsRasterLayer a ser amostrado.
+          - xs, ys: sequências ou arrays numpy com as coordenadas, no SRC do raster.
+          - metodo: 'bilinear' ou 'nearest' (valor do pixel que contém o ponto, como o identify).
+          - banda: banda a ser lida (padrão 1).
+
+        Retorna:
+          Array numpy float64 com os valores; NaN para pontos fora do raster ou em NoData.
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+
+        provider = raster_layer.dataProvider()
+        x_min, y_max, pixel_x, pixel_y = geotransform_provider(provider)
+        colunas_f = (xs - x_min) / pixel_x
+        linhas_f = (y_max - ys) / pixel_y
+
+        if metodo == 'nearest':
+            return self._valores_pixels(raster_layer, np.floor(linhas_f).astype(np.int64), np.floor(colunas_f).astype(np.int64), banda)
+
+        # Interpolação bilinear entre os centros dos quatro pixels vizinhos
+        colunas_f -= 0.5
+        linhas_f -= 0.5
+        coluna0 = np.floor(colunas_f).astype(np.int64)
+        linha0 = np.floor(linhas_f).astype(np.int64)
+        fx = colunas_f - coluna0
+        fy = linhas_f - linha0
+
+        soma = np.zeros(xs.shape)
+        pesos = np.zeros(xs.shape)
+        for dl, dc, peso in ((0, 0, (1 - fx) * (1 - fy)), (0, 1, fx * (1 - fy)), (1, 0, (1 - fx) * fy), (1, 1, fx * fy)):
+            valores = self._valores_pixels(raster_layer, linha0 + dl, coluna0 + dc, banda)
+            validos = ~np.isnan(valores)
+            soma += np.where(validos, valores * peso, 0.0)
+            pesos += np.where(validos, peso, 0.0)
+
+        # Vizinhos NoData ou fora do raster são descartados e os pesos restantes renormalizados
+        with np.errstate(invalid='ignore', divide='ignore'):
+            resultado = soma / pesos
+        resultado[pesos <= 0] = np.nan
+
+        # Pontos fora da extensão continuam sem valor, mesmo perto da borda
+        fora = (xs < x_min) | (xs > x_min + provider.xSize() * pixel_x) | (ys > y_max) | (ys < y_max - provider.ySize() * pixel_y)
+        resultado[fora] = np.nan
+        return resultado
+
+    def amostrar_ponto(self, raster_layer, x, y, metodo='nearest', banda=1):
+        """Amostra um único ponto; retorna None quando não há valor, como o identify."""
+        valor = self.amostrar(raster_layer, [x], [y], metodo, banda)[0]
+        return None if np.isnan(valor) else float(valor)
+
+    def invalidar(self, layer_ids=None):
+        """Descarta os tiles em cache das camadas informadas (ou de todas, se None)."""
+        with self._trava:
+            if layer_ids is None:
+                self._cache.clear()
+                self._bytes_em_cache = 0
+                return
+            layer_ids = set(layer_ids)
+            for chave in [chave for chave in self._cache if chave[0] in layer_ids]:
+                self._bytes_em_cache -= self._cache.pop(chave).nbytes
+
+    def _valores_pixels(self, raster_layer, linhas, colunas, banda):
+        """Obtém os valores de pixels (linha, coluna) agrupando as leituras por tile."""
+        provider = raster_layer.dataProvider()
+        valores = np.full(linhas.shape, np.nan)
+
+        dentro = (linhas >= 0) & (linhas < provider.ySize()) & (colunas >= 0) & (colunas < provider.xSize())
+        if not dentro.any():
+            return valores
+
+        indices = np.nonzero(dentro)[0]
+        tiles_linha = linhas[indices] // self.tamanho_tile
+        tiles_coluna = colunas[indices] // self.tamanho_tile
+        chaves = tiles_linha * (provider.xSize() // self.tamanho_tile + 1) + tiles_coluna
+
+        for chave in np.unique(chaves):
+            selecao = indices[chaves == chave]
+            tile_linha = int(linhas[selecao[0]] // self.tamanho_tile)
+            tile_coluna = int(colunas[selecao[0]] // self.tamanho_tile)
+            dados = self._obter_tile(raster_layer, banda, tile_linha, tile_coluna)
+            valores[selecao] = dados[linhas[selecao] - tile_linha * self.tamanho_tile,
+                                     colunas[selecao] - tile_coluna * self.tamanho_tile]
+        return valores
+
+    def _obter_tile(self, raster_layer, banda, tile_linha, tile_coluna):
+        """Retorna o tile do cache ou o lê do provedor, com NaN nos pixels NoData."""
+        chave = (raster_layer.id(), banda, tile_linha, tile_coluna)
+        with self._trava:
+            dados = self._cache.get(chave)
+            if dados is not None:
+                self._cache.move_to_end(chave)
+                return dados
+
+        provider = raster_layer.dataProvider()
+        x_min, y_max, pixel_x, pixel_y = geotransform_provider(provider)
+        linha0 = tile_linha * self.tamanho_tile
+        coluna0 = tile_coluna * self.tamanho_tile
+        altura = min(self.tamanho_tile, provider.ySize() - linha0)
+        largura = min(self.tamanho_tile, provider.xSize() - coluna0)
+
+        janela = QgsRectangle(
+            x_min + coluna0 * pixel_x,
+            y_max - (linha0 + altura) * pixel_y,
+            x_min + (coluna0 + largura) * pixel_x,
+            y_max - linha0 * pixel_y)
+        dados, mascara = bloco_para_array(provider.block(banda, janela, largura, altura), largura, altura)
+        dados[~mascara] = np.nan
+
+        with self._trava:
+            if chave not in self._cache:
+                self._cache[chave] = dados
+                self._bytes_em_cache += dados.nbytes
+            # Remove os tiles menos usados recentemente até respeitar o limite de memória
+            while self._bytes_em_cache > self.limite_bytes and len(self._cache) > 1:
+                _, removido = self._cache.popitem(last=False)
+                self._bytes_em_cache -= removido.nbytes
+        return dados
+
+_amostrador = None
+
+def obter_amostrador():
+    """Retorna o amostrador compartilhado por todas as ferramentas do plugin.
+
+    O cache das camadas removidas do projeto é descartado automaticamente.
+    """
+    global _amostrador
+    if _amostrador is None:
+        _amostrador = AmostradorRaster()
+        QgsProject.instance().layersWillBeRemoved.connect(_amostrador.invalidar)
+    return _amostrador
@@ -0,0 +1,216 @@
+from qgis.core import QgsApplication
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PIL.ExifTags import TAGS
+from io import BytesIO
+import PIL.Image
+import hashlib
+import json
+import time
+import os
+
+# Lado máximo, em pixels, das miniaturas exibidas na tabela de fotos
+TAMANHO_MINIATURA = 160
+
+# Incrementar quando o conteúdo gravado no cache mudar, para invalidar as entradas antigas
+_VERSAO_CACHE = 1
+
+# Limites do cache em disco: acima do tamanho, as entradas usadas há mais tempo são removidas primeiro
+TAMANHO_MAXIMO_CACHE = 200 * 1024 * 1024  # bytes
+IDADE_MAXIMA_CACHE = 90 * 24 * 3600  # segundos sem uso
+
+def info_vazia():
+    """Retorna as informações padrão de uma foto sem dados EXIF legíveis."""
+    return {"latitude": "N/A", "longitude": "N/A", "altitude": "N/A", "data": "N/A", "hora": "N/A", "resolucao": "N/A"}
+
+def pasta_cache_fotos():
+    """Retorna (e cria, se preciso) a pasta do cache de miniaturas no perfil do QGIS."""
+    pasta = os.path.join(QgsApplication.qgisSettingsDirPath(), "tempo_salvo_tools", "cache_fotos")
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+def coordenada_gps(gps_info, ref_index, ref):
+    """Converte uma coordenada GPS do EXIF (graus, minutos, segundos) em graus decimais.
+
+    Retorna "N/A" quando a coordenada ou a referência (N, S, E, W) não estão presentes.
+    """
+    try:
+        coord = gps_info.get(ref_index)
+        if not coord or not ref:
+            return "N/A"
+        graus, minutos, segundos = [float(x) for x in coord]
+        decimal = graus + minutos / 60 + segundos / 3600
+        return -decimal if ref in ['S', 'W'] else decimal
+    except Exception:
+        return "N/A"
+
+def altitude_gps(gps_info):
+    """Obtém a altitude em metros do EXIF (chave 6), negativa se a referência (chave 5) for abaixo do nível do mar."""
+    try:
+        alt = gps_info.get(6)
+        if not alt:
+            return "N/A"
+        altitude = float(alt)
+        return -altitude if gps_info.get(5, 0) == 1 else altitude
+    except Exception:
+        return "N/A"
+
+def extrair_info_exif(imagem):
+    """Extrai coordenadas, altitude, data, hora e resolução de uma imagem PIL já aberta.
+
+    Deve ser chamada antes de draft(), que altera o tamanho informado pela imagem.
+    """
+    info = info_vazia()
+    largura, altura = imagem.size
+    info["resolucao"] = f"{largura}x{altura}"
+
+    exif_data = imagem._getexif() if hasattr(imagem, "_getexif") else None
+    if not exif_data:
+        return info
+
+    exif = {TAGS.get(k, k): v for k, v in exif_data.items() if k in TAGS}
+
+    gps_info = exif.get("GPSInfo")
+    if gps_info:
+        info["latitude"] = coordenada_gps(gps_info, 2, gps_info.get(1))
+        info["longitude"] = coordenada_gps(gps_info, 4, gps_info.get(3))
+        info["altitude"] = altitude_gps(gps_info)
+
+    data_hora = str(exif.get("DateTimeOriginal", "N/A N/A")).split()
+    info["data"] = data_hora[0] if len(data_hora) > 0 else "N/A"
+    info["hora"] = data_hora[1] if len(data_hora) > 1 else "N/A"
+    return info
+
+def _chave_cache(caminho, tamanho):
+    """Chave do cache de uma foto: caminho, data de modificação, tamanho do arquivo e tamanho da miniatura."""
+    estado = os.stat(caminho)
+    texto = f"{_VERSAO_CACHE}|{os.path.abspath(caminho)}|{estado.st_mtime_ns}|{estado.st_size}|{tamanho}"
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+def ler_foto(caminho, pasta_cache, tamanho=TAMANHO_MINIATURA):
+    """Lê as informações EXIF e a miniatura de uma foto, usando o cache em disco quando possível.
+
+    Não usa objetos do Qt e pode ser executada fora da thread da interface.
+
+    Parâmetros:
+      - caminho: caminho da foto.
+      - pasta_cache: pasta onde as miniaturas (.jpg) e as informações (.json) são guardadas.
+      - tamanho: lado máximo da miniatura, em pixels.
+
+    Retorna:
+      Tupla (info, miniatura): dicionário com latitude, longitude, altitude, data, hora e resolução,
+      e os bytes JPEG da miniatura (None se a foto não puder ser lida).
+    """
+    try:
+        chave = _chave_cache(caminho, tamanho)
+    except OSError:
+        return info_vazia(), None
+
+    arquivo_info = os.path.join(pasta_cache, chave + ".json")
+    arquivo_miniatura = os.path.join(pasta_cache, chave + ".jpg")
+
+    # Foto já vista com a mesma data de modificação e tamanho: nada é decodificado
+    if os.path.exists(arquivo_info) and os.path.exists(arquivo_miniatura):
+        try:
+            with open(arquivo_info, "r", encoding="utf-8") as arquivo:
+                info = json.load(arquivo)
+            with open(arquivo_miniatura, "rb") as arquivo:
+                dados_miniatura = arquivo.read()
+            # Marca a entrada como usada agora (a limpeza remove primeiro as usadas há mais tempo)
+            os.utime(arquivo_miniatura)
+            return info, dados_miniatura
+        except (OSError, ValueError):
+            pass  # Entrada corrompida: a foto é lida de novo e o cache regravado
+
+    try:
+        with PIL.Image.open(caminho) as imagem:
+            info = extrair_info_exif(imagem)
+
+            # Em JPEG, draft() faz o decodificador reduzir a imagem na própria leitura (escala 1/2 a 1/8)
+            imagem.draft("RGB", (tamanho, tamanho))
+            miniatura = imagem.convert("RGB")
+            miniatura.thumbnail((tamanho, tamanho), PIL.Image.BILINEAR)
+
+            buffer = BytesIO()
+            miniatura.save(buffer, format="JPEG", quality=85)
+            dados_miniatura = buffer.getvalue()
+    except Exception:
+        return info_vazia(), None
+
+    # Falhas na gravação do cache não impedem o carregamento
+    try:
+        with open(arquivo_miniatura, "wb") as arquivo:
+            arquivo.write(dados_miniatura)
+        with open(arquivo_info, "w", encoding="utf-8") as arquivo:
+            json.dump(info, arquivo)
+    except OSError:
+        pass
+
+    return info, dados_miniatura
+
+def limpar_cache_fotos(pasta_cache, tamanho_maximo=TAMANHO_MAXIMO_CACHE, idade_maxima=IDADE_MAXIMA_CACHE):
+    """Mantém o cache de miniaturas dentro dos limites de idade e de tamanho.
+
+    Cada entrada (miniatura .jpg e informações .json) tem a idade da última leitura, registrada na
+    data de modificação da miniatura. As entradas sem uso há mais de idade_maxima são removidas e,
+    se o total ainda passar de tamanho_maximo, as mais antigas são removidas até caber.
+
+    Retorna:
+      Número de entradas removidas.
+    """
+    entradas = {}  # chave -> [última utilização, bytes, arquivos]
+    try:
+        nomes = os.listdir(pasta_cache)
+    except OSError:
+        return 0
+    for nome in nomes:
+        chave, extensao = os.path.splitext(nome)
+        if extensao not in (".jpg", ".json"):
+            continue
+        caminho = os.path.join(pasta_cache, nome)
+        try:
+            estado = os.stat(caminho)
+        except OSError:
+            continue
+        entrada = entradas.setdefault(chave, [0.0, 0, []])
+        if extensao == ".jpg" or not entrada[0]:
+            entrada[0] = estado.st_mtime
+        entrada[1] += estado.st_size
+        entrada[2].append(caminho)
+
+    limite_idade = time.time() - idade_maxima
+    total = sum(entrada[1] for entrada in entradas.values())
+    removidas = 0
+    for usado_em, tamanho_entrada, arquivos in sorted(entradas.values(), key=lambda entrada: entrada[0]):
+        if usado_em >= limite_idade and total <= tamanho_maximo:
+            break
+        for caminho in arquivos:
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+        total -= tamanho_entrada
+        removidas += 1
+    return removidas
+
+def carregar_fotos(caminhos, tamanho=TAMANHO_MINIATURA, max_workers=None):
+    """Lê as fotos em paralelo, entregando cada uma assim que fica pronta.
+
+    Parâmetros:
+      - caminhos: lista de caminhos das fotos.
+      - tamanho: lado máximo das miniaturas, em pixels.
+      - max_workers: número de threads (padrão: núcleos disponíveis, até 8).
+
+    Retorna:
+      Gerador de tuplas (indice, info, miniatura), fora da ordem de entrada; indice é a posição em caminhos.
+      Ao final, o cache em disco é reduzido aos limites de idade e tamanho (limpar_cache_fotos).
+    """
+    pasta_cache = pasta_cache_fotos()
+    max_workers = max_workers or min(8, os.cpu_count() or 2)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futuros = {executor.submit(ler_foto, caminho, pasta_cache, tamanho): indice for indice, caminho in enumerate(caminhos)}
+        for futuro in as_completed(futuros):
+            info, miniatura = futuro.result()
+            yield futuros[futuro], info, miniatura
+
+    limpar_cache_fotos(pasta_cache)
@@ -0,0 +1,401 @@
+from qgis.core import QgsFeature, QgsFeatureRequest, QgsWkbTypes
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import defaultdict
+from osgeo import gdal, ogr, osr
+import numpy as np
+import struct
+import os
+
+from .raster_blocos import fonte_vetorial_memoria
+
+# Lado padrão (em pixels) das janelas processadas em paralelo
+TAMANHO_TILE_PADRAO = 2048
+
+# Linhas enviadas por vez ao destino
+_TAMANHO_LOTE = 5000
+
+def janelas_com_sobreposicao(largura, altura, tamanho_tile=TAMANHO_TILE_PADRAO):
+    """Divide a grade em janelas que compartilham uma linha/coluna de pixels com as vizinhas.
+
+    O GDAL interpola as curvas entre os centros dos pixels, e uma curva que atravessa a coluna (ou
+    linha) compartilhada tem, sobre a reta dos centros dessa coluna, um vértice calculado com os
+    mesmos dois pixels nas duas janelas. Além dela, cada janela estende a curva por meio pixel até a
+    sua borda; recortadas na reta dos centros (ver limites_da_janela), as curvas das duas janelas
+    terminam no mesmo ponto e podem ser emendadas.
+
+    Retorna:
+      Tupla (janelas, costuras_colunas, costuras_linhas): lista de (coluna0, linha0, largura, altura)
+      e os índices das colunas e linhas compartilhadas.
+    """
+    inicios_colunas = list(range(0, max(largura - 1, 1), tamanho_tile))
+    inicios_linhas = list(range(0, max(altura - 1, 1), tamanho_tile))
+
+    janelas = []
+    for linha0 in inicios_linhas:
+        for coluna0 in inicios_colunas:
+            janelas.append((coluna0, linha0,
+                            min(coluna0 + tamanho_tile, largura - 1) - coluna0 + 1,
+                            min(linha0 + tamanho_tile, altura - 1) - linha0 + 1))
+    return janelas, inicios_colunas[1:], inicios_linhas[1:]
+
+def limites_da_janela(janela, largura, altura, geotransform):
+    """Retângulo de recorte das curvas de uma janela: a reta dos centros dos pixels de cada lado que
+    é costura; os lados na borda do raster ficam abertos (infinitos), como na geração em uma janela só.
+
+    Parâmetros:
+      - janela: tupla (coluna0, linha0, largura, altura) de janelas_com_sobreposicao().
+      - largura, altura: dimensões do raster inteiro, em pixels.
+      - geotransform: geotransformação do raster (sem rotação).
+
+    Retorna:
+      Tupla (x_min, x_max, y_min, y_max).
+    """
+    coluna0, linha0, largura_janela, altura_janela = janela
+    x0, px, _, y0, _, py = geotransform
+    coluna1 = coluna0 + largura_janela - 1
+    linha1 = linha0 + altura_janela - 1
+
+    xs = [x0 + (coluna0 + 0.5) * px if coluna0 > 0 else -np.inf * np.sign(px),
+          x0 + (coluna1 + 0.5) * px if coluna1 < largura - 1 else np.inf * np.sign(px)]
+    ys = [y0 + (linha0 + 0.5) * py if linha0 > 0 else -np.inf * np.sign(py),
+          y0 + (linha1 + 0.5) * py if linha1 < altura - 1 else np.inf * np.sign(py)]
+    return min(xs), max(xs), min(ys), max(ys)
+
+def recortar_linha(coordenadas, limites):
+    """Recorta uma linha por um retângulo (Liang-Barsky em todos os segmentos de uma vez).
+
+    Parâmetros:
+      - coordenadas: array (N, 2) da linha.
+      - limites: tupla (x_min, x_max, y_min, y_max); use infinito nos lados sem recorte.
+
+    Retorna:
+      Lista de arrays (M, 2), os trechos contínuos da linha dentro do retângulo.
+    """
+    x_min, x_max, y_min, y_max = limites
+    inicio = coordenadas[:-1]
+    delta = np.diff(coordenadas, axis=0)
+    t0 = np.zeros(len(delta))
+    t1 = np.ones(len(delta))
+    mantidos = np.ones(len(delta), dtype=bool)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for p, q in ((-delta[:, 0], inicio[:, 0] - x_min), (delta[:, 0], x_max - inicio[:, 0]),
+                     (-delta[:, 1], inicio[:, 1] - y_min), (delta[:, 1], y_max - inicio[:, 1])):
+            razao = q / p
+            mantidos &= ~((p == 0) & (q < 0))
+            t0 = np.where(p < 0, np.maximum(t0, razao), t0)
+            t1 = np.where(p > 0, np.minimum(t1, razao), t1)
+
+    # Segmentos que só tocam o retângulo em um ponto também são descartados
+    mantidos &= t1 - t0 > 1e-12
+    indices = np.flatnonzero(mantidos)
+    if not len(indices):
+        return []
+    if len(indices) == len(delta) and np.all(t0 <= 0) and np.all(t1 >= 1):
+        return [coordenadas]  # Linha inteira dentro do retângulo
+
+    a = inicio + t0[:, None] * delta
+    b = inicio + t1[:, None] * delta
+
+    # Um trecho novo começa quando o segmento anterior foi descartado ou cortado no fim, ou o atual cortado no início
+    anteriores = indices[1:] - 1
+    continua = (anteriores == indices[:-1]) & (t1[anteriores] >= 1) & (t0[indices[1:]] <= 0)
+    cortes = np.flatnonzero(~continua) + 1
+
+    trechos = []
+    for grupo in np.split(indices, cortes):
+        trechos.append(np.vstack((a[grupo[0]], b[grupo])))
+    return trechos
+
+def _curvas_da_janela(caminho_raster, banda, janela, intervalo, base, limites=None):
+    """Gera as curvas de uma janela com gdal.ContourGenerate (executada nas threads do pool).
+
+    Cada chamada abre o seu próprio dataset, já que os datasets do GDAL não podem ser
+    compartilhados entre threads; o GDAL libera o GIL durante a leitura e a geração.
+    Com 'limites' (limites_da_janela), as curvas são recortadas nas costuras, descartando os
+    prolongamentos de meio pixel que o GDAL gera até a borda da janela.
+
+    Retorna:
+      Lista de tuplas (elevacao, coordenadas), com coordenadas em um array float64 (N, 2).
+    """
+    coluna0, linha0, largura, altura = janela
+
+    origem = gdal.Open(caminho_raster, gdal.GA_ReadOnly)
+    banda_origem = origem.GetRasterBand(banda)
+    nodata = banda_origem.GetNoDataValue()
+    dados = banda_origem.ReadAsArray(coluna0, linha0, largura, altura).astype(np.float64)
+
+    x0, px, rx, y0, ry, py = origem.GetGeoTransform()
+    memoria = gdal.GetDriverByName('MEM').Create('', largura, altura, 1, gdal.GDT_Float64)
+    memoria.SetGeoTransform((x0 + coluna0 * px + linha0 * rx, px, rx, y0 + coluna0 * ry + linha0 * py, ry, py))
+    banda_memoria = memoria.GetRasterBand(1)
+    if nodata is not None:
+        banda_memoria.SetNoDataValue(nodata)
+    banda_memoria.WriteArray(dados)
+
+    fonte_vetorial = fonte_vetorial_memoria()
+    camada = fonte_vetorial.CreateLayer('curvas', None, ogr.wkbLineString)
+    camada.CreateField(ogr.FieldDefn('ID', ogr.OFTInteger))
+    camada.CreateField(ogr.FieldDefn('ELEV', ogr.OFTReal))
+
+    gdal.ContourGenerate(banda_memoria, intervalo, base, [], 1 if nodata is not None else 0,
+                         nodata if nodata is not None else 0, camada, 0, 1)
+
+    curvas = []
+    for feicao in camada:
+        geometria = feicao.GetGeometryRef()
+        if geometria is None or geometria.GetPointCount() < 2:
+            continue
+        coordenadas = np.array(geometria.GetPoints(), dtype=np.float64)[:, :2]
+        trechos = recortar_linha(coordenadas, limites) if limites is not None else [coordenadas]
+        curvas.extend((feicao.GetField(1), trecho) for trecho in trechos)
+    return curvas
+
+def _unir_linhas(linhas, chave):
+    """Emenda as linhas cujas extremidades coincidem (mesma chave), formando cadeias contínuas.
+
+    Parâmetros:
+      - linhas: lista de arrays (N, 2).
+      - chave: função que converte um ponto em uma chave hashable (coordenadas arredondadas).
+
+    Retorna:
+      Lista de arrays (N, 2), uma por cadeia.
+    """
+    extremos = defaultdict(list)
+    for i, linha in enumerate(linhas):
+        extremos[chave(linha[0])].append(i)
+        extremos[chave(linha[-1])].append(i)
+
+    usadas = np.zeros(len(linhas), dtype=bool)
+
+    def estender(cadeia):
+        # Acrescenta ao fim da cadeia as linhas que começam (ou terminam) no seu último ponto
+        while True:
+            fim = chave(cadeia[-1][-1])
+            proxima = next((j for j in extremos[fim] if not usadas[j]), None)
+            if proxima is None:
+                return cadeia
+            usadas[proxima] = True
+            linha = linhas[proxima]
+            cadeia.append(linha[1:] if chave(linha[0]) == fim else linha[::-1][1:])
+
+    resultado = []
+    for i in range(len(linhas)):
+        if usadas[i]:
+            continue
+        usadas[i] = True
+        cadeia = estender([linhas[i]])
+        # Estende também a partir do início, invertendo a cadeia
+        cadeia = estender([np.concatenate(cadeia)[::-1]])
+        resultado.append(np.concatenate(cadeia)[::-1])
+    return resultado
+
+def gerar_curvas_em_blocos(caminho_raster, intervalo, banda=1, base=0.0, tamanho_tile=TAMANHO_TILE_PADRAO,
+                           max_workers=None, progresso=None, cancelado=None):
+    """Gera as curvas de nível de um raster em janelas processadas em paralelo e emenda as curvas nas costuras.
+
+    As curvas que não tocam nenhuma costura são entregues assim que a sua janela termina; só as que
+    tocam ficam em memória até o fim, quando são emendadas por elevação.
+
+    Parâmetros:
+      - caminho_raster: arquivo do raster (legível pelo GDAL).
+      - intervalo: equidistância entre as curvas.
+      - banda: banda do raster (padrão 1).
+      - base: cota de referência das curvas (padrão 0).
+      - tamanho_tile: lado das janelas em pixels.
+      - max_workers: número de threads (padrão: núcleos disponíveis).
+      - progresso: (opcional) função chamada com o número de janelas concluídas e o total de janelas.
+      - cancelado: (opcional) função sem argumentos; se retornar True, as janelas pendentes são
+        descartadas e o gerador termina sem emendar as curvas.
+
+    Retorna (gerador):
+      Lotes (listas) de tuplas (elevacao, coordenadas), com coordenadas em arrays float64 (N, 2).
+    """
+    origem = gdal.Open(caminho_raster, gdal.GA_ReadOnly)
+    if origem is None:
+        raise ValueError(f"O raster '{caminho_raster}' não pode ser aberto pelo GDAL.")
+    largura, altura = origem.RasterXSize, origem.RasterYSize
+    geotransform = origem.GetGeoTransform()
+    x0, px, _, y0, _, py = geotransform
+    origem = None
+
+    janelas, costuras_colunas, costuras_linhas = janelas_com_sobreposicao(largura, altura, tamanho_tile)
+
+    # Coordenadas das costuras (centros dos pixels compartilhados) e tolerância de comparação
+    tolerancia = 1e-6 * max(abs(px), abs(py))
+    costuras_x = np.array([x0 + (coluna + 0.5) * px for coluna in costuras_colunas])
+    costuras_y = np.array([y0 + (linha + 0.5) * py for linha in costuras_linhas])
+
+    def toca_costura(ponto):
+        return bool(np.any(np.abs(costuras_x - ponto[0]) <= tolerancia) or np.any(np.abs(costuras_y - ponto[1]) <= tolerancia))
+
+    def chave(ponto):
+        return (int(round(ponto[0] / tolerancia)), int(round(ponto[1] / tolerancia)))
+
+    pendentes = defaultdict(list)  # Curvas que tocam costuras, por elevação
+    max_workers = max_workers or os.cpu_count() or 2
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futuros = [executor.submit(_curvas_da_janela, caminho_raster, banda, janela, intervalo, base,
+                                   limites_da_janela(janela, largura, altura, geotransform))
+                   for janela in janelas]
+        for concluidas, futuro in enumerate(as_completed(futuros), start=1):
+            prontas = []
+            for elevacao, coordenadas in futuro.result():
+                if toca_costura(coordenadas[0]) or toca_costura(coordenadas[-1]):
+                    pendentes[elevacao].append(coordenadas)
+                else:
+                    prontas.append((elevacao, coordenadas))
+
+            for inicio in range(0, len(prontas), _TAMANHO_LOTE):
+                yield prontas[inicio:inicio + _TAMANHO_LOTE]
+
+            if progresso is not None:
+                progresso(concluidas, len(janelas))
+
+            if cancelado is not None and cancelado():
+                for pendente in futuros:
+                    pendente.cancel()
+                return
+
+    # Emenda as curvas que atravessam as costuras
+    for elevacao in sorted(pendentes):
+        emendadas = [(elevacao, linha) for linha in _unir_linhas(pendentes.pop(elevacao), chave)]
+        for inicio in range(0, len(emendadas), _TAMANHO_LOTE):
+            yield emendadas[inicio:inicio + _TAMANHO_LOTE]
+
+def linha_wkb(coordenadas, cota=None):
+    """Monta o WKB (little endian) de uma LineString a partir de um array (N, 2).
+
+    Se 'cota' for informada, monta uma LineString Z com essa Z constante em todos os vértices.
+    """
+    if cota is None:
+        return struct.pack('<BII', 1, 2, len(coordenadas)) + np.ascontiguousarray(coordenadas, dtype='<f8').tobytes()
+    pontos = np.empty((len(coordenadas), 3), dtype='<f8')
+    pontos[:, :2] = coordenadas
+    pontos[:, 2] = cota
+    return struct.pack('<BII', 1, 1002, len(coordenadas)) + pontos.tobytes()
+
+def gravar_curvas_gpkg(caminho_gpkg, crs_wkt, lotes, nome_camada='curvas', tolerancia=None, com_z=False):
+    """Grava as curvas em um GeoPackage (campos ID e ELEV), um lote por transação.
+
+    Parâmetros:
+      - caminho_gpkg: arquivo de saída (substituído se existir).
+      - crs_wkt: SRC das curvas em WKT.
+      - lotes: iterável de listas de (elevacao, coordenadas), como o de gerar_curvas_em_blocos().
+      - nome_camada: nome da tabela no GeoPackage.
+      - tolerancia: (opcional) tolerância de simplificação aplicada a cada curva.
+      - com_z: se True, grava LineStringZ com a cota de cada curva como Z.
+
+    Retorna:
+      Número de curvas gravadas.
+    """
+    driver = ogr.GetDriverByName('GPKG')
+    if os.path.exists(caminho_gpkg):
+        driver.DeleteDataSource(caminho_gpkg)
+    fonte = driver.CreateDataSource(caminho_gpkg)
+
+    srs = None
+    if crs_wkt:
+        srs = osr.SpatialReference()
+        srs.ImportFromWkt(crs_wkt)
+    camada = fonte.CreateLayer(nome_camada, srs, ogr.wkbLineString25D if com_z else ogr.wkbLineString)
+    camada.CreateField(ogr.FieldDefn('ID', ogr.OFTInteger))
+    camada.CreateField(ogr.FieldDefn('ELEV', ogr.OFTReal))
+    definicao = camada.GetLayerDefn()
+
+    quantidade = 0
+    for lote in lotes:
+        camada.StartTransaction()
+        for elevacao, coordenadas in lote:
+            if tolerancia:
+                simplificada = ogr.CreateGeometryFromWkb(linha_wkb(coordenadas)).Simplify(tolerancia)
+                if simplificada is None or simplificada.GetPointCount() < 2:
+                    continue
+                coordenadas = np.array(simplificada.GetPoints(), dtype=np.float64)[:, :2]
+
+            quantidade += 1
+            feicao = ogr.Feature(definicao)
+            feicao.SetField(0, quantidade)
+            feicao.SetField(1, float(elevacao))
+            feicao.SetGeometry(ogr.CreateGeometryFromWkb(linha_wkb(coordenadas, float(elevacao) if com_z else None)))
+            camada.CreateFeature(feicao)
+        camada.CommitTransaction()
+
+    fonte = None  # Fecha o arquivo
+    return quantidade
+
+def gerar_curvas_gpkg(caminho_raster, caminho_gpkg, intervalo, tolerancia=None, com_z=False, max_workers=None,
+                      progresso=None, cancelado=None, tamanho_tile=TAMANHO_TILE_PADRAO):
+    """Gera as curvas de um raster em janelas paralelas e grava direto em um GeoPackage no SRC do raster.
+
+    Reúne gerar_curvas_em_blocos() e gravar_curvas_gpkg(); não depende de camadas do projeto, por isso
+    pode ser executada em tarefas de segundo plano (é o que a fila de lote usa para cada raster).
+
+    Retorna:
+      Número de curvas gravadas.
+    """
+    origem = gdal.Open(caminho_raster, gdal.GA_ReadOnly)
+    if origem is None:
+        raise ValueError(f"O raster '{caminho_raster}' não pode ser aberto pelo GDAL.")
+    crs_wkt = origem.GetProjection()
+    origem = None
+
+    lotes = gerar_curvas_em_blocos(caminho_raster, intervalo, tamanho_tile=tamanho_tile, max_workers=max_workers,
+                                   progresso=progresso, cancelado=cancelado)
+    return gravar_curvas_gpkg(caminho_gpkg, crs_wkt, lotes, tolerancia=tolerancia, com_z=com_z)
+
+def copiar_curvas_simplificadas(camada_origem, camada_destino, tolerancia=0.01, campo_cota='ELEV',
+                                tamanho_lote=_TAMANHO_LOTE, progresso=None):
+    """Copia as curvas simplificadas para outra camada, em lotes enviados direto ao provedor.
+
+    Só o campo de cota é lido da origem (QgsFeatureRequest com subconjunto de atributos). A Z
+    constante de cada curva é aplicada por addZValue, sem remontar a linha vértice a vértice, e as
+    feições não passam pelo buffer de edição (nem pela pilha de desfazer) da camada de destino.
+
+    Parâmetros:
+      - camada_origem: QgsVectorLayer com as curvas e o campo de cota.
+      - camada_destino: QgsVectorLayer de linhas com um único campo, a cota; se for 3D, a cota vira a Z.
+      - tolerancia: tolerância da simplificação (padrão 0.01).
+      - campo_cota: nome do campo de cota na origem.
+      - tamanho_lote: feições enviadas por chamada a addFeatures.
+      - progresso: (opcional) função chamada com o número de feições já copiadas.
+
+    Retorna:
+      Número de feições copiadas.
+    """
+    provider = camada_destino.dataProvider()
+    com_z = QgsWkbTypes.hasZ(camada_destino.wkbType())
+
+    request = QgsFeatureRequest().setSubsetOfAttributes([campo_cota], camada_origem.fields())
+
+    lote = []
+    quantidade = 0
+    for feicao in camada_origem.getFeatures(request):
+        cota = feicao[campo_cota]
+        geometria = feicao.geometry().simplify(tolerancia)
+        if geometria.isEmpty():
+            continue
+        if com_z:
+            geometria.get().addZValue(cota)
+
+        nova_feicao = QgsFeature()
+        nova_feicao.setGeometry(geometria)
+        nova_feicao.setAttributes([cota])
+        lote.append(nova_feicao)
+
+        if len(lote) >= tamanho_lote:
+            provider.addFeatures(lote)
+            quantidade += len(lote)
+            lote = []
+            if progresso is not None:
+                progresso(quantidade)
+
+    if lote:
+        provider.addFeatures(lote)
+        quantidade += len(lote)
+        if progresso is not None:
+            progresso(quantidade)
+
+    camada_destino.updateExtents()
+    return quantidade
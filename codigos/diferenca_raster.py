@@ -0,0 +1,234 @@
+from osgeo import gdal
+import numpy as np
+import math
+
+from .raster_blocos import TAMANHO_BLOCO_PADRAO
+
+# NoData gravado no raster de diferenças
+NODATA_DIFERENCA = -9999.0
+
+# Tolerância (em frações de pixel) ao encaixar a extensão de interseção na grade do raster de referência
+_TOLERANCIA_GRADE = 1e-6
+
+class GradeComum:
+    """Grade regular sobre a qual as duas superfícies são comparadas.
+
+    Atributos:
+      - x_min, y_max: canto superior esquerdo.
+      - pixel_x, pixel_y: tamanho do pixel (positivos).
+      - largura, altura: número de colunas e linhas.
+    """
+
+    def __init__(self, x_min, y_max, pixel_x, pixel_y, largura, altura):
+        self.x_min = x_min
+        self.y_max = y_max
+        self.pixel_x = pixel_x
+        self.pixel_y = pixel_y
+        self.largura = largura
+        self.altura = altura
+
+    @property
+    def limites(self):
+        """Tupla (x_min, y_min, x_max, y_max), no formato de outputBounds do gdal.Warp."""
+        return (self.x_min, self.y_max - self.altura * self.pixel_y, self.x_min + self.largura * self.pixel_x, self.y_max)
+
+    @property
+    def area_pixel(self):
+        return self.pixel_x * self.pixel_y
+
+    def contar_blocos(self, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+        """Número de janelas percorridas por calcular_diferenca()."""
+        return -(-self.largura // tamanho_bloco) * -(-self.altura // tamanho_bloco)
+
+def grade_comum(raster_referencia, raster_secundario):
+    """Calcula a grade da área comum entre dois rasters, alinhada aos pixels do raster de referência.
+
+    A resolução e o alinhamento são os do raster de referência; a extensão é a interseção das
+    duas camadas, reduzida aos pixels inteiros da referência que ficam dentro dela.
+
+    Retorna:
+      GradeComum, ou None se os rasters não se sobrepõem.
+    """
+    extent_referencia = raster_referencia.extent()
+    intersecao = extent_referencia.intersect(raster_secundario.extent())
+    if intersecao.isEmpty():
+        return None
+
+    pixel_x = raster_referencia.rasterUnitsPerPixelX()
+    pixel_y = raster_referencia.rasterUnitsPerPixelY()
+    origem_x = extent_referencia.xMinimum()
+    origem_y = extent_referencia.yMaximum()
+
+    coluna0 = math.ceil((intersecao.xMinimum() - origem_x) / pixel_x - _TOLERANCIA_GRADE)
+    coluna1 = math.floor((intersecao.xMaximum() - origem_x) / pixel_x + _TOLERANCIA_GRADE)
+    linha0 = math.ceil((origem_y - intersecao.yMaximum()) / pixel_y - _TOLERANCIA_GRADE)
+    linha1 = math.floor((origem_y - intersecao.yMinimum()) / pixel_y + _TOLERANCIA_GRADE)
+
+    if coluna1 <= coluna0 or linha1 <= linha0:
+        return None
+
+    return GradeComum(origem_x + coluna0 * pixel_x, origem_y - linha0 * pixel_y, pixel_x, pixel_y, coluna1 - coluna0, linha1 - linha0)
+
+def grade_do_raster(raster_layer):
+    """Retorna a GradeComum que cobre o raster inteiro, com a sua resolução e alinhamento."""
+    extent = raster_layer.extent()
+    return GradeComum(extent.xMinimum(), extent.yMaximum(), raster_layer.rasterUnitsPerPixelX(),
+                      raster_layer.rasterUnitsPerPixelY(), raster_layer.width(), raster_layer.height())
+
+def _abrir_na_grade(raster_layer, grade, crs_wkt, reamostragem):
+    """Abre o raster como um VRT reprojetado (warped) sobre a grade comum.
+
+    Nada é lido nesse momento: o GDAL reamostra apenas as janelas pedidas depois, e os pixels
+    NoData ou fora do raster de origem chegam como NaN.
+
+    Retorna:
+      Tupla (origem, vrt); o dataset de origem precisa continuar referenciado enquanto o VRT for lido.
+    """
+    origem = gdal.Open(raster_layer.source(), gdal.GA_ReadOnly)
+    if origem is None:
+        raise RuntimeError(f"Não foi possível abrir o raster '{raster_layer.name()}' com o GDAL.")
+
+    opcoes = gdal.WarpOptions(
+        format='VRT',
+        outputBounds=grade.limites,
+        width=grade.largura,
+        height=grade.altura,
+        dstSRS=crs_wkt,
+        resampleAlg=reamostragem,
+        outputType=gdal.GDT_Float64,
+        dstNodata=float('nan'),
+    )
+    vrt = gdal.Warp('', origem, options=opcoes)
+    if vrt is None:
+        raise RuntimeError(f"Não foi possível alinhar o raster '{raster_layer.name()}' à grade comum.")
+    return origem, vrt
+
+def _criar_saida(caminho_saida, grade, crs_wkt):
+    """Cria o GeoTIFF float32 do raster de diferenças sobre a grade comum."""
+    driver = gdal.GetDriverByName('GTiff')
+    dataset = driver.Create(caminho_saida, grade.largura, grade.altura, 1, gdal.GDT_Float32, options=['TILED=YES', 'COMPRESS=LZW'])
+    if dataset is None:
+        raise RuntimeError(f"Não foi possível criar o arquivo '{caminho_saida}'.")
+    dataset.SetGeoTransform((grade.x_min, grade.pixel_x, 0.0, grade.y_max, 0.0, -grade.pixel_y))
+    dataset.SetProjection(crs_wkt)
+    dataset.GetRasterBand(1).SetNoDataValue(NODATA_DIFERENCA)
+    return dataset
+
+def calcular_diferenca(raster_primitivo, raster_modificado, caminho_saida=None, somar_volumes=True,
+                       reamostragem='bilinear', tamanho_bloco=TAMANHO_BLOCO_PADRAO, progresso=None):
+    """Calcula modificado - primitivo em janelas numpy, com os dois rasters alinhados na mesma grade.
+
+    O raster modificado é reamostrado sobre a grade do primitivo; um pixel só tem diferença quando
+    as duas superfícies têm valor nele (NoData em qualquer uma delas resulta em NoData).
+
+    Parâmetros:
+      - raster_primitivo: QgsRasterLayer da superfície original (define resolução e alinhamento).
+      - raster_modificado: QgsRasterLayer da superfície modificada, no mesmo SRC.
+      - caminho_saida: (opcional) GeoTIFF onde gravar as diferenças; se None, nada é gravado.
+      - somar_volumes: soma os volumes de corte e aterro na mesma passagem.
+      - reamostragem: algoritmo do GDAL usado no raster modificado ('near', 'bilinear', 'cubic'...).
+      - tamanho_bloco: lado da janela em pixels.
+      - progresso: (opcional) função chamada com o número de janelas já processadas.
+
+    Retorna:
+      Tupla (grade, total_corte, total_aterro); o corte é negativo e os totais são None
+      quando somar_volumes é falso. Retorna (None, None, None) se os rasters não se sobrepõem.
+    """
+    grade = grade_comum(raster_primitivo, raster_modificado)
+    if grade is None:
+        return None, None, None
+
+    # Os datasets ficam em variáveis até o fim: uma banda do GDAL não mantém o seu dataset aberto
+    crs_wkt = raster_primitivo.crs().toWkt()
+    origem_primitivo, vrt_primitivo = _abrir_na_grade(raster_primitivo, grade, crs_wkt, 'near')
+    origem_modificado, vrt_modificado = _abrir_na_grade(raster_modificado, grade, crs_wkt, reamostragem)
+    banda_primitivo = vrt_primitivo.GetRasterBand(1)
+    banda_modificado = vrt_modificado.GetRasterBand(1)
+
+    saida = _criar_saida(caminho_saida, grade, crs_wkt) if caminho_saida else None
+    banda_saida = saida.GetRasterBand(1) if saida is not None else None
+
+    soma_corte = 0.0
+    soma_aterro = 0.0
+    indice = 0
+
+    for linha0 in range(0, grade.altura, tamanho_bloco):
+        altura = min(tamanho_bloco, grade.altura - linha0)
+        for coluna0 in range(0, grade.largura, tamanho_bloco):
+            largura = min(tamanho_bloco, grade.largura - coluna0)
+
+            primitivo = banda_primitivo.ReadAsArray(coluna0, linha0, largura, altura)
+            modificado = banda_modificado.ReadAsArray(coluna0, linha0, largura, altura)
+
+            # NaN em qualquer superfície se propaga para a diferença
+            diferenca = modificado - primitivo
+            validos = np.isfinite(diferenca)
+
+            if banda_saida is not None:
+                banda_saida.WriteArray(np.where(validos, diferenca, NODATA_DIFERENCA).astype(np.float32), coluna0, linha0)
+
+            if somar_volumes:
+                soma_corte += np.sum(diferenca, where=validos & (diferenca < 0))
+                soma_aterro += np.sum(diferenca, where=validos & (diferenca > 0))
+
+            indice += 1
+            if progresso is not None:
+                progresso(indice)
+
+    if saida is not None:
+        banda_saida.FlushCache()
+        saida = None  # Fecha o arquivo
+
+    if not somar_volumes:
+        return grade, None, None
+    return grade, float(soma_corte) * grade.area_pixel, float(soma_aterro) * grade.area_pixel
+
+def comparar_superficies(raster_primitivo, rasters_modificados, reamostragem='bilinear',
+                         tamanho_bloco=TAMANHO_BLOCO_PADRAO, progresso=None):
+    """Soma corte e aterro de várias superfícies em relação a um mesmo raster primitivo.
+
+    O primitivo é percorrido uma única vez: cada janela dele é lida uma vez e comparada com a janela
+    correspondente de todas as superfícies, reamostradas sobre a grade do primitivo. Pixels fora de
+    uma superfície (ou NoData em qualquer uma das duas) não entram nos volumes daquela comparação.
+
+    Parâmetros:
+      - raster_primitivo: QgsRasterLayer da superfície de referência.
+      - rasters_modificados: lista de QgsRasterLayer das superfícies comparadas (ex.: levantamentos por época).
+      - reamostragem: algoritmo do GDAL usado nas superfícies comparadas.
+      - tamanho_bloco: lado da janela em pixels.
+      - progresso: (opcional) função chamada com o número de janelas do primitivo já processadas.
+
+    Retorna:
+      Lista de tuplas (total_corte, total_aterro), na ordem de rasters_modificados; o corte é negativo.
+    """
+    grade = grade_do_raster(raster_primitivo)
+    crs_wkt = raster_primitivo.crs().toWkt()
+
+    # Os datasets ficam em listas até o fim: uma banda do GDAL não mantém o seu dataset aberto
+    abertos = [_abrir_na_grade(raster_primitivo, grade, crs_wkt, 'near')]
+    abertos += [_abrir_na_grade(raster, grade, crs_wkt, reamostragem) for raster in rasters_modificados]
+    bandas = [vrt.GetRasterBand(1) for _, vrt in abertos]
+    banda_primitivo, bandas_modificadas = bandas[0], bandas[1:]
+
+    somas_corte = np.zeros(len(bandas_modificadas))
+    somas_aterro = np.zeros(len(bandas_modificadas))
+    indice = 0
+
+    for linha0 in range(0, grade.altura, tamanho_bloco):
+        altura = min(tamanho_bloco, grade.altura - linha0)
+        for coluna0 in range(0, grade.largura, tamanho_bloco):
+            largura = min(tamanho_bloco, grade.largura - coluna0)
+
+            primitivo = banda_primitivo.ReadAsArray(coluna0, linha0, largura, altura)
+            if np.isfinite(primitivo).any():
+                for i, banda in enumerate(bandas_modificadas):
+                    diferenca = banda.ReadAsArray(coluna0, linha0, largura, altura) - primitivo
+                    validos = np.isfinite(diferenca)
+                    somas_corte[i] += np.sum(diferenca, where=validos & (diferenca < 0))
+                    somas_aterro[i] += np.sum(diferenca, where=validos & (diferenca > 0))
+
+            indice += 1
+            if progresso is not None:
+                progresso(indice)
+
+    return [(float(corte) * grade.area_pixel, float(aterro) * grade.area_pixel) for corte, aterro in zip(somas_corte, somas_aterro)]
@@ -0,0 +1,211 @@
+import numpy as np
+import ezdxf
+
+# Prefixo das camadas DXF que recebem as curvas e os rótulos
+CAMADA_DXF_CURVAS = "Curvas de Níveis 3D"
+
+# Estilo de texto dos rótulos, criado uma única vez por documento
+ESTILO_ROTULOS = "Rotulos Curvas"
+
+# Conversão das cores escolhidas no ConfigDialog para RGB
+CORES_RGB = {
+    'Red': (255, 0, 0),
+    'Yellow': (255, 255, 0),
+    'Green': (0, 255, 0),
+    'Cyan': (0, 255, 255),
+    'Blue': (0, 0, 255),
+    'Magenta': (255, 0, 255),
+    'Gray': (180, 180, 180),
+}
+
+# Feições lidas, posicionadas e gravadas por vez
+_TAMANHO_LOTE = 5000
+
+# Tipos WKB de linha (2D, Z, M, ZM e 2.5D) e o número de valores por vértice
+_DIMENSOES_LINHA = {2: 2, 1002: 3, 2002: 3, 3002: 4, 0x80000002: 3}
+_DIMENSOES_MULTILINHA = {5: 2, 1005: 3, 2005: 3, 3005: 4, 0x80000005: 3}
+
+def fator_escala_dxf(escala, tamanho):
+    """Fator aplicado ao tamanho e ao deslocamento dos rótulos: escala * tamanho / 30000."""
+    return escala * tamanho / 30000
+
+def _linha_do_wkb(wkb, deslocamento, dimensoes, ordem):
+    """Lê uma LineString (sem o cabeçalho) a partir de 'deslocamento'; retorna (coordenadas XY, próximo deslocamento)."""
+    quantidade = int(np.frombuffer(wkb, dtype=ordem + 'u4', count=1, offset=deslocamento)[0])
+    valores = np.frombuffer(wkb, dtype=ordem + 'f8', count=quantidade * dimensoes, offset=deslocamento + 4)
+    return valores.reshape(quantidade, dimensoes)[:, :2], deslocamento + 4 + 8 * quantidade * dimensoes
+
+def partes_wkb(wkb):
+    """Extrai as coordenadas XY de uma geometria de linha (simples ou multipartes) em WKB.
+
+    Retorna:
+      Lista de arrays (N, 2), uma por parte; vazia se o WKB não for de linha.
+    """
+    if not wkb:
+        return []
+    ordem = '<' if wkb[0] == 1 else '>'
+    tipo = int(np.frombuffer(wkb, dtype=ordem + 'u4', count=1, offset=1)[0])
+    if tipo in _DIMENSOES_LINHA:
+        return [_linha_do_wkb(wkb, 5, _DIMENSOES_LINHA[tipo], ordem)[0]]
+    if tipo not in _DIMENSOES_MULTILINHA:
+        return []
+
+    partes = []
+    deslocamento = 9
+    for _ in range(int(np.frombuffer(wkb, dtype=ordem + 'u4', count=1, offset=5)[0])):
+        coordenadas, deslocamento = _linha_do_wkb(wkb, deslocamento + 5, _DIMENSOES_MULTILINHA[tipo], ordem)
+        partes.append(coordenadas)
+    return partes
+
+def posicoes_rotulos(linhas, distancia_repeticao):
+    """Calcula as posições dos rótulos de todas as linhas de uma vez, com comprimentos acumulados em numpy.
+
+    Em cada linha os rótulos ficam a cada 'distancia_repeticao' a partir do início; linhas mais curtas
+    que a distância recebem um único rótulo no meio do seu segmento central.
+
+    Parâmetros:
+      - linhas: lista de arrays (N, 2), com N >= 2.
+      - distancia_repeticao: distância entre rótulos consecutivos.
+
+    Retorna:
+      Tupla (indices_linhas, x, y, angulos): a linha de cada rótulo, suas coordenadas e o ângulo (graus)
+      do segmento em que ele está.
+    """
+    tamanhos = np.array([len(linha) for linha in linhas], dtype=np.int64)
+    inicios = np.concatenate(([0], np.cumsum(tamanhos)[:-1]))
+    fins = inicios + tamanhos - 1  # Índice do último vértice de cada linha
+    coordenadas = np.concatenate(linhas)
+
+    # Segmentos de todas as linhas; os que ligam uma linha à seguinte têm comprimento zero
+    delta = np.diff(coordenadas, axis=0)
+    comprimentos = np.hypot(delta[:, 0], delta[:, 1])
+    comprimentos[fins[:-1]] = 0.0
+    acumulado = np.concatenate(([0.0], np.cumsum(comprimentos)))
+    comprimento_linhas = acumulado[fins] - acumulado[inicios]
+
+    # Rótulos a cada distância de repetição ao longo de cada linha
+    if distancia_repeticao > 0:
+        quantidades = np.floor(comprimento_linhas / distancia_repeticao).astype(np.int64)
+    else:
+        quantidades = np.zeros(len(linhas), dtype=np.int64)
+    indices_linhas = np.repeat(np.arange(len(linhas)), quantidades)
+    ordem = np.arange(quantidades.sum()) - np.repeat(np.cumsum(quantidades) - quantidades, quantidades) + 1
+    distancias = acumulado[inicios[indices_linhas]] + ordem * distancia_repeticao
+
+    segmentos = np.searchsorted(acumulado, distancias, side='left') - 1
+    segmentos = np.clip(segmentos, inicios[indices_linhas], fins[indices_linhas] - 1)
+    com_comprimento = comprimentos[segmentos] > 0
+    fracao = np.zeros(len(segmentos))
+    np.divide(distancias - acumulado[segmentos], comprimentos[segmentos], out=fracao, where=com_comprimento)
+    fracao = np.clip(fracao, 0.0, 1.0)
+
+    # Linhas sem rótulo (mais curtas que a repetição): um rótulo no meio do segmento central
+    curtas = np.flatnonzero(quantidades == 0)
+    segmentos_curtas = inicios[curtas] + tamanhos[curtas] // 2 - 1
+
+    indices_linhas = np.concatenate((indices_linhas, curtas))
+    segmentos = np.concatenate((segmentos, segmentos_curtas))
+    fracao = np.concatenate((fracao, np.full(len(curtas), 0.5)))
+
+    x = coordenadas[segmentos, 0] + fracao * delta[segmentos, 0]
+    y = coordenadas[segmentos, 1] + fracao * delta[segmentos, 1]
+    angulos = np.degrees(np.arctan2(delta[segmentos, 1], delta[segmentos, 0]))
+    return indices_linhas, x, y, angulos
+
+def _preparar_documento(cores):
+    """Cria o documento com as camadas de mestras e simples (cores por camada) e o estilo dos rótulos.
+
+    Retorna:
+      Tupla (doc, camadas), com camadas = {True: (linhas, rótulos) das mestras, False: das simples}.
+    """
+    doc = ezdxf.new(dxfversion='R2010')
+    if not doc.styles.has_entry(ESTILO_ROTULOS):
+        doc.styles.new(ESTILO_ROTULOS, dxfattribs={'font': 'arial.ttf', 'height': 0})
+
+    camadas = {}
+    for mestra, (cor_linha, cor_rotulo, padrao) in ((True, ('cor1', 'cor3', 'Red')), (False, ('cor2', 'cor4', 'Yellow'))):
+        sufixo = "Mestras" if mestra else "Simples"
+        nomes = (f"{CAMADA_DXF_CURVAS} - {sufixo}", f"{CAMADA_DXF_CURVAS} - Rótulos {sufixo}")
+        for nome, chave in zip(nomes, (cor_linha, cor_rotulo)):
+            camada = doc.layers.new(nome, dxfattribs={'color': 7})
+            camada.rgb = CORES_RGB.get(cores.get(chave, padrao), (255, 0, 0))
+        camadas[mestra] = nomes
+    return doc, camadas
+
+def escrever_dxf_curvas(camada, caminho, desnivel_m, cores, posicao, tamanho, repeticao, fator_escala,
+                        progresso=None, cancelado=None):
+    """Grava as curvas de uma camada (campo ELEV) em DXF, com polilinhas e rótulos.
+
+    As curvas com ELEV múltiplo de 'desnivel_m' vão para as camadas das mestras (cores 'cor1' e 'cor3'); as
+    demais, para as das simples ('cor2' e 'cor4'). As cores ficam nas camadas (BYLAYER). Cada curva é uma
+    LWPOLYLINE com a cota como elevação, e os rótulos de cada lote de feições são posicionados de uma vez
+    por posicoes_rotulos().
+
+    Parâmetros:
+      - camada: QgsVectorLayer de linhas com o campo ELEV.
+      - caminho: arquivo DXF de saída.
+      - desnivel_m: desnível das curvas mestras.
+      - cores: dicionário das cores do ConfigDialog ('cor1' a 'cor4').
+      - posicao, tamanho, repeticao: posição ('Acima', 'Abaixo' ou 'Centro'), tamanho e repetição dos rótulos.
+      - fator_escala: fator calculado por fator_escala_dxf().
+      - progresso: (opcional) função chamada com o número de feições já gravadas.
+      - cancelado: (opcional) função sem argumentos; se retornar True, a exportação é interrompida.
+
+    Retorna:
+      True se o arquivo foi salvo; False se a exportação foi cancelada.
+    """
+    doc, camadas = _preparar_documento(cores)
+    msp = doc.modelspace()
+
+    altura_texto = tamanho * fator_escala
+    deslocamento = {'Acima': 1.5, 'Abaixo': -1.5}.get(posicao, 0.0) * tamanho * fator_escala
+
+    def gravar_lote(linhas, cotas):
+        cotas = np.asarray(cotas, dtype=np.float64)
+        mestras = (np.mod(cotas, desnivel_m) == 0).tolist()
+        textos = [str(cota) for cota in cotas.tolist()]
+
+        for linha, cota, mestra in zip(linhas, cotas.tolist(), mestras):
+            msp.add_lwpolyline(linha.tolist(), format='xy', dxfattribs={'layer': camadas[mestra][0], 'elevation': cota})
+
+        indices, x, y, angulos = posicoes_rotulos(linhas, repeticao)
+        if deslocamento:
+            # Desloca os rótulos perpendicularmente aos segmentos
+            alfa = np.radians(angulos + 90)
+            x = x + deslocamento * np.cos(alfa)
+            y = y + deslocamento * np.sin(alfa)
+
+        for indice, xr, yr, angulo in zip(indices.tolist(), x.tolist(), y.tolist(), angulos.tolist()):
+            msp.add_mtext(textos[indice], dxfattribs={
+                'layer': camadas[mestras[indice]][1],
+                'style': ESTILO_ROTULOS,
+                'char_height': altura_texto,
+                'rotation': angulo,
+                'insert': (xr, yr),
+                'attachment_point': 5,
+            })
+
+    linhas = []
+    cotas = []
+    for contador, feature in enumerate(camada.getFeatures(), start=1):
+        cota = feature['ELEV']
+        for parte in partes_wkb(bytes(feature.geometry().asWkb())):
+            if len(parte) >= 2:
+                linhas.append(parte)
+                cotas.append(cota)
+
+        if len(linhas) >= _TAMANHO_LOTE:
+            if cancelado is not None and cancelado():
+                return False
+            gravar_lote(linhas, cotas)
+            linhas, cotas = [], []
+            if progresso is not None:
+                progresso(contador)
+
+    if linhas:
+        gravar_lote(linhas, cotas)
+        if progresso is not None:
+            progresso(contador)
+
+    doc.saveas(caminho)
+    return True
@@ -0,0 +1,167 @@
+from qgis.core import QgsMesh
+import numpy as np
+import re
+import os
+
+def extrair_topologia_malha(mesh_layer, remover_degenerados=True):
+    """Lê os vértices e as faces de uma camada de malha diretamente do provedor (QgsMesh).
+
+    As faces com mais de três vértices são trianguladas em leque a partir do primeiro vértice,
+    e os vértices sem Z (malhas 2D) recebem Z = 0.
+
+    Parâmetros:
+      - mesh_layer: QgsMeshLayer a ser lida.
+      - remover_degenerados: descarta triângulos com vértices colineares em planta.
+
+    Retorna:
+      Tupla (vertices, triangulos): array float64 (N, 3) com X, Y, Z e array int64 (M, 3)
+      com os índices (base 0) dos vértices de cada triângulo.
+    """
+    malha = QgsMesh()
+    mesh_layer.dataProvider().populateMesh(malha)
+
+    total_vertices = malha.vertexCount()
+    vertices = np.empty((total_vertices, 3), dtype=np.float64)
+    for i in range(total_vertices):
+        vertice = malha.vertex(i)
+        vertices[i] = (vertice.x(), vertice.y(), vertice.z())
+    vertices[np.isnan(vertices[:, 2]), 2] = 0.0
+
+    triangulos = triangular_faces([malha.face(i) for i in range(malha.faceCount())])
+
+    if remover_degenerados and len(triangulos):
+        triangulos = triangulos[~triangulos_colineares(vertices, triangulos)]
+
+    return vertices, triangulos
+
+def triangular_faces(faces):
+    """Triangula em leque uma lista de faces (listas de índices de vértices).
+
+    As faces são agrupadas pelo número de vértices para que cada grupo seja triangulado
+    de uma vez; a ordem original é preservada quando todas as faces são triângulos.
+
+    Retorna:
+      Array int64 (M, 3) com os índices dos triângulos.
+    """
+    grupos = {}
+    for face in faces:
+        if len(face) >= 3:
+            grupos.setdefault(len(face), []).append(face)
+
+    partes = []
+    for tamanho, grupo in sorted(grupos.items()):
+        indices = np.asarray(grupo, dtype=np.int64)
+        for k in range(1, tamanho - 1):
+            partes.append(indices[:, [0, k, k + 1]])
+
+    if not partes:
+        return np.empty((0, 3), dtype=np.int64)
+    return np.concatenate(partes)
+
+def triangulos_colineares(vertices, triangulos):
+    """Retorna a máscara dos triângulos cujos vértices são colineares em planta (área XY nula)."""
+    p1 = vertices[triangulos[:, 0], :2]
+    p2 = vertices[triangulos[:, 1], :2]
+    p3 = vertices[triangulos[:, 2], :2]
+    return (p2[:, 0] - p1[:, 0]) * (p3[:, 1] - p1[:, 1]) == (p3[:, 0] - p1[:, 0]) * (p2[:, 1] - p1[:, 1])
+
+# Registro de uma faceta do STL binário: normal, três vértices e o campo de atributos (50 bytes)
+_DTYPE_STL_FACETA = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('atributo', '<u2'),
+])
+
+# Origem local gravada no cabeçalho do STL binário ("ORIGEM x y z")
+_PADRAO_ORIGEM_STL = re.compile(rb'ORIGEM\s+(\S+)\s+(\S+)\s+(\S+)')
+
+# Linhas "vertex x y z" do STL ASCII
+_PADRAO_VERTICE_STL = re.compile(r'^\s*vertex\s+(\S+)\s+(\S+)\s+(\S+)', re.MULTILINE)
+
+def calcular_normais(vertices, triangulos):
+    """Calcula as normais unitárias dos triângulos pela regra da mão direita (v1 - v0) x (v2 - v0).
+
+    Triângulos degenerados recebem normal nula.
+
+    Retorna:
+      Array float64 (M, 3).
+    """
+    p0 = vertices[triangulos[:, 0]]
+    normais = np.cross(vertices[triangulos[:, 1]] - p0, vertices[triangulos[:, 2]] - p0)
+    comprimentos = np.linalg.norm(normais, axis=1, keepdims=True)
+    np.divide(normais, comprimentos, out=normais, where=comprimentos > 0)
+    return normais
+
+def escrever_stl_binario(caminho, vertices, triangulos, origem=None):
+    """Grava a malha em um arquivo STL binário, com as normais das facetas calculadas.
+
+    O formato armazena as coordenadas em float32 (cerca de 7 algarismos significativos), o que em
+    coordenadas UTM (nortes perto de 7.500.000) significa passos de ~0,5 m. Por isso as coordenadas
+    são gravadas relativas a uma origem local, registrada no cabeçalho ("ORIGEM x y z") e somada
+    de volta por ler_stl().
+
+    Parâmetros:
+      - caminho: arquivo .stl de saída.
+      - vertices, triangulos: arrays (N, 3) float64 e (M, 3) int64 da malha.
+      - origem: (opcional) origem local (x, y, z); se None, usa o canto mínimo da malha, arredondado ao metro.
+    """
+    if origem is None:
+        origem = np.floor(vertices.min(axis=0)) if len(vertices) else np.zeros(3)
+    origem = np.asarray(origem, dtype=np.float64)
+
+    facetas = np.zeros(len(triangulos), dtype=_DTYPE_STL_FACETA)
+    facetas['normal'] = calcular_normais(vertices, triangulos)
+    facetas['vertices'] = vertices[triangulos] - origem
+
+    cabecalho = 'Tempo Salvo Tools ORIGEM %.3f %.3f %.3f' % tuple(origem.tolist())
+    with open(caminho, 'wb') as arquivo:
+        arquivo.write(cabecalho.encode('ascii')[:80].ljust(80, b' '))
+        arquivo.write(np.uint32(len(facetas)).tobytes())
+        facetas.tofile(arquivo)
+
+def _stl_binario(caminho):
+    """Verifica se o arquivo é um STL binário pelo tamanho esperado a partir do número de facetas.
+
+    O cabeçalho não é confiável: muitos exportadores gravam "solid" também nos arquivos binários.
+    """
+    tamanho = os.path.getsize(caminho)
+    if tamanho < 84:
+        return False
+    with open(caminho, 'rb') as arquivo:
+        arquivo.seek(80)
+        total_facetas = int(np.frombuffer(arquivo.read(4), dtype='<u4')[0])
+    return tamanho == 84 + total_facetas * _DTYPE_STL_FACETA.itemsize
+
+def ler_stl(caminho):
+    """Lê um arquivo STL, binário ou ASCII, e unifica os vértices repetidos.
+
+    Parâmetros:
+      - caminho: caminho do arquivo .stl.
+
+    Retorna:
+      Tupla (vertices, triangulos): array float64 (N, 3) com os vértices únicos e
+      array int64 (M, 3) com os índices (base 0) dos vértices de cada triângulo.
+    """
+    if _stl_binario(caminho):
+        with open(caminho, 'rb') as arquivo:
+            dados = arquivo.read()
+        facetas = np.frombuffer(dados, dtype=_DTYPE_STL_FACETA, offset=84)
+        coordenadas = facetas['vertices'].reshape(-1, 3).astype(np.float64)
+
+        # Arquivos gravados pelo plugin guardam a origem local no cabeçalho
+        origem = _PADRAO_ORIGEM_STL.search(dados[:80])
+        if origem:
+            coordenadas += np.array([float(valor) for valor in origem.groups()])
+    else:
+        with open(caminho, 'r', encoding='utf-8', errors='replace') as arquivo:
+            texto = arquivo.read()
+        valores = _PADRAO_VERTICE_STL.findall(texto)
+        coordenadas = np.array(valores, dtype=np.float64).reshape(-1, 3)
+        coordenadas = coordenadas[:len(coordenadas) - len(coordenadas) % 3]  # Descarta uma faceta incompleta no final
+
+    if not len(coordenadas):
+        return np.empty((0, 3)), np.empty((0, 3), dtype=np.int64)
+
+    # Vértices com as mesmas coordenadas passam a ser um único vértice
+    vertices, inverso = np.unique(coordenadas, axis=0, return_inverse=True)
+    return vertices, inverso.reshape(-1, 3).astype(np.int64)
@@ -0,0 +1,170 @@
+from qgis.core import QgsRectangle
+import numpy as np
+
+from .raster_blocos import bloco_para_array, geotransform_provider
+from .transformacoes_crs import obter_transformacao
+
+# Tamanho (em pixels) dos blocos lidos ao longo do corredor da linha
+TAMANHO_BLOCO_CORREDOR = 256
+
+# Limite padrão de amostras por linha de perfil
+MAX_AMOSTRAS_PADRAO = 20000
+
+# Ângulo de deflexão (graus) a partir do qual os segmentos vizinhos ao vértice são refinados
+_ANGULO_REFINO = 10.0
+
+# Refino máximo (passo dividido por este fator) nos vértices com deflexão de 180 graus
+_FATOR_REFINO_MAXIMO = 4.0
+
+def passo_pelo_pixel(raster_layers, map_crs):
+    """Passo de amostragem igual ao menor pixel entre as camadas raster, em unidades do SRC do mapa.
+
+    Para camadas em outro SRC, o tamanho do pixel é obtido pela largura da extensão transformada
+    dividida pelo número de colunas.
+
+    Parâmetros:
+      - raster_layers: lista de QgsRasterLayer.
+      - map_crs: SRC do mapa (em que a linha do perfil foi desenhada).
+
+    Retorna:
+      O menor tamanho de pixel, ou None se não houver camadas válidas.
+    """
+    passos = []
+    for layer in raster_layers:
+        if layer is None or not layer.isValid() or layer.width() <= 0:
+            continue
+        if layer.crs() == map_crs:
+            passos.append(layer.rasterUnitsPerPixelX())
+        else:
+            extensao = obter_transformacao(layer.crs(), map_crs).transformBoundingBox(layer.extent())
+            passos.append(extensao.width() / layer.width())
+
+    passos = [passo for passo in passos if passo > 0]
+    return min(passos) if passos else None
+
+def amostrar_polilinha(vertices, passo, max_amostras=MAX_AMOSTRAS_PADRAO, refinar_curvatura=True):
+    """Distribui amostras ao longo de uma polilinha com espaçamento derivado de 'passo'.
+
+    Todos os vértices da linha são amostrados. Cada segmento recebe amostras a no máximo 'passo'
+    de distância; com refinar_curvatura, os segmentos vizinhos a vértices com deflexão acima de
+    10 graus usam um passo menor (até 4 vezes, proporcional ao ângulo). Se o total exceder
+    'max_amostras', todos os passos são ampliados na mesma proporção.
+
+    Parâmetros:
+      - vertices: array (N, 2) com os vértices da linha.
+      - passo: espaçamento desejado entre amostras.
+      - max_amostras: (opcional) limite de amostras; None para não limitar.
+      - refinar_curvatura: refina perto dos vértices em que a linha muda de direção.
+
+    Retorna:
+      Tupla (distancias, xs, ys) de arrays com a distância acumulada e as coordenadas de cada amostra.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 2)
+    if len(vertices) < 2:
+        return np.zeros(len(vertices)), vertices[:, 0].copy(), vertices[:, 1].copy()
+
+    delta = np.diff(vertices, axis=0)
+    comprimentos = np.hypot(delta[:, 0], delta[:, 1])
+    acumulado = np.concatenate(([0.0], np.cumsum(comprimentos)))
+
+    passos = np.full(len(comprimentos), float(passo))
+    if refinar_curvatura and len(comprimentos) > 1:
+        # Deflexão em cada vértice interno, aplicada aos dois segmentos que se encontram nele
+        azimutes = np.arctan2(delta[:, 1], delta[:, 0])
+        deflexao = np.abs((np.diff(azimutes) + np.pi) % (2 * np.pi) - np.pi)
+        deflexao[deflexao < np.radians(_ANGULO_REFINO)] = 0.0
+        deflexao_segmento = np.zeros(len(comprimentos))
+        deflexao_segmento[:-1] = deflexao
+        deflexao_segmento[1:] = np.maximum(deflexao_segmento[1:], deflexao)
+        passos /= 1.0 + (_FATOR_REFINO_MAXIMO - 1.0) * deflexao_segmento / np.pi
+
+    quantidades = np.maximum(np.ceil(comprimentos / passos), 1).astype(np.int64)
+    if max_amostras is not None and quantidades.sum() + 1 > max_amostras:
+        escala = quantidades.sum() / max(max_amostras - 1, 1)
+        quantidades = np.maximum(np.ceil(comprimentos / (passos * escala)), 1).astype(np.int64)
+
+    # Frações 0, 1/n, ..., (n-1)/n de cada segmento, mais o último vértice
+    segmentos = np.repeat(np.arange(len(comprimentos)), quantidades)
+    ordem = np.arange(quantidades.sum()) - np.repeat(np.cumsum(quantidades) - quantidades, quantidades)
+    fracao = ordem / quantidades[segmentos]
+
+    xs = np.append(vertices[segmentos, 0] + fracao * delta[segmentos, 0], vertices[-1, 0])
+    ys = np.append(vertices[segmentos, 1] + fracao * delta[segmentos, 1], vertices[-1, 1])
+    distancias = np.append(acumulado[segmentos] + fracao * comprimentos[segmentos], acumulado[-1])
+    return distancias, xs, ys
+
+def amostrar_corredor(provider, xs, ys, banda=1, tamanho_bloco=TAMANHO_BLOCO_CORREDOR, progresso=None, cancelado=None):
+    """Lê o valor do pixel (como o identify) em todas as amostras, lendo só os blocos tocados pela linha.
+
+    O raster é dividido em blocos de tamanho_bloco x tamanho_bloco pixels e apenas os blocos que
+    contêm alguma amostra (o corredor da linha) são lidos do provedor, um de cada vez.
+
+    Parâmetros:
+      - provider: QgsRasterDataProvider (um clone, quando usado fora da thread principal).
+      - xs, ys: arrays com as coordenadas das amostras, no SRC do raster.
+      - banda: banda a ser lida (padrão 1).
+      - progresso: (opcional) função chamada com (blocos lidos, total de blocos).
+      - cancelado: (opcional) função sem argumentos; se retornar True, a leitura é interrompida.
+
+    Retorna:
+      Array float64 com os valores (NaN fora do raster ou em NoData), ou None se cancelado.
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    valores = np.full(xs.shape, np.nan)
+
+    x_min, y_max, pixel_x, pixel_y = geotransform_provider(provider)
+    largura_total = provider.xSize()
+    altura_total = provider.ySize()
+    with np.errstate(invalid='ignore'):
+        colunas = np.floor((xs - x_min) / pixel_x)
+        linhas = np.floor((y_max - ys) / pixel_y)
+    dentro = (colunas >= 0) & (colunas < largura_total) & (linhas >= 0) & (linhas < altura_total)
+    indices = np.flatnonzero(dentro)
+    colunas = colunas[indices].astype(np.int64)
+    linhas = linhas[indices].astype(np.int64)
+
+    # Agrupa as amostras pelo bloco que as contém
+    blocos_por_linha = -(-largura_total // tamanho_bloco)
+    chaves = (linhas // tamanho_bloco) * blocos_por_linha + colunas // tamanho_bloco
+    ordem = np.argsort(chaves, kind='stable')
+    chaves_unicas, inicios = np.unique(chaves[ordem], return_index=True)
+    fins = np.append(inicios[1:], len(ordem))
+
+    for lidos, (chave, inicio, fim) in enumerate(zip(chaves_unicas.tolist(), inicios.tolist(), fins.tolist()), start=1):
+        if cancelado is not None and cancelado():
+            return None
+
+        linha0 = (chave // blocos_por_linha) * tamanho_bloco
+        coluna0 = (chave % blocos_por_linha) * tamanho_bloco
+        altura = min(tamanho_bloco, altura_total - linha0)
+        largura = min(tamanho_bloco, largura_total - coluna0)
+        janela = QgsRectangle(
+            x_min + coluna0 * pixel_x,
+            y_max - (linha0 + altura) * pixel_y,
+            x_min + (coluna0 + largura) * pixel_x,
+            y_max - linha0 * pixel_y)
+        dados, mascara = bloco_para_array(provider.block(banda, janela, largura, altura), largura, altura)
+        dados[~mascara] = np.nan
+
+        selecao = ordem[inicio:fim]
+        valores[indices[selecao]] = dados[linhas[selecao] - linha0, colunas[selecao] - coluna0]
+
+        if progresso is not None:
+            progresso(lidos, len(chaves_unicas))
+    return valores
+
+def trechos_validos(distancias, valores):
+    """Divide um perfil em trechos contínuos com valor, descartando as amostras NaN.
+
+    Retorna:
+      Lista de dicionários {'distances': array, 'values': array}, um por trecho.
+    """
+    validos = ~np.isnan(valores)
+    if not validos.any():
+        return []
+
+    # Limites dos trechos: posições em que a validade muda
+    mudancas = np.flatnonzero(np.diff(np.concatenate(([False], validos, [False])).astype(np.int8)))
+    return [{'distances': distancias[inicio:fim], 'values': valores[inicio:fim]}
+            for inicio, fim in zip(mudancas[::2].tolist(), mudancas[1::2].tolist())]
@@ -0,0 +1,123 @@
+import numpy as np
+
+class IndiceLinha:
+    """Índice de uma polilinha para consultas distância -> ponto em O(log n).
+
+    As distâncias acumuladas e os vetores unitários de direção de cada segmento são calculados
+    uma única vez; cada consulta localiza o segmento com np.searchsorted e desloca o ponto inicial
+    ao longo da direção do segmento.
+    """
+
+    def __init__(self, pontos, distancias=None):
+        """
+        Parâmetros:
+          - pontos: lista de QgsPointXY (ou array (N, 2)) com os vértices da linha.
+          - distancias: (opcional) distâncias acumuladas já conhecidas de cada vértice; se None,
+            são calculadas a partir dos vértices.
+        """
+        if isinstance(pontos, np.ndarray):
+            self.vertices = np.asarray(pontos, dtype=np.float64).reshape(-1, 2)
+        else:
+            self.vertices = np.array([(ponto.x(), ponto.y()) for ponto in pontos], dtype=np.float64).reshape(-1, 2)
+
+        delta = np.diff(self.vertices, axis=0)
+        if distancias is None:
+            self.distancias = np.concatenate(([0.0], np.cumsum(np.hypot(delta[:, 0], delta[:, 1]))))
+        else:
+            self.distancias = np.asarray(distancias, dtype=np.float64)
+
+        # Direção de cada segmento por unidade de distância (zero nos segmentos de comprimento nulo)
+        comprimentos = np.diff(self.distancias)
+        self.direcoes = np.zeros_like(delta)
+        np.divide(delta, comprimentos[:, None], out=self.direcoes, where=comprimentos[:, None] > 0)
+
+    def __len__(self):
+        return len(self.vertices)
+
+    @property
+    def comprimento(self):
+        """Distância acumulada do último vértice (0 para linhas sem segmentos)."""
+        return float(self.distancias[-1]) if len(self.distancias) else 0.0
+
+    def pontos_nas_distancias(self, distancias):
+        """Localiza vários pontos de uma vez pelas distâncias acumuladas.
+
+        Retorna:
+          Tupla (xs, ys) de arrays; NaN para as distâncias fora do intervalo da linha.
+        """
+        distancias = np.asarray(distancias, dtype=np.float64)
+        xs = np.full(distancias.shape, np.nan)
+        ys = np.full(distancias.shape, np.nan)
+        if len(self.vertices) < 2:
+            return xs, ys
+
+        dentro = (distancias >= self.distancias[0]) & (distancias <= self.distancias[-1])
+        d = distancias[dentro]
+        segmentos = np.clip(np.searchsorted(self.distancias, d, side='right') - 1, 0, len(self.direcoes) - 1)
+        avanco = d - self.distancias[segmentos]
+        xs[dentro] = self.vertices[segmentos, 0] + avanco * self.direcoes[segmentos, 0]
+        ys[dentro] = self.vertices[segmentos, 1] + avanco * self.direcoes[segmentos, 1]
+        return xs, ys
+
+    def ponto_na_distancia(self, distancia):
+        """Retorna (x, y) na distância acumulada informada, ou None se ela estiver fora da linha."""
+        xs, ys = self.pontos_nas_distancias([distancia])
+        if np.isnan(xs[0]):
+            return None
+        return float(xs[0]), float(ys[0])
+
+class IndiceCurvas:
+    """Curvas de perfil (distâncias e valores) em arrays numpy, para a interação do gráfico com o cursor.
+
+    Guarda cada trecho contínuo de cada perfil e o intervalo total de distâncias, de modo que cada
+    movimento do mouse faça apenas uma busca binária por trecho, sem reconstruir listas.
+    """
+
+    def __init__(self, all_profiles):
+        """
+        Parâmetros:
+          - all_profiles: lista de dicionários {'layer', 'profiles': [{'distances', 'values'}, ...]}.
+        """
+        self.trechos = []  # (índice do perfil, distâncias, valores)
+        for indice, profile_data in enumerate(all_profiles):
+            for segment in profile_data['profiles']:
+                distancias = np.asarray(segment['distances'], dtype=np.float64)
+                if len(distancias):
+                    self.trechos.append((indice, distancias, np.asarray(segment['values'], dtype=np.float64)))
+
+        if self.trechos:
+            self.x_min = min(float(distancias[0]) for _, distancias, _ in self.trechos)
+            self.x_max = max(float(distancias[-1]) for _, distancias, _ in self.trechos)
+        else:
+            self.x_min = self.x_max = None
+
+    def contem(self, x):
+        """Indica se x está dentro do intervalo de distâncias de alguma curva."""
+        return self.x_min is not None and self.x_min <= x <= self.x_max
+
+    def valor_mais_proximo(self, x, y):
+        """Interpola todas as curvas em x e escolhe a mais próxima de y.
+
+        Retorna:
+          Tupla (valor interpolado, índice do perfil), ou (None, None) se nenhuma curva cobrir x.
+        """
+        melhor_valor = None
+        melhor_indice = None
+        menor_diferenca = float('inf')
+        for indice, distancias, valores in self.trechos:
+            if not distancias[0] <= x <= distancias[-1]:
+                continue
+            i = min(max(int(np.searchsorted(distancias, x, side='right')) - 1, 0), len(distancias) - 2)
+            if i < 0:
+                valor = float(valores[0])
+            else:
+                intervalo = distancias[i + 1] - distancias[i]
+                fracao = (x - distancias[i]) / intervalo if intervalo > 0 else 0.0
+                valor = float(valores[i] + fracao * (valores[i + 1] - valores[i]))
+
+            diferenca = abs(y - valor)
+            if diferenca < menor_diferenca:
+                menor_diferenca = diferenca
+                melhor_valor = valor
+                melhor_indice = indice
+        return melhor_valor, melhor_indice
@@ -0,0 +1,69 @@
+import numpy as np
+
+# Cada nível agrupa 'FATOR_NIVEL' vezes mais amostras que o anterior
+FATOR_NIVEL = 4
+
+# Níveis deixam de ser criados quando restariam menos grupos que isto
+_MINIMO_GRUPOS = 256
+
+class PiramideCurva:
+    """Pirâmide de resoluções de uma curva de perfil, com decimação por mínimo/máximo ('peak').
+
+    O nível 0 é a curva completa; cada nível seguinte guarda, para cada grupo de amostras, o ponto de
+    menor e o de maior valor, na ordem em que aparecem. Assim os picos e vales continuam visíveis em
+    qualquer escala, e o gráfico escolhe o nível de acordo com a faixa visível e a largura em pixels.
+    """
+
+    def __init__(self, x, y):
+        """
+        Parâmetros:
+          - x: array com as distâncias (crescentes).
+          - y: array com os valores, sem NaN.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.niveis = [(1, x, y)]  # (amostras por grupo, x, y)
+
+        grupo = FATOR_NIVEL
+        while len(x) // grupo >= _MINIMO_GRUPOS:
+            self.niveis.append((grupo,) + self._decimar(x, y, grupo))
+            grupo *= FATOR_NIVEL
+
+    @staticmethod
+    def _decimar(x, y, grupo):
+        """Mínimo e máximo de cada grupo de 'grupo' amostras (o último grupo pode ser menor)."""
+        quantidade = -(-len(y) // grupo)
+        # Completa o último grupo repetindo a última amostra
+        preenchido = np.concatenate((y, np.full(quantidade * grupo - len(y), y[-1])))
+        blocos = preenchido.reshape(quantidade, grupo)
+
+        base = np.arange(quantidade) * grupo
+        indice_min = np.minimum(base + blocos.argmin(axis=1), len(y) - 1)
+        indice_max = np.minimum(base + blocos.argmax(axis=1), len(y) - 1)
+
+        # Intercala mínimo e máximo na ordem das distâncias
+        indices = np.column_stack((np.minimum(indice_min, indice_max), np.maximum(indice_min, indice_max))).ravel()
+        return x[indices], y[indices]
+
+    def dados_visiveis(self, x_inicio, x_fim, largura_pixels):
+        """Seleciona o nível e o trecho da curva a desenhar para a faixa visível.
+
+        Usa o nível mais grosso que ainda tenha ao menos um grupo por pixel dentro da faixa e recorta
+        as amostras fora dela (mantendo uma de cada lado, para a linha chegar às bordas).
+
+        Retorna:
+          Tupla (x, y) de arrays.
+        """
+        _, x, _ = self.niveis[0]
+        visiveis = np.searchsorted(x, x_fim, side='right') - np.searchsorted(x, x_inicio, side='left')
+
+        nivel = self.niveis[0]
+        for candidato in self.niveis[1:]:
+            if visiveis / candidato[0] < max(largura_pixels, 1):
+                break
+            nivel = candidato
+
+        _, x, y = nivel
+        inicio = max(int(np.searchsorted(x, x_inicio, side='left')) - 1, 0)
+        fim = min(int(np.searchsorted(x, x_fim, side='right')) + 1, len(x))
+        return x[inicio:fim], y[inicio:fim]
@@ -0,0 +1,504 @@
+from qgis.core import Qgis, QgsRectangle, QgsGeometry, QgsFeature
+from osgeo import gdal, ogr, osr
+import numpy as np
+
+# Tamanho padrão (em pixels) das janelas lidas do provedor; 512 x 512 float64 ocupa ~2 MB
+TAMANHO_BLOCO_PADRAO = 512
+
+# Correspondência entre os tipos de dados do QGIS e os tipos do numpy
+_TIPOS_NUMPY = {
+    Qgis.Byte: np.uint8,
+    Qgis.UInt16: np.uint16,
+    Qgis.Int16: np.int16,
+    Qgis.UInt32: np.uint32,
+    Qgis.Int32: np.int32,
+    Qgis.Float32: np.float32,
+    Qgis.Float64: np.float64,
+}
+
+def geotransform_provider(provider):
+    """Obtém a origem e o tamanho do pixel de um provedor raster.
+
+    Parâmetros:
+      - provider: QgsRasterDataProvider do raster.
+
+    Retorna:
+      Tupla (x_min, y_max, tamanho_pixel_x, tamanho_pixel_y).
+    """
+    extent = provider.extent()
+    pixel_x = extent.width() / provider.xSize()
+    pixel_y = extent.height() / provider.ySize()
+    return extent.xMinimum(), extent.yMaximum(), pixel_x, pixel_y
+
+def bloco_para_array(bloco, largura, altura):
+    """Converte um QgsRasterBlock em um array numpy e em uma máscara de pixels válidos.
+
+    Parâmetros:
+      - bloco: QgsRasterBlock retornado por provider.block().
+      - largura, altura: dimensões do bloco em pixels.
+
+    Retorna:
+      Tupla (dados, mascara) com os valores em float64 e True onde o pixel não é NoData.
+    """
+    tipo = _TIPOS_NUMPY.get(bloco.dataType())
+    if tipo is None:
+        raise ValueError(f"Tipo de dado raster não suportado: {bloco.dataType()}")
+
+    dados = np.frombuffer(bytes(bloco.data()), dtype=tipo).reshape(altura, largura).astype(np.float64)
+
+    mascara = np.isfinite(dados)
+    if bloco.hasNoDataValue():
+        mascara &= dados != bloco.noDataValue()
+
+    return dados, mascara
+
+def contar_blocos(provider, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """Retorna o número de janelas que iterar_blocos() produzirá para o provedor."""
+    colunas = -(-provider.xSize() // tamanho_bloco)
+    linhas = -(-provider.ySize() // tamanho_bloco)
+    return colunas * linhas
+
+def iterar_blocos(provider, banda=1, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """Percorre o raster em janelas de até tamanho_bloco x tamanho_bloco pixels.
+
+    Apenas uma janela fica em memória por vez, o que mantém o consumo constante
+    independentemente do tamanho do raster.
+
+    Parâmetros:
+      - provider: QgsRasterDataProvider do raster.
+      - banda: número da banda a ser lida (padrão 1).
+      - tamanho_bloco: lado da janela em pixels.
+
+    Retorna (gerador):
+      Tuplas (linha_inicial, coluna_inicial, dados, mascara) para cada janela.
+    """
+    x_min, y_max, pixel_x, pixel_y = geotransform_provider(provider)
+    largura_total = provider.xSize()
+    altura_total = provider.ySize()
+
+    for linha0 in range(0, altura_total, tamanho_bloco):
+        altura = min(tamanho_bloco, altura_total - linha0)
+        for coluna0 in range(0, largura_total, tamanho_bloco):
+            largura = min(tamanho_bloco, largura_total - coluna0)
+
+            janela = QgsRectangle(
+                x_min + coluna0 * pixel_x,
+                y_max - (linha0 + altura) * pixel_y,
+                x_min + (coluna0 + largura) * pixel_x,
+                y_max - linha0 * pixel_y)
+
+            bloco = provider.block(banda, janela, largura, altura)
+            dados, mascara = bloco_para_array(bloco, largura, altura)
+
+            yield linha0, coluna0, dados, mascara
+
+def somar_corte_aterro(provider, banda=1, tamanho_bloco=TAMANHO_BLOCO_PADRAO, progresso=None):
+    """Soma os volumes de corte e aterro de um raster de diferenças, bloco a bloco.
+
+    Valores negativos são corte e positivos são aterro; pixels NoData são ignorados.
+
+    Parâmetros:
+      - provider: QgsRasterDataProvider do raster de diferenças.
+      - banda: banda com as diferenças de cota (padrão 1).
+      - tamanho_bloco: lado da janela em pixels.
+      - progresso: (opcional) função chamada com o número de blocos já processados.
+
+    Retorna:
+      Tupla (total_corte, total_aterro) em unidades de volume; o corte é negativo.
+    """
+    _, _, pixel_x, pixel_y = geotransform_provider(provider)
+    area_pixel = pixel_x * pixel_y
+
+    soma_corte = 0.0
+    soma_aterro = 0.0
+
+    for indice, (_, _, dados, mascara) in enumerate(iterar_blocos(provider, banda, tamanho_bloco), start=1):
+        soma_corte += np.sum(dados, where=mascara & (dados < 0))
+        soma_aterro += np.sum(dados, where=mascara & (dados > 0))
+
+        if progresso is not None:
+            progresso(indice)
+
+    return float(soma_corte) * area_pixel, float(soma_aterro) * area_pixel
+
+# Layout WKB (little endian) de um polígono com um anel de 5 vértices: 93 bytes por pixel
+_DTYPE_WKB_QUADRADO = np.dtype([
+    ('ordem', 'u1'),
+    ('tipo', '<u4'),
+    ('aneis', '<u4'),
+    ('pontos', '<u4'),
+    ('coords', '<f8', (10,)),
+])
+
+def quadrados_pixels_wkb(x_min, y_min, x_max, y_max):
+    """Monta de uma só vez o WKB dos retângulos de vários pixels.
+
+    Parâmetros:
+      - x_min, y_min, x_max, y_max: arrays numpy com os limites de cada pixel.
+
+    Retorna:
+      Lista de objetos bytes, um WKB de Polygon por pixel.
+    """
+    quantidade = len(x_min)
+    wkb = np.empty(quantidade, dtype=_DTYPE_WKB_QUADRADO)
+    wkb['ordem'] = 1  # Little endian
+    wkb['tipo'] = 3  # Polygon
+    wkb['aneis'] = 1
+    wkb['pontos'] = 5
+    # Mesma sequência de vértices de QgsGeometry.fromRect
+    wkb['coords'] = np.column_stack([x_min, y_min, x_min, y_max, x_max, y_max, x_max, y_min, x_min, y_min])
+
+    bruto = wkb.tobytes()
+    tamanho = _DTYPE_WKB_QUADRADO.itemsize
+    return [bruto[i * tamanho:(i + 1) * tamanho] for i in range(quantidade)]
+
+def criar_feicoes(geometrias_wkb, atributos):
+    """Cria a lista de QgsFeature a partir de WKBs e das listas de atributos correspondentes."""
+    feicoes = []
+    for wkb, valores in zip(geometrias_wkb, atributos):
+        geometria = QgsGeometry()
+        geometria.fromWkb(wkb)
+        feicao = QgsFeature()
+        feicao.setGeometry(geometria)
+        feicao.setAttributes(list(valores))
+        feicoes.append(feicao)
+    return feicoes
+
+def escrever_poligonos_pixels(provider, destino, montar_atributos, banda=1, tamanho_bloco=TAMANHO_BLOCO_PADRAO, progresso=None):
+    """Escreve um polígono por pixel válido do raster, com um addFeatures por bloco.
+
+    Parâmetros:
+      - provider: QgsRasterDataProvider do raster de origem.
+      - destino: QgsVectorDataProvider da camada de polígonos.
+      - montar_atributos: função (ids, valores, areas) -> iterável com a lista de atributos de cada feição.
+        Os ids seguem a numeração linha a linha do raster, começando em 1.
+      - banda: banda a ser lida (padrão 1).
+      - tamanho_bloco: lado da janela em pixels.
+      - progresso: (opcional) função chamada com o número de blocos já processados.
+
+    Retorna:
+      Tupla (quantidade, valor_minimo, valor_maximo) das feições escritas; mínimo e máximo são None se vazio.
+    """
+    x_origem, y_origem, pixel_x, pixel_y = geotransform_provider(provider)
+    largura_total = provider.xSize()
+    area_pixel = pixel_x * pixel_y
+
+    quantidade = 0
+    valor_minimo = None
+    valor_maximo = None
+
+    for indice, (linha0, coluna0, dados, mascara) in enumerate(iterar_blocos(provider, banda, tamanho_bloco), start=1):
+        linhas, colunas = np.nonzero(mascara)
+
+        if linhas.size:
+            valores = dados[linhas, colunas]
+            linhas = linhas + linha0
+            colunas = colunas + coluna0
+            ids = linhas * largura_total + colunas + 1
+
+            x_min = x_origem + colunas * pixel_x
+            y_max = y_origem - linhas * pixel_y
+            geometrias = quadrados_pixels_wkb(x_min, y_max - pixel_y, x_min + pixel_x, y_max)
+
+            atributos = montar_atributos(ids, valores, np.full(valores.shape, area_pixel))
+            destino.addFeatures(criar_feicoes(geometrias, atributos))
+
+            quantidade += valores.size
+            bloco_min = float(valores.min())
+            bloco_max = float(valores.max())
+            valor_minimo = bloco_min if valor_minimo is None else min(valor_minimo, bloco_min)
+            valor_maximo = bloco_max if valor_maximo is None else max(valor_maximo, bloco_max)
+
+        if progresso is not None:
+            progresso(indice)
+
+    return quantidade, valor_minimo, valor_maximo
+
+# Layout WKB (little endian, ISO) de um PointZ: 29 bytes por ponto
+_DTYPE_WKB_PONTO_Z = np.dtype([
+    ('ordem', 'u1'),
+    ('tipo', '<u4'),
+    ('coords', '<f8', (3,)),
+])
+
+def pontos_z_wkb(x, y, z):
+    """Monta de uma só vez o WKB de vários pontos PointZ.
+
+    Parâmetros:
+      - x, y, z: arrays numpy com as coordenadas de cada ponto.
+
+    Retorna:
+      Lista de objetos bytes, um WKB de PointZ por ponto.
+    """
+    quantidade = len(x)
+    wkb = np.empty(quantidade, dtype=_DTYPE_WKB_PONTO_Z)
+    wkb['ordem'] = 1  # Little endian
+    wkb['tipo'] = 1001  # PointZ
+    wkb['coords'] = np.column_stack([x, y, z])
+
+    bruto = wkb.tobytes()
+    tamanho = _DTYPE_WKB_PONTO_Z.itemsize
+    return [bruto[i * tamanho:(i + 1) * tamanho] for i in range(quantidade)]
+
+def passo_para_limite(largura, altura, passo=1, max_pontos=None):
+    """Retorna o menor passo (>= passo) com o qual a amostragem de uma grade largura x altura
+    produz no máximo max_pontos pixels; sem limite, retorna o próprio passo."""
+    if not max_pontos:
+        return passo
+    passo = max(passo, int(np.ceil(np.sqrt(largura * altura / max_pontos))))
+    while -(-largura // passo) * -(-altura // passo) > max_pontos:
+        passo += 1
+    return passo
+
+def escrever_pontos_pixels(provider, destino, montar_atributos, passo=1, arredondar=None, banda=1,
+                           tamanho_bloco=TAMANHO_BLOCO_PADRAO, progresso=None):
+    """Escreve um ponto PointZ no centro de cada pixel válido, com um addFeatures por bloco.
+
+    Parâmetros:
+      - provider: QgsRasterDataProvider do raster de origem.
+      - destino: QgsVectorDataProvider da camada de pontos.
+      - montar_atributos: função (ids, x, y, z) -> iterável com a lista de atributos de cada feição.
+        Os ids seguem a numeração linha a linha do raster, começando em 1.
+      - passo: usa apenas um pixel a cada passo linhas e colunas (1 = todos).
+      - arredondar: (opcional) tupla com as casas decimais de X, Y e Z.
+      - banda: banda a ser lida (padrão 1).
+      - tamanho_bloco: lado da janela em pixels.
+      - progresso: (opcional) função chamada com o número de blocos já processados.
+
+    Retorna:
+      Número de pontos escritos.
+    """
+    x_origem, y_origem, pixel_x, pixel_y = geotransform_provider(provider)
+    largura_total = provider.xSize()
+    quantidade = 0
+
+    for indice, (linha0, coluna0, dados, mascara) in enumerate(iterar_blocos(provider, banda, tamanho_bloco), start=1):
+        # Linhas e colunas do bloco que caem na grade do passo (múltiplos de passo no raster inteiro)
+        linhas_bloco = np.arange((-linha0) % passo, dados.shape[0], passo)
+        colunas_bloco = np.arange((-coluna0) % passo, dados.shape[1], passo)
+        selecionados, selecionadas = np.nonzero(mascara[np.ix_(linhas_bloco, colunas_bloco)])
+
+        if selecionados.size:
+            linhas = linhas_bloco[selecionados]
+            colunas = colunas_bloco[selecionadas]
+            z = dados[linhas, colunas]
+            linhas = linhas + linha0
+            colunas = colunas + coluna0
+
+            ids = linhas * largura_total + colunas + 1
+            x = x_origem + (colunas + 0.5) * pixel_x
+            y = y_origem - (linhas + 0.5) * pixel_y
+            if arredondar is not None:
+                x, y, z = np.round(x, arredondar[0]), np.round(y, arredondar[1]), np.round(z, arredondar[2])
+
+            atributos = montar_atributos(ids, x, y, z)
+            destino.addFeatures(criar_feicoes(pontos_z_wkb(x, y, z), atributos))
+            quantidade += z.size
+
+        if progresso is not None:
+            progresso(indice)
+
+    return quantidade
+
+def fonte_vetorial_memoria():
+    """Cria uma fonte de dados OGR em memória.
+
+    Usa o driver 'MEM' (GDAL 3.11 ou mais recente, em que 'Memory' está obsoleto) e, nas versões
+    anteriores, o driver 'Memory'.
+    """
+    driver = ogr.GetDriverByName('MEM')
+    if driver is None or not driver.GetMetadataItem(gdal.DCAP_VECTOR):
+        driver = ogr.GetDriverByName('Memory')
+    return driver.CreateDataSource('')
+
+def poligonizar_valores_iguais(raster_layer, destino, montar_atributos, banda=1, tamanho_lote=5000, progresso=None):
+    """Dissolve pixels vizinhos de mesmo valor em polígonos com GDAL Polygonize.
+
+    Pixels NoData são ignorados através da banda de máscara do GDAL. Para rasters
+    de ponto flutuante é usado FPolygonize, que compara os valores sem truncá-los.
+
+    Parâmetros:
+      - raster_layer: QgsRasterLayer de origem; precisa ser legível pelo GDAL.
+      - destino: QgsVectorDataProvider da camada de polígonos.
+      - montar_atributos: função (ids, valores, areas) -> iterável com a lista de atributos de cada feição.
+      - banda: banda a ser poligonizada (padrão 1).
+      - tamanho_lote: quantidade de feições enviadas por chamada de addFeatures.
+      - progresso: (opcional) função chamada com o percentual concluído (0 a 100).
+
+    Retorna:
+      Tupla (quantidade, valor_minimo, valor_maximo) das feições escritas; mínimo e máximo são None se vazio.
+    """
+    fonte = gdal.Open(raster_layer.source()) if raster_layer.providerType() == 'gdal' else None
+    if fonte is None:
+        raise ValueError(f"O raster '{raster_layer.name()}' não pode ser aberto pelo GDAL.")
+
+    banda_gdal = fonte.GetRasterBand(banda)
+
+    fonte_vetorial = fonte_vetorial_memoria()
+    srs = osr.SpatialReference()
+    srs.ImportFromWkt(fonte.GetProjection())
+    camada_ogr = fonte_vetorial.CreateLayer('poligonos', srs, ogr.wkbPolygon)
+    camada_ogr.CreateField(ogr.FieldDefn('Value', ogr.OFTReal))
+
+    def callback_gdal(fracao, mensagem, dados):
+        if progresso is not None:
+            progresso(int(fracao * 100))
+        return 1
+
+    ponto_flutuante = banda_gdal.DataType in (gdal.GDT_Float32, gdal.GDT_Float64)
+    poligonizar = gdal.FPolygonize if ponto_flutuante else gdal.Polygonize
+    poligonizar(banda_gdal, banda_gdal.GetMaskBand(), camada_ogr, 0, [], callback=callback_gdal)
+
+    resumo = {'quantidade': 0, 'minimo': None, 'maximo': None}
+
+    def enviar_lote(geometrias, valores, areas):
+        valores = np.asarray(valores, dtype=np.float64)
+        inicio = resumo['quantidade'] + 1
+        ids = np.arange(inicio, inicio + valores.size)
+        atributos = montar_atributos(ids, valores, np.asarray(areas, dtype=np.float64))
+        destino.addFeatures(criar_feicoes(geometrias, atributos))
+
+        resumo['quantidade'] += valores.size
+        lote_min = float(valores.min())
+        lote_max = float(valores.max())
+        resumo['minimo'] = lote_min if resumo['minimo'] is None else min(resumo['minimo'], lote_min)
+        resumo['maximo'] = lote_max if resumo['maximo'] is None else max(resumo['maximo'], lote_max)
+
+    geometrias, valores, areas = [], [], []
+    for feicao_ogr in camada_ogr:
+        geometria_ogr = feicao_ogr.GetGeometryRef()
+        geometrias.append(bytes(geometria_ogr.ExportToWkb()))
+        valores.append(feicao_ogr.GetField(0))
+        areas.append(geometria_ogr.GetArea())
+
+        if len(geometrias) >= tamanho_lote:
+            enviar_lote(geometrias, valores, areas)
+            geometrias, valores, areas = [], [], []
+
+    if geometrias:
+        enviar_lote(geometrias, valores, areas)
+
+    return resumo['quantidade'], resumo['minimo'], resumo['maximo']
+
+def rasterizar_zonas(provider, geometrias_wkb, numeros=None):
+    """Grava uma única vez o raster de zonas na grade do provedor (em memória, pelo GDAL).
+
+    Cada pixel recebe o número da geometria que contém o seu centro, ou 0 fora de
+    todas elas; onde as geometrias se sobrepõem prevalece a última da lista. Para zonas
+    sobrepostas, separe-as antes com grupos_sem_sobreposicao() e rasterize cada grupo.
+
+    Parâmetros:
+      - provider: QgsRasterDataProvider que define a grade.
+      - geometrias_wkb: lista de WKBs dos polígonos, já no SRC do raster.
+      - numeros: (opcional) número gravado para cada geometria (inteiros a partir de 1); por padrão,
+        a posição da geometria na lista, começando em 1. Geometrias podem compartilhar o mesmo número.
+
+    Retorna:
+      Dataset GDAL (driver MEM) com uma banda inteira de números de zona.
+    """
+    x_min, y_max, pixel_x, pixel_y = geotransform_provider(provider)
+    if numeros is None:
+        numeros = range(1, len(geometrias_wkb) + 1)
+    numeros = list(numeros)
+    tipo = gdal.GDT_UInt16 if max(numeros, default=0) < 65535 else gdal.GDT_UInt32
+
+    zonas = gdal.GetDriverByName('MEM').Create('', provider.xSize(), provider.ySize(), 1, tipo)
+    zonas.SetGeoTransform((x_min, pixel_x, 0.0, y_max, 0.0, -pixel_y))
+
+    fonte_vetorial = fonte_vetorial_memoria()
+    camada_ogr = fonte_vetorial.CreateLayer('zonas', None, ogr.wkbUnknown)
+    camada_ogr.CreateField(ogr.FieldDefn('zona', ogr.OFTInteger))
+
+    for numero, wkb in zip(numeros, geometrias_wkb):
+        feicao_ogr = ogr.Feature(camada_ogr.GetLayerDefn())
+        feicao_ogr.SetGeometry(ogr.CreateGeometryFromWkb(wkb))
+        feicao_ogr.SetField('zona', numero)
+        camada_ogr.CreateFeature(feicao_ogr)
+
+    gdal.RasterizeLayer(zonas, [1], camada_ogr, options=['ATTRIBUTE=zona'])
+    return zonas
+
+def grupos_sem_sobreposicao(geometrias_wkb):
+    """Distribui os polígonos em grupos nos quais nenhum par se sobrepõe (apenas encostar é permitido).
+
+    Cada polígono vai para o primeiro grupo em que não sobrepõe nenhum outro; os candidatos são
+    filtrados pelos envelopes antes do teste de área da interseção.
+
+    Parâmetros:
+      - geometrias_wkb: lista de WKBs dos polígonos.
+
+    Retorna:
+      Lista de listas com as posições (base 0) das geometrias de cada grupo; um único grupo
+      quando não há sobreposição.
+    """
+    geometrias = [ogr.CreateGeometryFromWkb(wkb) for wkb in geometrias_wkb]
+    if not geometrias:
+        return []
+
+    # Envelopes como (x_min, x_max, y_min, y_max)
+    envelopes = np.array([geometria.GetEnvelope() for geometria in geometrias], dtype=np.float64)
+    grupo_de = np.full(len(geometrias), -1, dtype=np.int64)
+    grupos = []
+
+    for i, geometria in enumerate(geometrias):
+        anteriores = envelopes[:i]
+        candidatos = np.flatnonzero((anteriores[:, 0] < envelopes[i, 1]) & (anteriores[:, 1] > envelopes[i, 0]) &
+                                    (anteriores[:, 2] < envelopes[i, 3]) & (anteriores[:, 3] > envelopes[i, 2]))
+        conflitos = set()
+        for j in candidatos.tolist():
+            if grupo_de[j] in conflitos or not geometria.Intersects(geometrias[j]):
+                continue
+            intersecao = geometria.Intersection(geometrias[j])
+            if intersecao is not None and intersecao.GetArea() > 0:
+                conflitos.add(int(grupo_de[j]))
+
+        destino = next((g for g in range(len(grupos)) if g not in conflitos), len(grupos))
+        if destino == len(grupos):
+            grupos.append([])
+        grupos[destino].append(i)
+        grupo_de[i] = destino
+    return grupos
+
+def somar_corte_aterro_por_zona(provider, zonas, total_zonas, banda=1, tamanho_bloco=TAMANHO_BLOCO_PADRAO, progresso=None):
+    """Soma corte, aterro e área válida de cada zona em uma única passagem pelo raster de diferenças.
+
+    Em cada bloco, os valores são acumulados por zona com np.bincount sobre a janela
+    correspondente do raster de zonas.
+
+    Parâmetros:
+      - provider: QgsRasterDataProvider do raster de diferenças.
+      - zonas: dataset retornado por rasterizar_zonas() para o mesmo provedor.
+      - total_zonas: maior número de zona presente no raster de zonas.
+      - banda: banda com as diferenças de cota (padrão 1).
+      - tamanho_bloco: lado da janela em pixels.
+      - progresso: (opcional) função chamada com o número de blocos já processados.
+
+    Retorna:
+      Tupla (corte, aterro, area) de arrays float64 com total_zonas posições (a posição i corresponde
+      à zona i + 1); o corte é negativo e a área considera apenas pixels com valor.
+    """
+    _, _, pixel_x, pixel_y = geotransform_provider(provider)
+    area_pixel = pixel_x * pixel_y
+    banda_zonas = zonas.GetRasterBand(1)
+    tamanho = total_zonas + 1  # Posição 0: pixels fora das zonas
+
+    corte = np.zeros(tamanho)
+    aterro = np.zeros(tamanho)
+    pixels = np.zeros(tamanho)
+
+    for indice, (linha0, coluna0, dados, mascara) in enumerate(iterar_blocos(provider, banda, tamanho_bloco), start=1):
+        altura, largura = dados.shape
+        numeros = banda_zonas.ReadAsArray(coluna0, linha0, largura, altura).astype(np.intp)
+
+        validos = mascara & (numeros > 0) & (numeros <= total_zonas)
+        numeros_validos = numeros[validos]
+        valores = dados[validos]
+
+        corte += np.bincount(numeros_validos, weights=np.minimum(valores, 0.0), minlength=tamanho)
+        aterro += np.bincount(numeros_validos, weights=np.maximum(valores, 0.0), minlength=tamanho)
+        pixels += np.bincount(numeros_validos, minlength=tamanho)
+
+        if progresso is not None:
+            progresso(indice)
+
+    return corte[1:] * area_pixel, aterro[1:] * area_pixel, pixels[1:] * area_pixel
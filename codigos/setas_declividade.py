@@ -0,0 +1,166 @@
+from qgis.core import QgsGeometry
+import numpy as np
+
+from .amostragem_raster import obter_amostrador
+
+# Segmento de dois pontos (LineString) dentro do WKB de uma seta
+_DTYPE_WKB_SEGMENTO = np.dtype([
+    ('ordem', 'u1'),
+    ('tipo', '<u4'),
+    ('pontos', '<u4'),
+    ('coords', '<f8', (4,)),
+])
+
+def _dtype_wkb_seta(pontos_haste):
+    """MultiLineString de uma seta: a haste (com 'pontos_haste' vértices), as duas abas da cabeça e os dois fechamentos."""
+    return np.dtype([
+        ('ordem', 'u1'),
+        ('tipo', '<u4'),
+        ('partes', '<u4'),
+        ('haste_ordem', 'u1'),
+        ('haste_tipo', '<u4'),
+        ('haste_pontos', '<u4'),
+        ('haste', '<f8', (2 * pontos_haste,)),
+        ('cabeca', _DTYPE_WKB_SEGMENTO, (4,)),
+    ])
+
+def segmentos_das_feicoes(feicoes, transformacao=None):
+    """Explode as linhas em segmentos: cada par de vértices consecutivos das linhas simples vira um segmento,
+    e cada parte das linhas multipartes é mantida inteira.
+
+    Parâmetros:
+      - feicoes: iterável de QgsFeature de linhas.
+      - transformacao: (opcional) QgsCoordinateTransform aplicada às geometrias.
+
+    Retorna:
+      Lista de arrays (N, 2) com os vértices de cada segmento (N >= 2).
+    """
+    segmentos = []
+    for feicao in feicoes:
+        geometria = QgsGeometry(feicao.geometry())
+        if geometria.isEmpty():
+            continue
+        if transformacao is not None:
+            geometria.transform(transformacao)
+
+        if geometria.isMultipart():
+            for parte in geometria.asMultiPolyline():
+                if len(parte) >= 2:
+                    segmentos.append(np.array([(ponto.x(), ponto.y()) for ponto in parte], dtype=np.float64))
+        else:
+            vertices = np.array([(ponto.x(), ponto.y()) for ponto in geometria.asPolyline()], dtype=np.float64)
+            if len(vertices) >= 2:
+                segmentos.extend(np.stack([vertices[:-1], vertices[1:]], axis=1))
+    return segmentos
+
+def pontos_dos_segmentos(segmentos):
+    """Extrai de uma vez os pontos inicial, médio (vértice central) e final e o comprimento de cada segmento.
+
+    Retorna:
+      Tupla (inicio, meio, fim, comprimento): arrays (n, 2), (n, 2), (n, 2) e (n,).
+    """
+    tamanhos = np.array([len(segmento) for segmento in segmentos], dtype=np.int64)
+    inicios = np.concatenate(([0], np.cumsum(tamanhos)[:-1]))
+    vertices = np.concatenate(segmentos)
+
+    # Comprimento de cada segmento: soma das distâncias entre vértices consecutivos do mesmo segmento
+    delta = np.diff(vertices, axis=0)
+    distancias = np.append(np.hypot(delta[:, 0], delta[:, 1]), 0.0)
+    distancias[inicios + tamanhos - 1] = 0.0
+    comprimento = np.add.reduceat(distancias, inicios)
+
+    return vertices[inicios], vertices[inicios + tamanhos // 2], vertices[inicios + tamanhos - 1], comprimento
+
+def amostrar_cotas(raster_layer, inicio, fim):
+    """Lê as cotas do raster nos pontos inicial e final de todos os segmentos (valor do pixel, como o identify).
+
+    Retorna:
+      Tupla (cota_inicio, cota_fim), arrays com NaN onde não há valor.
+    """
+    xs = np.concatenate((inicio[:, 0], fim[:, 0]))
+    ys = np.concatenate((inicio[:, 1], fim[:, 1]))
+    cotas = obter_amostrador().amostrar(raster_layer, xs, ys, metodo='nearest')
+    return cotas[:len(inicio)], cotas[len(inicio):]
+
+def calcular_inclinacoes(comprimento, cota_inicio, cota_fim):
+    """Inclinação (%) de cada segmento, arredondada a 3 casas; NaN sem cota ou com comprimento nulo."""
+    inclinacao = np.full(len(comprimento), np.nan)
+    validos = (comprimento > 0) & ~np.isnan(cota_inicio) & ~np.isnan(cota_fim)
+    inclinacao[validos] = np.round((cota_fim[validos] - cota_inicio[validos]) / comprimento[validos] * 100, 3)
+    return inclinacao
+
+def setas_wkb(inicio, meio, fim, comprimento, cabeca, abertura, proporcional=False):
+    """Monta de uma só vez o WKB (MultiLineString) da seta de cada segmento.
+
+    Seta simples: haste reta do início ao fim, com a cabeça no ponto final e tamanho fixo.
+    Seta proporcional: haste início-meio-fim, com a cabeça no vértice central e tamanho em % do comprimento.
+
+    Parâmetros:
+      - inicio, meio, fim: arrays (n, 2) com os pontos de cada segmento.
+      - comprimento: array (n,) com os comprimentos.
+      - cabeca, abertura: tamanho da cabeça e abertura do fechamento (fixos ou em % do comprimento).
+      - proporcional: escolhe entre a seta simples e a proporcional.
+
+    Retorna:
+      Lista de objetos bytes, um WKB por segmento.
+    """
+    quantidade = len(inicio)
+    delta = fim - inicio
+    angulo = np.arctan2(delta[:, 1], delta[:, 0])
+
+    if proporcional:
+        tamanho_cabeca = cabeca * comprimento / 100
+        espessura = abertura * comprimento / 100
+        ponta = meio
+    else:
+        tamanho_cabeca = np.full(quantidade, float(cabeca))
+        espessura = np.full(quantidade, float(abertura))
+        ponta = fim
+
+    def deslocar(ponto, distancia, direcao):
+        return np.column_stack((ponto[:, 0] + distancia * np.cos(direcao), ponto[:, 1] + distancia * np.sin(direcao)))
+
+    aba1 = deslocar(ponta, -tamanho_cabeca, angulo + np.pi / 6)
+    aba2 = deslocar(ponta, -tamanho_cabeca, angulo - np.pi / 6)
+    fechamento1 = deslocar(aba1, espessura, angulo + np.pi / 2)
+    fechamento2 = deslocar(aba2, -espessura, angulo + np.pi / 2)
+
+    # Haste com três vértices só quando o vértice central é distinto das pontas
+    if proporcional:
+        tres_pontos = np.any(meio != inicio, axis=1) & np.any(meio != fim, axis=1)
+    else:
+        tres_pontos = np.zeros(quantidade, dtype=bool)
+
+    resultado = [None] * quantidade
+    for pontos_haste in (2, 3):
+        selecao = np.flatnonzero(tres_pontos if pontos_haste == 3 else ~tres_pontos)
+        if not len(selecao):
+            continue
+
+        dtype = _dtype_wkb_seta(pontos_haste)
+        wkb = np.empty(len(selecao), dtype=dtype)
+        wkb['ordem'] = 1  # Little endian
+        wkb['tipo'] = 5  # MultiLineString
+        wkb['partes'] = 5
+        wkb['haste_ordem'] = 1
+        wkb['haste_tipo'] = 2  # LineString
+        wkb['haste_pontos'] = pontos_haste
+        if pontos_haste == 3:
+            wkb['haste'] = np.column_stack((inicio[selecao], meio[selecao], fim[selecao]))
+        else:
+            wkb['haste'] = np.column_stack((inicio[selecao], fim[selecao]))
+
+        partes = wkb['cabeca']  # Visão dos quatro segmentos da cabeça
+        partes['ordem'] = 1
+        partes['tipo'] = 2
+        partes['pontos'] = 2
+        partes['coords'][:, 0] = np.column_stack((ponta[selecao], aba1[selecao]))
+        partes['coords'][:, 1] = np.column_stack((ponta[selecao], aba2[selecao]))
+        partes['coords'][:, 2] = np.column_stack((aba1[selecao], fechamento1[selecao]))
+        partes['coords'][:, 3] = np.column_stack((aba2[selecao], fechamento2[selecao]))
+
+        bruto = wkb.tobytes()
+        tamanho = dtype.itemsize
+        for posicao, indice in enumerate(selecao.tolist()):
+            resultado[indice] = bruto[posicao * tamanho:(posicao + 1) * tamanho]
+    return resultado
@@ -0,0 +1,105 @@
+from qgis.core import QgsCoordinateTransform, QgsCsException, QgsGeometry, QgsProject
+import threading
+import numpy as np
+
+# Transformações já criadas na sessão, indexadas por (SRC de origem, SRC de destino)
+_cache = {}
+_trava = threading.Lock()  # A extração de perfis transforma a partir de tarefas em segundo plano
+_sinais_conectados = False
+
+def _chave_crs(crs):
+    """Identificador do SRC para o cache: authid, ou o WKT para SRCs sem código."""
+    return crs.authid() or crs.toWkt()
+
+def obter_transformacao(origem, destino):
+    """Retorna a transformação entre dois SRCs, criada uma única vez por sessão.
+
+    A criação envolve a busca do pipeline no PROJ; as chamadas seguintes com o mesmo par de SRCs
+    devolvem uma cópia (compartilhada implicitamente) da transformação guardada.
+
+    Parâmetros:
+      - origem, destino: QgsCoordinateReferenceSystem.
+
+    Retorna:
+      QgsCoordinateTransform, ou None se os SRCs forem iguais.
+    """
+    if origem == destino:
+        return None
+
+    global _sinais_conectados
+    if not _sinais_conectados:
+        # Transformações dependem do contexto do projeto: descartadas ao trocá-lo ou ao fechar o projeto
+        QgsProject.instance().transformContextChanged.connect(limpar_cache_transformacoes)
+        QgsProject.instance().cleared.connect(limpar_cache_transformacoes)
+        _sinais_conectados = True
+
+    chave = (_chave_crs(origem), _chave_crs(destino))
+    with _trava:
+        transformacao = _cache.get(chave)
+        if transformacao is None:
+            transformacao = QgsCoordinateTransform(origem, destino, QgsProject.instance())
+            _cache[chave] = transformacao
+    return QgsCoordinateTransform(transformacao)
+
+def limpar_cache_transformacoes():
+    """Descarta as transformações guardadas (por exemplo, ao trocar de projeto)."""
+    with _trava:
+        _cache.clear()
+
+def transformar_coordenadas(xs, ys, origem, destino):
+    """Transforma vários pontos de uma vez entre dois SRCs.
+
+    Os pontos são montados em uma única LineString (WKB gerado com numpy) e transformados por uma
+    chamada de QgsGeometry.transform(); se ela falhar, cada ponto é transformado isoladamente.
+
+    Parâmetros:
+      - xs, ys: sequências ou arrays numpy com as coordenadas no SRC de origem.
+      - origem, destino: QgsCoordinateReferenceSystem.
+
+    Retorna:
+      Tupla (xs, ys) de arrays float64 no SRC de destino; NaN nos pontos que não puderam ser transformados.
+    """
+    return aplicar_transformacao(xs, ys, obter_transformacao(origem, destino))
+
+def aplicar_transformacao(xs, ys, transformacao):
+    """Transforma vários pontos de uma vez com uma transformação já obtida (ver transformar_coordenadas).
+
+    Usada pelas tarefas em segundo plano, que recebem a transformação pronta da thread principal
+    em vez de consultar o cache (e o projeto) fora dela.
+
+    Parâmetros:
+      - xs, ys: sequências ou arrays numpy com as coordenadas no SRC de origem.
+      - transformacao: QgsCoordinateTransform, ou None se os SRCs forem iguais.
+
+    Retorna:
+      Tupla (xs, ys) de arrays float64 no SRC de destino; NaN nos pontos que não puderam ser transformados.
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    if transformacao is None or len(xs) == 0:
+        return xs.copy(), ys.copy()
+
+    if len(xs) >= 2:
+        cabecalho = np.array([(1, 2, len(xs))], dtype=[('ordem', 'u1'), ('tipo', '<u4'), ('pontos', '<u4')])
+        wkb = cabecalho.tobytes() + np.column_stack((xs, ys)).tobytes()
+        geometria = QgsGeometry()
+        geometria.fromWkb(wkb)
+        try:
+            geometria.transform(transformacao)
+            coordenadas = np.frombuffer(bytes(geometria.asWkb()), dtype='<f8', offset=9).reshape(-1, 2)
+            if len(coordenadas) == len(xs):
+                return coordenadas[:, 0].copy(), coordenadas[:, 1].copy()
+        except QgsCsException:
+            pass
+
+    # Ponto a ponto, para isolar os que falham
+    saida_x = np.full(len(xs), np.nan)
+    saida_y = np.full(len(ys), np.nan)
+    for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+        try:
+            ponto = transformacao.transform(x, y)
+        except QgsCsException:
+            continue
+        saida_x[i] = ponto.x()
+        saida_y[i] = ponto.y()
+    return saida_x, saida_y
@@ -0,0 +1,185 @@
+from qgis.core import Qgis, QgsProject, QgsCoordinateTransform, QgsGeometry
+from osgeo import gdal
+import numpy as np
+
+from .raster_blocos import TAMANHO_BLOCO_PADRAO, geotransform_provider, iterar_blocos, rasterizar_zonas, somar_corte_aterro_por_zona
+
+# Classe usada quando não há camada de materiais e para os materiais sem fatores próprios
+CLASSE_PADRAO = "Padrão"
+
+FATOR_EMPOLAMENTO_PADRAO = 1.3
+FATOR_COMPACTACAO_PADRAO = 1.3
+
+# Maior código de classe aceito em um raster categórico de materiais
+_MAIOR_CODIGO_CLASSE = 65535
+
+# Tipos de dado aceitos em um raster categórico (códigos inteiros)
+_TIPOS_INTEIROS = (Qgis.Byte, Qgis.UInt16, Qgis.Int16, Qgis.UInt32, Qgis.Int32)
+
+class ResumoVolumes:
+    """Volumes de corte e aterro já somados por classe de material.
+
+    Guarda o "histograma" de corte e aterro de cada classe; com ele, trocar os fatores de
+    empolamento e compactação é só uma operação entre arrays, sem reler o raster.
+
+    Atributos:
+      - classes: lista com o nome de cada classe (texto).
+      - corte, aterro: arrays float64 com os volumes de cada classe (o corte é negativo).
+    """
+
+    def __init__(self, classes, corte, aterro):
+        self.classes = list(classes)
+        self.corte = np.asarray(corte, dtype=np.float64)
+        self.aterro = np.asarray(aterro, dtype=np.float64)
+
+    @classmethod
+    def material_unico(cls, total_corte, total_aterro):
+        """Resumo de um raster sem camada de materiais: uma única classe, a padrão."""
+        return cls([CLASSE_PADRAO], [total_corte], [total_aterro])
+
+    @property
+    def total_corte(self):
+        return float(self.corte.sum())
+
+    @property
+    def total_aterro(self):
+        return float(self.aterro.sum())
+
+    def aplicar_fatores(self, fatores):
+        """Aplica os fatores de cada classe aos volumes.
+
+        Parâmetros:
+          - fatores: dicionário {classe: (empolamento, compactacao)}; as classes ausentes usam os
+            fatores de CLASSE_PADRAO (ou os padrões do módulo, se ela também estiver ausente).
+
+        Retorna:
+          Tupla (corte_empolado, aterro_compactado): o corte multiplicado pelo empolamento e o
+          aterro multiplicado pelo fator de compactação de cada classe.
+        """
+        padrao = fatores.get(CLASSE_PADRAO, (FATOR_EMPOLAMENTO_PADRAO, FATOR_COMPACTACAO_PADRAO))
+        tabela = np.array([fatores.get(classe, padrao) for classe in self.classes], dtype=np.float64).reshape(-1, 2)
+        return float(np.dot(self.corte, tabela[:, 0])), float(np.dot(self.aterro, tabela[:, 1]))
+
+def resumo_por_poligonos(raster_layer, camada_materiais, campo, progresso=None):
+    """Soma corte e aterro do raster de diferenças por material, definido por uma camada de polígonos.
+
+    Os polígonos são agrupados pelo valor do campo e rasterizados uma única vez (um número por
+    material); os volumes de todos os materiais saem de uma só passagem pelo raster.
+
+    Parâmetros:
+      - raster_layer: QgsRasterLayer das diferenças de cota.
+      - camada_materiais: QgsVectorLayer de polígonos com o material de cada área.
+      - campo: nome do campo com o material.
+      - progresso: (opcional) função chamada com o número de blocos já processados.
+
+    Retorna:
+      ResumoVolumes com uma classe por valor distinto do campo; pixels fora dos polígonos
+      entram na classe padrão.
+    """
+    provider = raster_layer.dataProvider()
+    transformacao = QgsCoordinateTransform(camada_materiais.crs(), raster_layer.crs(), QgsProject.instance())
+
+    classes = []
+    numero_da_classe = {}
+    geometrias_wkb = []
+    numeros = []
+    for feicao in camada_materiais.getFeatures():
+        geometria = QgsGeometry(feicao.geometry())
+        if geometria.isEmpty():
+            continue
+        geometria.transform(transformacao)
+
+        classe = str(feicao[campo])
+        if classe not in numero_da_classe:
+            classes.append(classe)
+            numero_da_classe[classe] = len(classes)
+        geometrias_wkb.append(bytes(geometria.asWkb()))
+        numeros.append(numero_da_classe[classe])
+
+    # A classe padrão recebe o número seguinte e cobre todos os pixels sem polígono
+    classes.append(CLASSE_PADRAO)
+    numero_padrao = len(classes)
+
+    zonas = rasterizar_zonas(provider, geometrias_wkb, numeros)
+    _preencher_classe_padrao(zonas, numero_padrao)
+
+    corte, aterro, _ = somar_corte_aterro_por_zona(provider, zonas, numero_padrao, progresso=progresso)
+    return _agrupar_classes(classes, corte, aterro)
+
+def resumo_por_raster_categorico(raster_layer, raster_materiais, progresso=None):
+    """Soma corte e aterro do raster de diferenças por material, definido por um raster categórico.
+
+    O raster de materiais é reamostrado (vizinho mais próximo) sobre a grade do raster de diferenças;
+    os códigos de classe devem ser inteiros entre 1 e 65535, e 0 ou NoData ficam na classe padrão.
+
+    Retorna:
+      ResumoVolumes com uma classe por código com volume (nome = código em texto) e a classe padrão.
+    """
+    provider = raster_layer.dataProvider()
+    x_min, y_max, pixel_x, pixel_y = geotransform_provider(provider)
+
+    origem = gdal.Open(raster_materiais.source(), gdal.GA_ReadOnly)
+    if origem is None:
+        raise ValueError(f"O raster '{raster_materiais.name()}' não pode ser aberto pelo GDAL.")
+
+    opcoes = gdal.WarpOptions(
+        format='MEM',
+        outputBounds=(x_min, y_max - provider.ySize() * pixel_y, x_min + provider.xSize() * pixel_x, y_max),
+        width=provider.xSize(),
+        height=provider.ySize(),
+        dstSRS=raster_layer.crs().toWkt(),
+        resampleAlg='near',
+        outputType=gdal.GDT_Int32,
+        dstNodata=0,
+    )
+    zonas = gdal.Warp('', origem, options=opcoes)
+    if zonas is None:
+        raise ValueError(f"Não foi possível alinhar o raster '{raster_materiais.name()}' ao raster de diferenças.")
+
+    minimo, maximo = zonas.GetRasterBand(1).ComputeRasterMinMax(False)
+    if minimo < 0 or maximo > _MAIOR_CODIGO_CLASSE or any(valor != int(valor) for valor in (minimo, maximo)):
+        raise ValueError(f"Os códigos de classe do raster de materiais devem ser inteiros entre 1 e {_MAIOR_CODIGO_CLASSE}.")
+
+    # Pixels sem classe (código 0 ou NoData) ficam com o código seguinte ao maior, o da classe padrão
+    numero_padrao = int(maximo) + 1
+    _preencher_classe_padrao(zonas, numero_padrao)
+
+    corte, aterro, _ = somar_corte_aterro_por_zona(provider, zonas, numero_padrao, progresso=progresso)
+    classes = [str(codigo) for codigo in range(1, numero_padrao)] + [CLASSE_PADRAO]
+    return _agrupar_classes(classes, corte, aterro)
+
+def _preencher_classe_padrao(zonas, numero_padrao, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """Troca, faixa a faixa, o valor 0 (sem classe) do raster de zonas pelo número da classe padrão."""
+    banda_zonas = zonas.GetRasterBand(1)
+    for linha0 in range(0, zonas.RasterYSize, tamanho_bloco):
+        altura = min(tamanho_bloco, zonas.RasterYSize - linha0)
+        bloco = banda_zonas.ReadAsArray(0, linha0, zonas.RasterXSize, altura)
+        bloco[bloco == 0] = numero_padrao
+        banda_zonas.WriteArray(bloco, 0, linha0)
+
+def _agrupar_classes(classes, corte, aterro):
+    """Monta o ResumoVolumes descartando as classes sem nenhum volume."""
+    manter = (corte != 0) | (aterro != 0)
+    manter[-1] = True  # A classe padrão sempre aparece
+    return ResumoVolumes([classe for classe, m in zip(classes, manter) if m], corte[manter], aterro[manter])
+
+def raster_categorico_valido(raster_layer):
+    """Indica se o raster pode ser uma fonte de materiais: uma única banda de tipo inteiro."""
+    return raster_layer.bandCount() == 1 and raster_layer.dataProvider().dataType(1) in _TIPOS_INTEIROS
+
+def classes_raster_categorico(raster_materiais):
+    """Lista os códigos (em texto) presentes em um raster categórico de materiais, bloco a bloco.
+
+    Levanta ValueError se o raster não for de banda única inteira ou tiver valores não inteiros
+    (um MDT, por exemplo), em vez de truncá-los em classes falsas.
+    """
+    if not raster_categorico_valido(raster_materiais):
+        raise ValueError(f"O raster '{raster_materiais.name()}' não é categórico (banda única de valores inteiros).")
+
+    codigos = set()
+    for _, _, dados, mascara in iterar_blocos(raster_materiais.dataProvider()):
+        valores = np.unique(dados[mascara & (dados > 0)])
+        if np.any(valores != np.floor(valores)) or (len(valores) and valores[-1] > _MAIOR_CODIGO_CLASSE):
+            raise ValueError(f"Os códigos de classe do raster de materiais devem ser inteiros entre 1 e {_MAIOR_CODIGO_CLASSE}.")
+        codigos.update(valores.astype(np.int64).tolist())
+    return [str(codigo) for codigo in sorted(codigos)]
@@ -31,45 +31,8 @@ from .resources import *
 # Import the code for the dialog
 from .tempo_salvo_tools_dialog import TempoSalvoToolsDialog
 
-from .codigos.GradeManagerGeoUTM import GradeManager
-
-from .codigos.LinhaManagerPoligono import LinhaManager
-
-from .codigos.ExportarManagerFotos import FotosManager
-
-from .codigos.GerarCurvasNiveis import CurvasManager
-
-from .codigos.GerarSetasRaster import SetasManager
-
-from .codigos.ExtrairCotasMDT import CotasManager
-
-from .codigos.PoligonoManagerLinha import PoligonoManager
-
-from .codigos.CriarPlatoManager import PlatoManager
-
-from .codigos.CalcularVolume import VolumeManager
-
-from .codigos.GraficoTaludeManager2D import GraficoManager
-
-from .codigos.GraficoPerfilManager import PerfilManager
-
-from .codigos.GraficoEstruturasManager import EstruturasManager
-
-from .codigos.CriarMalhaManager import MalhaManager
-
-from .codigos.ConverterMalhaManager import MalhaConverteManager
-
-from .codigos.RasterizarMalhaManager import RasterizarManager
-
-from .codigos.OperacoesLinhasManager import LinhasManager
-
-from .codigos.LinhaDentroPoligono import DentroManager
-
-from .codigos.UiManager import UiManager  # Importa a classe UiManager
-from .codigos.UiManagerP import UiManagerP  # Importa a classe UiManagerP
-from .codigos.UiManagerT import UiManagerT  # Importa a classe UiManagerT
-from .codigos.UiManagerR import UiManagerR  # Importa a classe UiManagerR
-from .codigos.UiManagerM import UiManagerM  # Importa a classe UiManagerM
+# Os gerenciadores das ferramentas (e suas dependências pesadas, como ezdxf, pandas,
+# pyqtgraph, PIL e simplekml) são importados apenas quando a ação correspondente é usada
 from .codigos.ToolbarManager import ToolbarManager
 import os.path
 
@@ -88,15 +51,16 @@ class TempoSalvoTools:
         # Save reference to the QGIS interface
         self.iface = iface
         self.dlg = TempoSalvoToolsDialog(self.iface.mainWindow())  # Definindo a janela principal do QGIS como parent
-        self.ui_manager = UiManager(iface, self.dlg)  # Instancia UiManager
 
         # Inicializa o ToolbarManager
         self.toolbar_manager = ToolbarManager(iface, self.dlg)
 
-        self.ui_manager_p = UiManagerP(iface, self.dlg)  # Instancia UiManagerP
-        self.ui_manager_T = UiManagerT(iface, self.dlg)  # Instancia UiManagerT
-        self.ui_manager_R = UiManagerR(iface, self.dlg)  # Instancia UiManagerR
-        self.ui_manager_O = UiManagerM(iface, self.dlg)  # Instancia UiManagerM
+        # Os UiManagers são criados na primeira abertura do diálogo "Gerenciar Camadas" (ver run)
+        self.ui_manager = None
+        self.ui_manager_p = None
+        self.ui_manager_T = None
+        self.ui_manager_R = None
+        self.ui_manager_O = None
 
         # Inicializa as variáveis de instância para os diálogos
         self.setasraster_dlg = None
@@ -727,6 +691,7 @@ class TempoSalvoTools:
     def run_grade_utm_geo(self):
         """Executa a ação de abrir o diálogo Grade UTM/GEO."""
         if self.grade_utm_geo_dlg is None:
+            from .codigos.GradeManagerGeoUTM import GradeManager  # Importação adiada até o primeiro uso
             self.grade_utm_geo_dlg = GradeManager(self.iface.mainWindow())
             # self.grade_manager = GradeManager(self.grade_utm_geo_dlg)  # Instancia GradeManager
         if not self.grade_utm_geo_dlg.isVisible():
@@ -738,6 +703,7 @@ class TempoSalvoTools:
     def run_linha_poligono(self):
         """Executa a ação de abrir o diálogo Linha para Polígono."""
         if self.linha_poligono_dlg is None:
+            from .codigos.LinhaManagerPoligono import LinhaManager  # Importação adiada até o primeiro uso
             self.linha_poligono_dlg = LinhaManager(self.iface, self.iface.mainWindow())
         if not self.linha_poligono_dlg.isVisible():
             self.linha_poligono_dlg.show()
@@ -748,6 +714,7 @@ class TempoSalvoTools:
     def run_fotos_kmz(self):
         """Executa a ação de abrir o diálogo Fotos para KMZ."""
         if self.fotos_kmz_dlg is None:
+            from .codigos.ExportarManagerFotos import FotosManager  # Importação adiada até o primeiro uso
             self.fotos_kmz_dlg = FotosManager(self.iface.mainWindow())
         if not self.fotos_kmz_dlg.isVisible():
             self.fotos_kmz_dlg.show()
@@ -758,6 +725,7 @@ class TempoSalvoTools:
     def run_curvas(self):
         """Executa a ação de abrir o diálogo Gerar Curvas 3D."""
         if self.curvas_dlg is None:
+            from .codigos.GerarCurvasNiveis import CurvasManager  # Importação adiada até o primeiro uso
             self.curvas_dlg = CurvasManager(self.iface.mainWindow())
         if not self.curvas_dlg.isVisible():
             self.curvas_dlg.show()
@@ -768,6 +736,7 @@ class TempoSalvoTools:
     def run_setasraster(self):
         """Executa a ação de abrir o diálogo Setas sobre o MDT."""
         if self.setasraster_dlg is None:
+            from .codigos.GerarSetasRaster import SetasManager  # Importação adiada até o primeiro uso
             self.setasraster_dlg = SetasManager(self.iface.mainWindow())
         if not self.setasraster_dlg.isVisible():
             self.setasraster_dlg.show()
@@ -778,6 +747,7 @@ class TempoSalvoTools:
     def run_cotasraster(self):
         """Executa a ação de abrir o diálogo Cotas sobre o MDT."""
         if self.cotasraster_dlg is None:
+            from .codigos.ExtrairCotasMDT import CotasManager  # Importação adiada até o primeiro uso
             self.cotasraster_dlg = CotasManager(self.iface.mainWindow())
         if not self.cotasraster_dlg.isVisible():
             self.cotasraster_dlg.show()
@@ -788,6 +758,7 @@ class TempoSalvoTools:
     def run_poligono_linha(self):
         """Executa a ação de abrir o diálogo converter polígnos para linhas"""
         if self.poligono_linha_dlg is None:
+            from .codigos.PoligonoManagerLinha import PoligonoManager  # Importação adiada até o primeiro uso
             self.poligono_linha_dlg = PoligonoManager(self.iface, self.iface.mainWindow())
         if not self.poligono_linha_dlg.isVisible():
             self.poligono_linha_dlg.show()
@@ -798,6 +769,7 @@ class TempoSalvoTools:
     def run_plato_mdt(self):
         """Executa a ação de abrir o diálogo do Platô."""
         if self.plato_mdt_dlg is None:
+            from .codigos.CriarPlatoManager import PlatoManager  # Importação adiada até o primeiro uso
             self.plato_mdt_dlg = PlatoManager(self.iface.mainWindow())
         if not self.plato_mdt_dlg.isVisible():
             self.plato_mdt_dlg.show()
@@ -808,6 +780,7 @@ class TempoSalvoTools:
     def run_volume_mdt(self):
         """Executa a ação de abrir o diálogo para calcular volumes entre MDTs."""
         if self.volume_mdt_dlg is None:
+            from .codigos.CalcularVolume import VolumeManager  # Importação adiada até o primeiro uso
             self.volume_mdt_dlg = VolumeManager(self.iface.mainWindow())
         if not self.volume_mdt_dlg.isVisible():
             self.volume_mdt_dlg.show()
@@ -818,6 +791,7 @@ class TempoSalvoTools:
     def run_grafico_PyQt(self):
         """Executa a ação de abrir o diálogo Gráfico com taludes."""
         if self.grafico_PyQt_dlg is None:
+            from .codigos.GraficoTaludeManager2D import GraficoManager  # Importação adiada até o primeiro uso
             self.grafico_PyQt_dlg = GraficoManager(self.iface.mainWindow())
         if not self.grafico_PyQt_dlg.isVisible():
             self.grafico_PyQt_dlg.show()
@@ -828,6 +802,7 @@ class TempoSalvoTools:
     def run_grafico_perfil(self):
         """Executa a ação de abrir o diálogo de gráfico de perfis."""
         if self.grafico_perfil_dlg is None:
+            from .codigos.GraficoPerfilManager import PerfilManager  # Importação adiada até o primeiro uso
             self.grafico_perfil_dlg = PerfilManager(self.iface.mainWindow())
         if not self.grafico_perfil_dlg.isVisible():
             self.grafico_perfil_dlg.show()
@@ -838,6 +813,7 @@ class TempoSalvoTools:
     def run_grafico_estruturas(self):
         """Executa a ação de abrir o diálogo do de cálculo de estruturas."""
         if self.grafico_estruturas_dlg is None:
+            from .codigos.GraficoEstruturasManager import EstruturasManager  # Importação adiada até o primeiro uso
             self.grafico_estruturas_dlg = EstruturasManager(self.iface.mainWindow())
         if not self.grafico_estruturas_dlg.isVisible():
             self.grafico_estruturas_dlg.show()
@@ -848,6 +824,7 @@ class TempoSalvoTools:
     def run_malha(self):
         """Executa a ação de abrir o diálogo de Malha"""
         if self.malha_dlg is None:
+            from .codigos.CriarMalhaManager import MalhaManager  # Importação adiada até o primeiro uso
             # Passe a referência "self" (plugin) e iface para o MalhaManager
             self.malha_dlg = MalhaManager(self.iface, self, self.iface.mainWindow())
         if not self.malha_dlg.isVisible():
@@ -859,6 +836,7 @@ class TempoSalvoTools:
     def run_malhaconverte(self):
         """Executa a ação de abrir o diálogo de converter Malha"""
         if self.malhaconverte_dlg is None:
+            from .codigos.ConverterMalhaManager import MalhaConverteManager  # Importação adiada até o primeiro uso
             self.malhaconverte_dlg = MalhaConverteManager(self.iface.mainWindow())
         if not self.malhaconverte_dlg.isVisible():
             self.malhaconverte_dlg.show()
@@ -869,6 +847,7 @@ class TempoSalvoTools:
     def run_rasterizarmalha(self):
         """Executa a ação de abrir o diálogo de rasterizar Malha"""
         if self.rasterizarmalha_dlg is None:
+            from .codigos.RasterizarMalhaManager import RasterizarManager  # Importação adiada até o primeiro uso
             self.rasterizarmalha_dlg = RasterizarManager(self.iface.mainWindow())
         if not self.rasterizarmalha_dlg.isVisible():
             self.rasterizarmalha_dlg.show()
@@ -879,6 +858,7 @@ class TempoSalvoTools:
     def run_operacoeslinhas(self):
         """Executa a ação de abrir o diálogo para realiazar operações sobre linhas."""
         if self.operacoeslinhas_dlg is None:
+            from .codigos.OperacoesLinhasManager import LinhasManager  # Importação adiada até o primeiro uso
             self.operacoeslinhas_dlg = LinhasManager(self.iface.mainWindow())
         if not self.operacoeslinhas_dlg.isVisible():
             self.operacoeslinhas_dlg.show()
@@ -889,6 +869,7 @@ class TempoSalvoTools:
     def run_dentrolinhas(self):
         """Executa a ação de abrir o diálogo para gerar linhas dentro de polígonos."""
         if self.dentrolinhas_dlg is None:
+            from .codigos.LinhaDentroPoligono import DentroManager  # Importação adiada até o primeiro uso
             self.dentrolinhas_dlg = DentroManager(self.iface.mainWindow())
         if not self.dentrolinhas_dlg.isVisible():
             self.dentrolinhas_dlg.show()
@@ -904,6 +885,19 @@ class TempoSalvoTools:
         if self.first_start:
             self.first_start = False
 
+            # Importa e instancia os gerenciadores do diálogo principal apenas na primeira abertura
+            from .codigos.UiManager import UiManager
+            from .codigos.UiManagerP import UiManagerP
+            from .codigos.UiManagerT import UiManagerT
+            from .codigos.UiManagerR import UiManagerR
+            from .codigos.UiManagerM import UiManagerM
+
+            self.ui_manager = UiManager(self.iface, self.dlg)  # Instancia UiManager
+            self.ui_manager_p = UiManagerP(self.iface, self.dlg)  # Instancia UiManagerP
+            self.ui_manager_T = UiManagerT(self.iface, self.dlg)  # Instancia UiManagerT
+            self.ui_manager_R = UiManagerR(self.iface, self.dlg)  # Instancia UiManagerR
+            self.ui_manager_O = UiManagerM(self.iface, self.dlg)  # Instancia UiManagerM
+
         # Configura a janela do diálogo com botão de minimizar
         self.dlg.setWindowFlags(self.dlg.windowFlags() | Qt.Window | Qt.WindowMinimizeButtonHint)
 
@@ -0,0 +1,588 @@
+# coding=utf-8
+"""Benchmark reproduzível das rotinas mais pesadas do plugin, sobre terrenos sintéticos.
+
+Uso (com o Python do QGIS):
+
+    python test/benchmark_desempenho.py --tamanhos 500 2000 --saida resultados.json
+    python test/benchmark_desempenho.py --baseline resultados.json --tolerancia 0.2
+
+Os dados (MDTs, camadas vetoriais e malhas TIN) são gerados em uma pasta temporária a partir
+de sementes fixas. As rotinas ligadas a diálogos são medidas pelas funções que fazem o trabalho
+pesado (as mesmas chamadas pelos gerenciadores), sem abrir janelas; os exportadores que usam a
+barra de mensagens recebem o iface de teste de test/qgis_interface.py, com a plataforma Qt
+'offscreen'.
+
+Quando um baseline é informado, casos mais lentos que baseline * (1 + tolerância) são listados
+como regressões e o script termina com código de saída 1.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# A raiz do plugin precisa estar no caminho para importar o pacote "codigos"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from qgis.core import Qgis, QgsApplication  # noqa: E402
+
+import dados_sinteticos  # noqa: E402
+
+TAMANHOS_PADRAO = (500, 2000, 8000)
+
+CASOS = []
+
+_IFACE = None
+
+
+def caso(nome):
+    """Registra uma função de preparo de caso.
+
+    A função recebe o dicionário de dados de um tamanho e a pasta de trabalho e retorna
+    a função (sem argumentos) que será cronometrada; o preparo não entra na medição.
+    """
+    def registrar(funcao):
+        CASOS.append((nome, funcao))
+        return funcao
+    return registrar
+
+
+def iniciar_qgis():
+    """Inicia uma QgsApplication fora da tela (os exportadores criam barras de progresso) e o framework Processing."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    aplicacao = QgsApplication([], True)
+    aplicacao.initQgis()
+
+    sys.path.append(os.path.join(QgsApplication.pkgDataPath(), "python", "plugins"))
+    from processing.core.Processing import Processing
+    Processing.initialize()
+    return aplicacao
+
+
+def iface_teste():
+    """iface de teste (test/qgis_interface.py) com um canvas fora da tela, criado uma única vez."""
+    global _IFACE
+    if _IFACE is None:
+        from qgis.gui import QgsMapCanvas
+        from qgis_interface import QgisInterface
+        _IFACE = QgisInterface(QgsMapCanvas())
+    return _IFACE
+
+
+def preparar_dados(pasta, tamanho):
+    """Gera os dados sintéticos de um tamanho de MDT.
+
+    Retorna:
+      Dicionário com as camadas e caminhos usados pelos casos.
+    """
+    extensao = dados_sinteticos.extensao_mdt(tamanho)
+    caminho_mdt = dados_sinteticos.criar_mdt(pasta, tamanho)
+    caminho_diferenca = dados_sinteticos.criar_mdt(pasta, tamanho, deslocamento=-800.0, nome=f"diferenca_{tamanho}.tif")
+    caminho_malha = dados_sinteticos.criar_malha_tin(pasta, max(50, tamanho // 8), tamanho)
+
+    return {
+        "tamanho": tamanho,
+        "extensao": extensao,
+        "caminho_mdt": caminho_mdt,
+        "mdt": dados_sinteticos.carregar_raster(caminho_mdt),
+        "diferenca": dados_sinteticos.carregar_raster(caminho_diferenca),
+        "malha": dados_sinteticos.carregar_malha(caminho_malha),
+        "linhas": dados_sinteticos.criar_camada_linhas(extensao, 20),
+        "pontos": dados_sinteticos.criar_camada_pontos(extensao, 10000),
+        "poligonos": dados_sinteticos.criar_camada_poligonos(extensao, 50),
+    }
+
+
+@caso("volume_corte_aterro")
+def caso_volume(dados, pasta):
+    """Núcleo de VolumeManager.calculate_volume: soma de corte e aterro do raster de diferenças."""
+    from codigos.raster_blocos import somar_corte_aterro
+    provider = dados["diferenca"].dataProvider()
+    return lambda: somar_corte_aterro(provider)
+
+
+@caso("volume_diferenca_rasters")
+def caso_diferenca(dados, pasta):
+    """VolumeManager.calculate_raster_difference: diferença gravada em GeoTIFF com os volumes na mesma passagem."""
+    from codigos.diferenca_raster import calcular_diferenca
+    caminho = os.path.join(pasta, "diferenca_calculada.tif")
+    return lambda: calcular_diferenca(dados["mdt"], dados["diferenca"], caminho)
+
+
+@caso("volume_lote_epocas")
+def caso_volume_lote(dados, pasta):
+    """VolumeManager.calculate_volume_lote: um primitivo contra várias superfícies em uma leitura."""
+    from codigos.diferenca_raster import comparar_superficies
+    superficies = [dados["diferenca"]] * 5
+    return lambda: comparar_superficies(dados["mdt"], superficies)
+
+
+@caso("volume_por_zonas")
+def caso_volume_zonas(dados, pasta):
+    """VolumeManager.calculate_volume_zonas: rasterização das zonas e soma por zona em uma passagem."""
+    from codigos.raster_blocos import rasterizar_zonas, somar_corte_aterro_por_zona
+    provider = dados["diferenca"].dataProvider()
+    geometrias_wkb = [bytes(feicao.geometry().asWkb()) for feicao in dados["poligonos"].getFeatures()]
+
+    def executar():
+        zonas = rasterizar_zonas(provider, geometrias_wkb)
+        somar_corte_aterro_por_zona(provider, zonas, len(geometrias_wkb))
+    return executar
+
+
+@caso("curvas_nivel")
+def caso_curvas(dados, pasta):
+    """CurvasManager.generate_contour_lines: curvas em janelas paralelas gravadas em GeoPackage."""
+    from codigos.curvas_blocos import gerar_curvas_em_blocos, gravar_curvas_gpkg
+
+    caminho = os.path.join(pasta, "curvas_blocos.gpkg")
+    crs_wkt = dados["mdt"].crs().toWkt()
+
+    def executar():
+        gravar_curvas_gpkg(caminho, crs_wkt, gerar_curvas_em_blocos(dados["caminho_mdt"], 1.0))
+    return executar
+
+
+@caso("curvas_copiar_simplificadas")
+def caso_curvas_copiar(dados, pasta):
+    """CurvasManager.simplify_and_copy_features: simplificação e Z em lotes direto no provedor."""
+    from qgis.core import QgsField, QgsVectorLayer
+    from qgis.PyQt.QtCore import QVariant
+    from codigos.curvas_blocos import copiar_curvas_simplificadas, gerar_curvas_em_blocos, gravar_curvas_gpkg
+
+    caminho = os.path.join(pasta, "curvas_origem.gpkg")
+    gravar_curvas_gpkg(caminho, dados["mdt"].crs().toWkt(), gerar_curvas_em_blocos(dados["caminho_mdt"], 1.0))
+    origem = QgsVectorLayer(f"{caminho}|layername=curvas", "curvas", "ogr")
+
+    def executar():
+        destino = QgsVectorLayer(f"LineStringZ?crs={origem.crs().authid()}", "curvas_3d", "memory")
+        destino.dataProvider().addAttributes([QgsField("ELEV", QVariant.Double)])
+        destino.updateFields()
+        copiar_curvas_simplificadas(origem, destino)
+    return executar
+
+
+@caso("curvas_exportar_dxf")
+def caso_curvas_dxf(dados, pasta):
+    """CurvasManager.export_to_dxf: polilinhas e rótulos posicionados em lote com numpy."""
+    from qgis.core import QgsVectorLayer
+    from codigos.curvas_blocos import gerar_curvas_gpkg
+    from codigos.dxf_curvas import escrever_dxf_curvas, fator_escala_dxf
+
+    caminho = os.path.join(pasta, "curvas_dxf.gpkg")
+    gerar_curvas_gpkg(dados["caminho_mdt"], caminho, 1.0, tolerancia=0.01, com_z=True)
+    camada = QgsVectorLayer(f"{caminho}|layername=curvas", "curvas", "ogr")
+    saida = os.path.join(pasta, "curvas.dxf")
+
+    def executar():
+        escrever_dxf_curvas(camada, saida, 5, {}, 'Centro', 8, 100, fator_escala_dxf(1000, 8))
+    return executar
+
+
+@caso("linhas_exportar_kml")
+def caso_linhas_kml(dados, pasta):
+    """UiManager.escrever_kml_em_fluxo: placemarks gravados feição a feição, com tabela de atributos."""
+    from codigos.UiManager import UiManager
+    gerenciador = object.__new__(UiManager)
+    gerenciador.iface = iface_teste()
+    caminho = os.path.join(pasta, "linhas.kml")
+    return lambda: gerenciador.escrever_kml_em_fluxo(dados["linhas"], caminho, "ID", 2.0, 0, "", "", True, False, 1)
+
+
+@caso("curvas_nivel_processing")
+def caso_curvas_processing(dados, pasta):
+    """Referência: gdal:contour em uma única passagem, como o plugin fazia antes das janelas."""
+    import processing
+
+    def executar():
+        processing.run("gdal:contour", {
+            'INPUT': dados["caminho_mdt"],
+            'BAND': 1,
+            'INTERVAL': 1.0,
+            'FIELD_NAME': 'ELEV',
+            'OUTPUT': 'TEMPORARY_OUTPUT'
+        })
+    return executar
+
+
+@caso("perfil_transectos")
+def caso_perfil(dados, pasta):
+    """PerfilManager.extract_profile: amostragem das linhas sintéticas a cada metro."""
+    from codigos.amostragem_raster import AmostradorRaster
+
+    coordenadas = []
+    for feicao in dados["linhas"].getFeatures():
+        geometria = feicao.geometry()
+        distancias = np.arange(0.0, geometria.length(), 1.0)
+        pontos = [geometria.interpolate(d).asPoint() for d in distancias]
+        coordenadas.append((np.array([p.x() for p in pontos]), np.array([p.y() for p in pontos])))
+
+    def executar():
+        # Amostrador novo a cada repetição, para medir também a leitura dos tiles
+        amostrador = AmostradorRaster()
+        for xs, ys in coordenadas:
+            amostrador.amostrar(dados["mdt"], xs, ys)
+    return executar
+
+
+@caso("perfil_corredor")
+def caso_perfil_corredor(dados, pasta):
+    """TarefaPerfis.run: cinco MDTs amostrados lendo só os blocos tocados por cada linha."""
+    from codigos.perfil_amostragem import amostrar_corredor
+
+    coordenadas = []
+    for feicao in dados["linhas"].getFeatures():
+        geometria = feicao.geometry()
+        pontos = [geometria.interpolate(d).asPoint() for d in np.arange(0.0, geometria.length(), 1.0)]
+        coordenadas.append((np.array([p.x() for p in pontos]), np.array([p.y() for p in pontos])))
+
+    def executar():
+        provider = dados["mdt"].dataProvider().clone()
+        for _ in range(5):
+            for xs, ys in coordenadas:
+                amostrar_corredor(provider, xs, ys)
+    return executar
+
+
+@caso("perfil_amostragem_pixel")
+def caso_perfil_amostragem(dados, pasta):
+    """PerfilManager.calculate_distances_and_points no modo 'pixel': passo do MDT, limite e refino nos vértices."""
+    from codigos.perfil_amostragem import amostrar_polilinha, passo_pelo_pixel
+
+    linhas = [np.array([(p.x(), p.y()) for p in feicao.geometry().vertices()]) for feicao in dados["linhas"].getFeatures()]
+    passo = passo_pelo_pixel([dados["mdt"]], dados["mdt"].crs())
+
+    def executar():
+        for vertices in linhas:
+            amostrar_polilinha(vertices, passo)
+    return executar
+
+
+@caso("perfil_tabela_intervalos")
+def caso_perfil_tabela(dados, pasta):
+    """PerfilManager.log_xyz_every_100m: pontos a cada metro, transformados em lote (SRC em cache) e amostrados."""
+    from qgis.core import QgsCoordinateReferenceSystem
+    from codigos.amostragem_raster import obter_amostrador
+    from codigos.perfil_indice import IndiceLinha
+    from codigos.transformacoes_crs import transformar_coordenadas
+
+    geometria = next(dados["linhas"].getFeatures()).geometry()
+    indice = IndiceLinha(np.array([(p.x(), p.y()) for p in geometria.vertices()]))
+    distancias = np.arange(0.0, indice.comprimento, 1.0)
+    geografico = QgsCoordinateReferenceSystem("EPSG:4674")
+
+    def executar():
+        xs, ys = indice.pontos_nas_distancias(distancias)
+        # Ida e volta por um SRC geográfico, como em um projeto com o MDT em outro SRC
+        lon, lat = transformar_coordenadas(xs, ys, dados["mdt"].crs(), geografico)
+        xs, ys = transformar_coordenadas(lon, lat, geografico, dados["mdt"].crs())
+        obter_amostrador().amostrar(dados["mdt"], xs, ys, metodo='nearest')
+    return executar
+
+
+@caso("perfil_cursor")
+def caso_perfil_cursor(dados, pasta):
+    """PerfilManager.mouse_moved/update_map_marker: 10 mil consultas distância -> ponto e curva mais próxima."""
+    from codigos.perfil_indice import IndiceCurvas, IndiceLinha
+
+    geometria = next(dados["linhas"].getFeatures()).geometry()
+    distancias = np.arange(0.0, geometria.length(), 0.5)
+    vertices = np.array([(p.x(), p.y()) for p in (geometria.interpolate(d).asPoint() for d in distancias)])
+    perfis = [{'layer': None, 'profiles': [{'distances': distancias, 'values': np.sin(distancias / 50.0) * k}]}
+              for k in range(1, 6)]
+    consultas = np.random.default_rng(0).uniform(0.0, distancias[-1], 10000).tolist()
+
+    def executar():
+        indice_linha = IndiceLinha(vertices, distancias)
+        indice_curvas = IndiceCurvas(perfis)
+        for x in consultas:
+            indice_curvas.valor_mais_proximo(x, 0.0)
+            indice_linha.ponto_na_distancia(x)
+    return executar
+
+
+@caso("perfil_piramide_lod")
+def caso_perfil_lod(dados, pasta):
+    """PerfilManager.plot_profiles/update_lod_curves: pirâmides de cinco curvas e 200 mudanças de zoom."""
+    from codigos.perfil_lod import PiramideCurva
+
+    x = np.arange(0.0, 20.0 * dados["tamanho"], 0.5)
+    curvas = [np.sin(x / (30.0 * k)) * 50.0 + k for k in range(1, 6)]
+    faixas = [(x[-1] * (1 - f) / 2, x[-1] * (1 + f) / 2) for f in np.linspace(1.0, 0.001, 200)]
+
+    def executar():
+        piramides = [PiramideCurva(x, y) for y in curvas]
+        for inicio, fim in faixas:
+            for piramide in piramides:
+                piramide.dados_visiveis(inicio, fim, 1200)
+    return executar
+
+
+@caso("setas_declividade")
+def caso_setas(dados, pasta):
+    """SetasManager.gerar_setas: segmentos, cotas, inclinações e setas em WKB com um addFeatures."""
+    from qgis.core import QgsVectorLayer
+    from codigos.amostragem_raster import obter_amostrador
+    from codigos.raster_blocos import criar_feicoes
+    from codigos.setas_declividade import (amostrar_cotas, calcular_inclinacoes, pontos_dos_segmentos,
+                                           segmentos_das_feicoes, setas_wkb)
+
+    def executar():
+        obter_amostrador().invalidar()
+        segmentos = segmentos_das_feicoes(dados["linhas"].getFeatures())
+        inicio, meio, fim, comprimento = pontos_dos_segmentos(segmentos)
+        cota_inicio, cota_fim = amostrar_cotas(dados["mdt"], inicio, fim)
+        inclinacoes = calcular_inclinacoes(comprimento, cota_inicio, cota_fim)
+        geometrias = setas_wkb(inicio, meio, fim, comprimento, 10, 2, proporcional=False)
+        destino = QgsVectorLayer(f"MultiLineString?crs={dados['linhas'].crs().authid()}", "setas", "memory")
+        destino.dataProvider().addFeatures(criar_feicoes(geometrias, [[float(i)] for i in inclinacoes]))
+    return executar
+
+
+@caso("cotas_pontos")
+def caso_cotas(dados, pasta):
+    """Amostragem pontual (nearest, como o identify) da camada de pontos sintéticos."""
+    from codigos.amostragem_raster import AmostradorRaster
+
+    pontos = [feicao.geometry().asPoint() for feicao in dados["pontos"].getFeatures()]
+    xs = np.array([p.x() for p in pontos])
+    ys = np.array([p.y() for p in pontos])
+    return lambda: AmostradorRaster().amostrar(dados["mdt"], xs, ys, metodo='nearest')
+
+
+@caso("mdt_para_pontos")
+def caso_mdt_pontos(dados, pasta):
+    """CotasManager.processar_cotas_pontos: um PointZ por pixel (passo ajustado a no máximo 1 milhão de pontos)."""
+    from qgis.core import QgsVectorLayer
+    from codigos.raster_blocos import escrever_pontos_pixels, passo_para_limite
+    provider = dados["mdt"].dataProvider()
+    passo = passo_para_limite(provider.xSize(), provider.ySize(), 1, 1000000)
+
+    def executar():
+        camada = QgsVectorLayer("PointZ?crs=EPSG:31983&field=ID:integer&field=X:double&field=Y:double&field=Z:double", "pontos", "memory")
+        escrever_pontos_pixels(provider, camada.dataProvider(), lambda ids, x, y, z: zip(ids.tolist(), x.tolist(), y.tolist(), z.tolist()),
+                               passo=passo, arredondar=(3, 3, 5))
+    return executar
+
+
+@caso("malha_topologia")
+def caso_malha_topologia(dados, pasta):
+    """Leitura dos vértices e triângulos da malha TIN (início de UiManagerM.exportar_malha)."""
+    from codigos.malha_topologia import extrair_topologia_malha
+    return lambda: extrair_topologia_malha(dados["malha"])
+
+
+def _gerenciador_malha():
+    """Instância de UiManagerM sem diálogo, suficiente para os exportadores que não usam a interface."""
+    from codigos.UiManagerM import UiManagerM
+    return object.__new__(UiManagerM)
+
+
+@caso("malha_exportar_obj")
+def caso_malha_obj(dados, pasta):
+    from codigos.malha_topologia import extrair_topologia_malha
+    vertices, triangulos = extrair_topologia_malha(dados["malha"])
+    gerenciador = _gerenciador_malha()
+    caminho = os.path.join(pasta, "malha.obj")
+    return lambda: gerenciador.export_to_obj(vertices, triangulos, caminho)
+
+
+@caso("malha_exportar_dxf")
+def caso_malha_dxf(dados, pasta):
+    from codigos.malha_topologia import extrair_topologia_malha
+    vertices, triangulos = extrair_topologia_malha(dados["malha"])
+    gerenciador = _gerenciador_malha()
+    gerenciador.iface = iface_teste()
+    caminho = os.path.join(pasta, "malha.dxf")
+    return lambda: gerenciador.export_to_dxf(vertices, triangulos, caminho)
+
+
+@caso("malha_exportar_kml")
+def caso_malha_kml(dados, pasta):
+    from qgis.PyQt.QtGui import QColor
+    from codigos.malha_topologia import extrair_topologia_malha
+    vertices, triangulos = extrair_topologia_malha(dados["malha"])
+    gerenciador = _gerenciador_malha()
+    gerenciador.iface = iface_teste()
+    caminho = os.path.join(pasta, "malha.kml")
+    estilo = {"line_color": QColor(0, 0, 0), "line_opacity": 255, "line_width": 1,
+              "face_color": QColor(200, 200, 200), "face_opacity": 128}
+    return lambda: gerenciador.export_to_kml(vertices, triangulos, dados["malha"].crs(), caminho, estilo)
+
+
+@caso("malha_exportar_stl_binario")
+def caso_malha_stl_binario(dados, pasta):
+    from codigos.malha_topologia import extrair_topologia_malha
+    vertices, triangulos = extrair_topologia_malha(dados["malha"])
+    gerenciador = _gerenciador_malha()
+    caminho = os.path.join(pasta, "malha_binario.stl")
+    return lambda: gerenciador.export_to_stl(vertices, triangulos, caminho, binario=True)
+
+
+@caso("malha_exportar_stl_ascii")
+def caso_malha_stl_ascii(dados, pasta):
+    from codigos.malha_topologia import extrair_topologia_malha
+    vertices, triangulos = extrair_topologia_malha(dados["malha"])
+    gerenciador = _gerenciador_malha()
+    caminho = os.path.join(pasta, "malha_ascii.stl")
+    return lambda: gerenciador.export_to_stl(vertices, triangulos, caminho, binario=False)
+
+
+@caso("malha_exportar_dae")
+def caso_malha_dae(dados, pasta):
+    from codigos.malha_topologia import extrair_topologia_malha
+    vertices, triangulos = extrair_topologia_malha(dados["malha"])
+    gerenciador = _gerenciador_malha()
+    caminho = os.path.join(pasta, "malha.dae")
+    return lambda: gerenciador.export_to_dae(vertices, triangulos, caminho)
+
+
+@caso("stl_leitura_ascii")
+def caso_stl_ascii(dados, pasta):
+    """MalhaConverteManager.parse_stl sobre um STL ASCII."""
+    from codigos.malha_topologia import extrair_topologia_malha, ler_stl
+    vertices, triangulos = extrair_topologia_malha(dados["malha"])
+    caminho = os.path.join(pasta, "leitura_ascii.stl")
+    _gerenciador_malha().export_to_stl(vertices, triangulos, caminho, binario=False)
+    return lambda: ler_stl(caminho)
+
+
+@caso("stl_leitura_binario")
+def caso_stl_binario(dados, pasta):
+    """MalhaConverteManager.parse_stl sobre um STL binário."""
+    from codigos.malha_topologia import extrair_topologia_malha, escrever_stl_binario, ler_stl
+    vertices, triangulos = extrair_topologia_malha(dados["malha"])
+    caminho = os.path.join(pasta, "leitura_binario.stl")
+    escrever_stl_binario(caminho, vertices, triangulos)
+    return lambda: ler_stl(caminho)
+
+
+def cronometrar(funcao, repeticoes):
+    """Executa a função repeticoes vezes e retorna os tempos, em segundos."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def executar_benchmarks(tamanhos, repeticoes, filtro=None, pasta_base=None):
+    """Gera os dados de cada tamanho e cronometra os casos registrados.
+
+    Parâmetros:
+      - tamanhos: lados dos MDTs sintéticos, em pixels.
+      - repeticoes: número de execuções cronometradas de cada caso.
+      - filtro: nomes dos casos a executar (padrão: todos).
+      - pasta_base: pasta onde criar a pasta temporária dos dados.
+
+    Retorna:
+      Lista de dicionários com caso, tamanho, tempos, mínimo e mediana (ou o erro do caso).
+    """
+    resultados = []
+    for tamanho in tamanhos:
+        pasta = tempfile.mkdtemp(prefix=f"tst_benchmark_{tamanho}_", dir=pasta_base)
+        try:
+            print(f"Gerando dados sintéticos ({tamanho} x {tamanho})...", flush=True)
+            dados = preparar_dados(pasta, tamanho)
+
+            for nome, preparar in CASOS:
+                if filtro and nome not in filtro:
+                    continue
+                resultado = {"caso": nome, "tamanho": tamanho}
+                try:
+                    tempos = cronometrar(preparar(dados, pasta), repeticoes)
+                    resultado.update({"tempos": tempos, "minimo": min(tempos), "mediana": statistics.median(tempos)})
+                    print(f"  {nome:<28} {resultado['mediana']:10.3f} s (mín. {resultado['minimo']:.3f} s)", flush=True)
+                except Exception as e:
+                    resultado["erro"] = str(e)
+                    print(f"  {nome:<28} ERRO: {e}", flush=True)
+                resultados.append(resultado)
+        finally:
+            shutil.rmtree(pasta, ignore_errors=True)
+    return resultados
+
+
+def informacoes_ambiente():
+    """Versões e máquina, gravadas junto aos resultados para que as comparações façam sentido."""
+    return {
+        "data": datetime.datetime.now().isoformat(timespec="seconds"),
+        "qgis": Qgis.QGIS_VERSION,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sistema": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "nucleos": os.cpu_count(),
+    }
+
+
+def comparar_com_baseline(resultados, baseline, tolerancia):
+    """Compara as medianas com as de um baseline.
+
+    Retorna:
+      Lista de tuplas (caso, tamanho, mediana do baseline, mediana atual) dos casos que ficaram
+      mais lentos que baseline * (1 + tolerancia).
+    """
+    referencias = {(r["caso"], r["tamanho"]): r["mediana"] for r in baseline.get("resultados", []) if "mediana" in r}
+
+    regressoes = []
+    for resultado in resultados:
+        referencia = referencias.get((resultado["caso"], resultado["tamanho"]))
+        if referencia is None or "mediana" not in resultado:
+            continue
+        if resultado["mediana"] > referencia * (1.0 + tolerancia):
+            regressoes.append((resultado["caso"], resultado["tamanho"], referencia, resultado["mediana"]))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das rotinas do Tempo Salvo Tools com terrenos sintéticos.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=list(TAMANHOS_PADRAO), help="lados dos MDTs sintéticos, em pixels")
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções cronometradas de cada caso")
+    parser.add_argument("--casos", nargs="+", help="executa apenas os casos informados")
+    parser.add_argument("--saida", help="arquivo JSON onde gravar os resultados")
+    parser.add_argument("--baseline", help="arquivo JSON de uma execução anterior, para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="aumento relativo tolerado antes de acusar regressão")
+    parser.add_argument("--listar", action="store_true", help="lista os casos disponíveis e sai")
+    args = parser.parse_args(argv)
+
+    if args.listar:
+        for nome, _ in CASOS:
+            print(nome)
+        return 0
+
+    aplicacao = iniciar_qgis()
+    try:
+        resultados = executar_benchmarks(args.tamanhos, args.repeticoes, args.casos)
+    finally:
+        aplicacao.exitQgis()
+
+    relatorio = {"ambiente": informacoes_ambiente(), "repeticoes": args.repeticoes, "resultados": resultados}
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+        print(f"Resultados gravados em {args.saida}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as arquivo:
+            baseline = json.load(arquivo)
+        regressoes = comparar_com_baseline(resultados, baseline, args.tolerancia)
+        for nome, tamanho, anterior, atual in regressoes:
+            print(f"REGRESSÃO: {nome} ({tamanho}): {anterior:.3f} s -> {atual:.3f} s ({atual / anterior - 1:+.0%})")
+        if regressoes:
+            return 1
+        print("Nenhuma regressão em relação ao baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
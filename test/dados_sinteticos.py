@@ -0,0 +1,201 @@
+# coding=utf-8
+"""Geração de dados sintéticos (MDT, camadas vetoriais e malhas TIN) para os benchmarks.
+
+Todos os dados são gerados a partir de uma semente fixa, de modo que duas execuções
+com os mesmos parâmetros produzem exatamente os mesmos arquivos.
+"""
+
+import os
+
+import numpy as np
+from osgeo import gdal, osr
+
+from qgis.core import (QgsVectorLayer, QgsFeature, QgsGeometry, QgsPointXY, QgsRasterLayer, QgsMeshLayer)
+
+# SIRGAS 2000 / UTM 23S, o SRC mais usado pelos projetos do plugin
+EPSG_PADRAO = 31983
+
+# Canto superior esquerdo dos rasters sintéticos (coordenadas UTM realistas)
+ORIGEM_X = 500000.0
+ORIGEM_Y = 7500000.0
+
+# Linhas processadas por vez na geração do MDT, para limitar a memória em rasters grandes
+_LINHAS_POR_BLOCO = 512
+
+
+def _parametros_relevo(semente, quantidade_morros=24):
+    """Sorteia centros, alturas e larguras dos morros gaussianos do relevo (em frações da extensão)."""
+    rng = np.random.default_rng(semente)
+    centros = rng.uniform(0.0, 1.0, size=(quantidade_morros, 2))
+    alturas = rng.uniform(-40.0, 60.0, size=quantidade_morros)
+    larguras = rng.uniform(0.03, 0.2, size=quantidade_morros)
+    return centros, alturas, larguras
+
+
+def relevo_sintetico(linhas, colunas, tamanho, semente):
+    """Calcula a elevação nas posições (linhas, colunas) de um MDT de tamanho x tamanho pixels.
+
+    O relevo combina morros gaussianos, uma ondulação suave e um pequeno ruído determinístico.
+    """
+    centros, alturas, larguras = _parametros_relevo(semente)
+    u = (colunas + 0.5) / tamanho
+    v = (linhas + 0.5) / tamanho
+
+    z = 800.0 + 15.0 * np.sin(6.0 * u) * np.cos(4.0 * v)
+    for (cu, cv), altura, largura in zip(centros, alturas, larguras):
+        z = z + altura * np.exp(-((u - cu) ** 2 + (v - cv) ** 2) / (2.0 * largura ** 2))
+
+    # Ruído de alta frequência que depende só da posição, para não variar com o tamanho do bloco
+    z = z + 0.25 * np.sin(linhas * 12.9898 + colunas * 78.233 + semente)
+    return z
+
+
+def criar_mdt(pasta, tamanho, tamanho_pixel=1.0, deslocamento=0.0, semente=42, nome=None, nodata=-9999.0):
+    """Grava um MDT sintético tamanho x tamanho (float32) como GeoTIFF.
+
+    Parâmetros:
+      - pasta: pasta de saída.
+      - tamanho: número de linhas e colunas.
+      - tamanho_pixel: resolução em metros.
+      - deslocamento: valor somado a todas as elevações (ex.: -cota média para um raster de diferença).
+      - semente: semente do relevo.
+      - nome: nome do arquivo (padrão: mdt_<tamanho>.tif).
+      - nodata: valor NoData gravado em uma faixa de 8 pixels na borda esquerda.
+
+    Retorna:
+      O caminho do arquivo gravado.
+    """
+    caminho = os.path.join(pasta, nome or f"mdt_{tamanho}.tif")
+
+    driver = gdal.GetDriverByName("GTiff")
+    dataset = driver.Create(caminho, tamanho, tamanho, 1, gdal.GDT_Float32, options=["TILED=YES"])
+    dataset.SetGeoTransform((ORIGEM_X, tamanho_pixel, 0.0, ORIGEM_Y, 0.0, -tamanho_pixel))
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(EPSG_PADRAO)
+    dataset.SetProjection(srs.ExportToWkt())
+
+    banda = dataset.GetRasterBand(1)
+    banda.SetNoDataValue(nodata)
+
+    colunas = np.arange(tamanho, dtype=np.float64)[np.newaxis, :]
+    for linha0 in range(0, tamanho, _LINHAS_POR_BLOCO):
+        altura = min(_LINHAS_POR_BLOCO, tamanho - linha0)
+        linhas = np.arange(linha0, linha0 + altura, dtype=np.float64)[:, np.newaxis]
+        z = relevo_sintetico(linhas, colunas, tamanho, semente) + deslocamento
+        z[:, :8] = nodata  # Faixa sem dados, para exercitar o tratamento de NoData
+        banda.WriteArray(z.astype(np.float32), 0, linha0)
+
+    banda.FlushCache()
+    dataset = None
+    return caminho
+
+
+def carregar_raster(caminho, nome=None):
+    """Carrega um raster como QgsRasterLayer (sem adicioná-lo ao projeto)."""
+    camada = QgsRasterLayer(caminho, nome or os.path.splitext(os.path.basename(caminho))[0], "gdal")
+    if not camada.isValid():
+        raise RuntimeError(f"Raster sintético inválido: {caminho}")
+    return camada
+
+
+def extensao_mdt(tamanho, tamanho_pixel=1.0):
+    """Retorna (x_min, y_min, x_max, y_max) de um MDT gerado por criar_mdt."""
+    lado = tamanho * tamanho_pixel
+    return ORIGEM_X, ORIGEM_Y - lado, ORIGEM_X + lado, ORIGEM_Y
+
+
+def _camada_memoria(tipo, nome, geometrias):
+    """Cria uma camada em memória com um campo ID e as geometrias informadas."""
+    camada = QgsVectorLayer(f"{tipo}?crs=EPSG:{EPSG_PADRAO}&field=ID:integer", nome, "memory")
+    feicoes = []
+    for i, geometria in enumerate(geometrias, start=1):
+        feicao = QgsFeature(camada.fields())
+        feicao.setGeometry(geometria)
+        feicao.setAttributes([i])
+        feicoes.append(feicao)
+    camada.dataProvider().addFeatures(feicoes)
+    camada.updateExtents()
+    return camada
+
+
+def criar_camada_linhas(extensao, quantidade, vertices_por_linha=50, semente=7):
+    """Cria uma camada de linhas aleatórias (passeios) dentro da extensão."""
+    rng = np.random.default_rng(semente)
+    x_min, y_min, x_max, y_max = extensao
+    passo = 0.02 * (x_max - x_min)
+
+    geometrias = []
+    for _ in range(quantidade):
+        inicio = rng.uniform((x_min, y_min), (x_max, y_max))
+        passos = rng.normal(0.0, passo, size=(vertices_por_linha - 1, 2))
+        pontos = np.vstack((inicio, inicio + np.cumsum(passos, axis=0)))
+        pontos[:, 0] = np.clip(pontos[:, 0], x_min, x_max)
+        pontos[:, 1] = np.clip(pontos[:, 1], y_min, y_max)
+        geometrias.append(QgsGeometry.fromPolylineXY([QgsPointXY(x, y) for x, y in pontos]))
+    return _camada_memoria("LineString", "Linhas Sintéticas", geometrias)
+
+
+def criar_camada_pontos(extensao, quantidade, semente=11):
+    """Cria uma camada de pontos uniformemente distribuídos na extensão."""
+    rng = np.random.default_rng(semente)
+    x_min, y_min, x_max, y_max = extensao
+    pontos = rng.uniform((x_min, y_min), (x_max, y_max), size=(quantidade, 2))
+    return _camada_memoria("Point", "Pontos Sintéticos", [QgsGeometry.fromPointXY(QgsPointXY(x, y)) for x, y in pontos])
+
+
+def criar_camada_poligonos(extensao, quantidade, semente=13):
+    """Cria uma camada de polígonos (hexágonos irregulares) dentro da extensão."""
+    rng = np.random.default_rng(semente)
+    x_min, y_min, x_max, y_max = extensao
+    raio_max = 0.08 * (x_max - x_min)
+
+    geometrias = []
+    angulos = np.linspace(0.0, 2.0 * np.pi, 7)[:-1]
+    for _ in range(quantidade):
+        raio = rng.uniform(0.2, 1.0) * raio_max
+        cx = rng.uniform(x_min + raio, x_max - raio)
+        cy = rng.uniform(y_min + raio, y_max - raio)
+        raios = raio * rng.uniform(0.6, 1.0, size=angulos.size)
+        anel = [QgsPointXY(cx + r * np.cos(a), cy + r * np.sin(a)) for r, a in zip(raios, angulos)]
+        geometrias.append(QgsGeometry.fromPolygonXY([anel + anel[:1]]))
+    return _camada_memoria("Polygon", "Polígonos Sintéticos", geometrias)
+
+
+def criar_malha_tin(pasta, lado, tamanho_mdt, tamanho_pixel=1.0, semente=42):
+    """Grava uma malha TIN regular (lado x lado nós, 2 triângulos por célula) em formato .2dm.
+
+    As cotas dos nós seguem o mesmo relevo de criar_mdt, amostrado sobre a extensão do MDT.
+
+    Retorna:
+      O caminho do arquivo .2dm gravado.
+    """
+    caminho = os.path.join(pasta, f"tin_{lado}.2dm")
+
+    indices = np.linspace(0, tamanho_mdt - 1, lado)
+    linhas, colunas = np.meshgrid(indices, indices, indexing="ij")
+    z = relevo_sintetico(linhas, colunas, tamanho_mdt, semente)
+    x = ORIGEM_X + (colunas + 0.5) * tamanho_pixel
+    y = ORIGEM_Y - (linhas + 0.5) * tamanho_pixel
+
+    total_nos = lado * lado
+    nos = np.column_stack((np.arange(1, total_nos + 1), x.ravel(), y.ravel(), z.ravel()))
+
+    # Cada célula (i, j) gera os triângulos (a, b, c) e (b, d, c), com numeração dos nós a partir de 1
+    base = (np.arange(lado - 1)[:, np.newaxis] * lado + np.arange(lado - 1)[np.newaxis, :]).ravel() + 1
+    a, b, c, d = base, base + 1, base + lado, base + lado + 1
+    triangulos = np.concatenate((np.column_stack((a, b, c)), np.column_stack((b, d, c))))
+    elementos = np.column_stack((np.arange(1, len(triangulos) + 1), triangulos))
+
+    with open(caminho, "w") as arquivo:
+        arquivo.write("MESH2D\n")
+        np.savetxt(arquivo, elementos, fmt="E3T %d %d %d %d 1")
+        np.savetxt(arquivo, nos, fmt="ND %d %.3f %.3f %.3f")
+    return caminho
+
+
+def carregar_malha(caminho, nome=None):
+    """Carrega um arquivo .2dm como QgsMeshLayer (provedor MDAL)."""
+    camada = QgsMeshLayer(caminho, nome or os.path.splitext(os.path.basename(caminho))[0], "mdal")
+    if not camada.isValid():
+        raise RuntimeError(f"Malha sintética inválida: {caminho}")
+    return camada
@@ -0,0 +1,117 @@
+# coding=utf-8
+"""Testes de codigos/curvas_blocos.py: recorte e emenda das curvas nas costuras entre janelas."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+from osgeo import gdal, ogr
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from codigos.curvas_blocos import _unir_linhas, gerar_curvas_em_blocos, gerar_curvas_gpkg, limites_da_janela, recortar_linha  # noqa: E402
+
+
+def _chave(ponto):
+    return round(float(ponto[0]), 6), round(float(ponto[1]), 6)
+
+
+class UnirLinhasTest(unittest.TestCase):
+
+    def test_emenda_linha_invertida(self):
+        linhas = [
+            np.array([(0.0, 0.0), (1.0, 0.0)]),
+            np.array([(2.0, 0.0), (1.0, 0.0)]),  # Termina onde a primeira termina
+            np.array([(5.0, 5.0), (6.0, 6.0)]),  # Sem vizinhas
+        ]
+        cadeias = _unir_linhas(linhas, _chave)
+        self.assertEqual(len(cadeias), 2)
+        np.testing.assert_array_equal(cadeias[0], [(0.0, 0.0), (1.0, 0.0), (2.0, 0.0)])
+        np.testing.assert_array_equal(cadeias[1], linhas[2])
+
+    def test_emenda_pelos_dois_lados(self):
+        linhas = [
+            np.array([(1.0, 0.0), (2.0, 0.0)]),
+            np.array([(2.0, 0.0), (3.0, 0.0)]),
+            np.array([(0.0, 0.0), (1.0, 0.0)]),
+        ]
+        cadeias = _unir_linhas(linhas, _chave)
+        self.assertEqual(len(cadeias), 1)
+        np.testing.assert_array_equal(cadeias[0], [(0.0, 0.0), (1.0, 0.0), (2.0, 0.0), (3.0, 0.0)])
+
+
+class RecortarLinhaTest(unittest.TestCase):
+
+    def test_trechos_dentro_do_retangulo(self):
+        linha = np.array([(0.0, 0.0), (2.0, 0.0), (2.0, 2.0), (0.0, 2.0), (0.0, 0.5)])
+        trechos = recortar_linha(linha, (-np.inf, 1.0, -np.inf, np.inf))
+        self.assertEqual(len(trechos), 2)
+        np.testing.assert_allclose(trechos[0], [(0.0, 0.0), (1.0, 0.0)])
+        np.testing.assert_allclose(trechos[1], [(1.0, 2.0), (0.0, 2.0), (0.0, 0.5)])
+
+    def test_sem_recorte(self):
+        linha = np.array([(0.0, 0.0), (2.0, 1.0)])
+        trechos = recortar_linha(linha, (-np.inf, np.inf, -np.inf, np.inf))
+        self.assertEqual(len(trechos), 1)
+        np.testing.assert_array_equal(trechos[0], linha)
+
+    def test_limites_nos_centros_das_costuras(self):
+        # Janela das colunas 8 a 16 e linhas 0 a 8 de um raster 30 x 20, pixel de 1 m com norte para cima
+        limites = limites_da_janela((8, 0, 9, 9), 30, 20, (100.0, 1.0, 0.0, 200.0, 0.0, -1.0))
+        self.assertEqual(limites, (108.5, 116.5, 191.5, np.inf))
+
+
+class CurvasEmJanelasTest(unittest.TestCase):
+    """Curvas geradas em janelas pequenas devem ser as mesmas da geração em uma janela só."""
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp(prefix="tst_curvas_")
+        self.caminho = os.path.join(self.pasta, "mdt.tif")
+
+        colunas, linhas = np.meshgrid(np.arange(41), np.arange(29))
+        cotas = 20.0 + 8.0 * np.sin(colunas / 5.3) * np.cos(linhas / 4.1) + 0.37 * colunas
+        fonte = gdal.GetDriverByName('GTiff').Create(self.caminho, 41, 29, 1, gdal.GDT_Float64)
+        fonte.SetGeoTransform((500000.0, 1.0, 0.0, 7500000.0, 0.0, -1.0))
+        fonte.GetRasterBand(1).WriteArray(cotas)
+        fonte = None
+
+    def tearDown(self):
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def _curvas(self, tamanho_tile):
+        return [curva for lote in gerar_curvas_em_blocos(self.caminho, 1.0, base=0.25, tamanho_tile=tamanho_tile, max_workers=2)
+                for curva in lote]
+
+    @staticmethod
+    def _comprimento(coordenadas):
+        return float(np.hypot(*np.diff(coordenadas, axis=0).T).sum())
+
+    def test_janelas_pequenas_igual_janela_unica(self):
+        unica = self._curvas(4096)
+        janelas = self._curvas(8)
+
+        self.assertEqual(len(janelas), len(unica))
+        for elevacao in sorted({cota for cota, _ in unica}):
+            self.assertAlmostEqual(
+                sum(self._comprimento(linha) for cota, linha in janelas if cota == elevacao),
+                sum(self._comprimento(linha) for cota, linha in unica if cota == elevacao),
+                places=6)
+
+    def test_geopackage_do_lote(self):
+        """Caminho da fila de lote (TarefaCurvasRaster): curvas simplificadas com Z gravadas no GeoPackage."""
+        contagens = []
+        for tamanho_tile in (4096, 8):
+            caminho_gpkg = os.path.join(self.pasta, f"curvas_{tamanho_tile}.gpkg")
+            gravadas = gerar_curvas_gpkg(self.caminho, caminho_gpkg, 1.0, tolerancia=0.01, com_z=True, tamanho_tile=tamanho_tile)
+            fonte = ogr.Open(caminho_gpkg)
+            self.assertEqual(fonte.GetLayer(0).GetFeatureCount(), gravadas)
+            fonte = None
+            contagens.append(gravadas)
+        self.assertEqual(contagens[0], contagens[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
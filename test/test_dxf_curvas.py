@@ -0,0 +1,37 @@
+# coding=utf-8
+"""Testes de codigos/dxf_curvas.py: posições dos rótulos das curvas no DXF."""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from codigos.dxf_curvas import posicoes_rotulos  # noqa: E402
+
+
+class PosicoesRotulosTest(unittest.TestCase):
+
+    def test_repeticao_e_linha_curta(self):
+        linhas = [
+            np.array([(0.0, 0.0), (10.0, 0.0)]),  # 10 m: rótulos a 4 e 8 m
+            np.array([(0.0, 0.0), (0.0, 2.0)]),   # mais curta que a repetição: um rótulo no meio
+        ]
+        indices, x, y, angulos = posicoes_rotulos(linhas, 4.0)
+        np.testing.assert_array_equal(indices, [0, 0, 1])
+        np.testing.assert_allclose(x, [4.0, 8.0, 0.0])
+        np.testing.assert_allclose(y, [0.0, 0.0, 1.0])
+        np.testing.assert_allclose(angulos, [0.0, 0.0, 90.0])
+
+    def test_rotulo_no_segmento_certo(self):
+        linhas = [np.array([(0.0, 0.0), (3.0, 0.0), (3.0, 3.0)])]
+        indices, x, y, angulos = posicoes_rotulos(linhas, 5.0)
+        np.testing.assert_array_equal(indices, [0])
+        np.testing.assert_allclose((x[0], y[0]), (3.0, 2.0))
+        np.testing.assert_allclose(angulos, [90.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# coding=utf-8
+"""Testes de codigos/malha_topologia.py: gravação e leitura de STL binário em coordenadas UTM."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from codigos.malha_topologia import escrever_stl_binario, ler_stl  # noqa: E402
+
+
+class StlBinarioTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp(prefix="tst_stl_")
+        self.vertices = np.array([
+            (500000.123, 7500000.456, 100.25),
+            (500010.5, 7500000.456, 101.0),
+            (500000.123, 7500010.75, 102.5),
+            (500010.5, 7500010.75, 99.125),
+        ])
+        self.triangulos = np.array([(0, 1, 2), (1, 3, 2)])
+
+    def tearDown(self):
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def test_ida_e_volta(self):
+        caminho = os.path.join(self.pasta, "malha.stl")
+        escrever_stl_binario(caminho, self.vertices, self.triangulos)
+        self.assertEqual(os.path.getsize(caminho), 84 + 50 * len(self.triangulos))
+
+        vertices, triangulos = ler_stl(caminho)
+        self.assertEqual(len(vertices), 4)
+        # Relativas à origem local, as coordenadas UTM voltam com precisão milimétrica
+        np.testing.assert_allclose(vertices[triangulos], self.vertices[self.triangulos], rtol=0, atol=1e-3)
+
+    def test_origem_informada(self):
+        caminho = os.path.join(self.pasta, "malha_origem.stl")
+        escrever_stl_binario(caminho, self.vertices, self.triangulos, origem=(500000.0, 7500000.0, 0.0))
+        with open(caminho, 'rb') as arquivo:
+            self.assertIn(b"ORIGEM 500000.000 7500000.000 0.000", arquivo.read(80))
+
+        vertices, triangulos = ler_stl(caminho)
+        np.testing.assert_allclose(vertices[triangulos], self.vertices[self.triangulos], rtol=0, atol=1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+# coding=utf-8
+"""Testes de codigos/perfil_amostragem.py: distribuição das amostras ao longo da linha do perfil."""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from codigos.perfil_amostragem import amostrar_polilinha  # noqa: E402
+
+
+class AmostrarPolilinhaTest(unittest.TestCase):
+
+    def test_passo_regular(self):
+        distancias, xs, ys = amostrar_polilinha([(0.0, 0.0), (10.0, 0.0)], 2.5)
+        np.testing.assert_allclose(distancias, [0.0, 2.5, 5.0, 7.5, 10.0])
+        np.testing.assert_allclose(xs, distancias)
+        np.testing.assert_allclose(ys, 0.0)
+
+    def test_limite_de_amostras(self):
+        distancias, _, _ = amostrar_polilinha([(0.0, 0.0), (10.0, 0.0)], 2.5, max_amostras=3)
+        np.testing.assert_allclose(distancias, [0.0, 5.0, 10.0])
+
+    def test_refino_nos_vertices(self):
+        vertices = [(0.0, 0.0), (10.0, 0.0), (10.0, 10.0)]
+        distancias, xs, ys = amostrar_polilinha(vertices, 10.0, refinar_curvatura=False)
+        np.testing.assert_allclose(distancias, [0.0, 10.0, 20.0])
+
+        # Deflexão de 90 graus: passo dividido por 1 + 3 * 0,5 = 2,5 -> três amostras por segmento
+        distancias, xs, ys = amostrar_polilinha(vertices, 10.0)
+        self.assertEqual(len(distancias), 7)
+        np.testing.assert_allclose(distancias[[0, 3, 6]], [0.0, 10.0, 20.0])
+        np.testing.assert_allclose((xs[3], ys[3]), (10.0, 0.0))
+        np.testing.assert_allclose((xs[-1], ys[-1]), (10.0, 10.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
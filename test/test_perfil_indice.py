@@ -0,0 +1,44 @@
+# coding=utf-8
+"""Testes de codigos/perfil_indice.py: consultas distância -> ponto ao longo da linha do perfil."""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from codigos.perfil_indice import IndiceLinha  # noqa: E402
+
+
+class IndiceLinhaTest(unittest.TestCase):
+    """Linha em L: (0, 0) -> (10, 0) -> (10, 10)."""
+
+    def setUp(self):
+        self.indice = IndiceLinha(np.array([(0.0, 0.0), (10.0, 0.0), (10.0, 10.0)]))
+
+    def test_distancias_acumuladas(self):
+        np.testing.assert_allclose(self.indice.distancias, [0.0, 10.0, 20.0])
+        self.assertEqual(self.indice.comprimento, 20.0)
+        self.assertEqual(len(self.indice), 3)
+
+    def test_pontos_nas_distancias(self):
+        xs, ys = self.indice.pontos_nas_distancias([0.0, 5.0, 10.0, 15.0, 20.0])
+        np.testing.assert_allclose(xs, [0.0, 5.0, 10.0, 10.0, 10.0])
+        np.testing.assert_allclose(ys, [0.0, 0.0, 0.0, 5.0, 10.0])
+
+    def test_fora_da_linha(self):
+        xs, ys = self.indice.pontos_nas_distancias([-1.0, 21.0])
+        self.assertTrue(np.isnan(xs).all() and np.isnan(ys).all())
+        self.assertIsNone(self.indice.ponto_na_distancia(25.0))
+        self.assertEqual(self.indice.ponto_na_distancia(12.5), (10.0, 2.5))
+
+    def test_segmento_de_comprimento_nulo(self):
+        indice = IndiceLinha(np.array([(0.0, 0.0), (0.0, 0.0), (3.0, 4.0)]))
+        self.assertEqual(indice.ponto_na_distancia(2.5), (1.5, 2.0))
+        self.assertEqual(indice.ponto_na_distancia(0.0), (0.0, 0.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+# coding=utf-8
+"""Testes de codigos/perfil_lod.py: decimação mínimo/máximo da pirâmide de resoluções."""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from codigos.perfil_lod import PiramideCurva  # noqa: E402
+
+
+class PiramideCurvaTest(unittest.TestCase):
+
+    def test_decimar_grupos_completos(self):
+        y = np.array([3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0])
+        x, y_decimado = PiramideCurva._decimar(np.arange(8.0), y, 4)
+        # Mínimo e máximo de cada grupo, na ordem em que aparecem
+        np.testing.assert_array_equal(x, [1.0, 2.0, 5.0, 6.0])
+        np.testing.assert_array_equal(y_decimado, [1.0, 4.0, 9.0, 2.0])
+
+    def test_decimar_ultimo_grupo_incompleto(self):
+        y = np.array([3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0])
+        x, y_decimado = PiramideCurva._decimar(np.arange(8.0), y, 3)
+        np.testing.assert_array_equal(x, [1.0, 2.0, 3.0, 5.0, 6.0, 7.0])
+        np.testing.assert_array_equal(y_decimado, [1.0, 4.0, 1.0, 9.0, 2.0, 6.0])
+
+    def test_niveis(self):
+        x = np.arange(1024.0)
+        piramide = PiramideCurva(x, np.sin(x))
+        self.assertEqual([nivel[0] for nivel in piramide.niveis], [1, 4])
+        self.assertEqual(len(piramide.niveis[1][1]), 2 * 256)
+
+
+if __name__ == '__main__':
+    unittest.main()
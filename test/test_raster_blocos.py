@@ -0,0 +1,31 @@
+# coding=utf-8
+"""Testes de codigos/raster_blocos.py: passo de amostragem para um limite de pontos."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from codigos.raster_blocos import passo_para_limite  # noqa: E402
+
+
+class PassoParaLimiteTest(unittest.TestCase):
+
+    def test_sem_limite(self):
+        self.assertEqual(passo_para_limite(1000, 1000, 3), 3)
+
+    def test_limite_exato(self):
+        # 100 x 100 pontos com passo 10
+        self.assertEqual(passo_para_limite(1000, 1000, 1, 10000), 10)
+
+    def test_limite_arredondado(self):
+        # Com passo 10 seriam 101 x 100 pontos; 11 é o menor passo que respeita o limite
+        self.assertEqual(passo_para_limite(1001, 1000, 1, 10000), 11)
+
+    def test_passo_maior_que_o_necessario(self):
+        self.assertEqual(passo_para_limite(100, 100, 5, 1000000), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+# coding=utf-8
+"""Testes de codigos/setas_declividade.py: WKB das setas montado com numpy."""
+
+import math
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from codigos.setas_declividade import _dtype_wkb_seta, setas_wkb  # noqa: E402
+
+
+class SetasWkbTest(unittest.TestCase):
+
+    def setUp(self):
+        self.inicio = np.array([(0.0, 0.0)])
+        self.meio = np.array([(5.0, 0.0)])
+        self.fim = np.array([(10.0, 0.0)])
+        self.comprimento = np.array([10.0])
+
+    def test_seta_simples(self):
+        wkb, = setas_wkb(self.inicio, self.meio, self.fim, self.comprimento, 2.0, 1.0)
+        seta = np.frombuffer(wkb, dtype=_dtype_wkb_seta(2))[0]
+        self.assertEqual((seta['ordem'], seta['tipo'], seta['partes']), (1, 5, 5))
+        np.testing.assert_allclose(seta['haste'], [0.0, 0.0, 10.0, 0.0])
+
+        # Abas a 30 graus da haste, com 2 m, a partir da ponta (10, 0)
+        recuo = 2.0 * math.cos(math.pi / 6)
+        cabeca = seta['cabeca']['coords']
+        np.testing.assert_allclose(cabeca[0], [10.0, 0.0, 10.0 - recuo, -1.0])
+        np.testing.assert_allclose(cabeca[1], [10.0, 0.0, 10.0 - recuo, 1.0])
+        # Fechamentos: 1 m perpendicular à haste, para fora de cada aba
+        np.testing.assert_allclose(cabeca[2], [10.0 - recuo, -1.0, 10.0 - recuo, 0.0], atol=1e-12)
+        np.testing.assert_allclose(cabeca[3], [10.0 - recuo, 1.0, 10.0 - recuo, 0.0], atol=1e-12)
+
+    def test_seta_proporcional(self):
+        wkb, = setas_wkb(self.inicio, self.meio, self.fim, self.comprimento, 20.0, 10.0, proporcional=True)
+        seta = np.frombuffer(wkb, dtype=_dtype_wkb_seta(3))[0]
+        np.testing.assert_allclose(seta['haste'], [0.0, 0.0, 5.0, 0.0, 10.0, 0.0])
+        # Cabeça no vértice central, com 20% do comprimento
+        recuo = 2.0 * math.cos(math.pi / 6)
+        np.testing.assert_allclose(seta['cabeca']['coords'][0], [5.0, 0.0, 5.0 - recuo, -1.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
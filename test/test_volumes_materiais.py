@@ -0,0 +1,32 @@
+# coding=utf-8
+"""Testes de codigos/volumes_materiais.py: fatores de empolamento e compactação por material."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from codigos.volumes_materiais import CLASSE_PADRAO, ResumoVolumes  # noqa: E402
+
+
+class AplicarFatoresTest(unittest.TestCase):
+
+    def test_fatores_por_classe(self):
+        resumo = ResumoVolumes(["Argila", "Rocha"], [-10.0, -20.0], [5.0, 8.0])
+        fatores = {"Argila": (1.5, 1.2), CLASSE_PADRAO: (1.1, 1.3)}
+        corte, aterro = resumo.aplicar_fatores(fatores)
+        # A rocha, sem fatores próprios, usa os da classe padrão
+        self.assertAlmostEqual(corte, -10.0 * 1.5 - 20.0 * 1.1)
+        self.assertAlmostEqual(aterro, 5.0 * 1.2 + 8.0 * 1.3)
+
+    def test_sem_fatores(self):
+        resumo = ResumoVolumes.material_unico(-10.0, 5.0)
+        corte, aterro = resumo.aplicar_fatores({})
+        self.assertAlmostEqual(corte, -13.0)
+        self.assertAlmostEqual(aterro, 6.5)
+        self.assertEqual((resumo.total_corte, resumo.total_aterro), (-10.0, 5.0))
+
+
+if __name__ == '__main__':
+    unittest.main()